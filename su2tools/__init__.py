@@ -0,0 +1,8 @@
+"""
+Tools for working with the SU2 test-case corpus.
+"""
+from .cache import load_mesh
+from .mesh import FFDBox, Marker, Mesh, PeriodicTransform, Zone
+from .reader import read_mesh
+
+__all__ = ["FFDBox", "Marker", "Mesh", "PeriodicTransform", "Zone", "load_mesh", "read_mesh"]
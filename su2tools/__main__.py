@@ -0,0 +1,70 @@
+"""
+Command-line entry point: ``python -m su2tools <command> [options]``.
+"""
+# Standard Python modules
+import sys
+
+# First party modules
+from . import (
+    archive,
+    cache,
+    catalog,
+    coarsen,
+    columnar,
+    compare,
+    convert,
+    deform,
+    diff,
+    dual,
+    eqn,
+    ffd,
+    gradcheck,
+    partition,
+    periodic,
+    quality,
+    reader,
+    renumber,
+    sections,
+    store,
+    tecplot,
+    transfer,
+    walldist,
+)
+
+COMMANDS = {
+    "info": reader.main,
+    "cache": cache.main,
+    "dedup": store.main,
+    "catalog": catalog.main,
+    "sections": sections.main,
+    "partition": partition.main,
+    "renumber": renumber.main,
+    "quality": quality.main,
+    "periodic": periodic.main,
+    "ffd": ffd.main,
+    "transfer": transfer.main,
+    "coarsen": coarsen.main,
+    "convert": convert.main,
+    "walldist": walldist.main,
+    "archive": archive.main,
+    "dual": dual.main,
+    "diff": diff.main,
+    "deform": deform.main,
+    "columns": columnar.main,
+    "compare": compare.main,
+    "gradcheck": gradcheck.main,
+    "tecplot": tecplot.main,
+    "eqn": eqn.main,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"usage: python -m su2tools {{{','.join(COMMANDS)}}} [options]", file=sys.stderr)
+        return 2
+    return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Read-only access to ADF files, the original on-disk format of CGNS.
+
+An ADF file is a tree of nodes. Every node has a name, a label (the CGNS type, e.g.
+``Zone_t``), a data type, up to 12 dimensions and optional data. Headers are stored as
+fixed-width ASCII records and disk addresses as 12 hexadecimal characters (8 for the 4 kB
+block, 4 for the offset inside it), which is all that is needed to walk the tree. Node data
+is returned as NumPy arrays viewing the memory-mapped file.
+"""
+# Standard Python modules
+import mmap
+
+# External modules
+import numpy as np
+
+ADF_MAGIC = b"ADF Database Version"
+BLOCK_SIZE = 4096
+NODE_HEADER_SIZE = 246
+_FILE_HEADER_SIZE = 186
+_CHUNK_HEADER_SIZE = 16
+_SUB_NODE_ENTRY_SIZE = 44
+
+DATA_TYPES = {
+    "I4": "i4",
+    "I8": "i8",
+    "U4": "u4",
+    "U8": "u8",
+    "R4": "f4",
+    "R8": "f8",
+    "X4": "c8",
+    "X8": "c16",
+    "B1": "u1",
+    "C1": "S1",
+}
+
+
+def _pointer(field):
+    """Convert a 12-character disk pointer to a byte offset."""
+    return int(field[:8], 16) * BLOCK_SIZE + int(field[8:12], 16)
+
+
+class Node:
+    """
+    One node of an ADF tree.
+
+    Attributes
+    ----------
+    name : str
+        Node name.
+    label : str
+        Node label; for CGNS files this is the SIDS type, e.g. ``Elements_t``.
+    data_type : str
+        ADF data type ("MT" for nodes without data, "I4", "R8", "C1", ...).
+    dims : tuple of int
+        Dimensions of the node data, first index varying fastest.
+    """
+
+    def __init__(self, adf, offset):
+        header = adf.buf[offset : offset + NODE_HEADER_SIZE]
+        if header[:4] != b"NoDe" or header[-4:] != b"TaiL":
+            raise ValueError(f"{adf.path}: no ADF node at byte {offset}")
+        self._adf = adf
+        self.name = header[4:36].decode("latin-1").rstrip()
+        self.label = header[36:68].decode("latin-1").rstrip()
+        self._nsub = int(header[68:76], 16)
+        self._sub_table = _pointer(header[84:96])
+        self.data_type = header[96:128].decode("latin-1").strip()
+        ndim = int(header[128:130], 16)
+        self.dims = tuple(int(header[130 + 8 * i : 138 + 8 * i], 16) for i in range(ndim))
+        self._nchunks = int(header[226:230], 16)
+        self._data = _pointer(header[230:242])
+        self._children = None
+
+    def __repr__(self):
+        return f"Node({self.name!r}, {self.label!r}, {self.data_type}{list(self.dims)})"
+
+    @property
+    def children(self):
+        """The child nodes, in file order."""
+        if self._children is None:
+            buf = self._adf.buf
+            base = self._sub_table + _CHUNK_HEADER_SIZE
+            self._children = []
+            for i in range(self._nsub):
+                entry = buf[base + i * _SUB_NODE_ENTRY_SIZE : base + (i + 1) * _SUB_NODE_ENTRY_SIZE]
+                self._children.append(Node(self._adf, _pointer(entry[32:44])))
+        return self._children
+
+    def child(self, name):
+        """Return the child called ``name``, or None."""
+        for c in self.children:
+            if c.name == name:
+                return c
+        return None
+
+    def get(self, path):
+        """Return the descendant at a '/'-separated path, or None."""
+        node = self
+        for name in path.strip("/").split("/"):
+            node = node.child(name)
+            if node is None:
+                return None
+        return node
+
+    def by_label(self, label):
+        """Children whose label is ``label``."""
+        return [c for c in self.children if c.label == label]
+
+    def walk(self):
+        """Yield this node and all its descendants, depth first."""
+        yield self
+        for c in self.children:
+            yield from c.walk()
+
+    def _chunks(self):
+        buf = self._adf.buf
+        if self._nchunks == 1:
+            return [(self._data + _CHUNK_HEADER_SIZE, _pointer(buf[self._data + 4 : self._data + 16]))]
+        # A data-chunk table: header, then (start, end) pointer pairs
+        base = self._data + _CHUNK_HEADER_SIZE
+        spans = []
+        for i in range(self._nchunks):
+            entry = buf[base + 24 * i : base + 24 * (i + 1)]
+            spans.append((_pointer(entry[:12]) + _CHUNK_HEADER_SIZE, _pointer(entry[12:24])))
+        return spans
+
+    @property
+    def data(self):
+        """
+        The node data as an array of shape ``dims`` in Fortran order, a string for C1 data,
+        or None for nodes without data.
+        """
+        if self.data_type == "MT" or self._nchunks == 0:
+            return None
+        if self.data_type not in DATA_TYPES:
+            raise ValueError(f"unsupported ADF data type {self.data_type} in node {self.name}")
+        dtype = np.dtype(DATA_TYPES[self.data_type]).newbyteorder(self._adf.byteorder)
+        count = int(np.prod(self.dims, dtype=np.int64))
+        spans = self._chunks()
+        if len(spans) == 1:
+            start = spans[0][0]
+            flat = np.frombuffer(self._adf.buf, dtype=dtype, count=count, offset=start)
+        else:
+            flat = np.concatenate([np.frombuffer(self._adf.buf[a:b], dtype=dtype) for a, b in spans])[:count]
+        if self.data_type == "C1":
+            return flat.tobytes().decode("latin-1").rstrip("\0 ")
+        return flat.reshape(self.dims, order="F")
+
+
+class ADFFile:
+    """
+    A memory-mapped ADF file.
+
+    Parameters
+    ----------
+    path : str
+        File name.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buf[4 : 4 + len(ADF_MAGIC)] != ADF_MAGIC:
+            raise ValueError(f"{path} is not an ADF file")
+        tags = {}
+        for i in range(6):
+            start = self.buf.find(f"AdF{i}".encode(), 0, _FILE_HEADER_SIZE)
+            if start < 0:
+                raise ValueError(f"{path}: corrupt ADF file header")
+            tags[i] = start + 4
+        # AdF2 holds the numeric format ('B'ig or 'L'ittle endian IEEE) and the OS size
+        numeric = self.buf[tags[2] : tags[2] + 1]
+        if numeric not in (b"B", b"L"):
+            raise ValueError(f"{path}: unsupported ADF numeric format {numeric!r}")
+        self.byteorder = ">" if numeric == b"B" else "<"
+        self.root = Node(self, _pointer(self.buf[tags[4] : tags[4] + 12]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        try:
+            self.buf.close()
+        except BufferError:
+            # Arrays returned by Node.data still view the file; it is unmapped once they are gone
+            pass
+
+
+def is_adf(path):
+    """Whether ``path`` starts with the ADF file signature."""
+    with open(path, "rb") as f:
+        return f.read(4 + len(ADF_MAGIC))[4:] == ADF_MAGIC
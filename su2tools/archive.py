@@ -0,0 +1,348 @@
+"""
+Compressed SU2 mesh archives (``.su2z``) with random access to zones and markers.
+
+The text of a .su2 file is cut into blocks that start at every section boundary of
+:mod:`su2tools.sections` (element, point, marker, periodic and FFD blocks, zone headers) and
+are split further at line ends to at most ``block_size`` bytes. Every block is compressed on
+its own, with zlib or, if the ``zstandard`` package is installed, zstd. The file holds::
+
+    header   "SU2Z", format version, byte offset and length of the index
+    blocks   the compressed blocks, in file order
+    index    JSON: codec, original size and SHA-256, (offset, size, compressed offset,
+             compressed size) of every block, and the section index of the mesh
+
+Reading a zone, a marker or the points of a zone only decompresses the blocks of that byte
+range; whole meshes are decompressed with one thread per block, since zlib and zstd release
+the GIL.
+"""
+# Standard Python modules
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import struct
+import tarfile
+import time
+import zlib
+
+# External modules
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# First party modules
+from .reader import CHUNK_LINES, parse
+from .sections import MeshIndex, ZoneIndex, describe, scan
+
+ARCHIVE_SUFFIX = ".su2z"
+MAGIC = b"SU2Z"
+VERSION = 1
+# Magic, version, index offset, index length
+_HEADER = struct.Struct("<4sIQQ")
+
+BLOCK_SIZE = 1 << 20
+CODECS = ("zlib", "zstd")
+DEFAULT_LEVEL = {"zlib": 6, "zstd": 9}
+
+
+def _compressor(codec, level):
+    if codec == "zlib":
+        return lambda data: zlib.compress(data, level)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd archives require the zstandard package")
+        return zstandard.ZstdCompressor(level=level).compress
+    raise ValueError(f"unknown codec {codec!r} (expected one of {', '.join(CODECS)})")
+
+
+def _decompressor(codec):
+    if codec == "zlib":
+        return zlib.decompress
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd archives require the zstandard package")
+        return zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"unknown codec {codec!r}")
+
+
+def block_bounds(data, zones, block_size=BLOCK_SIZE):
+    """
+    Byte offsets that cut ``data`` into blocks: every zone and section boundary, then line
+    ends so that no block is longer than ``block_size`` (unless a single line is).
+
+    Returns
+    -------
+    bounds : ndarray
+        Increasing offsets from 0 to ``len(data)``.
+    """
+    cuts = {0, len(data)}
+    for z in zones:
+        cuts.update([z.offset, z.end])
+        for s in z.sections:
+            cuts.update([s.offset, s.end])
+    cuts = sorted(c for c in cuts if 0 <= c <= len(data))
+    bounds = [0]
+    for end in cuts[1:]:
+        while end - bounds[-1] > block_size:
+            cut = data.rfind(b"\n", bounds[-1], bounds[-1] + block_size) + 1
+            if cut <= bounds[-1]:
+                cut = data.find(b"\n", bounds[-1] + block_size, end) + 1 or end
+            bounds.append(cut)
+        if end > bounds[-1]:
+            bounds.append(end)
+    return np.array(bounds, dtype=np.int64)
+
+
+def pack_bytes(data, path, codec="zlib", level=None, block_size=BLOCK_SIZE, workers=None):
+    """
+    Write the .su2 text ``data`` as an archive at ``path``.
+
+    Returns
+    -------
+    index : dict
+        The index stored in the archive.
+    """
+    compress = _compressor(codec, DEFAULT_LEVEL.get(codec) if level is None else level)
+    zones = scan(data, path)
+    bounds = block_bounds(data, zones, block_size)
+    pieces = [data[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        compressed = list(pool.map(compress, pieces))
+    sizes = np.array([len(c) for c in compressed], dtype=np.int64)
+    offsets = _HEADER.size + np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    index = {
+        "codec": codec,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "blocks": np.column_stack([bounds[:-1], np.diff(bounds), offsets, sizes]).tolist(),
+        "zones": [z.to_dict() for z in zones],
+    }
+    header = json.dumps(index, separators=(",", ":")).encode()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, _HEADER.size + int(sizes.sum()), len(header)))
+        for c in compressed:
+            f.write(c)
+        f.write(header)
+    os.replace(tmp, path)
+    return index
+
+
+def pack(source, path=None, codec="zlib", level=None, block_size=BLOCK_SIZE, workers=None):
+    """Compress the .su2 file ``source`` to ``path`` (default: ``source`` + ``z``)."""
+    with open(source, "rb") as f:
+        data = f.read()
+    path = path or source + "z"
+    pack_bytes(data, path, codec, level, block_size, workers)
+    return path
+
+
+def pack_tar(source, directory=None, codec="zlib", level=None, block_size=BLOCK_SIZE, workers=None):
+    """
+    Compress every .su2 member of a tar archive (``.tgz``, ``.tar.gz``, ...) to its own
+    archive in ``directory`` (default: next to the tar file), without extracting it.
+
+    Returns
+    -------
+    paths : list of str
+        The archives written.
+    """
+    directory = directory or os.path.dirname(source)
+    paths = []
+    with tarfile.open(source) as tar:
+        for member in tar:
+            if member.isfile() and member.name.endswith(".su2"):
+                path = os.path.join(directory, os.path.basename(member.name) + "z")
+                pack_bytes(tar.extractfile(member).read(), path, codec, level, block_size, workers)
+                paths.append(path)
+    return paths
+
+
+class Archive:
+    """
+    An open .su2z archive.
+
+    Parameters
+    ----------
+    path : str
+        Archive file name.
+
+    Attributes
+    ----------
+    index : MeshIndex
+        Section index of the original mesh; byte offsets refer to the uncompressed text.
+    blocks : ndarray
+        (nblock, 4) offset and size of each block in the text, offset and size in the archive.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        magic, version, offset, length = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{path} is not a version {VERSION} .su2z archive")
+        self._file.seek(offset)
+        meta = json.loads(self._file.read(length))
+        self.codec = meta["codec"]
+        self.size = meta["size"]
+        self.sha256 = meta["sha256"]
+        self.blocks = np.array(meta["blocks"], dtype=np.int64).reshape(-1, 4)
+        self.index = MeshIndex(path, self.size, None, [ZoneIndex.from_dict(z) for z in meta["zones"]])
+        self._decompress = _decompressor(self.codec)
+        self.blocks_read = 0
+
+    def __repr__(self):
+        return f"Archive({self.path!r}, {self.codec}, {len(self.blocks)} blocks, {self.size} bytes)"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _block(self, i):
+        _, _, offset, size = self.blocks[i]
+        self._file.seek(offset)
+        return self._decompress(self._file.read(size))
+
+    def read(self, start=0, end=None, workers=1):
+        """
+        Uncompressed text of the bytes ``start:end`` of the original mesh.
+
+        Only the blocks that overlap the range are read and decompressed, by ``workers``
+        threads.
+        """
+        end = self.size if end is None else end
+        if end <= start:
+            return b""
+        first = int(np.searchsorted(self.blocks[:, 0], start, side="right")) - 1
+        last = int(np.searchsorted(self.blocks[:, 0], end, side="left"))
+        # Read the compressed bytes sequentially, then decompress them in parallel
+        base = self.blocks[first, 2]
+        self._file.seek(base)
+        raw = self._file.read(int(self.blocks[last - 1, 2] + self.blocks[last - 1, 3] - base))
+        pieces = [raw[o - base : o - base + n] for o, n in self.blocks[first:last, 2:]]
+        if workers == 1 or len(pieces) == 1:
+            text = b"".join(map(self._decompress, pieces))
+        else:
+            with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+                text = b"".join(pool.map(self._decompress, pieces))
+        self.blocks_read += len(pieces)
+        skip = start - self.blocks[first, 0]
+        return text[skip : skip + end - start]
+
+    def _parse_range(self, offset, end, lineno, ndime, chunk_lines):
+        text = self.read(offset, end)
+        return parse(text, self.path, chunk_lines, lineno=lineno, ndime=ndime).zones[0]
+
+    def mesh(self, workers=None, chunk_lines=CHUNK_LINES):
+        """Decompress and parse the whole mesh, as :func:`su2tools.read_mesh` would return it."""
+        return parse(self.read(workers=workers), self.path, chunk_lines)
+
+    def load_zone(self, izone, chunk_lines=CHUNK_LINES):
+        """Read a single zone (see :func:`su2tools.sections.load_zone`)."""
+        z = self.index.zone(izone)
+        zone = self._parse_range(z.offset, z.end, z.lineno, z.ndime, chunk_lines)
+        zone.izone = z.izone
+        return zone
+
+    def load_marker(self, tag, izone=None, chunk_lines=CHUNK_LINES):
+        """Read the first marker called ``tag`` (see :func:`su2tools.sections.load_marker`)."""
+        z, s = self.index.marker(tag, izone)
+        return self._parse_range(s.offset, s.end, s.lineno, z.ndime, chunk_lines).markers[0]
+
+    def load_points(self, izone=1, chunk_lines=CHUNK_LINES):
+        """Read the point coordinates of one zone only."""
+        z = self.index.zone(izone)
+        s = z.find("points")[0]
+        return self._parse_range(s.offset, s.end, s.lineno, z.ndime, chunk_lines).coords
+
+    def unpack(self, path):
+        """Write the original .su2 file, after checking its SHA-256."""
+        data = self.read(workers=None)
+        if hashlib.sha256(data).hexdigest() != self.sha256:
+            raise ValueError(f"{self.path}: the decompressed mesh does not match its checksum")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+def read_archive(path, workers=None):
+    """Read the mesh of a .su2z archive."""
+    with Archive(path) as archive:
+        return archive.mesh(workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools archive", description="Compressed, seekable SU2 mesh archives.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("pack", help="compress .su2 files, or the .su2 members of tar files")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--out", help="output directory (default: next to each file)")
+    p.add_argument("--codec", choices=CODECS, default="zlib")
+    p.add_argument("--level", type=int, help="compression level")
+    p.add_argument("--block-size", type=int, default=BLOCK_SIZE, help=f"largest block (default: {BLOCK_SIZE})")
+    p = sub.add_parser("info", help="print the sections and blocks of archives")
+    p.add_argument("paths", nargs="+")
+    p = sub.add_parser("read", help="time reading an archive, or one zone or marker of it")
+    p.add_argument("path")
+    p.add_argument("--zone", type=int)
+    p.add_argument("--marker")
+    p = sub.add_parser("unpack", help="restore the original .su2 file")
+    p.add_argument("path")
+    p.add_argument("-o", "--output", help="output file (default: the archive name without 'z')")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "pack":
+            if args.out:
+                os.makedirs(args.out, exist_ok=True)
+            for source in args.paths:
+                start = time.perf_counter()
+                options = (args.codec, args.level, args.block_size)
+                if tarfile.is_tarfile(source):
+                    written = pack_tar(source, args.out, *options)
+                else:
+                    target = os.path.join(args.out, os.path.basename(source) + "z") if args.out else None
+                    written = [pack(source, target, *options)]
+                elapsed = time.perf_counter() - start
+                for path in written:
+                    with Archive(path) as archive:
+                        size = archive.size
+                    print(f"{path}: {size / 1e6:.2f} MB -> {os.path.getsize(path) / 1e6:.2f} MB in {elapsed:.2f} s")
+        elif args.command == "info":
+            for path in args.paths:
+                with Archive(path) as archive:
+                    compressed = int(archive.blocks[:, 3].sum())
+                    print(describe(archive.index))
+                    print(
+                        f"  {archive.codec}: {len(archive.blocks)} blocks, {archive.size} -> {compressed} bytes "
+                        f"({archive.size / max(compressed, 1):.1f}x)"
+                    )
+        elif args.command == "read":
+            with Archive(args.path) as archive:
+                start = time.perf_counter()
+                if args.zone is None and args.marker is None:
+                    result = archive.mesh()
+                elif args.marker is not None:
+                    result = archive.load_marker(args.marker, args.zone)
+                else:
+                    result = archive.load_zone(args.zone)
+                elapsed = time.perf_counter() - start
+                print(f"{result}: {archive.blocks_read} of {len(archive.blocks)} blocks in {elapsed * 1e3:.1f} ms")
+        elif args.command == "unpack":
+            output = args.output or (args.path[:-1] if args.path.endswith(ARCHIVE_SUFFIX) else args.path + ".su2")
+            with Archive(args.path) as archive:
+                archive.unpack(output)
+            print(f"{args.path} -> {output}")
+    except (KeyError, ValueError, ImportError) as e:
+        parser.error(str(e).strip("'\""))
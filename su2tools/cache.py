@@ -0,0 +1,330 @@
+"""
+Binary sidecar cache for parsed meshes.
+
+A cache file holds a small JSON header followed by raw, 64-byte aligned arrays, so that it
+can be memory-mapped and turned back into a :class:`~su2tools.mesh.Mesh` without copying.
+Every cache records the SHA-256 digest of the file it was built from; a cache whose digest no
+longer matches its source is ignored and rebuilt.
+
+By default the cache is written next to the mesh (``mesh.su2`` -> ``mesh.su2.cache``). When a
+cache directory is given, or the ``SU2TOOLS_CACHE`` environment variable is set, caches are
+stored there under the digest of the source instead, so identical meshes share one entry.
+"""
+# Standard Python modules
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+# External modules
+import numpy as np
+
+# First party modules
+from .mesh import FFDBox, Marker, Mesh, PeriodicTransform, Zone
+from .reader import read_mesh
+
+MAGIC = b"SU2TOOLS"
+VERSION = 1
+ALIGN = 64
+CACHE_SUFFIX = ".cache"
+_PREFIX = struct.Struct("<8sII")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_bundle(path, arrays, meta):
+    """
+    Write named arrays and JSON-serializable metadata to a single binary file.
+
+    The file is written to a temporary name first and then moved into place, so readers never
+    see a partially written bundle.
+
+    Parameters
+    ----------
+    path : str
+        Output file name.
+    arrays : dict
+        Mapping of name to ndarray.
+    meta : dict
+        Metadata stored in the header.
+    """
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"meta": meta, "arrays": layout}).encode()
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=CACHE_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(data_start + offset)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_bundle(path):
+    """
+    Memory-map a file written by :func:`save_bundle`.
+
+    The arrays are copy-on-write views of the file: they can be modified in memory without
+    affecting the file on disk.
+
+    Returns
+    -------
+    arrays : dict
+        Mapping of name to ndarray.
+    meta : dict
+        The stored metadata.
+    """
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    magic, version, header_len = _PREFIX.unpack_from(buf)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} su2tools bundle")
+    header = json.loads(buf[_PREFIX.size : _PREFIX.size + header_len])
+    data_start = _aligned(_PREFIX.size + header_len)
+    arrays = {}
+    for name, info in header["arrays"].items():
+        dtype = np.dtype(info["dtype"])
+        count = int(np.prod(info["shape"], dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(info["shape"], dtype=dtype)
+        else:
+            offset = data_start + info["offset"]
+            arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=offset).reshape(info["shape"])
+    return arrays, header["meta"]
+
+
+def read_bundle_meta(path):
+    """Read only the metadata of a bundle, or return None if the file is not a bundle."""
+    try:
+        with open(path, "rb") as f:
+            magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC or version != VERSION:
+                return None
+            return json.loads(f.read(header_len))["meta"]
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def file_stamp(path):
+    """Size and modification time of a file, as recorded in the metadata of its sidecar files."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def read_sidecar_meta(filename, kind, version, source):
+    """
+    Read the metadata of a sidecar bundle built from the file ``source``.
+
+    Returns None if the bundle is missing, of another kind or version, or stale: the size or
+    modification time of ``source`` differ from those recorded by :func:`file_stamp`.
+    """
+    meta = read_bundle_meta(filename)
+    if not meta or meta.get("kind") != kind or meta.get("version") != version:
+        return None
+    stamp = file_stamp(source)
+    if any(meta.get(key) != value for key, value in stamp.items()):
+        return None
+    return meta
+
+
+def save_quietly(save, *args, **kwargs):
+    """
+    Call the function ``save`` that writes a sidecar file, ignoring the errors of the file
+    system (e.g. a read-only tree), since sidecars are only caches.
+
+    Returns
+    -------
+    saved : bool
+    """
+    try:
+        save(*args, **kwargs)
+    except OSError:
+        return False
+    return True
+
+
+def _flatten_mesh(mesh):
+    """Split a mesh into a dict of arrays and a JSON-serializable description."""
+    arrays = {}
+    zones = []
+    for i, zone in enumerate(mesh):
+        key = f"z{i}"
+        arrays[f"{key}/elem_types"] = zone.elem_types
+        arrays[f"{key}/elem_offsets"] = zone.elem_offsets
+        arrays[f"{key}/elem_conn"] = zone.elem_conn
+        arrays[f"{key}/coords"] = zone.coords
+        markers = []
+        for j, m in enumerate(zone.markers):
+            arrays[f"{key}/m{j}/elem_types"] = m.elem_types
+            arrays[f"{key}/m{j}/elem_offsets"] = m.elem_offsets
+            arrays[f"{key}/m{j}/elem_conn"] = m.elem_conn
+            if m.transform is not None:
+                arrays[f"{key}/m{j}/transform"] = m.transform
+            markers.append({"tag": m.tag, "send_to": m.send_to, "transform": m.transform is not None})
+        boxes = []
+        for k, box in enumerate(zone.ffd_boxes):
+            for name in ("corners", "control_indices", "control_points", "surface_points", "surface_params"):
+                arrays[f"{key}/ffd{k}/{name}"] = getattr(box, name)
+            boxes.append(
+                {
+                    "tag": box.tag,
+                    "level": box.level,
+                    "degree": list(box.degree),
+                    "parents": box.parents,
+                    "children": box.children,
+                    "surface_markers": [str(t) for t in box.surface_markers],
+                }
+            )
+        periodic = [[p.index, p.center.tolist(), p.angles.tolist(), p.translation.tolist()] for p in zone.periodic]
+        zones.append(
+            {
+                "izone": zone.izone,
+                "ndime": zone.ndime,
+                "npoin_domain": zone.npoin_domain,
+                "markers": markers,
+                "periodic": periodic,
+                "ffd_boxes": boxes,
+            }
+        )
+    return arrays, zones
+
+
+def _unflatten_mesh(arrays, zones, path):
+    result = []
+    for i, info in enumerate(zones):
+        key = f"z{i}"
+        zone = Zone(info["izone"], info["ndime"])
+        zone.elem_types = arrays[f"{key}/elem_types"]
+        zone.elem_offsets = arrays[f"{key}/elem_offsets"]
+        zone.elem_conn = arrays[f"{key}/elem_conn"]
+        zone.coords = arrays[f"{key}/coords"]
+        zone.npoin_domain = info["npoin_domain"]
+        for j, m in enumerate(info["markers"]):
+            zone.markers.append(
+                Marker(
+                    m["tag"],
+                    arrays[f"{key}/m{j}/elem_types"],
+                    arrays[f"{key}/m{j}/elem_offsets"],
+                    arrays[f"{key}/m{j}/elem_conn"],
+                    m["send_to"],
+                    arrays[f"{key}/m{j}/transform"] if m["transform"] else None,
+                )
+            )
+        zone.periodic = [PeriodicTransform(*p) for p in info["periodic"]]
+        for k, b in enumerate(info["ffd_boxes"]):
+            box = FFDBox(b["tag"])
+            box.level = b["level"]
+            box.degree = tuple(b["degree"])
+            box.parents = b["parents"]
+            box.children = b["children"]
+            box.surface_markers = np.array(b["surface_markers"], dtype=object)
+            for name in ("corners", "control_indices", "control_points", "surface_points", "surface_params"):
+                setattr(box, name, arrays[f"{key}/ffd{k}/{name}"])
+            zone.ffd_boxes.append(box)
+        result.append(zone)
+    return Mesh(result, path=path)
+
+
+def cache_path(path, digest=None, cache_dir=None):
+    """
+    Return the cache file name for a mesh.
+
+    Parameters
+    ----------
+    path : str
+        The .su2 file.
+    digest : str, optional
+        Digest of the file, required when a cache directory is used.
+    cache_dir : str, optional
+        Cache directory. Defaults to ``$SU2TOOLS_CACHE``, or the directory of the mesh if unset.
+    """
+    cache_dir = cache_dir or os.environ.get("SU2TOOLS_CACHE")
+    if cache_dir:
+        if digest is None:
+            digest = file_digest(path)
+        return os.path.join(cache_dir, digest + CACHE_SUFFIX)
+    return path + CACHE_SUFFIX
+
+
+def save_mesh_cache(mesh, filename, digest):
+    """Write a parsed mesh to ``filename``, tagged with the digest of its source."""
+    arrays, zones = _flatten_mesh(mesh)
+    save_bundle(filename, arrays, {"kind": "mesh", "source_digest": digest, "zones": zones})
+
+
+def load_mesh(path, cache_dir=None, write=True):
+    """
+    Load a mesh through the sidecar cache.
+
+    The source file is hashed and compared with the digest stored in the cache. On a match the
+    cache is memory-mapped; otherwise the mesh is parsed and, if ``write`` is True, a new cache
+    is written. Failing to write the cache (e.g. in a read-only checkout) is not an error.
+
+    Parameters
+    ----------
+    path : str
+        The .su2 file.
+    cache_dir : str, optional
+        See :func:`cache_path`.
+    write : bool
+        Whether to (re)write the cache on a miss.
+
+    Returns
+    -------
+    mesh : Mesh
+        The mesh, backed by the cache when it was valid.
+    """
+    digest = file_digest(path)
+    filename = cache_path(path, digest, cache_dir)
+    meta = read_bundle_meta(filename)
+    if meta is not None and meta.get("kind") == "mesh" and meta.get("source_digest") == digest:
+        arrays, meta = load_bundle(filename)
+        return _unflatten_mesh(arrays, meta["zones"], path)
+
+    mesh = read_mesh(path)
+    if write:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+            save_mesh_cache(mesh, filename, digest)
+        except OSError:
+            pass
+    return mesh
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools cache", description="Build or refresh mesh sidecar caches.")
+    parser.add_argument("meshes", nargs="+", help=".su2 files to cache")
+    parser.add_argument("--cache-dir", help="cache directory (default: $SU2TOOLS_CACHE or next to each mesh)")
+    args = parser.parse_args(argv)
+    for path in args.meshes:
+        load_mesh(path, cache_dir=args.cache_dir)
+        print(f"{path} -> {cache_path(path, cache_dir=args.cache_dir)}")
@@ -0,0 +1,318 @@
+"""
+Queryable catalog of every mesh in the repository.
+
+``build_catalog`` walks the tree, summarizes each .su2 and .cgns file in a process pool and
+stores the results in an indexed SQLite database. Files whose size and modification time
+have not changed since the last run are not read again. Queries then only touch the
+database::
+
+    $ python -m su2tools catalog build
+    $ python -m su2tools catalog query --ndime 2 --category '%rans%' --min-points 30000 --periodic
+"""
+# Standard Python modules
+import argparse
+import concurrent.futures
+import os
+import sqlite3
+
+# First party modules
+from .cache import file_digest
+from .cgns import summarize as summarize_cgns
+from .reader import read_mesh
+from .store import find_files
+
+DEFAULT_CATALOG = "mesh_catalog.sqlite"
+PATTERNS = ("*.su2", "*.cgns")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    category TEXT,
+    format TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    digest TEXT,
+    ndime INTEGER,
+    nzone INTEGER,
+    npoin INTEGER,
+    nelem INTEGER,
+    nperiodic INTEGER,
+    ffd_nbox INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS zones (
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    izone INTEGER,
+    ndime INTEGER,
+    npoin INTEGER,
+    nelem INTEGER,
+    nperiodic INTEGER
+);
+CREATE TABLE IF NOT EXISTS elements (
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    izone INTEGER,
+    vtk_type INTEGER,
+    count INTEGER
+);
+CREATE TABLE IF NOT EXISTS markers (
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    izone INTEGER,
+    tag TEXT,
+    nelem INTEGER,
+    npoin INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_shape ON files(ndime, npoin);
+CREATE INDEX IF NOT EXISTS files_category ON files(category);
+CREATE INDEX IF NOT EXISTS zones_file ON zones(file_id);
+CREATE INDEX IF NOT EXISTS elements_file ON elements(file_id);
+CREATE INDEX IF NOT EXISTS elements_type ON elements(vtk_type, count);
+CREATE INDEX IF NOT EXISTS markers_file ON markers(file_id);
+CREATE INDEX IF NOT EXISTS markers_tag ON markers(tag);
+"""
+
+
+def summarize_file(path):
+    """
+    Summarize one mesh file as a JSON-like dict (see :func:`su2tools.cgns.summarize`).
+    """
+    if path.lower().endswith(".cgns"):
+        return dict(summarize_cgns(path), format="cgns")
+    mesh = read_mesh(path)
+    zones = []
+    for zone in mesh:
+        zones.append(
+            {
+                "izone": zone.izone,
+                "ndime": zone.ndime,
+                "npoin": zone.npoin,
+                "nelem": zone.nelem,
+                "nperiodic": len(zone.periodic),
+                "elem_counts": zone.elem_counts(),
+                "markers": [(m.tag, m.nelem, len(m.nodes)) for m in zone.markers],
+            }
+        )
+    return {
+        "format": "su2",
+        "ndime": max(z.ndime for z in mesh),
+        "nzone": mesh.nzone,
+        "zones": zones,
+        "nperiodic": max(len(z.periodic) for z in mesh),
+        "ffd_nbox": sum(len(z.ffd_boxes) for z in mesh),
+    }
+
+
+def _index_one(args):
+    root, rel = args
+    path = os.path.join(root, rel)
+    try:
+        summary = summarize_file(path)
+        summary["error"] = None
+    except Exception as e:  # a broken file must not abort the whole catalog
+        summary = {"error": f"{type(e).__name__}: {e}", "zones": []}
+    summary["digest"] = file_digest(path)
+    return rel, summary
+
+
+def connect(db_path):
+    db = sqlite3.connect(db_path)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(SCHEMA)
+    return db
+
+
+def build_catalog(root=".", db_path=DEFAULT_CATALOG, workers=None, patterns=PATTERNS, force=False):
+    """
+    Create or update the catalog for all meshes under ``root``.
+
+    Parameters
+    ----------
+    root : str
+        Directory to scan.
+    db_path : str
+        SQLite file to write.
+    workers : int, optional
+        Number of worker processes (default: one per CPU).
+    patterns : tuple of str
+        File name patterns to index.
+    force : bool
+        Re-read every file, even unchanged ones.
+
+    Returns
+    -------
+    counts : tuple of int
+        Number of files (indexed, unchanged, removed).
+    """
+    db = connect(db_path)
+    known = {path: (size, mtime) for path, size, mtime in db.execute("SELECT path, size, mtime_ns FROM files")}
+    todo = []
+    present = set()
+    for rel in find_files(root, patterns):
+        st = os.stat(os.path.join(root, rel))
+        present.add(rel)
+        if force or known.get(rel) != (st.st_size, st.st_mtime_ns):
+            todo.append((rel, st))
+
+    removed = [p for p in known if p not in present]
+    for rel in removed:
+        db.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+    stats = dict(todo)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_index_one, [(root, rel) for rel, _ in todo], chunksize=4)
+        for rel, s in results:
+            st = stats[rel]
+            db.execute("DELETE FROM files WHERE path = ?", (rel,))
+            zones = s["zones"]
+            cur = db.execute(
+                "INSERT INTO files (path, category, format, size, mtime_ns, digest, ndime, nzone, npoin, nelem, "
+                "nperiodic, ffd_nbox, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    rel,
+                    rel.split("/", 1)[0] if "/" in rel else "",
+                    s.get("format"),
+                    st.st_size,
+                    st.st_mtime_ns,
+                    s["digest"],
+                    s.get("ndime"),
+                    s.get("nzone"),
+                    sum(z["npoin"] for z in zones),
+                    sum(z["nelem"] for z in zones),
+                    s.get("nperiodic"),
+                    s.get("ffd_nbox"),
+                    s["error"],
+                ),
+            )
+            file_id = cur.lastrowid
+            for z in zones:
+                db.execute(
+                    "INSERT INTO zones VALUES (?, ?, ?, ?, ?, ?)",
+                    (file_id, z["izone"], z["ndime"], z["npoin"], z["nelem"], z.get("nperiodic", 0)),
+                )
+                db.executemany(
+                    "INSERT INTO elements VALUES (?, ?, ?, ?)",
+                    [(file_id, z["izone"], t, n) for t, n in z["elem_counts"].items()],
+                )
+                db.executemany(
+                    "INSERT INTO markers VALUES (?, ?, ?, ?, ?)",
+                    [(file_id, z["izone"], m[0], m[1], m[2] if len(m) > 2 else None) for m in z["markers"]],
+                )
+    db.commit()
+    db.close()
+    return len(todo), len(present) - len(todo), len(removed)
+
+
+def query(
+    db_path=DEFAULT_CATALOG,
+    ndime=None,
+    category=None,
+    min_points=None,
+    max_points=None,
+    marker=None,
+    periodic=False,
+    elem_type=None,
+    ffd=False,
+):
+    """
+    Select meshes from the catalog.
+
+    Parameters
+    ----------
+    ndime : int, optional
+        Mesh dimension.
+    category : str, optional
+        SQL LIKE pattern on the top-level directory, e.g. ``'%rans%'``.
+    min_points, max_points : int, optional
+        Bounds on the total number of points.
+    marker : str, optional
+        SQL LIKE pattern that at least one marker tag must match.
+    periodic : bool
+        Only meshes with periodic transformations or a periodic marker.
+    elem_type : int, optional
+        Only meshes containing volume elements of this VTK type.
+    ffd : bool
+        Only meshes that embed FFD boxes.
+
+    Returns
+    -------
+    rows : list of tuple
+        (path, ndime, npoin, nelem, nzone) for every match, sorted by path.
+    """
+    where = ["error IS NULL"]
+    params = []
+    if ndime is not None:
+        where.append("ndime = ?")
+        params.append(ndime)
+    if category is not None:
+        where.append("category LIKE ?")
+        params.append(category)
+    if min_points is not None:
+        where.append("npoin >= ?")
+        params.append(min_points)
+    if max_points is not None:
+        where.append("npoin <= ?")
+        params.append(max_points)
+    if marker is not None:
+        where.append("EXISTS (SELECT 1 FROM markers m WHERE m.file_id = files.id AND m.tag LIKE ?)")
+        params.append(marker)
+    if periodic:
+        where.append(
+            "(nperiodic > 1 OR EXISTS (SELECT 1 FROM markers m WHERE m.file_id = files.id "
+            "AND m.tag LIKE '%periodic%'))"
+        )
+    if elem_type is not None:
+        where.append("EXISTS (SELECT 1 FROM elements e WHERE e.file_id = files.id AND e.vtk_type = ?)")
+        params.append(elem_type)
+    if ffd:
+        where.append("ffd_nbox > 0")
+    db = connect(db_path)
+    rows = db.execute(
+        f"SELECT path, ndime, npoin, nelem, nzone FROM files WHERE {' AND '.join(where)} ORDER BY path", params
+    ).fetchall()
+    db.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools catalog", description="Index and query the mesh corpus.")
+    parser.add_argument("--db", default=DEFAULT_CATALOG, help=f"catalog file (default: {DEFAULT_CATALOG})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="index new and modified meshes")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--workers", type=int)
+    p.add_argument("--force", action="store_true", help="re-read unchanged files too")
+    p = sub.add_parser("query", help="list meshes matching all given conditions")
+    p.add_argument("--ndime", type=int)
+    p.add_argument("--category", help="LIKE pattern on the top-level directory, e.g. '%%rans%%'")
+    p.add_argument("--min-points", type=int)
+    p.add_argument("--max-points", type=int)
+    p.add_argument("--marker", help="LIKE pattern on marker tags")
+    p.add_argument("--periodic", action="store_true")
+    p.add_argument("--elem-type", type=int, help="VTK element type")
+    p.add_argument("--ffd", action="store_true")
+    p = sub.add_parser("sql", help="run a raw SQL query")
+    p.add_argument("statement")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        indexed, unchanged, removed = build_catalog(args.root, args.db, args.workers, force=args.force)
+        print(f"{indexed} indexed, {unchanged} unchanged, {removed} removed -> {args.db}")
+    elif args.command == "query":
+        rows = query(
+            args.db,
+            args.ndime,
+            args.category,
+            args.min_points,
+            args.max_points,
+            args.marker,
+            args.periodic,
+            args.elem_type,
+            args.ffd,
+        )
+        for path, ndime, npoin, nelem, nzone in rows:
+            print(f"{path}  ndime={ndime} npoin={npoin} nelem={nelem} nzone={nzone}")
+    elif args.command == "sql":
+        db = connect(args.db)
+        for row in db.execute(args.statement):
+            print("\t".join(str(v) for v in row))
+        db.close()
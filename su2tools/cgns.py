@@ -0,0 +1,639 @@
+"""
+Access to CGNS meshes stored as ADF or HDF5 files.
+
+ADF files are read with :mod:`su2tools.adf`; HDF5 files need the optional ``h5py`` package.
+Both are exposed through the same node interface (``name``, ``label``, ``data``,
+``children``, ``child``, ``by_label``), with node data in Fortran order as in the CGNS
+standard.
+
+:func:`read_cgns` converts a CGNS file into the :class:`~su2tools.mesh.Mesh` arrays, one
+whole section or boundary condition at a time, and :func:`write_cgns` writes a mesh as an
+HDF5 CGNS file with one dataset per array (this also needs ``h5py``).
+"""
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# First party modules
+from .adf import ADFFile, is_adf
+from .kdtree import KDTree
+from .mesh import (
+    ELEM_DIMS,
+    HEXAHEDRON,
+    INDEX_DTYPE,
+    LINE,
+    NODES_PER_ELEM,
+    PRISM,
+    PYRAMID,
+    QUADRILATERAL,
+    TETRAHEDRON,
+    TRIANGLE,
+    VERTEX,
+    Marker,
+    Mesh,
+    Zone,
+)
+from .topology import take_elements
+
+# CGNS ElementType_t values
+NODE = 2
+BAR_2 = 3
+TRI_3 = 5
+QUAD_4 = 7
+TETRA_4 = 10
+PYRA_5 = 12
+PENTA_6 = 14
+HEXA_8 = 17
+MIXED = 20
+NGON_n = 22
+NFACE_n = 23
+
+# Number of nodes of every fixed-size CGNS element type, linear or not
+CGNS_NODES_PER_ELEM = {
+    NODE: 1,
+    BAR_2: 2,
+    4: 3,
+    TRI_3: 3,
+    6: 6,
+    QUAD_4: 4,
+    8: 8,
+    9: 9,
+    TETRA_4: 4,
+    11: 10,
+    PYRA_5: 5,
+    13: 14,
+    PENTA_6: 6,
+    15: 15,
+    16: 18,
+    HEXA_8: 8,
+    18: 20,
+    19: 27,
+    21: 13,
+}
+
+CGNS_TO_VTK = {
+    NODE: VERTEX,
+    BAR_2: LINE,
+    TRI_3: TRIANGLE,
+    QUAD_4: QUADRILATERAL,
+    TETRA_4: TETRAHEDRON,
+    PYRA_5: PYRAMID,
+    PENTA_6: PRISM,
+    HEXA_8: HEXAHEDRON,
+}
+VTK_TO_CGNS = {v: k for k, v in CGNS_TO_VTK.items()}
+
+# Lookup arrays for whole connectivity arrays (-1 and 0 for unsupported types)
+_CGNS_TO_VTK = np.full(64, -1, dtype=np.int64)
+_CGNS_TO_VTK[list(CGNS_TO_VTK)] = list(CGNS_TO_VTK.values())
+_VTK_TO_CGNS = np.zeros(16, dtype=np.int64)
+_VTK_TO_CGNS[list(VTK_TO_CGNS)] = list(VTK_TO_CGNS.values())
+
+# Grid locations under which boundary conditions list elements rather than points
+_ELEMENT_LOCATIONS = ("FaceCenter", "EdgeCenter", "IFaceCenter", "JFaceCenter", "KFaceCenter", "CellCenter")
+
+# Largest node name of the CGNS standard
+NAME_LENGTH = 32
+# Version written to CGNSLibraryVersion
+CGNS_VERSION = 4.2
+
+
+class _HDF5Node:
+    """
+    Node interface over one group of an HDF5-based CGNS file.
+    """
+
+    def __init__(self, group):
+        self._group = group
+        attrs = group.attrs
+        self.name = _attr_str(attrs.get("name", group.name.rsplit("/", 1)[-1]))
+        self.label = _attr_str(attrs.get("label", ""))
+        self.data_type = _attr_str(attrs.get("type", "MT"))
+        self.dims = tuple(reversed(group[" data"].shape)) if " data" in group else ()
+
+    def __repr__(self):
+        return f"Node({self.name!r}, {self.label!r}, {self.data_type}{list(self.dims)})"
+
+    @property
+    def children(self):
+        return [_HDF5Node(g) for k, g in self._group.items() if not k.startswith(" ") and isinstance(g, h5py.Group)]
+
+    def child(self, name):
+        for c in self.children:
+            if c.name == name:
+                return c
+        return None
+
+    def by_label(self, label):
+        return [c for c in self.children if c.label == label]
+
+    def walk(self):
+        yield self
+        for c in self.children:
+            yield from c.walk()
+
+    @property
+    def data(self):
+        if " data" not in self._group:
+            return None
+        value = self._group[" data"][()]
+        if self.data_type == "C1":
+            return np.asarray(value, dtype=np.uint8).tobytes().decode("latin-1").rstrip("\0 ")
+        # HDF5 stores the CGNS (Fortran-ordered) arrays with reversed dimensions
+        return np.asarray(value).T
+
+
+def _attr_str(value):
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    elif isinstance(value, np.ndarray):
+        value = value.tobytes().decode("latin-1")
+    return str(value).rstrip("\0 ")
+
+
+class CGNSFile:
+    """
+    An open CGNS file, either ADF or HDF5.
+
+    Parameters
+    ----------
+    path : str
+        File name.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if is_adf(path):
+            self._file = ADFFile(path)
+            self.root = self._file.root
+        else:
+            if h5py is None:
+                raise ImportError(f"{path} is not an ADF file and reading HDF5 CGNS files requires h5py")
+            self._file = h5py.File(path, "r")
+            self.root = _HDF5Node(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def bases(self):
+        return self.root.by_label("CGNSBase_t")
+
+
+def _section_types(section):
+    """
+    VTK type of every element of an Elements_t node (-1 for types without a VTK equivalent).
+    """
+    etype = int(section.data[0])
+    erange = section.child("ElementRange").data
+    nelem = int(erange[1] - erange[0] + 1)
+    if etype != MIXED:
+        return np.full(nelem, CGNS_TO_VTK.get(etype, -1), dtype=np.int64)
+    conn = section.child("ElementConnectivity").data
+    ctypes = conn[_mixed_starts(section, conn, nelem)]
+    return np.array([CGNS_TO_VTK.get(int(t), -1) for t in range(max(ctypes) + 1)])[ctypes]
+
+
+def _mixed_starts(section, conn, nelem):
+    """Position in ``conn`` of the type of each element of a MIXED section."""
+    start = section.child("ElementStartOffset")
+    if start is not None:
+        return np.asarray(start.data, dtype=np.int64).ravel()[:-1]
+    # CGNS 3 files have no offsets: the sizes follow from the types, one element at a time
+    starts = np.empty(nelem, dtype=np.int64)
+    pos = 0
+    for i in range(nelem):
+        starts[i] = pos
+        pos += 1 + CGNS_NODES_PER_ELEM[int(conn[pos])]
+    return starts
+
+
+def _bc_size(bc):
+    """Number of boundary entities referenced by a BC_t node."""
+    for name in ("PointList", "ElementList"):
+        node = bc.child(name)
+        if node is not None:
+            return int(np.size(node.data))
+    for name in ("PointRange", "ElementRange"):
+        node = bc.child(name)
+        if node is not None:
+            extent = np.abs(np.diff(np.asarray(node.data).reshape(-1, 2), axis=1)).ravel() + 1
+            if name == "ElementRange":
+                return int(extent.prod())
+            # Structured point range: count faces rather than points
+            extent = extent[extent > 1] - 1
+            return int(extent.prod()) if len(extent) else 1
+    return 0
+
+
+def summarize(path):
+    """
+    Describe a CGNS mesh without building its connectivity.
+
+    Returns
+    -------
+    summary : dict
+        ``ndime`` (the cell dimension), ``nzone`` and a list of ``zones``, each with ``npoin``, ``nelem``,
+        ``elem_counts`` (by VTK type) and ``markers`` as (name, size) pairs.
+    """
+    zones = []
+    ndime = 0
+    nperiodic = 0
+    with CGNSFile(path) as f:
+        for base in f.bases:
+            cell_dim = int(base.data[0])
+            ndime = max(ndime, cell_dim)
+            for zone in base.by_label("Zone_t"):
+                # (IndexDimension, 3) array of vertex, cell and boundary-vertex sizes
+                sizes = np.asarray(zone.data).reshape(-1, 3, order="F")
+                npoin = int(np.prod(sizes[:, 0]))
+                nelem = int(np.prod(sizes[:, 1]))
+                ztype = zone.child("ZoneType")
+                elem_counts = {}
+                markers = []
+                if ztype is not None and ztype.data == "Structured":
+                    elem_counts[HEXAHEDRON if cell_dim == 3 else QUADRILATERAL] = nelem
+                for section in zone.by_label("Elements_t"):
+                    types = _section_types(section)
+                    if np.all(ELEM_DIMS[np.clip(types, 0, len(ELEM_DIMS) - 1)] < cell_dim):
+                        markers.append((section.name, len(types)))
+                        continue
+                    for t, n in zip(*np.unique(types, return_counts=True)):
+                        elem_counts[int(t)] = elem_counts.get(int(t), 0) + int(n)
+                for zbc in zone.by_label("ZoneBC_t"):
+                    for bc in zbc.by_label("BC_t"):
+                        if not any(m[0] == bc.name for m in markers):
+                            markers.append((bc.name, _bc_size(bc)))
+                for zgc in zone.by_label("ZoneGridConnectivity_t"):
+                    for gc in zgc.walk():
+                        if gc.label == "Periodic_t":
+                            nperiodic += 1
+                zones.append(
+                    {
+                        "izone": len(zones) + 1,
+                        "ndime": cell_dim,
+                        "npoin": npoin,
+                        "nelem": nelem,
+                        "elem_counts": elem_counts,
+                        "markers": markers,
+                    }
+                )
+    return {"ndime": ndime, "nzone": len(zones), "zones": zones, "nperiodic": nperiodic, "ffd_nbox": 0}
+
+
+def _index_range(node):
+    """(IndexDimension, 2) array of a PointRange or ElementRange node."""
+    return np.asarray(node.data, dtype=np.int64).reshape(-1, 2, order="F")
+
+
+def _read_coords(zone_node, cell_dim):
+    """Coordinates of the points of a Zone_t node, first index varying fastest."""
+    grids = zone_node.by_label("GridCoordinates_t")
+    if not grids:
+        raise ValueError(f"zone {zone_node.name} has no GridCoordinates")
+    columns = []
+    for axis in "XYZ":
+        node = grids[0].child(f"Coordinate{axis}")
+        if node is not None:
+            columns.append(np.asarray(node.data, dtype=np.float64).ravel(order="F"))
+    coords = np.column_stack(columns)
+    # 2D meshes are often written with a constant z
+    if coords.shape[1] > cell_dim and len(coords) and np.ptp(coords[:, cell_dim:], axis=0).max() > 0:
+        raise ValueError(f"zone {zone_node.name}: surface meshes (cell dimension {cell_dim} in 3D) are not supported")
+    return np.ascontiguousarray(coords[:, :cell_dim])
+
+
+def _read_section(section):
+    """
+    Elements of an Elements_t node.
+
+    Returns
+    -------
+    first : int
+        CGNS number of the first element.
+    types, offsets, conn : ndarray
+        CSR arrays of the elements, with VTK types and 0-based point indices.
+    """
+    etype = int(section.data[0])
+    first, last = _index_range(section.child("ElementRange"))[0]
+    nelem = int(last - first + 1)
+    conn = np.asarray(section.child("ElementConnectivity").data, dtype=np.int64).ravel(order="F")
+    if etype == MIXED:
+        starts = _mixed_starts(section, conn, nelem)
+        types = _CGNS_TO_VTK[np.clip(conn[starts], 0, len(_CGNS_TO_VTK) - 1)]
+        keep = np.ones(len(conn), dtype=bool)
+        keep[starts] = False
+        conn = conn[keep]
+    else:
+        types = np.full(nelem, CGNS_TO_VTK.get(etype, -1), dtype=np.int64)
+    if np.any(types < 0):
+        raise ValueError(f"section {section.name}: only linear elements are supported (type {etype})")
+    offsets = np.zeros(nelem + 1, dtype=np.int64)
+    np.cumsum(NODES_PER_ELEM[types], out=offsets[1:])
+    return int(first), types.astype(np.uint8), offsets, (conn - 1).astype(INDEX_DTYPE)
+
+
+def _concat(parts):
+    """Concatenate CSR element sets given as (types, offsets, conn) tuples."""
+    types = np.concatenate([np.zeros(0, dtype=np.uint8)] + [p[0] for p in parts])
+    nnode = np.concatenate([np.zeros(0, dtype=np.int64)] + [np.diff(p[1]) for p in parts])
+    offsets = np.zeros(len(types) + 1, dtype=np.int64)
+    np.cumsum(nnode, out=offsets[1:])
+    conn = np.concatenate([np.zeros(0, dtype=INDEX_DTYPE)] + [p[2] for p in parts])
+    return types, offsets, conn
+
+
+def _bc_tag(bc):
+    """Marker name of a BC_t node: its family if it has one, else its own name."""
+    family = bc.child("FamilyName")
+    return family.data if family is not None and family.data else bc.name
+
+
+def _bc_elements(bc):
+    """CGNS numbers of the elements a BC_t node refers to, or None for point lists."""
+    location = bc.child("GridLocation")
+    by_element = location is not None and location.data in _ELEMENT_LOCATIONS
+    for name, is_range in (("ElementRange", True), ("ElementList", False), ("PointRange", True), ("PointList", False)):
+        node = bc.child(name)
+        if node is None or (name.startswith("Point") and not by_element):
+            continue
+        if is_range:
+            first, last = _index_range(node)[0]
+            return np.arange(first, last + 1)
+        return np.asarray(node.data, dtype=np.int64).ravel(order="F")
+    return None
+
+
+def _read_unstructured(node, cell_dim, izone):
+    """Convert an unstructured Zone_t node to a :class:`Zone`."""
+    zone = Zone(izone, cell_dim)
+    zone.coords = _read_coords(node, cell_dim)
+    zone.npoin_domain = zone.npoin
+    sections = sorted((_read_section(s) + (s.name,) for s in node.by_label("Elements_t")), key=lambda s: s[0])
+    ids = np.concatenate([np.zeros(0, dtype=np.int64)] + [s[0] + np.arange(len(s[1])) for s in sections])
+    section = np.repeat(np.arange(len(sections)), [len(s[1]) for s in sections])
+    types, offsets, conn = _concat([s[1:4] for s in sections])
+    volume = ELEM_DIMS[types] == cell_dim
+    zone.elem_types, zone.elem_offsets, zone.elem_conn = take_elements(types, offsets, conn, np.flatnonzero(volume))
+
+    # Boundary elements go to the marker of their boundary condition, or of their section
+    # when no boundary condition refers to them
+    boundary = np.flatnonzero(~volume)
+    unused = np.ones(len(boundary), dtype=bool)
+    for zbc in node.by_label("ZoneBC_t"):
+        for bc in zbc.by_label("BC_t"):
+            elements = _bc_elements(bc)
+            if elements is None:
+                continue
+            mine = np.isin(ids[boundary], elements)
+            unused &= ~mine
+            zone.markers.append(Marker(_bc_tag(bc), *take_elements(types, offsets, conn, boundary[mine])))
+    for i in np.unique(section[boundary[unused]]):
+        mine = boundary[unused & (section[boundary] == i)]
+        zone.markers.append(Marker(sections[i][4], *take_elements(types, offsets, conn, mine)))
+    return zone
+
+
+def _grid_cells(index):
+    """
+    Cells of a structured grid of point indices, as (ncell, 2**ndim) corners in VTK order
+    (lines, quadrilaterals or hexahedra), first index varying fastest.
+    """
+    head, tail = slice(None, -1), slice(1, None)
+    if index.ndim == 1:
+        corners = [(head,), (tail,)]
+    elif index.ndim == 2:
+        corners = [(head, head), (tail, head), (tail, tail), (head, tail)]
+    else:
+        corners = [(i, j, k) for k in (head, tail) for i, j in ((head, head), (tail, head), (tail, tail), (head, tail))]
+    return np.stack([index[c].ravel(order="F") for c in corners], axis=1)
+
+
+def _point_box(index, point_range, faces=False):
+    """Point indices of a block inside a PointRange, keeping one axis per varying index."""
+    lo = point_range.min(axis=1) - 1
+    hi = point_range.max(axis=1) - 1
+    if faces:
+        # Face-center ranges number faces: the points go one further along the face
+        hi = hi + (hi > lo)
+    box = index[tuple(slice(a, b + 1) for a, b in zip(lo, hi))]
+    return box.reshape([n for n in box.shape if n > 1] or [1], order="F")
+
+
+def _read_structured(nodes, cell_dim, izone):
+    """
+    Convert the structured Zone_t nodes of a base to a single unstructured :class:`Zone`.
+
+    The blocks are joined by merging the points of their 1-to-1 interfaces, found by nearest
+    point search between the two point ranges of each interface.
+    """
+    blocks = {}
+    coords = []
+    npoin = 0
+    for node in nodes:
+        dims = np.asarray(node.data, dtype=np.int64).reshape(-1, 3, order="F")[:, 0]
+        index = npoin + np.arange(int(np.prod(dims))).reshape(dims, order="F")
+        blocks[node.name] = (node, index)
+        coords.append(_read_coords(node, cell_dim))
+        npoin += index.size
+    coords = np.concatenate(coords)
+
+    # Pairs of coincident points across the interfaces
+    pairs = [np.zeros((0, 2), dtype=np.int64)]
+    for name, (node, index) in blocks.items():
+        for zgc in node.by_label("ZoneGridConnectivity_t"):
+            for gc in zgc.by_label("GridConnectivity1to1_t"):
+                own = _point_box(index, _index_range(gc.child("PointRange"))).ravel()
+                donor = _point_box(blocks[gc.data][1], _index_range(gc.child("PointRangeDonor"))).ravel()
+                dist, near = KDTree(coords[donor]).query(coords[own])
+                scale = np.ptp(coords[own], axis=0).max(initial=0.0) if len(own) else 0.0
+                if len(own) != len(donor) or dist.max(initial=0.0) > 1e-8 * max(scale, 1e-300):
+                    raise ValueError(f"interface {gc.name} of zone {name}: the points of both sides do not match")
+                pairs.append(np.column_stack([own, donor[near]]))
+    pairs = np.concatenate(pairs)
+
+    # Smallest index of every group of merged points, by label propagation
+    label = np.arange(npoin)
+    while True:
+        low = np.minimum(label[pairs[:, 0]], label[pairs[:, 1]])
+        new = label.copy()
+        np.minimum.at(new, pairs[:, 0], low)
+        np.minimum.at(new, pairs[:, 1], low)
+        new = new[new]
+        if np.array_equal(new, label):
+            break
+        label = new
+    _, first, renumber = np.unique(label, return_index=True, return_inverse=True)
+
+    zone = Zone(izone, cell_dim)
+    zone.coords = coords[first]
+    zone.npoin_domain = zone.npoin
+    cell_type = {1: LINE, 2: QUADRILATERAL, 3: HEXAHEDRON}
+    cells = np.concatenate([_grid_cells(index) for _, index in blocks.values()])
+    zone.elem_types = np.full(len(cells), cell_type[cell_dim], dtype=np.uint8)
+    zone.elem_offsets = np.arange(len(cells) + 1, dtype=np.int64) * cells.shape[1]
+    zone.elem_conn = renumber[cells].ravel().astype(INDEX_DTYPE)
+
+    # Boundary faces, gathered by marker name
+    faces = {}
+    for node, index in blocks.values():
+        for zbc in node.by_label("ZoneBC_t"):
+            for bc in zbc.by_label("BC_t"):
+                point_range = bc.child("PointRange")
+                if point_range is None:
+                    continue
+                location = bc.child("GridLocation")
+                box = _point_box(index, _index_range(point_range), location is not None and location.data != "Vertex")
+                if box.ndim != cell_dim - 1:
+                    continue
+                faces.setdefault(_bc_tag(bc), []).append(renumber[_grid_cells(box)] if box.ndim else renumber[box])
+    for tag, parts in faces.items():
+        conn = np.concatenate(parts)
+        etype = cell_type.get(cell_dim - 1, VERTEX)
+        offsets = np.arange(len(conn) + 1, dtype=np.int64) * conn.shape[1]
+        types = np.full(len(conn), etype, dtype=np.uint8)
+        zone.markers.append(Marker(tag, types, offsets, conn.ravel().astype(INDEX_DTYPE)))
+    return zone
+
+
+def read_cgns(path):
+    """
+    Read the mesh of a CGNS file.
+
+    Every unstructured zone becomes a zone of the mesh; the structured blocks of a base are
+    merged into one unstructured zone of quadrilaterals or hexahedra. Boundary elements are
+    grouped into markers named after the family (or the name) of their boundary condition.
+    2D meshes stored with a constant z are read as 2D.
+
+    Returns
+    -------
+    mesh : Mesh
+    """
+    zones = []
+    with CGNSFile(path) as f:
+        for base in f.bases:
+            cell_dim = int(base.data[0])
+            structured = []
+            for node in base.by_label("Zone_t"):
+                ztype = node.child("ZoneType")
+                if ztype is not None and ztype.data == "Structured":
+                    structured.append(node)
+                else:
+                    zones.append(_read_unstructured(node, cell_dim, len(zones) + 1))
+            if structured:
+                zones.append(_read_structured(structured, cell_dim, len(zones) + 1))
+    return Mesh(zones, path=path)
+
+
+def _hdf5_node(parent, name, label, data=None):
+    """
+    Create a CGNS node (an HDF5 group with its attributes and `` data`` dataset).
+
+    Strings are stored as C1 data, arrays with their CGNS data type, in reversed dimension
+    order as the CGNS library does.
+    """
+    if len(name) > NAME_LENGTH:
+        raise ValueError(f"CGNS node names are limited to {NAME_LENGTH} characters: {name!r}")
+    group = parent.create_group(name, track_order=True)
+    if isinstance(data, str):
+        data_type, data = "C1", np.frombuffer(data.encode("latin-1"), dtype=np.int8)
+    elif data is not None:
+        data = np.asarray(data)
+        data_type = {"i4": "I4", "i8": "I8", "f4": "R4", "f8": "R8"}[data.dtype.str[1:]]
+    else:
+        data_type = "MT"
+    group.attrs.create("name", np.bytes_(name), dtype=f"S{NAME_LENGTH + 1}")
+    group.attrs.create("label", np.bytes_(label), dtype=f"S{NAME_LENGTH + 1}")
+    group.attrs.create("type", np.bytes_(data_type), dtype="S3")
+    group.attrs.create("flags", np.array([1], dtype=np.int32))
+    if data is not None:
+        group.create_dataset(" data", data=np.ascontiguousarray(data.T))
+    return group
+
+
+def _write_section(parent, name, types, offsets, conn, first, index_dtype):
+    """Write CSR elements as one Elements_t node: of a single type if possible, else MIXED."""
+    nelem = len(types)
+    ctypes = _VTK_TO_CGNS[types]
+    uniform = nelem and np.all(ctypes == ctypes[0])
+    section = _hdf5_node(parent, name, "Elements_t", np.array([ctypes[0] if uniform else MIXED, 0], dtype=np.int32))
+    _hdf5_node(section, "ElementRange", "IndexRange_t", np.array([first, first + nelem - 1], dtype=index_dtype))
+    if uniform:
+        data = conn.astype(index_dtype) + 1
+    else:
+        start = offsets + np.arange(nelem + 1)
+        data = np.empty(len(conn) + nelem, dtype=index_dtype)
+        data[start[:-1]] = ctypes
+        nodes = np.ones(len(data), dtype=bool)
+        nodes[start[:-1]] = False
+        data[nodes] = conn + 1
+        _hdf5_node(section, "ElementStartOffset", "DataArray_t", start.astype(index_dtype))
+    _hdf5_node(section, "ElementConnectivity", "DataArray_t", data)
+
+
+def write_cgns(mesh, path):
+    """
+    Write a mesh (or a list of zones) as an HDF5 CGNS file.
+
+    Each zone becomes an unstructured Zone_t with its coordinates, one Elements_t node for the
+    volume elements and one per marker, and a BC_t per marker that refers to its elements and
+    carries the marker name as its family. SU2-specific data (periodic transforms, SEND_TO,
+    FFD boxes) has no CGNS equivalent and is not written.
+    """
+    if h5py is None:
+        raise ImportError("writing CGNS files requires h5py")
+    zones = list(mesh)
+    ndime = max((z.ndime for z in zones), default=0)
+    tmp = path + ".tmp"
+    with h5py.File(tmp, "w", track_order=True) as f:
+        f.attrs.create("name", np.bytes_("HDF5 MotherNode"), dtype=f"S{NAME_LENGTH + 1}")
+        f.attrs.create("label", np.bytes_("Root Node of HDF5 File"), dtype=f"S{NAME_LENGTH + 1}")
+        f.attrs.create("type", np.bytes_("MT"), dtype="S3")
+        f.create_dataset(" format", data=np.frombuffer(b"IEEE_LITTLE_32\0", dtype=np.int8))
+        version = f"HDF5 Version {h5py.version.hdf5_version}".encode().ljust(NAME_LENGTH + 1, b"\0")
+        f.create_dataset(" hdf5version", data=np.frombuffer(version, dtype=np.int8))
+        _hdf5_node(f, "CGNSLibraryVersion", "CGNSLibraryVersion_t", np.array([CGNS_VERSION], dtype=np.float32))
+        base = _hdf5_node(f, "Base", "CGNSBase_t", np.array([ndime, ndime], dtype=np.int32))
+        families = []
+        for zone in zones:
+            nbound = sum(m.nelem for m in zone.markers)
+            large = max(zone.npoin, zone.nelem + nbound, len(zone.elem_conn)) >= 2**31 - 1
+            index_dtype = np.int64 if large else np.int32
+            size = np.array([[zone.npoin, zone.nelem, 0]], dtype=index_dtype)
+            node = _hdf5_node(base, f"Zone {zone.izone}", "Zone_t", size)
+            _hdf5_node(node, "ZoneType", "ZoneType_t", "Unstructured")
+            grid = _hdf5_node(node, "GridCoordinates", "GridCoordinates_t")
+            for axis, column in zip("XYZ", zone.coords.T):
+                _hdf5_node(grid, f"Coordinate{axis}", "DataArray_t", np.ascontiguousarray(column, dtype=np.float64))
+            _write_section(node, "Elements", zone.elem_types, zone.elem_offsets, zone.elem_conn, 1, index_dtype)
+            # Marker tags may repeat (SEND_RECEIVE); node names may not
+            tags = [m.tag for m in zone.markers]
+            names = [t if t not in tags[:i] else f"{t}.{tags[:i].count(t) + 1}" for i, t in enumerate(tags)]
+            first = np.cumsum([zone.nelem + 1] + [m.nelem for m in zone.markers])
+            for m, name, start in zip(zone.markers, names, first):
+                _write_section(node, name, m.elem_types, m.elem_offsets, m.elem_conn, start, index_dtype)
+            zbc = _hdf5_node(node, "ZoneBC", "ZoneBC_t")
+            for m, name, start in zip(zone.markers, names, first):
+                bc = _hdf5_node(zbc, name, "BC_t", "FamilySpecified")
+                element_range = np.array([[start, start + m.nelem - 1]], dtype=index_dtype)
+                _hdf5_node(bc, "ElementRange", "IndexRange_t", element_range)
+                _hdf5_node(bc, "FamilyName", "FamilyName_t", m.tag)
+                if m.tag not in families:
+                    families.append(m.tag)
+        for tag in families:
+            family = _hdf5_node(base, tag, "Family_t")
+            _hdf5_node(family, "FamilyBC", "FamilyBC_t", "Null")
+    os.replace(tmp, path)
@@ -0,0 +1,411 @@
+"""
+Coarse levels of SU2 meshes by agglomeration of point control volumes.
+
+SU2 solves on the median-dual control volumes around the points, and its multigrid merges
+neighboring control volumes. To keep the coarse levels writable as ordinary .su2 meshes, the
+control volume of a point is merged into a neighbor's by collapsing the edge between them:
+the point disappears, the elements around it are attached to the neighbor, and the elements
+that contained the edge shrink (quadrilaterals become triangles) or vanish (triangles and
+tetrahedra). Each round collapses an independent set of points, at most one per element, all
+at once:
+
+- every free point picks its shortest allowed edge; boundary points only collapse along an
+  edge of their own marker, and points on several markers, on sharp boundary features, on
+  SEND_RECEIVE markers or ghost points never move, so every MARKER_TAG keeps its corners;
+- a collapse is rejected if it would invert or flatten an element (a corner area or volume
+  below :data:`MIN_MEASURE_RATIO` of the element's), or if the two points have common
+  neighbors outside the elements of the edge (the link condition), which would fold the mesh;
+- in 3D only points surrounded by tetrahedra collapse, since collapsing an edge of a
+  hexahedron, prism or pyramid gives no standard element.
+
+Markers stop coarsening once their number of points has dropped by the same ratio in their own
+dimension, so that the boundary keeps its resolution relative to the volume. Rounds are repeated
+until the number of points has dropped by ``2**ndime`` or the rounds stop making progress.
+"""
+# Standard Python modules
+import argparse
+import copy
+import os
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .mesh import (
+    INDEX_DTYPE,
+    LINE,
+    NODES_PER_ELEM,
+    QUADRILATERAL,
+    TETRAHEDRON,
+    TRIANGLE,
+    VERTEX,
+)
+from .reader import read_mesh
+from .topology import element_edges
+from .writer import write_mesh
+
+# Boundary points where the boundary turns by more than this angle (degrees) are kept
+FEATURE_ANGLE = 30.0
+# Markers with fewer points than this are left alone
+MIN_MARKER_POINTS = 8
+MAX_ROUNDS = 40
+# A level stops when a round removes fewer than this fraction of the points
+MIN_PROGRESS = 0.002
+# A collapse is rejected if a corner of an element it moves gets smaller than this fraction of
+# the element's mean corner measure, so that no coarse element is flat
+MIN_MEASURE_RATIO = 0.05
+
+# Signed corner measures: the area of the triangle at each corner of a polygon, the volume of
+# a tetrahedron
+_CORNERS = {
+    TRIANGLE: [(0, 1, 2)],
+    QUADRILATERAL: [(0, 1, 3), (1, 2, 0), (2, 3, 1), (3, 0, 2)],
+    TETRAHEDRON: [(0, 1, 2, 3)],
+}
+
+
+def _corner_measures(etype, coords, nodes):
+    """(nelem, ncorner) signed areas or volumes of the corners of elements of one type."""
+    corners = nodes[:, np.asarray(_CORNERS[etype])]
+    x = coords[corners]
+    if etype == TETRAHEDRON:
+        a, b, c = x[..., 1, :] - x[..., 0, :], x[..., 2, :] - x[..., 0, :], x[..., 3, :] - x[..., 0, :]
+        return np.einsum("...d,...d->...", np.cross(a, b), c) / 6
+    a, b = x[..., 1, :] - x[..., 0, :], x[..., 2, :] - x[..., 0, :]
+    return (a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]) / 2
+
+
+def _rebuild(types, offsets, conn):
+    """
+    Drop the repeated nodes of collapsed elements.
+
+    Lines, triangles and tetrahedra with a repeated node vanish, quadrilaterals with two equal
+    adjacent nodes become triangles.
+
+    Returns
+    -------
+    types, offsets, conn : ndarray
+        The new CSR elements.
+    source : ndarray
+        Index of the element each new element comes from.
+    """
+    out_types, out_nodes, out_source = [], [], []
+    for etype in np.unique(types):
+        idx = np.flatnonzero(types == etype)
+        n = NODES_PER_ELEM[etype]
+        nodes = conn[offsets[idx, None] + np.arange(n)]
+        ordered = np.sort(nodes, axis=1)
+        dup = np.any(ordered[:, 1:] == ordered[:, :-1], axis=1)
+        if etype == QUADRILATERAL:
+            adjacent = nodes == np.roll(nodes, -1, axis=1)
+            first = np.argmax(adjacent, axis=1)
+            shrink = dup & adjacent.any(axis=1)
+            tri = nodes[np.arange(len(idx))[:, None], (first[:, None] + np.arange(1, 4)) % 4][shrink]
+            out_types.append(np.full(len(tri), TRIANGLE, dtype=types.dtype))
+            out_nodes.append(tri.ravel())
+            out_source.append(idx[shrink])
+        elif dup.any() and etype not in (VERTEX, LINE, TRIANGLE, TETRAHEDRON):
+            raise ValueError(f"collapsed element of type {etype}")
+        keep = ~dup
+        out_types.append(types[idx[keep]])
+        out_nodes.append(nodes[keep].ravel())
+        out_source.append(idx[keep])
+    if not out_types:
+        return types, offsets, conn, np.zeros(0, dtype=np.int64)
+    source = np.concatenate(out_source)
+    order = np.argsort(source, kind="stable")
+    new_types = np.concatenate(out_types)[order]
+    nnode = NODES_PER_ELEM[new_types]
+    new_offsets = np.zeros(len(new_types) + 1, dtype=np.int64)
+    np.cumsum(nnode, out=new_offsets[1:])
+    # Nodes are grouped by type above; gather them back in element order
+    group_offsets = np.zeros(len(new_types) + 1, dtype=np.int64)
+    np.cumsum(NODES_PER_ELEM[np.concatenate(out_types)], out=group_offsets[1:])
+    take = np.repeat(group_offsets[:-1][order] - new_offsets[:-1], nnode) + np.arange(new_offsets[-1])
+    return new_types, new_offsets, np.concatenate(out_nodes)[take], source[order]
+
+
+def _boundary(zone, done=()):
+    """
+    Marker membership of the points.
+
+    Points of the markers in ``done`` are fixed.
+
+    Returns
+    -------
+    count : ndarray
+        Number of markers (other than VERTEX markers) each point is on.
+    marker : ndarray
+        Index in ``tags`` of the marker of points on exactly one marker.
+    fixed : ndarray
+        Points that must not move: on VERTEX markers, on small or ``done`` markers, or on sharp
+        features.
+    tags : list of str
+    edge_keys : ndarray
+        Sorted ``(a * npoin + b) * len(tags) + marker`` keys of the marker edges.
+    """
+    npoin = zone.npoin
+    nodes = zone.marker_nodes()
+    vertex_tags = {m.tag for m in zone.markers if m.nelem and (m.elem_types == VERTEX).all()}
+    tags = [tag for tag in nodes if tag not in vertex_tags]
+    count = np.zeros(npoin, dtype=np.int64)
+    marker = np.full(npoin, -1, dtype=np.int64)
+    fixed = np.zeros(npoin, dtype=bool)
+    for tag, points in nodes.items():
+        if tag in vertex_tags:
+            fixed[points] = True
+            continue
+        count[points] += 1
+        marker[points] = tags.index(tag)
+        if len(points) < MIN_MARKER_POINTS or tag in done:
+            fixed[points] = True
+
+    keys = [np.zeros(0, dtype=np.int64)]
+    face_nodes, normals = [], []
+    for m in zone.markers:
+        if m.tag not in tags:
+            continue
+        edges = element_edges(m.elem_types, m.elem_offsets, m.elem_conn)
+        keys.append((edges[:, 0] * npoin + edges[:, 1]) * len(tags) + tags.index(m.tag))
+        for etype in (LINE, TRIANGLE, QUADRILATERAL):
+            idx = np.flatnonzero(m.elem_types == etype)
+            if len(idx) == 0:
+                continue
+            f = m.elem_conn[m.elem_offsets[idx, None] + np.arange(NODES_PER_ELEM[etype])].astype(np.int64)
+            x = zone.coords[f]
+            if etype == LINE:
+                d = x[:, 1] - x[:, 0]
+                n = np.column_stack([d[:, 1], -d[:, 0]])
+            elif etype == TRIANGLE:
+                n = np.cross(x[:, 1] - x[:, 0], x[:, 2] - x[:, 0])
+            else:
+                n = np.cross(x[:, 2] - x[:, 0], x[:, 3] - x[:, 1])
+            face_nodes.append(f)
+            normals.append(n / np.maximum(np.linalg.norm(n, axis=1, keepdims=True), 1e-300))
+
+    # Sharp features: a face normal far from the average normal at one of its points
+    if face_nodes:
+        average = np.zeros((npoin, zone.ndime))
+        for f, n in zip(face_nodes, normals):
+            np.add.at(average, f.ravel(), np.repeat(n, f.shape[1], axis=0))
+        average /= np.maximum(np.linalg.norm(average, axis=1, keepdims=True), 1e-300)
+        lowest = np.ones(npoin)
+        for f, n in zip(face_nodes, normals):
+            cos = np.einsum("nd,nd->n", np.repeat(n, f.shape[1], axis=0), average[f.ravel()])
+            np.minimum.at(lowest, f.ravel(), cos)
+        fixed |= lowest < np.cos(np.radians(FEATURE_ANGLE / 2))
+    return count, marker, fixed, tags, np.unique(np.concatenate(keys))
+
+
+def _select(zone, rng, boundary):
+    """
+    Choose the points to collapse in one round and their targets.
+
+    Returns
+    -------
+    target : ndarray
+        For every point, the point it collapses onto (itself if it stays).
+    """
+    npoin = zone.npoin
+    count, marker, fixed, tags, edge_keys = boundary
+    elem_of = np.repeat(np.arange(zone.nelem), np.diff(zone.elem_offsets))
+    free = ~fixed & (count <= 1)
+    if zone.npoin_domain and zone.npoin_domain < npoin:
+        free[zone.npoin_domain :] = False
+    if zone.ndime == 3:
+        np.logical_and.at(free, zone.elem_conn, (zone.elem_types == TETRAHEDRON)[elem_of])
+    used = np.zeros(npoin, dtype=bool)
+    used[zone.elem_conn] = True
+    free &= used
+
+    # Shortest allowed edge of every free point
+    edges = element_edges(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+    src = np.concatenate([edges[:, 0], edges[:, 1]])
+    dst = np.concatenate([edges[:, 1], edges[:, 0]])
+    ok = free[src]
+    if zone.npoin_domain and zone.npoin_domain < npoin:
+        ok &= dst < zone.npoin_domain
+    on_marker = count[src] == 1
+    lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+    key = (lo * npoin + hi) * max(len(tags), 1) + marker[src]
+    ok &= ~on_marker | np.isin(key, edge_keys, assume_unique=False)
+    src, dst = src[ok], dst[ok]
+    length = np.linalg.norm(zone.coords[src] - zone.coords[dst], axis=1)
+    order = np.lexsort((length, src))
+    src, dst = src[order], dst[order]
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = src[1:] != src[:-1]
+    target = np.arange(npoin)
+    target[src[first]] = dst[first]
+    candidate = target != np.arange(npoin)
+
+    # At most one collapsing point per element: keep the candidates of highest priority among
+    # all the points they share an element with
+    priority = np.where(candidate, rng.random(npoin), -1.0)
+    elem_max = np.maximum.reduceat(priority[zone.elem_conn], zone.elem_offsets[:-1])
+    around = np.full(npoin, -1.0)
+    np.maximum.at(around, zone.elem_conn, elem_max[elem_of])
+    selected = candidate & (priority >= around)
+    return np.where(selected, target, np.arange(npoin))
+
+
+def _reject(zone, target):
+    """Points of ``target`` whose collapse would invert an element or fold the mesh."""
+    npoin = zone.npoin
+    moving = target != np.arange(npoin)
+    reject = np.zeros(npoin, dtype=bool)
+    conn = target[zone.elem_conn]
+    elem_of = np.repeat(np.arange(zone.nelem), np.diff(zone.elem_offsets))
+    # The collapsing point of each element (at most one)
+    source = np.full(zone.nelem, -1, dtype=np.int64)
+    np.maximum.at(source, elem_of, np.where(moving[zone.elem_conn], zone.elem_conn, -1))
+    expected = []
+    for etype in _CORNERS:
+        idx = np.flatnonzero((zone.elem_types == etype) & (source >= 0))
+        if len(idx) == 0:
+            continue
+        n = NODES_PER_ELEM[etype]
+        old = zone.elem_conn[zone.elem_offsets[idx, None] + np.arange(n)]
+        new = conn[zone.elem_offsets[idx, None] + np.arange(n)]
+        p = source[idx]
+        has_edge = np.any(old == target[p][:, None], axis=1)
+        corners = _corner_measures(etype, zone.coords, old)
+        sign = np.sign(corners.sum(axis=1))
+        floor = MIN_MEASURE_RATIO * np.abs(corners.mean(axis=1))
+        if etype == QUADRILATERAL:
+            # A quadrilateral with the edge becomes the triangle of its other three points
+            adjacent = new == np.roll(new, -1, axis=1)
+            first = np.argmax(adjacent, axis=1)
+            tri = new[np.arange(len(idx))[:, None], (first[:, None] + np.arange(1, 4)) % 4]
+            tri_ok = np.all(_corner_measures(TRIANGLE, zone.coords, tri) * sign[:, None] > floor[:, None], axis=1)
+            quad_ok = np.all(_corner_measures(etype, zone.coords, new) * sign[:, None] > floor[:, None], axis=1)
+            bad = np.where(has_edge, ~adjacent.any(axis=1) | ~tri_ok, ~quad_ok)
+        else:
+            measure = _corner_measures(etype, zone.coords, new)
+            bad = ~has_edge & np.any(measure * sign[:, None] <= floor[:, None], axis=1)
+            # The other points of the simplices that vanish form the link of the edge
+            other = np.where((old != p[:, None]) & (old != target[p][:, None]), old, -1)[has_edge]
+            expected.append(np.column_stack([np.repeat(p[has_edge], n), other.ravel()]))
+        reject[p[bad]] = True
+
+    # Link condition: the common neighbors of the two points are the link of the edge
+    edges = element_edges(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+    keys = edges[:, 0] * npoin + edges[:, 1]
+    a = np.concatenate([edges[:, 0], edges[:, 1]])
+    b = np.concatenate([edges[:, 1], edges[:, 0]])
+    sel = moving[a] & (b != target[a])
+    p, r = a[sel], b[sel]
+    t = target[p]
+    k = np.minimum(t, r) * npoin + np.maximum(t, r)
+    pos = np.minimum(np.searchsorted(keys, k), len(keys) - 1)
+    common = np.bincount(p[keys[pos] == k], minlength=npoin)
+    link = np.unique(np.concatenate(expected + [np.zeros((0, 2), dtype=np.int64)]), axis=0)
+    link = link[link[:, 1] >= 0]
+    reject |= moving & (common != np.bincount(link[:, 0], minlength=npoin))
+    return reject
+
+
+def _apply(zone, target):
+    """Collapse the points of ``target`` in place."""
+    npoin = zone.npoin
+    removed = target != np.arange(npoin)
+    new_index = np.cumsum(~removed) - 1
+    point_map = new_index[target]
+    zone.elem_types, zone.elem_offsets, conn, _ = _rebuild(zone.elem_types, zone.elem_offsets, target[zone.elem_conn])
+    zone.elem_conn = point_map[conn].astype(INDEX_DTYPE)
+    for m in zone.markers:
+        m.elem_types, m.elem_offsets, conn, source = _rebuild(m.elem_types, m.elem_offsets, target[m.elem_conn])
+        m.elem_conn = point_map[conn].astype(INDEX_DTYPE)
+        if m.transform is not None:
+            m.transform = m.transform[source]
+        m._nodes = None
+    for box in zone.ffd_boxes:
+        keep = ~removed[box.surface_points]
+        box.surface_markers = box.surface_markers[keep]
+        box.surface_params = box.surface_params[keep]
+        box.surface_points = point_map[box.surface_points[keep]]
+    if zone.npoin_domain:
+        zone.npoin_domain -= int(removed[: zone.npoin_domain].sum())
+    zone.coords = zone.coords[~removed]
+
+
+def coarsen_zone(zone, ratio=None, seed=0):
+    """
+    Coarsen a zone in place by rounds of edge collapses.
+
+    Each marker stops coarsening once its number of points has dropped by
+    ``ratio ** ((ndime - 1) / ndime)``.
+
+    Parameters
+    ----------
+    zone : Zone
+    ratio : float, optional
+        Target reduction of the number of points (default: ``2**ndime``).
+    seed : int
+        Seed of the random priorities that choose between neighboring collapses.
+
+    Returns
+    -------
+    rounds : int
+        Number of rounds done.
+    """
+    ratio = ratio or 2**zone.ndime
+    goal = zone.npoin / ratio
+    # Markers are coarsened by the same ratio in their own dimension
+    marker_goal = {tag: len(n) / ratio ** ((zone.ndime - 1) / zone.ndime) for tag, n in zone.marker_nodes().items()}
+    rng = np.random.default_rng(seed)
+    for rounds in range(1, MAX_ROUNDS + 1):
+        done = [tag for tag, n in zone.marker_nodes().items() if len(n) <= marker_goal[tag]]
+        boundary = _boundary(zone, done)
+        target = _select(zone, rng, boundary)
+        reject = _reject(zone, target)
+        target[reject] = np.flatnonzero(reject)
+        ncollapse = int(np.count_nonzero(target != np.arange(zone.npoin)))
+        _apply(zone, target)
+        if zone.npoin <= goal or ncollapse < MIN_PROGRESS * zone.npoin:
+            break
+    return rounds
+
+
+def coarsen_mesh(mesh, levels=2, ratio=None, seed=0):
+    """
+    Build coarse levels of a mesh.
+
+    Returns
+    -------
+    coarse : list of list of Zone
+        The zones of each level, from the finest coarse level to the coarsest.
+    """
+    result = []
+    zones = list(mesh)
+    for _ in range(levels):
+        zones = [copy.deepcopy(z) for z in zones]
+        for zone in zones:
+            coarsen_zone(zone, ratio, seed)
+        result.append(zones)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools coarsen", description="Write coarse levels of SU2 meshes.")
+    parser.add_argument("paths", nargs="+", help=".su2 files")
+    parser.add_argument("--levels", type=int, default=2, help="number of coarse levels (default: 2)")
+    parser.add_argument("--ratio", type=float, help="point reduction per level (default: 4 in 2D, 8 in 3D)")
+    parser.add_argument("--out", help="output directory (default: next to each mesh)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        mesh = read_mesh(path)
+        start = time.perf_counter()
+        levels = coarsen_mesh(mesh, args.levels, args.ratio, args.seed)
+        elapsed = time.perf_counter() - start
+        stem = os.path.splitext(os.path.basename(path))[0]
+        directory = args.out or os.path.dirname(path)
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+        sizes = [f"{sum(z.npoin for z in mesh)}"]
+        for level, zones in enumerate(levels, 1):
+            write_mesh(zones, os.path.join(directory, f"{stem}_coarse{level}.su2"))
+            sizes.append(f"{sum(z.npoin for z in zones)}")
+        print(f"{path}: points {' -> '.join(sizes)} ({elapsed:.2f} s)")
@@ -0,0 +1,262 @@
+"""
+Columnar binary storage of SU2 solution and restart files (``solution_flow.dat`` ->
+``solution_flow.su2col``).
+
+The file is a bundle of :mod:`su2tools.cache`: a JSON header with the schema (the column
+names, codecs and dtypes, the number of points and the footer lines of the text file) and
+the byte offset of every column, followed by one 64-byte aligned block per column. Columns
+are stored either raw, as little-endian doubles, so that they are memory-mapped and read
+only when accessed, or compressed on their own (zlib, or zstd if the ``zstandard`` package is
+installed) after grouping the bytes of the doubles by significance, so that reading a column
+only decompresses that column.
+
+The SHA-256 of the text file is kept in the header. The text written back by
+:func:`unpack` is checked against it when the source was written in the layout of
+:func:`su2tools.solution.write_solution`, which is the case of the SU2 solution files.
+"""
+# Standard Python modules
+import argparse
+import hashlib
+import os
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .archive import CODECS, DEFAULT_LEVEL, _compressor, _decompressor
+from .cache import file_digest, load_bundle, read_bundle_meta, save_bundle
+from .solution import Solution, read_solution, write_solution
+
+COLUMNS_SUFFIX = ".su2col"
+COLUMNS_VERSION = 1
+RAW = "raw"
+
+
+def columns_path(path):
+    return os.path.splitext(path)[0] + COLUMNS_SUFFIX
+
+
+def _shuffle(values):
+    """Bytes of the doubles ``values`` grouped by significance."""
+    return np.ascontiguousarray(np.ascontiguousarray(values, dtype="<f8").view(np.uint8).reshape(-1, 8).T)
+
+
+def _unshuffle(data, npoint):
+    return np.ascontiguousarray(np.frombuffer(data, dtype=np.uint8).reshape(8, npoint).T).view("<f8").reshape(npoint)
+
+
+def save_columns(filename, solution, codec=RAW, level=None, source_sha256=None):
+    """
+    Write a :class:`~su2tools.solution.Solution` in columnar form.
+
+    Parameters
+    ----------
+    filename : str
+        Output file name.
+    solution : Solution
+    codec : {"raw", "zlib", "zstd"}
+        Compression of the columns; raw columns can be memory-mapped.
+    level : int, optional
+        Compression level.
+    source_sha256 : str, optional
+        Digest of the text file the solution was read from.
+    """
+    if codec != RAW:
+        compress = _compressor(codec, DEFAULT_LEVEL.get(codec) if level is None else level)
+    arrays = {}
+    columns = []
+    for i, name in enumerate(solution.names):
+        values = solution.values[:, i]
+        if codec == RAW:
+            arrays[f"c{i}"] = np.ascontiguousarray(values, dtype="<f8")
+        else:
+            arrays[f"c{i}"] = np.frombuffer(compress(_shuffle(values).tobytes()), dtype=np.uint8)
+        columns.append({"name": name, "dtype": "<f8", "codec": codec})
+    meta = {
+        "kind": "su2columns",
+        "version": COLUMNS_VERSION,
+        "npoint": solution.npoint,
+        "columns": columns,
+        "footer": solution.footer,
+        "source_sha256": source_sha256,
+    }
+    save_bundle(filename, arrays, meta)
+
+
+class ColumnFile:
+    """
+    Memory-mapped columnar solution file.
+
+    Attributes
+    ----------
+    names : list of str
+        Column names, without PointID.
+    npoint : int
+    footer : list of str
+        Lines that followed the point rows in the text file.
+    codecs : list of str
+        Codec of each column.
+    """
+
+    def __init__(self, path):
+        meta = read_bundle_meta(path)
+        if not meta or meta.get("kind") != "su2columns" or meta.get("version") != COLUMNS_VERSION:
+            raise ValueError(f"{path} is not a version {COLUMNS_VERSION} columnar solution file")
+        self.path = path
+        self._arrays, meta = load_bundle(path)
+        self.npoint = meta["npoint"]
+        self.names = [c["name"] for c in meta["columns"]]
+        self.codecs = [c["codec"] for c in meta["columns"]]
+        self.footer = meta["footer"]
+        self.source_sha256 = meta["source_sha256"]
+        self.bytes_read = 0
+
+    def __repr__(self):
+        return f"ColumnFile({self.path!r}, npoint={self.npoint}, names={self.names})"
+
+    def stored_size(self, name):
+        """Bytes taken by a column in the file."""
+        return self._arrays[f"c{self.names.index(name)}"].nbytes
+
+    def column(self, name):
+        """
+        Values of one column: a read-only view of the file for raw columns, decompressed
+        otherwise.
+        """
+        if name not in self.names:
+            raise KeyError(f"{self.path} has no column {name!r}")
+        i = self.names.index(name)
+        data = self._arrays[f"c{i}"]
+        self.bytes_read += data.nbytes
+        if self.codecs[i] == RAW:
+            values = data.view()
+            values.flags.writeable = False
+            return values
+        return _unshuffle(_decompressor(self.codecs[i])(data), self.npoint)
+
+    def columns(self, names=None):
+        """Dict of column values, of all columns by default."""
+        return {name: self.column(name) for name in (self.names if names is None else names)}
+
+    def solution(self, names=None):
+        """
+        The columns ``names`` (all by default, always in file order) as a
+        :class:`~su2tools.solution.Solution`.
+        """
+        if names is not None:
+            missing = set(names) - set(self.names)
+            if missing:
+                raise KeyError(f"{self.path} has no column {', '.join(sorted(missing))}")
+        names = self.names if names is None else [name for name in self.names if name in set(names)]
+        values = np.empty((self.npoint, len(names)))
+        for i, name in enumerate(names):
+            values[:, i] = self.column(name)
+        return Solution(names, values, self.footer)
+
+
+def load_solution(path, names=None):
+    """
+    Read the columns ``names`` (all by default) of a text or columnar solution file.
+
+    Returns
+    -------
+    solution : Solution
+    """
+    if path.endswith(COLUMNS_SUFFIX):
+        return ColumnFile(path).solution(names)
+    solution = read_solution(path)
+    if names is None:
+        return solution
+    keep = [i for i, name in enumerate(solution.names) if name in set(names)]
+    return Solution([solution.names[i] for i in keep], solution.values[:, keep], solution.footer)
+
+
+def pack(path, output=None, codec=RAW, level=None):
+    """Convert a text solution file to a columnar file; return the output path."""
+    output = output or columns_path(path)
+    save_columns(output, read_solution(path), codec, level, file_digest(path))
+    return output
+
+
+def unpack(path, output):
+    """
+    Write a columnar file back as a text solution file.
+
+    Returns
+    -------
+    identical : bool or None
+        Whether the text is byte for byte the source file, None if its digest was not recorded.
+    """
+    columns = ColumnFile(path)
+    write_solution(output, columns.solution())
+    if columns.source_sha256 is None:
+        return None
+    return file_digest(output) == columns.source_sha256
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools columns", description="Columnar binary SU2 solution files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("pack", help="convert text solution files")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--out", help="output directory (default: next to each file)")
+    p.add_argument("--codec", choices=(RAW,) + CODECS, default=RAW)
+    p.add_argument("--level", type=int, help="compression level")
+    p = sub.add_parser("info", help="print the columns of columnar files")
+    p.add_argument("paths", nargs="+")
+    p = sub.add_parser("read", help="time reading columns, against parsing the text file")
+    p.add_argument("path", help="columnar file")
+    p.add_argument("--columns", nargs="+", help="columns to read (default: all)")
+    p.add_argument("--text", help="text file to compare with (default: the source next to PATH)")
+    p = sub.add_parser("unpack", help="write text solution files back")
+    p.add_argument("path")
+    p.add_argument("-o", "--output", help="output file (default: PATH with .dat, if it does not exist)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "pack":
+            if args.out:
+                os.makedirs(args.out, exist_ok=True)
+            for source in args.paths:
+                output = os.path.join(args.out, os.path.basename(columns_path(source))) if args.out else None
+                start = time.perf_counter()
+                output = pack(source, output, args.codec, args.level)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{source}: {os.path.getsize(source) / 1e6:.2f} MB -> {output}: "
+                    f"{os.path.getsize(output) / 1e6:.2f} MB in {elapsed:.2f} s"
+                )
+        elif args.command == "info":
+            for path in args.paths:
+                columns = ColumnFile(path)
+                print(f"{path}: {columns.npoint} points, {len(columns.names)} columns")
+                for name, codec in zip(columns.names, columns.codecs):
+                    print(f"  {name:<28s} {codec:<5s} {columns.stored_size(name):>10d} bytes")
+        elif args.command == "read":
+            start = time.perf_counter()
+            columns = ColumnFile(args.path)
+            solution = columns.solution(args.columns)
+            elapsed = time.perf_counter() - start
+            checksum = hashlib.sha256(solution.values.tobytes()).hexdigest()[:12]
+            print(
+                f"{args.path}: {len(solution.names)} columns, {columns.bytes_read} bytes read "
+                f"in {elapsed * 1e3:.2f} ms ({checksum})"
+            )
+            text = args.text or os.path.splitext(args.path)[0] + ".dat"
+            if os.path.exists(text):
+                start = time.perf_counter()
+                solution = load_solution(text, args.columns)
+                elapsed = time.perf_counter() - start
+                checksum = hashlib.sha256(solution.values.tobytes()).hexdigest()[:12]
+                print(f"{text}: parsed in {elapsed * 1e3:.2f} ms ({checksum})")
+        elif args.command == "unpack":
+            output = args.output or os.path.splitext(args.path)[0] + ".dat"
+            if not args.output and os.path.exists(output):
+                parser.error(f"{output} exists, give the output file with -o")
+            identical = unpack(args.path, output)
+            note = {True: "identical to the source", False: "differs from the source", None: "no source digest"}
+            print(f"{args.path} -> {output} ({note[identical]})")
+    except (KeyError, ValueError, ImportError) as e:
+        parser.error(str(e).strip("'\""))
+    return 0
@@ -0,0 +1,344 @@
+"""
+Tolerance-aware comparison of solution, restart and gradient files against their references.
+
+Both files are read as arrays (text solution files, columnar ``.su2col`` files of
+:mod:`su2tools.columnar`, or ``VARIABLES=`` tables such as ``of_grad_cd.dat.ref``), the
+columns are matched by name and the rows by position, and every value is checked against
+per-column tolerances in one pass over the arrays. A value passes if it is within any of:
+
+- ``atol``: the absolute difference;
+- ``rtol``: the difference relative to the reference value;
+- ``ulps``: the number of representable doubles between the two values.
+
+The failing values are ranked by how far they are outside their tolerance, and the worst are
+reported with their row index (PointID, or the VARIABLE column of tables).
+
+Large files are compared in chunks of rows. In streaming mode the comparison stops at the
+first chunk with a value out of tolerance, so a bad restart fails after reading only the
+rows up to the first difference.
+"""
+# Standard Python modules
+import argparse
+import itertools
+import os
+
+# External modules
+import numpy as np
+
+# First party modules
+from .columnar import COLUMNS_SUFFIX, ColumnFile
+from .tecplot import read_table
+
+ATOL = 1e-12
+RTOL = 1e-6
+ULPS = 0
+
+# Rows per chunk in streaming mode
+CHUNK_ROWS = 1 << 16
+WORST = 10
+
+REF_SUFFIX = ".ref"
+
+
+def ulp_distance(a, b):
+    """Number of doubles between ``a`` and ``b`` (0 if equal, including +0 and -0)."""
+    ia = np.ascontiguousarray(a, dtype=np.float64).view(np.int64)
+    ib = np.ascontiguousarray(b, dtype=np.float64).view(np.int64)
+    # Map the bit patterns to integers that are ordered like the doubles
+    ia = np.where(ia < 0, np.iinfo(np.int64).min - ia, ia)
+    ib = np.where(ib < 0, np.iinfo(np.int64).min - ib, ib)
+    return np.maximum(ia, ib).view(np.uint64) - np.minimum(ia, ib).view(np.uint64)
+
+
+def parse_tolerances(specs, atol=ATOL, rtol=RTOL, ulps=ULPS):
+    """
+    Per-column tolerances from ``COLUMN:atol=1e-8,rtol=0,ulps=4`` strings.
+
+    Returns
+    -------
+    tolerances : dict
+        ``{None: default, COLUMN: tolerance}``, each a dict with ``atol``, ``rtol`` and ``ulps``.
+    """
+    default = {"atol": atol, "rtol": rtol, "ulps": ulps}
+    tolerances = {None: default}
+    for spec in specs or []:
+        column, _, values = spec.rpartition(":")
+        if not column:
+            raise ValueError(f"tolerance {spec!r} has no column, expected COLUMN:atol=...,rtol=...,ulps=...")
+        tolerance = dict(tolerances.get(column, default))
+        for item in values.split(","):
+            key, _, value = item.partition("=")
+            if key not in default:
+                raise ValueError(f"unknown tolerance {key!r} in {spec!r}, expected atol, rtol or ulps")
+            tolerance[key] = int(value) if key == "ulps" else float(value)
+        tolerances[column] = tolerance
+    return tolerances
+
+
+def compare_values(ref, new, atol, rtol, ulps):
+    """
+    Check ``new`` against ``ref`` with per-column tolerances.
+
+    Parameters
+    ----------
+    ref, new : ndarray
+        (nrow, ncolumn) values.
+    atol, rtol, ulps : ndarray
+        (ncolumn,) tolerances.
+
+    Returns
+    -------
+    ok : ndarray
+        Whether each value is within its tolerance; two NaN are equal.
+    diff, rel : ndarray
+        Absolute and relative difference.
+    ulp : ndarray
+        ULP distance.
+    excess : ndarray
+        Difference over the largest of the absolute and relative tolerances (inf for a NaN that
+        is not matched).
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        diff = np.abs(new - ref)
+        scale = np.abs(ref)
+        rel = diff / scale
+        ulp = ulp_distance(ref, new).reshape(ref.shape)
+        ok = (diff <= atol) | (diff <= rtol * scale) | (ulp <= ulps)
+        excess = diff / np.maximum(atol, rtol * scale)
+    nan = np.isnan(ref) | np.isnan(new)
+    ok = np.where(nan, np.isnan(ref) & np.isnan(new), ok)
+    excess[nan & ~ok] = np.inf
+    excess[ok] = 0.0
+    return ok, diff, rel, ulp, excess
+
+
+def _table_chunks(path, chunk_rows):
+    names, values = read_table(path)
+    yield names[0], names[1:], values[:, 0].astype(np.int64), values[:, 1:]
+
+
+def _column_chunks(path, chunk_rows):
+    columns = ColumnFile(path)
+    values = [columns.column(name) for name in columns.names]
+    chunk_rows = chunk_rows or max(columns.npoint, 1)
+    for start in range(0, max(columns.npoint, 1), chunk_rows):
+        stop = min(start + chunk_rows, columns.npoint)
+        yield "PointID", columns.names, np.arange(start, stop), np.column_stack([v[start:stop] for v in values])
+
+
+def _solution_chunks(path, chunk_rows):
+    with open(path, "rb") as f:
+        names = [name.strip().strip('"') for name in f.readline().decode().rstrip("\n").split("\t") if name.strip()]
+        rows = (line for line in f if line[:1].isdigit())
+        first = True
+        while True:
+            lines = list(itertools.islice(rows, chunk_rows))
+            if not lines and not first:
+                break
+            first = False
+            values = np.array(b" ".join(lines).split(), dtype=np.float64).reshape(len(lines), len(names))
+            yield names[0], names[1:], values[:, 0].astype(np.int64), values[:, 1:]
+            if chunk_rows is None or not lines:
+                break
+
+
+def iter_chunks(path, chunk_rows=None):
+    """
+    Read a file in chunks of rows, the whole file at once if ``chunk_rows`` is None.
+
+    Yields
+    ------
+    index_name : str
+        "PointID", or the name of the first column of a table.
+    names : list of str
+        Column names, without the index.
+    index : ndarray
+        Row index of every row of the chunk.
+    values : ndarray
+        (nrow, ncolumn) values.
+    """
+    if path.endswith(COLUMNS_SUFFIX):
+        return _column_chunks(path, chunk_rows)
+    with open(path, "rb") as f:
+        first = f.readline()
+    if first.lstrip().upper().startswith((b"VARIABLES", b"TITLE")):
+        return _table_chunks(path, chunk_rows)
+    return _solution_chunks(path, chunk_rows)
+
+
+class Comparison:
+    """
+    Result of :func:`compare`.
+
+    Attributes
+    ----------
+    names : list of str
+        Compared columns.
+    missing, extra : list of str
+        Columns of the reference missing from the new file, and columns only in the new file.
+    rows : int
+        Rows compared.
+    failed : ndarray
+        Values out of tolerance in each column.
+    max_abs, max_rel, max_ulps : ndarray
+        Largest absolute and relative difference and ULP distance of each column.
+    worst : list of tuple
+        ``(excess, index, column, ref, new)`` of the values furthest out of tolerance, worst first.
+    row_mismatch : str or None
+        Why the rows of the two files could not be matched.
+    stopped : bool
+        Whether a streaming comparison stopped before the end of the files.
+    """
+
+    def __init__(self, index_name, names, missing, extra):
+        self.index_name = index_name
+        self.names = names
+        self.missing = missing
+        self.extra = extra
+        self.rows = 0
+        self.failed = np.zeros(len(names), dtype=np.int64)
+        self.max_abs = np.zeros(len(names))
+        self.max_rel = np.zeros(len(names))
+        self.max_ulps = np.zeros(len(names), dtype=np.uint64)
+        self.worst = []
+        self.row_mismatch = None
+        self.stopped = False
+
+    def __repr__(self):
+        return f"Comparison({self.rows} rows, {len(self.names)} columns, {int(self.failed.sum())} failed)"
+
+    @property
+    def passed(self):
+        return not (self.failed.any() or self.missing or self.row_mismatch)
+
+    def _add(self, index, ok, diff, rel, ulp, excess, ref, new, nworst):
+        self.rows += len(index)
+        self.failed += np.count_nonzero(~ok, axis=0)
+        if len(index):
+            self.max_abs = np.fmax(self.max_abs, np.where(np.isnan(diff), 0.0, diff).max(axis=0))
+            self.max_rel = np.fmax(self.max_rel, np.where(np.isnan(rel), 0.0, rel).max(axis=0))
+            self.max_ulps = np.maximum(self.max_ulps, ulp.max(axis=0))
+        bad = np.flatnonzero(~ok.ravel())
+        if len(bad) > nworst:
+            bad = bad[np.argpartition(-excess.ravel()[bad], nworst - 1)[:nworst]]
+        rows, cols = np.unravel_index(bad, ok.shape)
+        self.worst.extend(
+            (float(excess[r, c]), int(index[r]), self.names[c], float(ref[r, c]), float(new[r, c]))
+            for r, c in zip(rows, cols)
+        )
+        self.worst = sorted(self.worst, key=lambda w: -w[0])[:nworst]
+
+
+def compare(ref_path, new_path, tolerances=None, stream=False, chunk_rows=CHUNK_ROWS, nworst=WORST):
+    """
+    Compare a file with its reference.
+
+    Parameters
+    ----------
+    ref_path, new_path : str
+    tolerances : dict, optional
+        See :func:`parse_tolerances`; by default :data:`ATOL`, :data:`RTOL` and :data:`ULPS`.
+    stream : bool
+        Read the files in chunks of ``chunk_rows`` and stop at the first chunk with a value
+        out of tolerance; otherwise the whole files are read and compared at once.
+    nworst : int
+        Number of worst values to keep.
+
+    Returns
+    -------
+    comparison : Comparison
+    """
+    tolerances = tolerances or parse_tolerances(None)
+    chunk_rows = chunk_rows if stream else None
+    ref_chunks = iter_chunks(ref_path, chunk_rows)
+    new_chunks = iter_chunks(new_path, chunk_rows)
+    comparison = None
+    for ref_chunk, new_chunk in itertools.zip_longest(ref_chunks, new_chunks):
+        if ref_chunk is None or new_chunk is None:
+            comparison.row_mismatch = f"{new_path if new_chunk is None else ref_path} has fewer rows"
+            break
+        index_name, ref_names, ref_index, ref = ref_chunk
+        _, new_names, new_index, new = new_chunk
+        if comparison is None:
+            names = [name for name in ref_names if name in new_names]
+            missing = [name for name in ref_names if name not in new_names]
+            extra = [name for name in new_names if name not in ref_names]
+            comparison = Comparison(index_name, names, missing, extra)
+            ref_columns = [ref_names.index(name) for name in names]
+            new_columns = [new_names.index(name) for name in names]
+            limits = [tolerances.get(name, tolerances[None]) for name in names]
+            atol, rtol, ulps = (np.array([t[key] for t in limits]) for key in ("atol", "rtol", "ulps"))
+        if len(ref_index) != len(new_index):
+            comparison.row_mismatch = f"{ref_path} has {len(ref_index)} rows, {new_path} {len(new_index)}"
+            break
+        if not np.array_equal(ref_index, new_index):
+            first = int(np.flatnonzero(ref_index != new_index)[0])
+            row = comparison.rows + first
+            comparison.row_mismatch = f"row {row}: {index_name} {ref_index[first]} != {new_index[first]}"
+            break
+        ref, new = ref[:, ref_columns], new[:, new_columns]
+        ok, diff, rel, ulp, excess = compare_values(ref, new, atol, rtol, ulps.astype(np.uint64))
+        comparison._add(ref_index, ok, diff, rel, ulp, excess, ref, new, nworst)
+        if stream and not ok.all():
+            comparison.stopped = True
+            break
+    return comparison
+
+
+def format_comparison(comparison):
+    """Return a :class:`Comparison` as text."""
+    c = comparison
+    lines = [f"  {c.rows} rows, {len(c.names)} columns: {'passed' if c.passed else 'FAILED'}"]
+    if c.stopped:
+        lines[0] += " (stopped at the first chunk out of tolerance)"
+    if c.row_mismatch:
+        lines.append(f"  rows do not match: {c.row_mismatch}")
+    if c.missing:
+        lines.append(f"  missing columns: {', '.join(c.missing)}")
+    if c.extra:
+        lines.append(f"  extra columns: {', '.join(c.extra)}")
+    for i, name in enumerate(c.names if c.rows else []):
+        lines.append(
+            f"  {name:<28s} max abs {c.max_abs[i]:.3e}  max rel {c.max_rel[i]:.3e}  "
+            f"max ulps {int(c.max_ulps[i]):>20d}  {c.failed[i]:>8d} failed"
+        )
+    if c.worst:
+        lines.append(f"  worst values ({c.index_name}, column, reference, new, times the tolerance):")
+        for excess, index, name, ref, new in c.worst:
+            lines.append(f"    {index:>10d}  {name:<28s} {ref:>24.15e} {new:>24.15e}  {excess:.3g}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="su2tools compare", description="Compare solution and gradient files with their references."
+    )
+    parser.add_argument("ref", help=f"reference file; NEW defaults to REF without {REF_SUFFIX}")
+    parser.add_argument("new", nargs="?", help="file to check")
+    parser.add_argument("--atol", type=float, default=ATOL, help=f"absolute tolerance (default: {ATOL:g})")
+    parser.add_argument("--rtol", type=float, default=RTOL, help=f"relative tolerance (default: {RTOL:g})")
+    parser.add_argument("--ulps", type=int, default=ULPS, help=f"tolerance in ULPs (default: {ULPS})")
+    parser.add_argument(
+        "--tol", action="append", metavar="COLUMN:KEY=VALUE,...", help="tolerances of one column, e.g. Mach:rtol=1e-4"
+    )
+    parser.add_argument("--stream", action="store_true", help="stop at the first chunk out of tolerance")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"rows per chunk (default: {CHUNK_ROWS})")
+    parser.add_argument("--worst", type=int, default=WORST, help=f"number of worst values shown (default: {WORST})")
+    args = parser.parse_args(argv)
+
+    new = args.new
+    if new is None:
+        if not args.ref.endswith(REF_SUFFIX):
+            parser.error(f"expected NEW, or a reference file ending with {REF_SUFFIX}")
+        new = args.ref[: -len(REF_SUFFIX)]
+    for path in (args.ref, new):
+        if not os.path.exists(path):
+            parser.error(f"{path} does not exist")
+    try:
+        tolerances = parse_tolerances(args.tol, args.atol, args.rtol, args.ulps)
+        comparison = compare(args.ref, new, tolerances, args.stream, args.chunk_rows, args.worst)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{args.ref} -> {new}")
+    print(format_comparison(comparison))
+    return 0 if comparison.passed else 1
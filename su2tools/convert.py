@@ -0,0 +1,162 @@
+"""
+Conversion between SU2 native (.su2) and CGNS meshes.
+
+Both directions move whole arrays: .su2 files are parsed by :mod:`su2tools.reader` and CGNS
+files by :func:`su2tools.cgns.read_cgns`, one Elements_t section at a time; CGNS files are
+written as HDF5 by :func:`su2tools.cgns.write_cgns` with one dataset per connectivity or
+coordinate array. The benchmark converts every mesh of the tree to the other format, reads it
+back and checks that points, elements and markers are unchanged::
+
+    $ python -m su2tools convert euler/wedge/mesh_wedge_inv.cgns /tmp/wedge.su2
+    $ python -m su2tools convert --bench
+"""
+# Standard Python modules
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .cgns import read_cgns, write_cgns
+from .reader import read_mesh
+from .store import find_files
+from .writer import write_mesh
+
+FORMATS = {".su2": (read_mesh, write_mesh), ".cgns": (read_cgns, write_cgns)}
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"{path}: unknown mesh format (expected one of {', '.join(FORMATS)})")
+    return FORMATS[ext]
+
+
+def convert(source, target):
+    """Convert the mesh ``source`` to ``target``, each in the format given by its extension."""
+    mesh = _format(source)[0](source)
+    _format(target)[1](mesh, target)
+    return mesh
+
+
+def compare(mesh, other):
+    """
+    Differences between the points, elements and markers of two meshes.
+
+    Returns
+    -------
+    differences : list of str
+        Empty if the meshes are equal.
+    """
+    zones, others = list(mesh), list(other)
+    if len(zones) != len(others):
+        return [f"{len(zones)} zones != {len(others)} zones"]
+    differences = []
+    for a, b in zip(zones, others):
+        where = f"zone {a.izone}"
+        if a.ndime != b.ndime or not np.array_equal(a.coords, b.coords):
+            differences.append(f"{where}: coordinates")
+        for name in ("elem_types", "elem_offsets", "elem_conn"):
+            if not np.array_equal(getattr(a, name), getattr(b, name)):
+                differences.append(f"{where}: {name}")
+        if [m.tag for m in a.markers] != [m.tag for m in b.markers]:
+            differences.append(f"{where}: marker tags")
+            continue
+        for m, n in zip(a.markers, b.markers):
+            if not all(np.array_equal(getattr(m, k), getattr(n, k)) for k in ("elem_types", "elem_conn")):
+                differences.append(f"{where}: marker {m.tag}")
+    return differences
+
+
+def not_converted(mesh):
+    """SU2-specific data of ``mesh`` that CGNS files do not hold, as a list of str."""
+    lost = []
+    for zone in mesh:
+        periodic = [p for p in zone.periodic if not p.is_identity]
+        if periodic:
+            lost.append(f"zone {zone.izone}: {len(periodic)} periodic transforms")
+        if zone.ffd_boxes:
+            lost.append(f"zone {zone.izone}: {len(zone.ffd_boxes)} FFD boxes")
+        if zone.npoin_domain and zone.npoin_domain != zone.npoin:
+            lost.append(f"zone {zone.izone}: {zone.npoin - zone.npoin_domain} ghost points")
+        if any(m.send_to is not None or m.transform is not None for m in zone.markers):
+            lost.append(f"zone {zone.izone}: SEND_RECEIVE data")
+    return lost
+
+
+def round_trip(path, directory):
+    """
+    Convert ``path`` to the other format in ``directory``, read it back and compare.
+
+    Returns
+    -------
+    result : dict
+        ``npoin``, the ``read``, ``write`` and ``read_back`` times in seconds, the
+        ``differences`` found and the data ``not_converted``.
+    """
+    read = _format(path)[0]
+    other = ".cgns" if path.lower().endswith(".su2") else ".su2"
+    read_other, write_other = FORMATS[other]
+    target = os.path.join(directory, os.path.splitext(os.path.basename(path))[0] + other)
+    start = time.perf_counter()
+    mesh = read(path)
+    t_read = time.perf_counter()
+    write_other(mesh, target)
+    t_write = time.perf_counter()
+    back = read_other(target)
+    t_back = time.perf_counter()
+    os.remove(target)
+    return {
+        "npoin": sum(z.npoin for z in mesh),
+        "read": t_read - start,
+        "write": t_write - t_read,
+        "read_back": t_back - t_write,
+        "differences": compare(mesh, back),
+        "not_converted": not_converted(mesh),
+    }
+
+
+def benchmark(paths):
+    """Round-trip every file of ``paths`` and print one line per file; return the failed files."""
+    failed = []
+    totals = np.zeros(3)
+    print(f"{'mesh':<70} {'points':>8} {'read':>7} {'write':>7} {'back':>7}  result")
+    with tempfile.TemporaryDirectory() as directory:
+        for path in paths:
+            try:
+                r = round_trip(path, directory)
+            except (ValueError, ImportError) as e:
+                print(f"{path:<70} {'':>8} {'':>7} {'':>7} {'':>7}  skipped: {e}")
+                continue
+            times = np.array([r["read"], r["write"], r["read_back"]])
+            totals += times
+            result = "ok" if not r["differences"] else "DIFFERS: " + ", ".join(r["differences"])
+            if r["not_converted"]:
+                result += " (not converted: " + ", ".join(r["not_converted"]) + ")"
+            if r["differences"]:
+                failed.append(path)
+            print(f"{path:<70} {r['npoin']:>8} " + " ".join(f"{t:>7.3f}" for t in times) + f"  {result}")
+    print(f"{'total':<70} {'':>8} " + " ".join(f"{t:>7.3f}" for t in totals))
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools convert", description="Convert meshes between .su2 and CGNS.")
+    parser.add_argument("paths", nargs="*", help="SOURCE TARGET, or the files to benchmark")
+    parser.add_argument("--bench", action="store_true", help="round-trip the files (default: all under .)")
+    args = parser.parse_args(argv)
+    if args.bench:
+        paths = args.paths or [p for p in find_files(".") if os.path.splitext(p)[1].lower() in FORMATS]
+        return 1 if benchmark(paths) else 0
+    if len(args.paths) != 2:
+        parser.error("expected SOURCE and TARGET")
+    start = time.perf_counter()
+    mesh = convert(*args.paths)
+    elapsed = time.perf_counter() - start
+    print(f"{args.paths[0]} -> {args.paths[1]}: {sum(z.npoin for z in mesh)} points in {elapsed:.2f} s")
+    for item in not_converted(mesh) if args.paths[1].lower().endswith(".cgns") else []:
+        print(f"  not converted: {item}", file=sys.stderr)
@@ -0,0 +1,420 @@
+"""
+Volume mesh deformation driven by the motion of surface markers, for unsteady cases with
+moving walls (pitching and plunging airfoils).
+
+The displacement of the surface points is interpolated into the volume either with radial
+basis functions (RBF) or with inverse distance weighting (IDW). Both only use a subset of
+the surface points, chosen greedily: starting from the point that moves most, the point
+where the interpolation of a set of test motions (by default the rigid translations and
+rotations of the surface) is worst is added until the error is below a tolerance. For RBF
+the inverse of the interpolation matrix is updated with a Schur complement at every step,
+and the interpolant on the remaining surface points is updated in place, so the selection
+costs O(nsurface * nselected^2).
+
+The interpolation from the selected points to the volume points is then a dense
+(nvolume, nselected) matrix, built once. The basis functions have a compact support
+(Wendland C2 for RBF; the IDW weights are blended out with the same function of the
+distance to the closest selected point): points farther than the support radius from every
+selected point do not move and are left out of the matrix. The interpolation error on the
+surface points that were not selected, small relative to the displacement but not to the
+first cells of a boundary layer, is corrected near the surface: points within a correction
+radius also take the error of their closest surface point, blended out with the distance.
+Every time step is then one matrix product plus this correction, and the surface points
+themselves are given their exact displacement.
+"""
+# Standard Python modules
+import argparse
+import copy
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .kdtree import KDTree
+from .quality import element_quality
+from .reader import read_mesh
+from .walldist import wall_markers
+from .writer import write_mesh
+
+METHODS = ("rbf", "idw")
+
+# Greedy selection stops when the largest error on the surface points, relative to the largest
+# test displacement, is below the tolerance, or when this many points are selected
+TOLERANCE = 1e-3
+MAX_POINTS = 1000
+
+# Support radius relative to the size of the bounding box of the moving markers, and radius of
+# the correction of the surface interpolation error relative to the support radius
+RADIUS_FACTOR = 10.0
+CORRECTION_FACTOR = 0.1
+
+IDW_POWER = 3.0
+
+# Rows of the volume interpolation matrix built at once
+CHUNK_POINTS = 8192
+
+
+def wendland(r):
+    """Wendland C2 function of the distance ``r`` relative to the support radius."""
+    r = np.minimum(r, 1.0)
+    return (1 - r) ** 4 * (4 * r + 1)
+
+
+def _distances(x, y):
+    """(len(x), len(y)) Euclidean distances between two point sets."""
+    d2 = np.einsum("nd,nd->n", x, x)[:, None] + np.einsum("nd,nd->n", y, y)[None, :] - 2 * x @ y.T
+    return np.sqrt(np.maximum(d2, 0.0))
+
+
+def rigid_modes(coords):
+    """
+    Unit rigid-body motions of a set of points: the translations and the rotations about
+    their centroid, scaled so that the largest displacement of each is 1.
+
+    Returns
+    -------
+    modes : ndarray
+        (nmode, npoint, ndime) displacements; 3 modes in 2D, 6 in 3D.
+    """
+    npoint, ndime = coords.shape
+    modes = [np.broadcast_to(np.eye(ndime)[d], (npoint, ndime)) for d in range(ndime)]
+    r = coords - coords.mean(axis=0)
+    axes = [2] if ndime == 2 else [0, 1, 2]
+    for axis in axes:
+        omega = np.zeros(3)
+        omega[axis] = 1.0
+        r3 = np.zeros((npoint, 3))
+        r3[:, :ndime] = r
+        rotation = np.cross(omega, r3)[:, :ndime]
+        scale = np.linalg.norm(rotation, axis=1).max(initial=0.0)
+        modes.append(rotation / scale if scale > 0 else rotation)
+    return np.array(modes)
+
+
+def pitch_plunge(coords, angle, plunge, center):
+    """
+    Displacement of points rotated by ``angle`` (degrees, nose up) about the z axis through
+    ``center`` and then moved by ``plunge`` along y.
+    """
+    a = np.radians(angle)
+    rotation = np.array([[np.cos(a), np.sin(a)], [-np.sin(a), np.cos(a)]])
+    disp = np.zeros_like(coords)
+    r = coords[:, :2] - np.asarray(center[:2])
+    disp[:, :2] = r @ rotation.T - r
+    disp[:, 1] += plunge
+    return disp
+
+
+def _select_rbf(x, values, radius, tolerance, max_points):
+    """
+    Greedy RBF point selection.
+
+    Returns
+    -------
+    selected : ndarray
+        Indices of the selected points in ``x``.
+    inverse : ndarray
+        Inverse of the interpolation matrix of the selected points.
+    error : float
+        Largest error on the points of ``x``.
+    """
+    npoint = len(x)
+    nvalue = values.shape[1]
+    scale = np.abs(values).max(initial=0.0) or 1.0
+    selected = np.zeros(min(max_points, npoint), dtype=np.int64)
+    columns = np.zeros((npoint, len(selected)))
+    inverse = np.zeros((len(selected), len(selected)))
+    fit = np.zeros((npoint, nvalue))
+    residual = values.copy()
+    k = 0
+    new = int(np.argmax(np.abs(values).max(axis=1)))
+    while True:
+        column = wendland(np.linalg.norm(x - x[new], axis=1) / radius)
+        b = inverse[:k, :k] @ columns[new, :k]
+        # Interpolant of a unit value at the new point that vanishes at the selected points
+        v = column - columns[:, :k] @ b
+        s = v[new]
+        if s <= 1e-12:
+            break
+        fit += np.outer(v / s, residual[new])
+        inverse[:k, :k] += np.outer(b, b) / s
+        inverse[:k, k] = inverse[k, :k] = -b / s
+        inverse[k, k] = 1 / s
+        columns[:, k] = column
+        selected[k] = new
+        k += 1
+        residual = values - fit
+        error = np.abs(residual).max(axis=1)
+        error[selected[:k]] = 0.0
+        new = int(np.argmax(error))
+        if error[new] <= tolerance * scale or k == len(selected):
+            break
+    error = np.abs(values - fit).max(initial=0.0) / scale
+    return selected[:k], inverse[:k, :k], error
+
+
+def _idw_weights(distance, power):
+    """Normalized inverse distance weights, exact (one-hot) at zero distance."""
+    with np.errstate(divide="ignore"):
+        w = distance**-power
+    exact = ~np.isfinite(w)
+    rows = exact.any(axis=1)
+    w[rows] = exact[rows]
+    return w / w.sum(axis=1, keepdims=True)
+
+
+def _select_idw(x, values, power, tolerance, max_points):
+    """Greedy IDW point selection; same returns as :func:`_select_rbf`, without the inverse."""
+    npoint = len(x)
+    scale = np.abs(values).max(initial=0.0) or 1.0
+    is_selected = np.zeros(npoint, dtype=bool)
+    weight = np.zeros(npoint)
+    weighted = np.zeros_like(values)
+    order = []
+    new = int(np.argmax(np.abs(values).max(axis=1)))
+    while True:
+        is_selected[new] = True
+        order.append(new)
+        with np.errstate(divide="ignore"):
+            w = np.linalg.norm(x - x[new], axis=1) ** -power
+        w[is_selected] = 0.0
+        weight += w
+        weighted += np.outer(w, values[new])
+        with np.errstate(invalid="ignore"):
+            error = np.abs(values - weighted / weight[:, None]).max(axis=1)
+        error[is_selected | (weight == 0)] = 0.0
+        new = int(np.argmax(error))
+        if error[new] <= tolerance * scale or len(order) == min(max_points, npoint):
+            break
+    return np.array(order, dtype=np.int64), None, float(error.max(initial=0.0)) / scale
+
+
+class Deformation:
+    """
+    Precomputed interpolation of the displacement of surface markers into the volume of a zone.
+
+    Parameters
+    ----------
+    zone : Zone
+    markers : list of str, optional
+        Moving markers; by default the walls (:func:`su2tools.walldist.wall_markers`).
+    fixed : list of str
+        Markers that must not move, within the support radius of the moving markers.
+    method : {"rbf", "idw"}
+    radius : float, optional
+        Support radius; by default :data:`RADIUS_FACTOR` times the size of the moving markers.
+    tolerance : float
+        Largest interpolation error of the test motions on the surface points, relative to their
+        largest displacement.
+    max_points : int
+        Largest number of selected surface points.
+    correction_radius : float, optional
+        Distance from the surface over which the interpolation error of the surface points is
+        corrected; by default :data:`CORRECTION_FACTOR` times ``radius``.
+    modes : ndarray, optional
+        (nmode, nsurface, ndime) test motions of the moving points; by default their rigid motions.
+    power : float
+        Exponent of the IDW weights.
+
+    Attributes
+    ----------
+    surface : ndarray
+        Points of the moving markers, in the order of the displacements given to :meth:`displacements`.
+    selected : ndarray
+        Points the volume displacement is interpolated from.
+    support : ndarray
+        Points that move, the rows of ``operator``.
+    operator : ndarray
+        (nsupport, nselected) interpolation matrix.
+    error : float
+        Relative interpolation error of the test motions on the surface points.
+    """
+
+    def __init__(
+        self,
+        zone,
+        markers=None,
+        fixed=(),
+        method="rbf",
+        radius=None,
+        tolerance=TOLERANCE,
+        max_points=MAX_POINTS,
+        correction_radius=None,
+        modes=None,
+        power=IDW_POWER,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"unknown deformation method {method!r}, expected one of {', '.join(METHODS)}")
+        markers = wall_markers(zone) if markers is None else list(markers)
+        tags = {m.tag for m in zone.markers}
+        missing = (set(markers) | set(fixed)) - tags
+        if missing:
+            raise ValueError(f"zone {zone.izone} has no marker {', '.join(sorted(missing))}")
+        if not markers:
+            raise ValueError(f"zone {zone.izone} has no moving marker")
+        nodes = zone.marker_nodes()
+        self.zone = zone
+        self.markers = markers
+        self.method = method
+        self.surface = np.unique(np.concatenate([nodes[tag] for tag in markers]))
+        fixed_points = np.concatenate([np.zeros(0, dtype=self.surface.dtype)] + [nodes[tag] for tag in fixed])
+        self.fixed = np.setdiff1d(fixed_points, self.surface)
+
+        x = zone.coords[self.surface]
+        size = np.linalg.norm(np.ptp(x, axis=0))
+        self.radius = RADIUS_FACTOR * size if radius is None else float(radius)
+        self.correction_radius = CORRECTION_FACTOR * self.radius if correction_radius is None else correction_radius
+        if modes is None:
+            modes = rigid_modes(x)
+        modes = np.asarray(modes, dtype=np.float64)
+        # Fixed points within reach of the moving points are candidates with a zero displacement
+        if len(self.fixed):
+            near, _ = KDTree(x).query(zone.coords[self.fixed])
+            self.fixed = self.fixed[near < self.radius]
+        candidates = np.concatenate([self.surface, self.fixed])
+        values = np.zeros((len(candidates), len(modes) * zone.ndime))
+        values[: len(self.surface)] = modes.transpose(1, 0, 2).reshape(len(self.surface), -1)
+
+        if method == "rbf":
+            chosen, inverse, self.error = _select_rbf(
+                zone.coords[candidates], values, self.radius, tolerance, max_points
+            )
+        else:
+            chosen, inverse, self.error = _select_idw(zone.coords[candidates], values, power, tolerance, max_points)
+        self._chosen = chosen
+        self.selected = candidates[chosen]
+        self._build_operator(candidates, inverse, power)
+
+    def _interpolation(self, x, inverse, power):
+        """(len(x), nselected) interpolation matrix from the selected points to the points ``x``."""
+        matrix = np.zeros((len(x), len(self.selected)))
+        centers = self.zone.coords[self.selected]
+        for start in range(0, len(x), CHUNK_POINTS):
+            d = _distances(x[start : start + CHUNK_POINTS], centers)
+            if self.method == "rbf":
+                matrix[start : start + len(d)] = wendland(d / self.radius) @ inverse
+            else:
+                blend = wendland(d.min(axis=1) / self.radius)
+                matrix[start : start + len(d)] = _idw_weights(d, power) * blend[:, None]
+        return matrix
+
+    def _build_operator(self, candidates, inverse, power):
+        coords = self.zone.coords
+        distance, _ = KDTree(coords[self.selected]).query(coords)
+        self.support = np.setdiff1d(np.flatnonzero(distance < self.radius), candidates)
+        self.operator = self._interpolation(coords[self.support], inverse, power)
+        self._boundary_operator = self._interpolation(coords[candidates], inverse, power)
+        # The points closer to the surface than the correction radius also take the interpolation
+        # error of their closest surface point, blended out with the distance
+        distance, nearest = KDTree(coords[candidates]).query(coords[self.support])
+        corrected = distance < self.correction_radius
+        self._corrected = np.flatnonzero(corrected)
+        self._nearest = nearest[corrected]
+        self._blend = wendland(distance[corrected] / self.correction_radius)
+
+    def __repr__(self):
+        return (
+            f"Deformation(zone {self.zone.izone}, {self.method}, {len(self.selected)} of "
+            f"{len(self.surface) + len(self.fixed)} surface points, {len(self.support)} volume points)"
+        )
+
+    def displacements(self, surface_displacements):
+        """
+        Point displacements for one or a batch of surface motions.
+
+        Parameters
+        ----------
+        surface_displacements : ndarray
+            (nsurface, ndime) or (nstep, nsurface, ndime) displacement of the points of
+            :attr:`surface`.
+
+        Returns
+        -------
+        disp : ndarray
+            (npoin, ndime) or (nstep, npoin, ndime) displacement of every point of the zone.
+        """
+        d = np.asarray(surface_displacements, dtype=np.float64)
+        single = d.ndim == 2
+        d = d[None] if single else d
+        nstep, ndime = len(d), self.zone.ndime
+        values = np.zeros((len(self.surface) + len(self.fixed), nstep, ndime))
+        values[: len(self.surface)] = d.transpose(1, 0, 2)
+        values = values.reshape(len(values), -1)
+        # One matrix product for all steps: (nsupport, nselected) @ (nselected, nstep * ndime)
+        moved = self.operator @ values[self._chosen]
+        residual = values - self._boundary_operator @ values[self._chosen]
+        moved[self._corrected] += self._blend[:, None] * residual[self._nearest]
+        disp = np.zeros((nstep, self.zone.npoin, ndime))
+        disp[:, self.support] = moved.reshape(len(self.support), nstep, ndime).transpose(1, 0, 2)
+        disp[:, self.surface] = d
+        return disp[0] if single else disp
+
+    def deform(self, surface_displacements):
+        """Deformed coordinates of the zone, see :meth:`displacements`."""
+        return self.zone.coords + self.displacements(surface_displacements)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="su2tools deform", description="Deform SU2 meshes for a pitching and plunging motion of their walls."
+    )
+    parser.add_argument("mesh", help=".su2 file")
+    parser.add_argument("--markers", nargs="+", help="moving markers (default: the walls)")
+    parser.add_argument("--fixed", nargs="+", default=[], help="markers that must not move")
+    parser.add_argument("--method", choices=METHODS, default="rbf")
+    parser.add_argument("--radius", type=float, help=f"support radius (default: {RADIUS_FACTOR:g} x marker size)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="relative selection tolerance")
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS, help="largest number of selected points")
+    parser.add_argument("--pitch", type=float, default=2.5, help="pitch amplitude in degrees (default: 2.5)")
+    parser.add_argument("--plunge", type=float, default=0.0, help="plunge amplitude (default: 0)")
+    parser.add_argument("--center", type=float, nargs=2, help="pitch axis (default: quarter chord)")
+    parser.add_argument("--steps", type=int, default=32, help="time steps per period (default: 32)")
+    parser.add_argument("-o", "--output", help="write the mesh at the largest pitch angle to this .su2 file")
+    args = parser.parse_args(argv)
+
+    mesh = read_mesh(args.mesh)
+    peaks = []
+    for zone in mesh:
+        start = time.perf_counter()
+        try:
+            deformation = Deformation(
+                zone, args.markers, args.fixed, args.method, args.radius, args.tolerance, args.max_points
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        setup = time.perf_counter() - start
+        print(f"zone {zone.izone}: {deformation!r}")
+        print(f"  setup {setup * 1e3:.1f} ms, surface error {deformation.error:.2e}, radius {deformation.radius:.4g}")
+
+        x = zone.coords[deformation.surface]
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        center = args.center or [0.75 * lo[0] + 0.25 * hi[0], 0.5 * (lo[1] + hi[1])]
+        phase = 2 * np.pi * np.arange(args.steps) / args.steps
+        motion = np.array([pitch_plunge(x, args.pitch * np.sin(p), args.plunge * np.sin(p), center) for p in phase])
+
+        elapsed = []
+        for d in motion:
+            start = time.perf_counter()
+            deformation.deform(d)
+            elapsed.append(time.perf_counter() - start)
+        base_volume = element_quality(zone)["volume"]
+        deformed = copy.copy(zone)
+        worst, inverted = np.inf, 0
+        for d in motion:
+            deformed.coords = deformation.deform(d)
+            ratio = element_quality(deformed)["volume"] / base_volume
+            worst = min(worst, float(ratio.min(initial=np.inf)))
+            inverted = max(inverted, int(np.count_nonzero(ratio <= 0)))
+        print(
+            f"  {args.steps} steps, {np.mean(elapsed) * 1e3:.2f} ms per step, "
+            f"smallest volume ratio {worst:.4f}, {inverted} inverted elements"
+        )
+        peaks.append(deformation.deform(motion[np.argmax(np.abs(np.sin(phase)))]))
+
+    if args.output:
+        for zone, coords in zip(mesh, peaks):
+            zone.coords = coords
+        write_mesh(mesh, args.output)
+        print(f"written to {args.output}")
+    return 0
@@ -0,0 +1,289 @@
+"""
+Differences between two meshes of the same geometry, such as a baseline mesh and the mesh
+deformed by an optimizer, and compact coordinate deltas against a baseline.
+
+The points of the new mesh are matched to the baseline by index when both meshes have the same
+elements and markers, and to their closest baseline point (:mod:`su2tools.kdtree`) otherwise.
+The comparison gives the displacement of every point, the displacement and the deviation of
+each marker (the exact distance from its new points to the baseline marker faces, with the face
+tree of :mod:`su2tools.walldist`), and the change of the element volumes and quality metrics of
+:mod:`su2tools.quality`, element by element when the topology is unchanged.
+
+A delta file (``.su2delta``) stores a bit mask of the points that moved and their coordinates
+only, as the bitwise XOR of the new and baseline doubles. The high bytes of the XOR of nearby values are
+zero, so the bytes are grouped by significance before zlib compression. Applying the delta to
+the baseline gives the new coordinates exactly; the SHA-256 of the baseline file and of the new
+coordinates are checked.
+"""
+# Standard Python modules
+import argparse
+import hashlib
+import os
+import zlib
+
+# External modules
+import numpy as np
+
+# First party modules
+from .cache import file_digest, load_bundle, read_bundle_meta, save_bundle
+from .kdtree import KDTree
+from .quality import METRICS, element_quality
+from .reader import read_mesh
+from .walldist import FaceTree, wall_faces
+from .writer import write_mesh
+
+DELTA_SUFFIX = ".su2delta"
+DELTA_VERSION = 1
+
+# Quality metrics that are better when larger
+_HIGHER_IS_BETTER = ("orthogonality",)
+
+
+def same_topology(zone, other):
+    """Whether two zones have the same points, elements and markers (coordinates aside)."""
+    if (zone.ndime, zone.npoin) != (other.ndime, other.npoin):
+        return False
+    for name in ("elem_types", "elem_offsets", "elem_conn"):
+        if not np.array_equal(getattr(zone, name), getattr(other, name)):
+            return False
+    if [m.tag for m in zone.markers] != [m.tag for m in other.markers]:
+        return False
+    return all(
+        np.array_equal(m.elem_types, n.elem_types) and np.array_equal(m.elem_conn, n.elem_conn)
+        for m, n in zip(zone.markers, other.markers)
+    )
+
+
+def align(base, zone):
+    """
+    Baseline point of every point of ``zone``.
+
+    Returns
+    -------
+    index : ndarray
+        Point of ``base`` matched to each point of ``zone``.
+    by_index : bool
+        True if the zones have the same topology and points are matched by index.
+    """
+    if same_topology(base, zone):
+        return np.arange(zone.npoin), True
+    _, index = KDTree(base.coords).query(zone.coords)
+    return index, False
+
+
+def _quality_change(base_quality, quality, by_index):
+    """Mean and worst value of each metric before and after, and per-element changes if ``by_index``."""
+    change = {}
+    for metric in METRICS:
+        worst = np.nanmin if metric in _HIGHER_IS_BETTER else np.nanmax
+        values = [base_quality[metric], quality[metric]]
+        finite = [v[np.isfinite(v)] for v in values]
+        change[metric] = {
+            "mean": [float(v.mean()) if len(v) else np.nan for v in finite],
+            "worst": [float(worst(v)) if len(v) else np.nan for v in finite],
+        }
+        if by_index:
+            delta = quality[metric] - base_quality[metric]
+            if metric in _HIGHER_IS_BETTER:
+                delta = -delta
+            change[metric]["worse"] = int(np.count_nonzero(delta > 1e-12 * np.abs(base_quality[metric])))
+    return change
+
+
+def zone_diff(base, zone):
+    """
+    Compare a zone with its baseline.
+
+    Returns
+    -------
+    diff : dict
+        ``index`` and ``by_index`` (see :func:`align`); ``displacement`` (npoin, ndime) of each
+        point from its baseline point; ``markers``, for every marker tag in both zones, the
+        number of ``points``, the largest and RMS ``displacement`` and the largest and RMS
+        ``deviation`` from the baseline marker faces; ``volume``, the total volume before and
+        after, and with the same topology the smallest and largest volume ``ratio`` and the
+        number of elements whose volume changed sign (``inverted``); ``quality``, see
+        :func:`_quality_change`.
+    """
+    index, by_index = align(base, zone)
+    displacement = zone.coords - base.coords[index]
+    distance = np.linalg.norm(displacement, axis=1)
+
+    markers = {}
+    base_tags = {m.tag for m in base.markers}
+    for tag, nodes in zone.marker_nodes().items():
+        if tag not in base_tags or len(nodes) == 0:
+            continue
+        deviation, _ = FaceTree(wall_faces(base, [tag])).query(zone.coords[nodes])
+        markers[tag] = {
+            "points": len(nodes),
+            "displacement": [float(distance[nodes].max()), float(np.sqrt(np.mean(distance[nodes] ** 2)))],
+            "deviation": [float(deviation.max()), float(np.sqrt(np.mean(deviation**2)))],
+        }
+
+    base_quality, quality = element_quality(base), element_quality(zone)
+    base_volume, volume = base_quality["volume"], quality["volume"]
+    volumes = {"total": [float(base_volume.sum()), float(volume.sum())]}
+    if by_index:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = volume / base_volume
+        volumes["ratio"] = [float(np.nanmin(ratio)), float(np.nanmax(ratio))] if len(ratio) else [1.0, 1.0]
+        volumes["inverted"] = int(np.count_nonzero(np.sign(volume) != np.sign(base_volume)))
+    return {
+        "index": index,
+        "by_index": by_index,
+        "displacement": displacement,
+        "markers": markers,
+        "volume": volumes,
+        "quality": _quality_change(base_quality, quality, by_index),
+    }
+
+
+def _coords_digest(coords):
+    return hashlib.sha256(np.ascontiguousarray(coords, dtype=np.float64).tobytes()).hexdigest()
+
+
+def _as_bits(x):
+    """Bit patterns of the doubles ``x``, flattened."""
+    return np.ascontiguousarray(x, dtype=np.float64).reshape(-1).view(np.uint64)
+
+
+def _xor_bytes(a, b):
+    """XOR of the bit patterns of two float arrays, grouped by byte significance."""
+    return np.ascontiguousarray((_as_bits(a) ^ _as_bits(b)).view(np.uint8).reshape(-1, 8).T)
+
+
+def delta_path(path):
+    return os.path.splitext(path)[0] + DELTA_SUFFIX
+
+
+def save_delta(filename, base_path, base, mesh, level=9):
+    """
+    Write the coordinates of ``mesh`` as a delta against the baseline mesh ``base`` read from
+    ``base_path``. Every zone must have the same topology as its baseline.
+
+    Returns
+    -------
+    moved : list of int
+        Number of points that moved in each zone.
+    """
+    base_zones, zones = list(base), list(mesh)
+    if len(base_zones) != len(zones) or not all(same_topology(b, z) for b, z in zip(base_zones, zones)):
+        raise ValueError("a delta needs the same elements and markers as the baseline")
+    arrays = {}
+    moved = []
+    for i, (b, z) in enumerate(zip(base_zones, zones)):
+        bits_changed = _as_bits(z.coords) != _as_bits(b.coords)
+        points = np.flatnonzero(np.any(bits_changed.reshape(z.npoin, -1), axis=1))
+        arrays[f"z{i}/moved"] = np.packbits(np.isin(np.arange(z.npoin), points))
+        bits = zlib.compress(_xor_bytes(b.coords[points], z.coords[points]).tobytes(), level)
+        arrays[f"z{i}/bits"] = np.frombuffer(bits, dtype=np.uint8)
+        moved.append(len(points))
+    meta = {
+        "kind": "su2delta",
+        "version": DELTA_VERSION,
+        "base": os.path.basename(base_path),
+        "base_sha256": file_digest(base_path),
+        "coords_sha256": [_coords_digest(z.coords) for z in zones],
+    }
+    save_bundle(filename, arrays, meta)
+    return moved
+
+
+def apply_delta(base_path, filename):
+    """
+    Read the baseline mesh and replace its coordinates with those of the delta.
+
+    Returns
+    -------
+    mesh : Mesh
+    """
+    meta = read_bundle_meta(filename)
+    if not meta or meta.get("kind") != "su2delta" or meta.get("version") != DELTA_VERSION:
+        raise ValueError(f"{filename} is not a version {DELTA_VERSION} mesh delta")
+    if file_digest(base_path) != meta["base_sha256"]:
+        raise ValueError(f"{base_path} is not the baseline of {filename} ({meta['base']})")
+    arrays, meta = load_bundle(filename)
+    mesh = read_mesh(base_path)
+    for i, zone in enumerate(mesh):
+        points = np.flatnonzero(np.unpackbits(arrays[f"z{i}/moved"], count=zone.npoin))
+        shape = (8, len(points) * zone.ndime)
+        xor = np.frombuffer(zlib.decompress(arrays[f"z{i}/bits"].tobytes()), dtype=np.uint8).reshape(shape)
+        bits = np.ascontiguousarray(xor.T).view(np.uint64).reshape(len(points), zone.ndime)
+        coords = zone.coords.copy()
+        coords[points] = (_as_bits(coords[points]).reshape(bits.shape) ^ bits).view(np.float64)
+        if _coords_digest(coords) != meta["coords_sha256"][i]:
+            raise ValueError(f"{filename}: zone {zone.izone} coordinates do not match their checksum")
+        zone.coords = coords
+    return mesh
+
+
+def format_diff(diff, izone=1):
+    """Return the report of :func:`zone_diff` as text."""
+    distance = np.linalg.norm(diff["displacement"], axis=1)
+    moved = int(np.count_nonzero(distance))
+    how = "by index" if diff["by_index"] else "by nearest point"
+    lines = [
+        f"zone {izone}: aligned {how}, {moved} of {len(distance)} points moved, "
+        f"max {distance.max(initial=0.0):.4e}, rms {np.sqrt(np.mean(distance**2)) if len(distance) else 0.0:.4e}"
+    ]
+    for tag, m in diff["markers"].items():
+        lines.append(
+            f"  marker {tag:<20s} {m['points']:>7d} points  displacement max {m['displacement'][0]:.4e} "
+            f"rms {m['displacement'][1]:.4e}  deviation max {m['deviation'][0]:.4e} rms {m['deviation'][1]:.4e}"
+        )
+    v = diff["volume"]
+    line = f"  volume {v['total'][0]:.6e} -> {v['total'][1]:.6e}"
+    if "ratio" in v:
+        line += f", element ratio {v['ratio'][0]:.4f} to {v['ratio'][1]:.4f}, {v['inverted']} inverted"
+    lines.append(line)
+    for metric, q in diff["quality"].items():
+        line = (
+            f"  {metric:<14s} mean {q['mean'][0]:.4g} -> {q['mean'][1]:.4g}, "
+            f"worst {q['worst'][0]:.4g} -> {q['worst'][1]:.4g}"
+        )
+        if "worse" in q:
+            line += f", {q['worse']} elements worse"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="su2tools diff", description="Compare a mesh with its baseline and store it as a delta."
+    )
+    parser.add_argument("base", help="baseline .su2 file")
+    parser.add_argument("new", nargs="?", help="mesh to compare with the baseline")
+    parser.add_argument("--delta", nargs="?", const="", help=f"write a delta file (default: NEW with {DELTA_SUFFIX})")
+    parser.add_argument("--apply", metavar="DELTA", help="rebuild a mesh from the baseline and a delta file")
+    parser.add_argument("-o", "--output", help="output .su2 file for --apply")
+    args = parser.parse_args(argv)
+
+    if args.apply:
+        if not args.output:
+            parser.error("--apply needs --output")
+        try:
+            mesh = apply_delta(args.base, args.apply)
+        except ValueError as e:
+            parser.error(str(e))
+        write_mesh(mesh, args.output)
+        print(f"{args.base} + {args.apply} -> {args.output}")
+        return 0
+    if not args.new:
+        parser.error("expected NEW, or --apply DELTA")
+    base, mesh = read_mesh(args.base), read_mesh(args.new)
+    if len(base) != len(mesh):
+        print(f"{args.base}: {len(base)} zones, {args.new}: {len(mesh)} zones")
+        return 1
+    print(f"{args.base} -> {args.new}")
+    for b, z in zip(base, mesh):
+        print(format_diff(zone_diff(b, z), z.izone))
+    if args.delta is not None:
+        filename = args.delta or delta_path(args.new)
+        try:
+            moved = save_delta(filename, args.base, base, mesh)
+        except ValueError as e:
+            parser.error(str(e))
+        size = os.path.getsize(filename)
+        print(f"delta {filename}: {sum(moved)} points, {size} bytes ({os.path.getsize(args.new) / size:.1f}x smaller)")
+    return 0
@@ -0,0 +1,392 @@
+"""
+Edge-based median-dual data of a mesh, as used by vertex-centered finite-volume solvers.
+
+The control volume of each point is bounded by the median dual: in 2D, the segments from the
+midpoint of each element edge to the element centroid; in 3D, the triangles (edge midpoint,
+face centroid, element centroid) for the two faces of the element that hold the edge. For every
+edge of the mesh the dual faces of all elements around it are summed into one normal, pointing
+from the first point of the edge to the second. The volume of each control volume is the sum,
+over its dual faces, of the cones from the point to the face (the cones to the element faces
+are flat). Markers get one normal per vertex: its share of the marker faces (half a segment in
+2D, the quadrilateral vertex-edge midpoints-face centroid in 3D), pointing out of the element
+that owns the face.
+
+Everything is computed with whole-array operations over all elements of a type at once. The
+results are cached next to the mesh (``mesh.su2`` -> ``mesh.su2.dual``) and memory-mapped by
+:func:`mesh_dual` as long as the size and modification time of the mesh are unchanged.
+"""
+# Standard Python modules
+import argparse
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .cache import file_stamp, load_bundle, read_sidecar_meta, save_bundle, save_quietly
+from .mesh import ELEM_DIMS, LINE, NODES_PER_ELEM, QUADRILATERAL, TRIANGLE
+from .reader import read_mesh
+from .topology import ELEM_EDGES, ELEM_FACES, FACE_WIDTH, element_faces
+
+DUAL_SUFFIX = ".dual"
+DUAL_VERSION = 1
+
+
+def _edge_faces(etype):
+    """(edge, faces) local node indices of each edge of a 3D element and the faces that hold it."""
+    return [(edge, [f for f in ELEM_FACES[etype] if set(edge) <= set(f)]) for edge in ELEM_EDGES[etype]]
+
+
+def _turn(v):
+    """The 2D vectors ``v`` turned by -90 degrees."""
+    return np.stack([v[..., 1], -v[..., 0]], axis=-1)
+
+
+class DualZone:
+    """
+    Median-dual data of one zone.
+
+    Attributes
+    ----------
+    edges : ndarray
+        (nedge, 2) point indices of each edge, smaller index first, sorted.
+    normals : ndarray
+        (nedge, ndime) dual face normal of each edge, its length the face area, pointing from
+        ``edges[:, 0]`` to ``edges[:, 1]``.
+    volumes : ndarray
+        Control volume (area in 2D) of each point.
+    vertices : dict
+        Sorted point indices of each marker, keyed by tag.
+    vertex_normals : dict
+        (nvertex, ndime) outward normal of each marker vertex, its length the vertex share of
+        the marker area, keyed by tag.
+    """
+
+    def __init__(self, edges, normals, volumes, vertices=None, vertex_normals=None):
+        self.edges = edges
+        self.normals = normals
+        self.volumes = volumes
+        self.vertices = vertices or {}
+        self.vertex_normals = vertex_normals or {}
+
+    def __repr__(self):
+        return f"DualZone(npoin={self.npoin}, nedge={self.nedge}, markers={list(self.vertices)})"
+
+    @property
+    def ndime(self):
+        return self.normals.shape[1]
+
+    @property
+    def npoin(self):
+        return len(self.volumes)
+
+    @property
+    def nedge(self):
+        return len(self.edges)
+
+
+def _dual_faces(zone):
+    """
+    Every piece of the median dual of a zone, one per element edge (2D) or per element edge
+    and face (3D).
+
+    Returns
+    -------
+    a, b : ndarray
+        Points of the edge of each piece.
+    normal : ndarray
+        (npiece, ndime) normal of each piece, pointing from ``a`` to ``b``.
+    center : ndarray
+        (npiece, ndime) centroid of each piece.
+    """
+    ndime, coords = zone.ndime, zone.coords
+    a, b, normal, center = [], [], [], []
+    for etype in ELEM_EDGES:
+        if ELEM_DIMS[etype] != ndime:
+            continue
+        elems = np.flatnonzero(zone.elem_types == etype)
+        if len(elems) == 0:
+            continue
+        nodes = zone.elem_conn[zone.elem_offsets[elems][:, None] + np.arange(NODES_PER_ELEM[etype])]
+        x = coords[nodes]
+        centroid = x.mean(axis=1)
+        if ndime == 2:
+            pieces = [(edge, [()]) for edge in ELEM_EDGES[etype]]
+        else:
+            pieces = _edge_faces(etype)
+            face_centroids = {face: x[:, list(face)].mean(axis=1) for face in ELEM_FACES[etype]}
+        for (i, j), faces in pieces:
+            mid = 0.5 * (x[:, i] + x[:, j])
+            for face in faces:
+                if ndime == 2:
+                    n = _turn(centroid - mid)
+                    c = 0.5 * (mid + centroid)
+                else:
+                    face_centroid = face_centroids[face]
+                    n = 0.5 * np.cross(face_centroid - mid, centroid - mid)
+                    c = (mid + face_centroid + centroid) / 3.0
+                # Orient the piece along the edge
+                sign = np.where(np.einsum("nd,nd->n", n, x[:, j] - x[:, i]) < 0, -1.0, 1.0)
+                a.append(nodes[:, i])
+                b.append(nodes[:, j])
+                normal.append(n * sign[:, None])
+                center.append(c)
+    if not a:
+        return (np.zeros(0, dtype=np.int64),) * 2 + (np.zeros((0, ndime)),) * 2
+    return np.concatenate(a), np.concatenate(b), np.concatenate(normal), np.concatenate(center)
+
+
+def _face_owners(zone, faces):
+    """
+    An element that has each of ``faces`` (rows of ``FACE_WIDTH`` node indices padded with -1)
+    as one of its faces, or -1.
+    """
+    elem_faces, face_elem = element_faces(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+    keys = np.sort(np.concatenate([elem_faces, faces]), axis=1)
+    is_query = np.r_[np.zeros(len(elem_faces), dtype=bool), np.ones(len(faces), dtype=bool)]
+    # Equal keys are grouped, element faces first
+    order = np.lexsort((is_query,) + tuple(keys.T[::-1]))
+    keys = keys[order]
+    new = np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)]
+    first = order[np.flatnonzero(new)[np.cumsum(new) - 1]]
+    owner = np.where(first < len(elem_faces), face_elem[np.minimum(first, len(elem_faces) - 1)], -1)
+    result = np.empty(len(faces), dtype=np.int64)
+    result[order[is_query[order]] - len(elem_faces)] = owner[is_query[order]]
+    return result
+
+
+def _centroids(zone):
+    """Mean of the nodes of every element."""
+    nnode = np.diff(zone.elem_offsets)
+    sums = np.add.reduceat(zone.coords[zone.elem_conn], zone.elem_offsets[:-1], axis=0) if zone.nelem else 0.0
+    return sums / np.maximum(nnode, 1)[:, None]
+
+
+def _vertex_normals(zone, marker, owners, centroids):
+    """
+    Vertex normals of a marker.
+
+    Returns
+    -------
+    vertices : ndarray
+        Sorted point indices of the marker.
+    normals : ndarray
+        (nvertex, ndime) outward normal of each vertex.
+    """
+    ndime, coords = zone.ndime, zone.coords
+    points, normals = [], []
+    for etype in (LINE, TRIANGLE, QUADRILATERAL):
+        if ELEM_DIMS[etype] != ndime - 1:
+            continue
+        elems = np.flatnonzero(marker.elem_types == etype)
+        if len(elems) == 0:
+            continue
+        nnode = NODES_PER_ELEM[etype]
+        nodes = marker.elem_conn[marker.elem_offsets[elems][:, None] + np.arange(nnode)]
+        x = coords[nodes]
+        center = x.mean(axis=1)
+        if ndime == 2:
+            n = np.repeat(0.5 * _turn(x[:, 1] - x[:, 0])[:, None], 2, axis=1)
+        else:
+            # Share of each vertex: its corner of the face, cut at the edge midpoints
+            xn, xp = np.roll(x, -1, axis=1), np.roll(x, 1, axis=1)
+            c = center[:, None]
+            n = 0.5 * (np.cross(0.5 * (x + xn) - x, c - x) + np.cross(c - x, 0.5 * (x + xp) - x))
+        # Point away from the element that owns the face (faces without one keep their order)
+        owner = owners[elems]
+        outward = np.einsum("nd,nd->n", n.sum(axis=1), center - centroids[np.maximum(owner, 0)])
+        sign = np.where((owner >= 0) & (outward < 0), -1.0, 1.0)
+        points.append(nodes.ravel())
+        normals.append((n * sign[:, None, None]).reshape(-1, ndime))
+    if not points:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, ndime))
+    vertices, inverse = np.unique(np.concatenate(points), return_inverse=True)
+    normals = np.concatenate(normals)
+    summed = np.stack([np.bincount(inverse, normals[:, d], len(vertices)) for d in range(ndime)], axis=1)
+    return vertices.astype(np.int64), summed
+
+
+def dual_zone(zone):
+    """
+    Compute the median-dual data of a zone.
+
+    Returns
+    -------
+    dual : DualZone
+    """
+    ndime, npoin = zone.ndime, zone.npoin
+    a, b, normal, center = _dual_faces(zone)
+    # One edge per point pair, stored with the smaller index first
+    flip = a > b
+    lo, hi = np.where(flip, b, a).astype(np.int64), np.where(flip, a, b).astype(np.int64)
+    normal = np.where(flip[:, None], -normal, normal)
+    key, inverse = np.unique(lo * npoin + hi, return_inverse=True)
+    edges = np.column_stack([key // max(npoin, 1), key % max(npoin, 1)])
+    normals = np.stack([np.bincount(inverse, normal[:, d], len(key)) for d in range(ndime)], axis=1)
+
+    # Cones from each point of the edge to the piece
+    cone_lo = np.einsum("nd,nd->n", normal, center - zone.coords[lo]) / ndime
+    cone_hi = -np.einsum("nd,nd->n", normal, center - zone.coords[hi]) / ndime
+    volumes = np.bincount(lo, cone_lo, npoin) + np.bincount(hi, cone_hi, npoin)
+
+    vertices, vertex_normals = {}, {}
+    markers = [m for m in zone.markers if np.any(ELEM_DIMS[m.elem_types] == ndime - 1)]
+    if markers:
+        faces = []
+        for m in markers:
+            f = np.full((m.nelem, FACE_WIDTH), -1, dtype=np.int64)
+            nnode = np.diff(m.elem_offsets)
+            f[np.arange(FACE_WIDTH) < nnode[:, None]] = m.elem_conn
+            faces.append(f)
+        owners = np.split(_face_owners(zone, np.concatenate(faces)), np.cumsum([m.nelem for m in markers])[:-1])
+        centroids = _centroids(zone)
+        for m, owner in zip(markers, owners):
+            v, n = _vertex_normals(zone, m, owner, centroids)
+            if m.tag in vertices:
+                # Markers that share a tag are merged
+                v, n = np.concatenate([vertices[m.tag], v]), np.concatenate([vertex_normals[m.tag], n])
+                v, inverse = np.unique(v, return_inverse=True)
+                n = np.stack([np.bincount(inverse, n[:, d], len(v)) for d in range(ndime)], axis=1)
+            vertices[m.tag], vertex_normals[m.tag] = v, n
+    return DualZone(edges, normals, volumes, vertices, vertex_normals)
+
+
+def closure(dual):
+    """
+    Sum of the outward normals of every control volume (zero for a closed dual mesh whose
+    boundary is entirely covered by markers).
+
+    Returns
+    -------
+    residual : ndarray
+        (npoin, ndime) sum of the normals around each point.
+    """
+    residual = np.zeros((dual.npoin, dual.ndime))
+    for d in range(dual.ndime):
+        residual[:, d] = np.bincount(dual.edges[:, 0], dual.normals[:, d], dual.npoin)
+        residual[:, d] -= np.bincount(dual.edges[:, 1], dual.normals[:, d], dual.npoin)
+    for tag, vertices in dual.vertices.items():
+        residual[vertices] += dual.vertex_normals[tag]
+    return residual
+
+
+def green_gauss(dual, values):
+    """
+    Green-Gauss gradient of point values, with the arithmetic mean on each dual face and the
+    point value on the marker faces.
+
+    Parameters
+    ----------
+    dual : DualZone
+    values : ndarray
+        (npoin,) or (npoin, nvar) point values.
+
+    Returns
+    -------
+    gradient : ndarray
+        (npoin, ndime) or (npoin, nvar, ndime) gradient at each point.
+    """
+    u = np.asarray(values, dtype=np.float64).reshape(dual.npoin, -1)
+    a, b = dual.edges[:, 0], dual.edges[:, 1]
+    flux = 0.5 * (u[a] + u[b])[:, :, None] * dual.normals[:, None, :]
+    gradient = np.zeros((dual.npoin,) + flux.shape[1:])
+    np.add.at(gradient, a, flux)
+    np.subtract.at(gradient, b, flux)
+    for tag, vertices in dual.vertices.items():
+        gradient[vertices] += u[vertices][:, :, None] * dual.vertex_normals[tag][:, None, :]
+    gradient /= np.where(dual.volumes > 0, dual.volumes, 1.0)[:, None, None]
+    return gradient[:, 0] if np.ndim(values) == 1 else gradient
+
+
+def dual_path(path):
+    return path + DUAL_SUFFIX
+
+
+def save_dual(path, duals, filename=None):
+    """Write the dual data of the zones of ``path`` to its dual file."""
+    arrays = {}
+    markers = []
+    for i, dual in enumerate(duals):
+        arrays[f"z{i}/edges"] = dual.edges
+        arrays[f"z{i}/normals"] = dual.normals
+        arrays[f"z{i}/volumes"] = dual.volumes
+        markers.append(list(dual.vertices))
+        for j, tag in enumerate(dual.vertices):
+            arrays[f"z{i}/m{j}/vertices"] = dual.vertices[tag]
+            arrays[f"z{i}/m{j}/normals"] = dual.vertex_normals[tag]
+    meta = {"kind": "dual", "version": DUAL_VERSION, **file_stamp(path), "markers": markers}
+    save_bundle(filename or dual_path(path), arrays, meta)
+
+
+def read_dual(path, filename=None):
+    """
+    Memory-map the cached dual data of ``path``, or return None if it is missing or stale.
+
+    Returns
+    -------
+    duals : list of DualZone
+        One per zone; the arrays are copy-on-write views of the file.
+    """
+    filename = filename or dual_path(path)
+    if read_sidecar_meta(filename, "dual", DUAL_VERSION, path) is None:
+        return None
+    arrays, meta = load_bundle(filename)
+    duals = []
+    for i, tags in enumerate(meta["markers"]):
+        vertices = {tag: arrays[f"z{i}/m{j}/vertices"] for j, tag in enumerate(tags)}
+        vertex_normals = {tag: arrays[f"z{i}/m{j}/normals"] for j, tag in enumerate(tags)}
+        dual = DualZone(arrays[f"z{i}/edges"], arrays[f"z{i}/normals"], arrays[f"z{i}/volumes"])
+        dual.vertices, dual.vertex_normals = vertices, vertex_normals
+        duals.append(dual)
+    return duals
+
+
+def mesh_dual(path, write=True):
+    """
+    Median-dual data of every zone of a mesh file, from its cache when it is up to date.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .su2 file.
+    write : bool
+        Write the dual file when it had to be computed. Errors while writing are ignored.
+
+    Returns
+    -------
+    duals : list of DualZone
+        One per zone.
+    cached : bool
+        True if the data was read from the cache.
+    """
+    duals = read_dual(path)
+    if duals is not None:
+        return duals, True
+    duals = [dual_zone(zone) for zone in read_mesh(path)]
+    if write:
+        save_quietly(save_dual, path, duals)
+    return duals, False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools dual", description="Median-dual edges, normals and volumes.")
+    parser.add_argument("paths", nargs="+", help=".su2 files")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the dual file")
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        start = time.perf_counter()
+        if args.no_cache:
+            duals, cached = [dual_zone(zone) for zone in read_mesh(path)], False
+        else:
+            duals, cached = mesh_dual(path)
+        elapsed = time.perf_counter() - start
+        for izone, dual in enumerate(duals, 1):
+            # Closure relative to the typical face area
+            scale = np.mean(dual.volumes) ** ((dual.ndime - 1) / dual.ndime) if dual.npoin else 1.0
+            residual = np.linalg.norm(closure(dual), axis=1).max(initial=0.0) / scale
+            print(
+                f"{path} zone {izone}: {dual.npoin} points, {dual.nedge} edges, {len(dual.vertices)} markers, "
+                f"volume {dual.volumes.sum():.6e}, min volume {dual.volumes.min(initial=np.inf):.4e}, "
+                f"closure {residual:.2e}{' (cached)' if cached else ''}"
+            )
+        print(f"  {elapsed:.2f} s")
@@ -0,0 +1,496 @@
+"""
+Compiler of Tecplot equation macros (``.eqn`` files of ``$!ALTERDATA`` commands) into NumPy
+evaluators, so that derived fields such as the velocity triangles and relative Mach number of
+``turbomachinery/centrifugal_blade/rotating_equation_tecplot.eqn`` are computed without Tecplot.
+
+Every ``EQUATION = '{W} = sqrt({Wx}*{Wx} + {Wy}*{Wy})'`` is parsed into an expression and the
+equations of a macro are merged into one DAG:
+
+- a variable assigned by an earlier equation stands for its expression, so the macro becomes a
+  single program over the columns of the data;
+- identical subexpressions are stored once (the operands of the commutative ``+``, ``*``,
+  ``min`` and ``max`` are sorted first), and operations on constants are folded.
+
+``Vn`` is the ``n``-th column of the data (1-based, without PointID) and ``{name}`` the column
+called ``name``, unless an earlier equation assigned it. The program is evaluated in one pass
+over the nodes, in chunks of rows if asked: only the columns it uses are read, which for
+memory-mapped columnar files (:class:`su2tools.columnar.ColumnFile`) keeps the memory bounded by
+the chunk size. The zone and value-location options of ``$!ALTERDATA`` are ignored: the
+equations apply to every row.
+"""
+# Standard Python modules
+import argparse
+import os
+import re
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .columnar import COLUMNS_SUFFIX, ColumnFile
+from .solution import Solution, read_solution, write_solution
+from .tecplot import read_tecplot
+
+BINARY = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide, "**": np.power}
+
+# Tecplot functions, case insensitive
+FUNCTIONS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "alog": np.log,
+    "log10": np.log10,
+    "alog10": np.log10,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "atan2": np.arctan2,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+    "min": np.minimum,
+    "max": np.maximum,
+    "sign": np.sign,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "round": np.rint,
+    "trunc": np.trunc,
+}
+CONSTANTS = {"pi": np.pi}
+COMMUTATIVE = {"+", "*", "min", "max"}
+UFUNCS = dict(BINARY, neg=np.negative, **FUNCTIONS)
+
+# Rows evaluated at once by default
+CHUNK_SIZE = 65536
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eEdD][+-]?\d+)?)|(?P<braced>\{[^}]*\})"
+    r"|(?P<name>[A-Za-z_]\w*)|(?P<op>\*\*|[-+*/(),=]))"
+)
+_COLUMN = re.compile(r"^[vV](\d+)$")
+_ALTERDATA = re.compile(r"^[ \t]*\$!ALTERDATA\b(.*?)(?=^[ \t]*\$!|\Z)", re.M | re.S | re.I)
+_EQUATION = re.compile(r"\bEQUATION\s*=\s*(?:'([^']*)'|\"([^\"]*)\")", re.I)
+
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise ValueError(f"unexpected {text[position:].strip()[:10]!r} in equation {text!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _variable(kind, value):
+    """Variable key of a ``Vn`` or ``{name}`` token: the column number or the name."""
+    if kind == "braced":
+        return value[1:-1].strip()
+    column = _COLUMN.match(value)
+    if column and int(column.group(1)) > 0:
+        return int(column.group(1))
+    return None
+
+
+class _Parser:
+    """Recursive-descent parser of one equation, emitting the nodes into a :class:`Program`."""
+
+    def __init__(self, program, text):
+        self.program = program
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def error(self, message):
+        return ValueError(f"{message} in equation {self.text.strip()!r}")
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, op):
+        kind, value = self.next()
+        if kind != "op" or value != op:
+            raise self.error(f"expected {op!r}, got {value!r}" if value else f"expected {op!r}")
+
+    def assignment(self):
+        kind, value = self.next()
+        target = _variable(kind, value) if kind in ("braced", "name") else None
+        if target is None:
+            raise self.error("expected a variable to assign")
+        self.expect("=")
+        node = self.expression()
+        if self.position != len(self.tokens):
+            raise self.error(f"unexpected {self.peek()[1]!r}")
+        return target, node
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in (("op", "+"), ("op", "-")):
+            node = self.program._node(self.next()[1], node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in (("op", "*"), ("op", "/")):
+            node = self.program._node(self.next()[1], node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == ("op", "-"):
+            self.next()
+            return self.program._node("neg", self.unary())
+        if self.peek() == ("op", "+"):
+            self.next()
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        node = self.atom()
+        if self.peek() == ("op", "**"):
+            self.next()
+            node = self.program._node("**", node, self.unary())
+        return node
+
+    def atom(self):
+        kind, value = self.next()
+        if kind == "number":
+            return self.program._constant(float(value.replace("d", "e").replace("D", "e")))
+        if kind == "op" and value == "(":
+            node = self.expression()
+            self.expect(")")
+            return node
+        if kind == "name" and value.lower() in FUNCTIONS:
+            function = value.lower()
+            self.expect("(")
+            args = [self.expression()]
+            while self.peek() == ("op", ","):
+                self.next()
+                args.append(self.expression())
+            self.expect(")")
+            if len(args) != FUNCTIONS[function].nin:
+                raise self.error(f"{value} takes {FUNCTIONS[function].nin} arguments, got {len(args)}")
+            return self.program._node(function, *args)
+        if kind == "name" and value.lower() in CONSTANTS:
+            return self.program._constant(CONSTANTS[value.lower()])
+        key = _variable(kind, value) if kind in ("braced", "name") else None
+        if key is None:
+            raise self.error(f"unexpected {value!r}" if value else "unexpected end")
+        return self.program._variable(key)
+
+
+class Program:
+    """
+    Equations compiled into a DAG of NumPy operations.
+
+    Nodes are numbered in evaluation order; each is ``("const", value)``, ``("input", key)``
+    (a column of the data, by 1-based number or name) or ``(op, arg, ...)`` with ``op`` a key of
+    :data:`BINARY` or :data:`FUNCTIONS`, or ``"neg"``.
+
+    Attributes
+    ----------
+    nodes : list of tuple
+    outputs : dict
+        Node of every assigned variable, in assignment order.
+    equations : list of str
+    expression_size : int
+        Number of operations of the equations written out as trees, without sharing.
+    """
+
+    def __init__(self, equations=()):
+        self.nodes = []
+        self.outputs = {}
+        self.equations = []
+        self.expression_size = 0
+        self._index = {}
+        self._sizes = []
+        for equation in equations:
+            self.add(equation)
+
+    def __repr__(self):
+        return f"Program(outputs={list(self.outputs)}, nodes={len(self.nodes)})"
+
+    def _intern(self, node, size):
+        if node not in self._index:
+            self._index[node] = len(self.nodes)
+            self.nodes.append(node)
+            self._sizes.append(size)
+        return self._index[node]
+
+    def _constant(self, value):
+        return self._intern(("const", float(value)), 0)
+
+    def _variable(self, key):
+        if key in self.outputs:
+            return self.outputs[key]
+        return self._intern(("input", key), 0)
+
+    def _node(self, op, *args):
+        if op in COMMUTATIVE:
+            args = tuple(sorted(args))
+        size = 1 + sum(self._sizes[arg] for arg in args)
+        if all(self.nodes[arg][0] == "const" for arg in args):
+            with np.errstate(all="ignore"):
+                return self._constant(UFUNCS[op](*(np.float64(self.nodes[arg][1]) for arg in args)))
+        return self._intern((op,) + tuple(args), size)
+
+    def add(self, equation):
+        """Compile one equation, ``{name} = expression`` or ``Vn = expression``."""
+        target, node = _Parser(self, equation).assignment()
+        self.expression_size += self._sizes[node]
+        self.outputs.pop(target, None)
+        self.outputs[target] = node
+        self.equations.append(equation.strip())
+
+    @property
+    def inputs(self):
+        """Keys of the data columns used by the outputs."""
+        return [self.nodes[i][1] for i in self._live() if self.nodes[i][0] == "input"]
+
+    @property
+    def operations(self):
+        """Number of operations evaluated per row, after sharing the common subexpressions."""
+        return sum(1 for i in self._live() if self.nodes[i][0] not in ("const", "input"))
+
+    def _live(self):
+        """Nodes the outputs depend on, in evaluation order."""
+        live = set(self.outputs.values())
+        for i in range(len(self.nodes) - 1, -1, -1):
+            if i in live and self.nodes[i][0] not in ("const", "input"):
+                live.update(self.nodes[i][1:])
+        return sorted(live)
+
+    def describe(self):
+        """The program as one line per operation, ``t12 = sqrt(t11)``."""
+
+        def operand(i):
+            kind, value = self.nodes[i][:2]
+            if kind == "const":
+                return repr(value)
+            if kind == "input":
+                return f"V{value}" if isinstance(value, int) else f"{{{value}}}"
+            return f"t{i}"
+
+        lines = []
+        for i in self._live():
+            op, args = self.nodes[i][0], self.nodes[i][1:]
+            if op in ("const", "input"):
+                continue
+            if op in BINARY:
+                expression = f"{operand(args[0])} {op} {operand(args[1])}"
+            elif op == "neg":
+                expression = f"-{operand(args[0])}"
+            else:
+                expression = f"{op}({', '.join(operand(arg) for arg in args)})"
+            lines.append(f"t{i} = {expression}")
+        for key, i in self.outputs.items():
+            lines.append(f"{'V%d' % key if isinstance(key, int) else '{%s}' % key} = {operand(i)}")
+        return "\n".join(lines)
+
+    def evaluate(self, data, names=None, chunk_size=None):
+        """
+        Evaluate the outputs over the rows of ``data``.
+
+        Parameters
+        ----------
+        data : ndarray, Solution, TecplotData or ColumnFile
+            (npoint, ncolumn) values, or an object with ``names`` (or ``variables``) and
+            ``values``, or a :class:`~su2tools.columnar.ColumnFile`, of which only the columns
+            used are read.
+        names : list of str, optional
+            Column names of an array, for the ``{name}`` inputs.
+        chunk_size : int, optional
+            Rows evaluated at once (default: :data:`CHUNK_SIZE`).
+
+        Returns
+        -------
+        outputs : dict
+            Values of every assigned variable, keyed by name (or 1-based column number).
+        """
+        npoint, columns = _columns(data, names)
+        inputs = {}
+        for key in self.inputs:
+            if key not in columns:
+                raise KeyError(f"no column {'V%d' % key if isinstance(key, int) else repr(key)} in the data")
+            inputs[key] = columns[key]()
+        order = self._live()
+        last_use = {}
+        for i in order:
+            if self.nodes[i][0] not in ("const", "input"):
+                for arg in self.nodes[i][1:]:
+                    last_use[arg] = i
+        results = {key: np.empty(npoint) for key in self.outputs}
+        readers = {}
+        for key, i in self.outputs.items():
+            readers.setdefault(i, []).append(key)
+
+        chunk_size = chunk_size or CHUNK_SIZE
+        with np.errstate(all="ignore"):
+            for start in range(0, npoint, chunk_size):
+                stop = min(start + chunk_size, npoint)
+                values = {}
+                free = []
+                for i in order:
+                    op, args = self.nodes[i][0], self.nodes[i][1:]
+                    if op == "const":
+                        values[i] = args[0]
+                    elif op == "input":
+                        values[i] = inputs[args[0]][start:stop]
+                    else:
+                        out = free.pop() if free else np.empty(stop - start)
+                        values[i] = UFUNCS[op](*(values[arg] for arg in args), out=out)
+                        # Buffers of the operands not used further are reused
+                        for arg in set(args):
+                            if last_use.get(arg) == i and self.nodes[arg][0] not in ("const", "input"):
+                                free.append(values.pop(arg))
+                    for key in readers.get(i, ()):
+                        results[key][start:stop] = values[i]
+        return results
+
+    def apply(self, data, names=None, chunk_size=None):
+        """
+        Evaluate the outputs and return the data as a :class:`~su2tools.solution.Solution` with
+        them, as Tecplot would: new variables are appended, assigned ones replaced.
+        """
+        return with_outputs(data, self.evaluate(data, names, chunk_size), names)
+
+
+def with_outputs(data, results, names=None):
+    """The data with the results of :meth:`Program.evaluate`, as a :class:`~su2tools.solution.Solution`."""
+    names = _names(data, names)
+    if isinstance(data, np.ndarray):
+        values = np.array(data, dtype=float)
+    elif hasattr(data, "values"):
+        values = np.array(data.values, dtype=float)
+    else:
+        values = data.solution().values
+    new = {}
+    for key, result in results.items():
+        column = key - 1 if isinstance(key, int) else names.index(key) if key in names else None
+        if column is not None and column < values.shape[1]:
+            values[:, column] = result
+        else:
+            new[f"V{key}" if isinstance(key, int) else key] = result
+    if new:
+        values = np.column_stack([values] + list(new.values()))
+    return Solution(names + list(new), values, getattr(data, "footer", None))
+
+
+def _names(data, names=None):
+    if names is not None:
+        return list(names)
+    if isinstance(data, np.ndarray):
+        return []
+    return list(getattr(data, "variables", None) or data.names)
+
+
+def _columns(data, names=None):
+    """Number of rows and {key: function returning the column} of the data."""
+    names = _names(data, names)
+    if hasattr(data, "column") and hasattr(data, "npoint"):
+        # Columnar file: columns are read when asked for
+        npoint = data.npoint
+        getters = [lambda name=name: data.column(name) for name in names]
+    else:
+        values = data if isinstance(data, np.ndarray) else data.values
+        if values.ndim != 2:
+            raise ValueError(f"expected (npoint, ncolumn) values, got shape {values.shape}")
+        npoint = len(values)
+        getters = [lambda j=j: values[:, j] for j in range(values.shape[1])]
+        if names and len(names) != values.shape[1]:
+            raise ValueError(f"{len(names)} names for {values.shape[1]} columns")
+    columns = {j + 1: getter for j, getter in enumerate(getters)}
+    columns.update((name, getter) for name, getter in zip(names, getters))
+    return npoint, columns
+
+
+def read_macro(path):
+    """Equations of the ``$!ALTERDATA`` commands of a Tecplot macro file, in order."""
+    with open(path) as f:
+        text = f.read()
+    equations = []
+    for command in _ALTERDATA.finditer(text):
+        match = _EQUATION.search(command.group(1))
+        if not match:
+            raise ValueError(f"{path}: $!ALTERDATA without EQUATION")
+        equations.append(match.group(1) if match.group(1) is not None else match.group(2))
+    if not equations:
+        raise ValueError(f"{path}: no $!ALTERDATA equation")
+    return equations
+
+
+def compile_macro(path):
+    """Compile a Tecplot macro file into a :class:`Program`."""
+    try:
+        return Program(read_macro(path))
+    except ValueError as e:
+        if str(e).startswith(path):
+            raise
+        raise ValueError(f"{path}: {e}") from None
+
+
+def load_data(path):
+    """Data of a solution file: text, columnar (read lazily) or Tecplot."""
+    if path.endswith(COLUMNS_SUFFIX):
+        return ColumnFile(path)
+    if path.endswith(".plt"):
+        return read_tecplot(path)
+    return read_solution(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="su2tools eqn", description="Evaluate the equations of a Tecplot macro over solution files."
+    )
+    parser.add_argument("macro", help="Tecplot macro (.eqn) with $!ALTERDATA equations")
+    parser.add_argument("paths", nargs="*", help="solution files: .dat, .su2col or Tecplot .plt")
+    parser.add_argument("--chunk-size", type=int, help=f"rows evaluated at once (default: {CHUNK_SIZE})")
+    parser.add_argument("--show", action="store_true", help="print the compiled program")
+    parser.add_argument("--out", help="write every file with the derived columns to this directory")
+    args = parser.parse_args(argv)
+
+    try:
+        program = compile_macro(args.macro)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    inputs = ", ".join(f"V{key}" if isinstance(key, int) else f"{{{key}}}" for key in program.inputs)
+    print(
+        f"{args.macro}: {len(program.equations)} equations, {program.expression_size} operations as trees, "
+        f"{program.operations} after sharing; inputs {inputs}"
+    )
+    if args.show:
+        print(program.describe())
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    for path in args.paths:
+        try:
+            data = load_data(path)
+            start = time.perf_counter()
+            results = program.evaluate(data, chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - start
+        except (KeyError, ValueError) as e:
+            parser.error(f"{path}: {str(e).strip(chr(39))}")
+        npoint = len(next(iter(results.values())))
+        print(f"{path}: {npoint} points in {elapsed * 1e3:.2f} ms")
+        for key, values in results.items():
+            print(f"  {key!s:<16s} min {np.nanmin(values):>12.5e} max {np.nanmax(values):>12.5e}")
+        if args.out:
+            solution = with_outputs(data, results)
+            output = os.path.join(args.out, os.path.splitext(os.path.basename(path))[0] + ".dat")
+            write_solution(output, solution)
+            print(f"  -> {output}")
+    return 0
@@ -0,0 +1,298 @@
+"""
+Batched free-form deformation (FFD) of the points embedded in FFD boxes.
+
+A box is a lattice of control points ``P[i, j, k]`` of degrees ``(l, m, n)``; a point with
+parametric coordinates ``(u, v, w)`` sits at
+
+    x(u, v, w) = sum_ijk B_i^l(u) B_j^m(v) B_k^n(w) P[i, j, k]
+
+with Bernstein polynomials ``B``. The parametric coordinates of the embedded points are found
+once: those of the surface points are read from FFD_SURFACE_POINTS, and those of the volume
+points inside the box are found by Newton iterations on the map above. The Bernstein products
+then form a dense (npoint, ncontrol) matrix, and any number of control point displacement sets
+are applied with a single matrix product.
+
+2D boxes are stored by SU2 as 3D boxes of degree 1 in the third direction, with control points
+at z = -0.5 and 0.5; 2D points are embedded at z = 0.
+"""
+# Standard Python modules
+import argparse
+import math
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .reader import read_mesh
+
+# Convergence tolerance of the parametric inversion, relative to the box size
+NEWTON_TOLERANCE = 1e-12
+NEWTON_ITERATIONS = 30
+
+
+def bernstein(degree, t):
+    """(len(t), degree + 1) values of the Bernstein polynomials of ``degree`` at ``t``."""
+    t = np.asarray(t, dtype=np.float64)[:, None]
+    i = np.arange(degree + 1)
+    binom = np.array([math.comb(degree, k) for k in i], dtype=np.float64)
+    return binom * t**i * (1 - t) ** (degree - i)
+
+
+def bernstein_derivative(degree, t):
+    """Derivatives with respect to ``t`` of the Bernstein polynomials of ``degree``."""
+    t = np.asarray(t, dtype=np.float64)
+    if degree == 0:
+        return np.zeros((len(t), 1))
+    lower = np.zeros((len(t), degree + 2))
+    lower[:, 1:-1] = bernstein(degree - 1, t)
+    return degree * (lower[:, :-1] - lower[:, 1:])
+
+
+def lattice(box):
+    """Control points of ``box`` as a (nu, nv, nw, 3) array indexed by (i, j, k)."""
+    shape = tuple(box.control_indices.max(axis=0) + 1)
+    points = np.zeros(shape + (3,))
+    points[tuple(box.control_indices.T)] = box.control_points
+    return points
+
+
+def basis_matrix(box, params):
+    """
+    Bernstein basis of ``box`` at the parametric coordinates ``params``.
+
+    Returns
+    -------
+    basis : ndarray
+        (npoint, ncontrol) matrix, with columns in the order of ``box.control_points``, so
+        that ``basis @ box.control_points`` are the physical coordinates.
+    """
+    nu, nv, nw = box.control_indices.max(axis=0) + 1
+    i, j, k = box.control_indices.T
+    bu = bernstein(nu - 1, params[:, 0])
+    bv = bernstein(nv - 1, params[:, 1])
+    bw = bernstein(nw - 1, params[:, 2])
+    return bu[:, i] * bv[:, j] * bw[:, k]
+
+
+def _evaluate(points, params):
+    """Physical coordinates and (npoint, 3, 3) Jacobian of the lattice ``points`` at ``params``."""
+    degrees = np.array(points.shape[:3]) - 1
+    b = [bernstein(n, params[:, d]) for d, n in enumerate(degrees)]
+    db = [bernstein_derivative(n, params[:, d]) for d, n in enumerate(degrees)]
+    x = np.einsum("pi,pj,pk,ijkd->pd", b[0], b[1], b[2], points)
+    jac = np.stack(
+        [
+            np.einsum("pi,pj,pk,ijkd->pd", db[0], b[1], b[2], points),
+            np.einsum("pi,pj,pk,ijkd->pd", b[0], db[1], b[2], points),
+            np.einsum("pi,pj,pk,ijkd->pd", b[0], b[1], db[2], points),
+        ],
+        axis=2,
+    )
+    return x, jac
+
+
+def parametric_coordinates(box, coords):
+    """
+    Parametric coordinates of points in ``box``, by Newton iterations from the box center.
+
+    Parameters
+    ----------
+    box : FFDBox
+    coords : ndarray
+        (n, 3) physical coordinates.
+
+    Returns
+    -------
+    params : ndarray
+        (n, 3) parametric coordinates.
+    converged : ndarray
+        Whether the iterations converged for each point.
+    """
+    points = lattice(box)
+    size = np.linalg.norm(np.ptp(box.control_points, axis=0))
+    params = np.full((len(coords), 3), 0.5)
+    active = np.arange(len(coords))
+    converged = np.zeros(len(coords), dtype=bool)
+    for _ in range(NEWTON_ITERATIONS):
+        if not len(active):
+            break
+        x, jac = _evaluate(points, params[active])
+        residual = x - coords[active]
+        done = np.linalg.norm(residual, axis=1) <= NEWTON_TOLERANCE * size
+        converged[active[done]] = True
+        active, residual, jac = active[~done], residual[~done], jac[~done]
+        if len(active):
+            params[active] -= np.linalg.solve(jac, residual[:, :, None])[:, :, 0]
+            # Keep diverging points from running away from the box
+            params[active] = np.clip(params[active], -1.0, 2.0)
+    return params, converged
+
+
+class EmbeddedPoints:
+    """
+    Points of a zone embedded in one FFD box, with their Bernstein basis.
+
+    Attributes
+    ----------
+    box : FFDBox
+    points : ndarray
+        Point indices in the zone.
+    params : ndarray
+        (npoint, 3) parametric coordinates.
+    is_surface : ndarray
+        Whether each point is an FFD surface point of the box.
+    basis : ndarray
+        (npoint, ncontrol) basis matrix (see :func:`basis_matrix`).
+    """
+
+    def __init__(self, box, points, params, is_surface):
+        self.box = box
+        self.points = points
+        self.params = params
+        self.is_surface = is_surface
+        self.basis = basis_matrix(box, params)
+
+    def __repr__(self):
+        return (
+            f"EmbeddedPoints({self.box.tag!r}, surface={int(self.is_surface.sum())}, "
+            f"volume={int((~self.is_surface).sum())})"
+        )
+
+
+def embed(zone, box, volume=True, eps=1e-9):
+    """
+    Find the points of ``zone`` embedded in ``box`` and their parametric coordinates.
+
+    Surface points keep the parametric coordinates stored in the mesh. With ``volume``, every
+    other point whose parametric coordinates lie in ``[0, 1]^3`` (within ``eps``) is added.
+    """
+    ndime = zone.ndime
+    surface = np.unique(box.surface_points, return_index=True)
+    points = [surface[0]]
+    params = [box.surface_params[surface[1]]]
+    if volume and zone.npoin:
+        lo = box.control_points[:, :ndime].min(axis=0)
+        hi = box.control_points[:, :ndime].max(axis=0)
+        margin = eps * np.linalg.norm(hi - lo)
+        inside = np.all((zone.coords >= lo - margin) & (zone.coords <= hi + margin), axis=1)
+        inside[surface[0]] = False
+        candidates = np.flatnonzero(inside)
+        coords = np.zeros((len(candidates), 3))
+        coords[:, :ndime] = zone.coords[candidates]
+        uvw, converged = parametric_coordinates(box, coords)
+        keep = converged & np.all((uvw >= -eps) & (uvw <= 1 + eps), axis=1)
+        points.append(candidates[keep])
+        params.append(uvw[keep])
+    is_surface = np.zeros(sum(len(p) for p in points), dtype=bool)
+    is_surface[: len(points[0])] = True
+    return EmbeddedPoints(box, np.concatenate(points), np.concatenate(params), is_surface)
+
+
+class FFDEngine:
+    """
+    Precomputed FFD of a zone, for applying many control point displacement sets at once.
+
+    Parameters
+    ----------
+    zone : Zone
+        Zone with FFD boxes.
+    volume : bool
+        Also deform the volume points inside the boxes, not only the FFD surface points.
+
+    Attributes
+    ----------
+    embedded : dict
+        :class:`EmbeddedPoints` of each box, keyed by tag.
+    """
+
+    def __init__(self, zone, volume=True):
+        if not zone.ffd_boxes:
+            raise ValueError(f"zone {zone.izone} has no FFD boxes")
+        self.zone = zone
+        self.embedded = {box.tag: embed(zone, box, volume) for box in zone.ffd_boxes}
+
+    def __repr__(self):
+        return f"FFDEngine(zone {self.zone.izone}, boxes={list(self.embedded.values())})"
+
+    def displacements(self, control_displacements):
+        """
+        Point displacements for a batch of designs.
+
+        Parameters
+        ----------
+        control_displacements : dict
+            For each box tag, an (ndesign, ncontrol, 3) array of control point displacements,
+            with control points in the order of ``box.control_points``. Boxes that are left out
+            do not move.
+
+        Returns
+        -------
+        disp : ndarray
+            (ndesign, npoin, ndime) displacement of every point of the zone.
+        """
+        ndesign = len(next(iter(control_displacements.values())))
+        ndime = self.zone.ndime
+        disp = np.zeros((ndesign, self.zone.npoin, ndime))
+        for tag, delta in control_displacements.items():
+            emb = self.embedded[tag]
+            delta = np.asarray(delta, dtype=np.float64)
+            ncontrol = delta.shape[1]
+            # One matrix product for all designs: (npoint, ncontrol) @ (ncontrol, ndesign * 3)
+            moved = emb.basis @ delta.transpose(1, 0, 2).reshape(ncontrol, -1)
+            disp[:, emb.points] += moved.reshape(len(emb.points), ndesign, 3).transpose(1, 0, 2)[:, :, :ndime]
+        return disp
+
+    def deform(self, control_displacements):
+        """Deformed coordinates, (ndesign, npoin, ndime), of a batch of designs."""
+        return self.zone.coords + self.displacements(control_displacements)
+
+    def surface_error(self):
+        """Largest distance between the FFD surface points and their image through the boxes."""
+        error = 0.0
+        for emb in self.embedded.values():
+            x = emb.basis[emb.is_surface] @ emb.box.control_points
+            ndime = self.zone.ndime
+            diff = x[:, :ndime] - self.zone.coords[emb.points[emb.is_surface]]
+            error = max(error, float(np.abs(diff).max(initial=0.0)))
+        return error
+
+
+def random_designs(zone, ndesign, amplitude, seed=0):
+    """Random control point displacements of every box of ``zone``, scaled by the box size."""
+    rng = np.random.default_rng(seed)
+    designs = {}
+    for box in zone.ffd_boxes:
+        size = np.ptp(box.control_points[:, : zone.ndime], axis=0)
+        ncontrol = len(box.control_points)
+        delta = np.zeros((ndesign, ncontrol, 3))
+        delta[:, :, : zone.ndime] = amplitude * size * rng.uniform(-1, 1, (ndesign, ncontrol, zone.ndime))
+        designs[box.tag] = delta
+    return designs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools ffd", description="Batched FFD deformation of SU2 meshes.")
+    parser.add_argument("mesh", help=".su2 file with FFD boxes")
+    parser.add_argument("--designs", type=int, default=100, help="number of random designs (default: 100)")
+    parser.add_argument("--amplitude", type=float, default=0.01, help="displacement relative to the box size")
+    parser.add_argument("--surface-only", action="store_true", help="only deform the FFD surface points")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for zone in read_mesh(args.mesh):
+        if not zone.ffd_boxes:
+            continue
+        start = time.perf_counter()
+        engine = FFDEngine(zone, volume=not args.surface_only)
+        setup = time.perf_counter() - start
+        print(f"zone {zone.izone}: setup {setup * 1e3:.1f} ms, surface error {engine.surface_error():.2e}")
+        for emb in engine.embedded.values():
+            print(f"  {emb!r}, {len(emb.box.control_points)} control points")
+        designs = random_designs(zone, args.designs, args.amplitude, args.seed)
+        start = time.perf_counter()
+        coords = engine.deform(designs)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {args.designs} designs in {elapsed * 1e3:.1f} ms ({args.designs / elapsed:.0f} designs/s), "
+            f"largest displacement {np.abs(coords - zone.coords).max():.3e}"
+        )
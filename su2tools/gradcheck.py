@@ -0,0 +1,255 @@
+"""
+Validation of adjoint gradients against finite differences, for every case of the corpus.
+
+A case is a directory with adjoint gradient files, ``of_grad_<objective>.plt`` with a GRADIENT
+column (``of_grad_cd.plt``, ``of_grad_cl.plt``, ...), and finite-difference files,
+``of_grad_findiff.plt`` or ``of_grad_findiff_<step>.plt``, with one column per objective
+(DRAG, LIFT, ...). Both have one row per design variable. For every adjoint objective and
+finite-difference step, the report gives per design variable:
+
+- the relative error of the adjoint gradient, ``|adjoint - findiff| / |findiff|``, with the
+  denominator kept above :data:`ZERO_FRACTION` times the largest finite-difference gradient
+  so that variables with a vanishing gradient do not dominate;
+- whether the signs agree (variables where both gradients vanish agree).
+
+When a case has finite differences with several steps, the change between successive steps is
+also reported, with the step the adjoint gradient agrees best with: the finite differences
+are consistent if they barely change when the step is reduced.
+
+The cases are read and checked in a process pool.
+"""
+# Standard Python modules
+import argparse
+import concurrent.futures
+import json
+import os
+import posixpath
+import re
+
+# External modules
+import numpy as np
+
+# First party modules
+from .store import find_files
+from .tecplot import read_table
+
+# Finite-difference column of each adjoint objective
+OBJECTIVES = {
+    "cd": "DRAG",
+    "cl": "LIFT",
+    "csf": "SIDEFORCE",
+    "cmx": "MOMENT_X",
+    "cmy": "MOMENT_Y",
+    "cmz": "MOMENT_Z",
+    "cfx": "FORCE_X",
+    "cfy": "FORCE_Y",
+    "cfz": "FORCE_Z",
+    "eff": "EFFICIENCY",
+}
+
+ADJOINT_PATTERN = re.compile(r"^of_grad_([a-z]+)\.plt$")
+FINDIFF_PATTERN = re.compile(r"^of_grad_findiff(?:_(.+))?\.plt$")
+
+# Gradients smaller than this fraction of the largest one are taken as zero
+ZERO_FRACTION = 1e-3
+
+
+def discover(root, paths=None):
+    """
+    Group the gradient files under ``root`` by directory.
+
+    Returns
+    -------
+    cases : list of dict
+        ``case`` (directory relative to ``root``), ``adjoint`` ({objective: path}) and
+        ``findiff`` ({step label: path}) of every directory with both kinds of files; the
+        label is the file name suffix, e.g. "1E-3", or "" for ``of_grad_findiff.plt``.
+    """
+    paths = paths if paths is not None else find_files(root, ("of_grad_*.plt",))
+    cases = {}
+    for path in paths:
+        directory, name = posixpath.split(path.replace(os.sep, "/"))
+        case = cases.setdefault(directory, {"case": directory, "adjoint": {}, "findiff": {}})
+        findiff = FINDIFF_PATTERN.match(name)
+        adjoint = ADJOINT_PATTERN.match(name)
+        if findiff:
+            case["findiff"][findiff.group(1) or ""] = os.path.join(root, path)
+        elif adjoint and adjoint.group(1) in OBJECTIVES:
+            case["adjoint"][adjoint.group(1)] = os.path.join(root, path)
+    return [case for _, case in sorted(cases.items()) if case["adjoint"] and case["findiff"]]
+
+
+def _read_gradients(path):
+    """Design variable indices, {column: values} and the finite-difference step of a gradient file."""
+    names, values = read_table(path)
+    columns = {name: values[:, i] for i, name in enumerate(names)}
+    index = columns.pop(names[0]).astype(np.int64)
+    step = columns.pop("FINDIFF_STEP", None)
+    return index, columns, float(step[0]) if step is not None and len(step) else None
+
+
+def relative_error(adjoint, findiff):
+    """Per-variable relative error of ``adjoint`` against ``findiff``, see :data:`ZERO_FRACTION`."""
+    floor = ZERO_FRACTION * np.abs(findiff).max(initial=0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        error = np.abs(adjoint - findiff) / np.maximum(np.abs(findiff), floor)
+    return np.where(adjoint == findiff, 0.0, error)
+
+
+def sign_agreement(adjoint, findiff):
+    """Whether the signs of the gradients agree, for every variable."""
+    scale = max(np.abs(adjoint).max(initial=0.0), np.abs(findiff).max(initial=0.0))
+    vanishing = (np.abs(adjoint) <= ZERO_FRACTION * scale) & (np.abs(findiff) <= ZERO_FRACTION * scale)
+    return vanishing | (np.sign(adjoint) == np.sign(findiff))
+
+
+def _step_value(label, step):
+    if step is not None:
+        return step
+    try:
+        return float(label)
+    except ValueError:
+        return None
+
+
+def check_case(case):
+    """
+    Check the gradients of one case of :func:`discover`.
+
+    Returns
+    -------
+    result : dict
+        ``case``, ``pairs`` (one dict per adjoint objective and finite-difference file, with
+        per-variable ``rel_error`` and ``sign_agrees``), ``steps`` (per objective with several
+        finite-difference steps, the per-variable ``rel_change`` between successive steps) and
+        ``skipped`` (reasons for pairs that could not be compared).
+    """
+    result = {"case": case["case"], "pairs": [], "steps": [], "skipped": []}
+    findiff = {}
+    for label, path in sorted(case["findiff"].items()):
+        index, columns, step = _read_gradients(path)
+        findiff[label] = (path, index, columns, _step_value(label, step))
+    # Largest step first
+    labels = sorted(findiff, key=lambda label: -(findiff[label][3] or 0.0))
+
+    for objective, path in sorted(case["adjoint"].items()):
+        index, columns, _ = _read_gradients(path)
+        if "GRADIENT" not in columns:
+            result["skipped"].append(f"{path}: no GRADIENT column")
+            continue
+        adjoint = columns["GRADIENT"]
+        column = OBJECTIVES[objective]
+        by_step = {}
+        for label in labels:
+            fd_path, fd_index, fd_columns, step = findiff[label]
+            if column not in fd_columns:
+                result["skipped"].append(f"{fd_path}: no {column} column for {objective}")
+                continue
+            common, i, j = np.intersect1d(index, fd_index, return_indices=True)
+            if len(common) == 0:
+                result["skipped"].append(f"{path} and {fd_path} have no design variable in common")
+                continue
+            a, f = adjoint[i], fd_columns[column][j]
+            error = relative_error(a, f)
+            agrees = sign_agreement(a, f)
+            by_step[label] = (common, f, error)
+            result["pairs"].append(
+                {
+                    "objective": objective,
+                    "column": column,
+                    "adjoint": path,
+                    "findiff": fd_path,
+                    "step": step,
+                    "variables": common.tolist(),
+                    "unmatched": int(len(index) + len(fd_index) - 2 * len(common)),
+                    "rel_error": error.tolist(),
+                    "max_rel_error": float(error.max()),
+                    "median_rel_error": float(np.median(error)),
+                    "sign_agrees": agrees.tolist(),
+                    "sign_agreement": float(agrees.mean()),
+                }
+            )
+        if len(by_step) < 2:
+            continue
+        ordered = [label for label in labels if label in by_step]
+        changes = []
+        for coarse, fine in zip(ordered[:-1], ordered[1:]):
+            common, i, j = np.intersect1d(by_step[coarse][0], by_step[fine][0], return_indices=True)
+            change = relative_error(by_step[coarse][1][i], by_step[fine][1][j])
+            changes.append(
+                {
+                    "steps": [findiff[coarse][3], findiff[fine][3]],
+                    "variables": common.tolist(),
+                    "rel_change": change.tolist(),
+                    "max_rel_change": float(change.max()),
+                    "median_rel_change": float(np.median(change)),
+                }
+            )
+        best = min(ordered, key=lambda label: np.median(by_step[label][2]))
+        result["steps"].append({"objective": objective, "changes": changes, "best_step": findiff[best][3]})
+    return result
+
+
+def check_all(cases, workers=None):
+    """Check every case of :func:`discover` in a process pool."""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(check_case, cases))
+
+
+def _step(step):
+    return f"{step:g}" if step is not None else "?"
+
+
+def format_report(results, variables=False):
+    """Return the results of :func:`check_case` as text, with per-variable rows if ``variables``."""
+    lines = [
+        f"{'case':<40s} {'objective':<14s} {'step':>7s} {'nvar':>5s} {'max rel err':>12s} "
+        f"{'median':>10s} {'signs':>7s}"
+    ]
+    for result in results:
+        for pair in result["pairs"]:
+            lines.append(
+                f"{result['case']:<40s} {pair['objective'] + '/' + pair['column']:<14s} {_step(pair['step']):>7s} "
+                f"{len(pair['variables']):>5d} {pair['max_rel_error']:>12.3e} {pair['median_rel_error']:>10.3e} "
+                f"{pair['sign_agreement']:>7.1%}"
+            )
+            if variables:
+                for var, error, agrees in zip(pair["variables"], pair["rel_error"], pair["sign_agrees"]):
+                    lines.append(f"    {var:>5d} {error:>12.3e}{'' if agrees else '  sign differs'}")
+        for steps in result["steps"]:
+            for change in steps["changes"]:
+                coarse, fine = (_step(s) for s in change["steps"])
+                lines.append(
+                    f"{result['case']:<40s} {steps['objective']:<14s} step {coarse} -> {fine}: findiff change "
+                    f"max {change['max_rel_change']:.3e}, median {change['median_rel_change']:.3e}; "
+                    f"adjoint closest to step {_step(steps['best_step'])}"
+                )
+        for reason in result["skipped"]:
+            lines.append(f"{result['case']:<40s} skipped: {reason}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="su2tools gradcheck", description="Compare adjoint gradients with finite differences for every case."
+    )
+    parser.add_argument("root", nargs="?", default=".", help="directory to search (default: current directory)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("-o", "--output", help="write the report, with per-variable errors, to this file")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    cases = discover(args.root)
+    if not cases:
+        print(f"no adjoint and finite-difference gradient pairs under {args.root}")
+        return 1
+    results = check_all(cases, args.workers)
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(format_report(results, variables=True) + "\n")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+            f.write("\n")
+    return 0
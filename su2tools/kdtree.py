@@ -0,0 +1,154 @@
+"""
+Balanced k-d tree for nearest-neighbor queries on point clouds.
+
+The tree is implicit: points are reordered so that every node covers a contiguous range, and
+each level splits every node at its median along the widest axis of its bounding box. Queries
+are answered for all query points at once, one tree level at a time: a first descent to the
+closest leaf gives an upper bound on the distance of each query, then every (query, node) pair
+whose bounding box is closer than that bound is expanded down to the leaves.
+"""
+# External modules
+import numpy as np
+
+
+def _box_distance(x, lo, hi):
+    """Squared distance from points ``x`` to the boxes ``[lo, hi]`` (row by row)."""
+    d = np.maximum(np.maximum(lo - x, x - hi), 0.0)
+    return np.einsum("nd,nd->n", d, d)
+
+
+class KDTree:
+    """
+    k-d tree over a set of points.
+
+    Parameters
+    ----------
+    points : array_like
+        (n, dim) point coordinates.
+    leaf_size : int
+        Largest number of points in a leaf.
+
+    Attributes
+    ----------
+    points : ndarray
+        The points, in their original order.
+    perm : ndarray
+        Point indices in tree order; leaf ``i`` holds ``perm[leaf_bounds[i]:leaf_bounds[i + 1]]``.
+    depth : int
+        Number of levels below the root.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        n, dim = self.points.shape
+        leaf_size = max(int(leaf_size), 2)
+        self.depth = int(np.ceil(np.log2(n / leaf_size))) if n > leaf_size else 0
+        perm = np.arange(n)
+        bounds = np.array([0, n])
+        for _ in range(self.depth):
+            starts, ends = bounds[:-1], bounds[1:]
+            p = self.points[perm]
+            extent = np.maximum.reduceat(p, starts) - np.minimum.reduceat(p, starts)
+            node = np.repeat(np.arange(len(starts)), ends - starts)
+            key = p[np.arange(n), np.argmax(extent, axis=1)[node]]
+            perm = perm[np.lexsort((key, node))]
+            bounds = np.append(np.column_stack([starts, (starts + ends) // 2]).ravel(), n)
+        self.perm = perm
+        self.leaf_bounds = bounds
+
+        # Bounding boxes of the nodes of every level, from the leaves up
+        lo = np.full((len(bounds) - 1, dim), np.inf)
+        hi = np.full((len(bounds) - 1, dim), -np.inf)
+        if n:
+            p = self.points[perm]
+            lo = np.minimum.reduceat(p, bounds[:-1])
+            hi = np.maximum.reduceat(p, bounds[:-1])
+        self._lo = [lo]
+        self._hi = [hi]
+        for _ in range(self.depth):
+            self._lo.insert(0, np.minimum(self._lo[0][0::2], self._lo[0][1::2]))
+            self._hi.insert(0, np.maximum(self._hi[0][0::2], self._hi[0][1::2]))
+
+    def __len__(self):
+        return len(self.points)
+
+    def _candidates(self, queries, first, last, x):
+        """
+        Squared distances from ``x[queries]`` to every point of the leaves ``first`` to ``last``
+        (excluded), padded with inf.
+        """
+        start = self.leaf_bounds[first]
+        size = self.leaf_bounds[last] - start
+        width = int(size.max()) if len(size) else 0
+        slot = np.arange(width)
+        valid = slot < size[:, None]
+        index = self.perm[np.where(valid, start[:, None] + slot, start[:, None])]
+        diff = self.points[index] - x[queries, None, :]
+        dist = np.where(valid, np.einsum("nkd,nkd->nk", diff, diff), np.inf)
+        return dist, index
+
+    def query(self, x, k=1):
+        """
+        Find the ``k`` nearest points of every query point.
+
+        Parameters
+        ----------
+        x : array_like
+            (m, dim) query points.
+        k : int
+            Number of neighbors.
+
+        Returns
+        -------
+        dist : ndarray
+            Distances, shape (m,) for ``k == 1`` and (m, k) otherwise, sorted by increasing
+            distance; inf where the tree has fewer than ``k`` points.
+        index : ndarray
+            Indices of the neighbors into :attr:`points` (``len(self)`` where missing).
+        """
+        x = np.ascontiguousarray(x, dtype=np.float64).reshape(-1, self.points.shape[1])
+        m = len(x)
+        dist = np.full((m, k), np.inf)
+        index = np.full((m, k), len(self.points), dtype=np.int64)
+        if m and len(self.points):
+            queries = np.arange(m)
+            # Descend to the closest leaf to get an upper bound on the k-th distance
+            node = np.zeros(m, dtype=np.int64)
+            for level in range(1, self.depth + 1):
+                left, right = 2 * node, 2 * node + 1
+                d_left = _box_distance(x, self._lo[level][left], self._hi[level][left])
+                d_right = _box_distance(x, self._lo[level][right], self._hi[level][right])
+                node = np.where(d_right < d_left, right, left)
+            # Climb back until the subtree holds at least k points
+            up = 0
+            while up < self.depth and (int(np.diff(self.leaf_bounds).min()) << up) < k:
+                up += 1
+            node >>= up
+            d, _ = self._candidates(queries, node << up, (node + 1) << up, x)
+            bound = np.partition(d, k - 1, axis=1)[:, k - 1] if d.shape[1] >= k else np.full(m, np.inf)
+
+            # Expand every (query, node) pair whose box may hold a closer point
+            node = np.zeros(m, dtype=np.int64)
+            for level in range(1, self.depth + 1):
+                queries = np.repeat(queries, 2)
+                node = np.stack([2 * node, 2 * node + 1], axis=1).ravel()
+                keep = _box_distance(x[queries], self._lo[level][node], self._hi[level][node]) <= bound[queries]
+                queries, node = queries[keep], node[keep]
+            d, i = self._candidates(queries, node, node + 1, x)
+            if d.shape[1] > k:
+                # Only the k closest points of each leaf can be among the k nearest
+                best = np.argpartition(d, k - 1, axis=1)[:, :k]
+                d = np.take_along_axis(d, best, axis=1)
+                i = np.take_along_axis(i, best, axis=1)
+            q = np.repeat(queries, d.shape[1])
+            d, i = d.ravel(), i.ravel()
+            order = np.lexsort((d, q))
+            q, d, i = q[order], d[order], i[order]
+            first = np.searchsorted(q, q)
+            rank = np.arange(len(q)) - first
+            sel = rank < k
+            dist[q[sel], rank[sel]] = np.sqrt(d[sel])
+            index[q[sel], rank[sel]] = np.where(np.isfinite(d[sel]), i[sel], len(self.points))
+        if k == 1:
+            return dist[:, 0], index[:, 0]
+        return dist, index
@@ -0,0 +1,429 @@
+"""
+In-memory representation of SU2 native (.su2) meshes.
+
+Element connectivity is kept in compressed sparse row (CSR) form: ``elem_types`` holds the
+VTK type of each element, ``elem_offsets`` the start of each element in ``elem_conn`` and
+``elem_conn`` the flattened node indices. Nothing is stored per element as a Python object.
+
+For code that works on one element type at a time, :class:`ElementGroups` (``zone.groups``,
+``marker.groups``) holds the same elements grouped by type, as one (nelem, nnode) block per
+type in a single int32 array. When the elements of each type are already contiguous, as in
+most meshes, the blocks are views of ``elem_conn`` and nothing is copied.
+"""
+# External modules
+import numpy as np
+
+# VTK element identifiers used by the SU2 native format
+VERTEX = 1
+LINE = 3
+TRIANGLE = 5
+QUADRILATERAL = 9
+TETRAHEDRON = 10
+HEXAHEDRON = 12
+PRISM = 13
+PYRAMID = 14
+
+ELEM_NAMES = {
+    VERTEX: "vertex",
+    LINE: "line",
+    TRIANGLE: "triangle",
+    QUADRILATERAL: "quadrilateral",
+    TETRAHEDRON: "tetrahedron",
+    HEXAHEDRON: "hexahedron",
+    PRISM: "prism",
+    PYRAMID: "pyramid",
+}
+
+ELEM_TYPES = [VERTEX, LINE, TRIANGLE, QUADRILATERAL, TETRAHEDRON, HEXAHEDRON, PRISM, PYRAMID]
+
+# Number of nodes per element, indexed by VTK type. Unsupported types map to zero.
+NODES_PER_ELEM = np.zeros(16, dtype=np.int64)
+NODES_PER_ELEM[ELEM_TYPES] = [1, 2, 3, 4, 4, 8, 6, 5]
+
+# Topological dimension of each element type, indexed by VTK type. Unsupported types map to -1.
+ELEM_DIMS = np.full(16, -1, dtype=np.int64)
+ELEM_DIMS[ELEM_TYPES] = [0, 1, 2, 2, 3, 3, 3, 3]
+
+INDEX_DTYPE = np.int32
+
+
+class ElementGroups:
+    """
+    Elements of a CSR element set grouped by type.
+
+    Parameters
+    ----------
+    elem_types, elem_offsets, elem_conn : ndarray
+        CSR connectivity of the elements.
+
+    Attributes
+    ----------
+    types : ndarray
+        VTK types present, in the order of their groups.
+    starts : ndarray
+        Elements of type ``types[i]`` are ``order[starts[i]:starts[i + 1]]``, or the range
+        ``starts[i]:starts[i + 1]`` itself when ``order`` is None.
+    order : ndarray or None
+        Element indices sorted by type (stable within a type), or None when the elements of
+        each type are already contiguous.
+    conn : ndarray
+        Node indices of the elements in ``order``, as int32; a view of ``elem_conn`` when the
+        elements of each type are contiguous and ``elem_conn`` is int32.
+    """
+
+    __slots__ = ("types", "starts", "order", "conn", "_source", "_conn_starts")
+
+    def __init__(self, elem_types, elem_offsets, elem_conn):
+        self._source = (elem_types, elem_offsets, elem_conn)
+        nelem = len(elem_types)
+        # Runs of equal types; the elements are already grouped if no type has two runs
+        run = np.flatnonzero(np.r_[True, elem_types[1:] != elem_types[:-1]]) if nelem else np.zeros(0, dtype=np.int64)
+        run_types = elem_types[run].astype(np.int64)
+        if len(np.unique(run_types)) == len(run_types):
+            self.order = None
+            self.types = run_types
+            self.starts = np.append(run, nelem).astype(np.int64)
+            conn = elem_conn[elem_offsets[0] : elem_offsets[-1]]
+        else:
+            self.order = np.argsort(elem_types, kind="stable")
+            types = elem_types[self.order]
+            first = np.flatnonzero(np.r_[True, types[1:] != types[:-1]])
+            self.types = types[first].astype(np.int64)
+            self.starts = np.append(first, nelem).astype(np.int64)
+            nnode = np.diff(elem_offsets)[self.order]
+            start = np.repeat(elem_offsets[self.order] - np.cumsum(nnode) + nnode, nnode)
+            conn = elem_conn[start + np.arange(len(start))]
+        self.conn = np.asarray(conn, dtype=INDEX_DTYPE)
+        self._conn_starts = np.r_[0, np.cumsum(np.diff(self.starts) * NODES_PER_ELEM[self.types])]
+
+    def __repr__(self):
+        counts = {ELEM_NAMES.get(int(t), int(t)): int(n) for t, n in zip(self.types, np.diff(self.starts))}
+        return f"ElementGroups({counts})"
+
+    def __len__(self):
+        return len(self.types)
+
+    def __contains__(self, etype):
+        return etype in self.types
+
+    def _index(self, etype):
+        i = np.flatnonzero(self.types == etype)
+        if len(i) == 0:
+            raise KeyError(etype)
+        return i[0]
+
+    def __getitem__(self, etype):
+        """(nelem, nnode) node indices of the elements of type ``etype`` (a view)."""
+        i = self._index(etype)
+        return self.conn[self._conn_starts[i] : self._conn_starts[i + 1]].reshape(-1, NODES_PER_ELEM[etype])
+
+    def __iter__(self):
+        """Yield ``(etype, elements, nodes)`` for every type present."""
+        for etype in self.types:
+            yield int(etype), self.elements(etype), self[etype]
+
+    def elements(self, etype):
+        """Indices of the elements of type ``etype`` in the CSR arrays."""
+        i = self._index(etype)
+        if self.order is None:
+            return np.arange(self.starts[i], self.starts[i + 1])
+        return self.order[self.starts[i] : self.starts[i + 1]]
+
+    def is_current(self, elem_types, elem_offsets, elem_conn):
+        """Whether the groups were built from these arrays."""
+        return all(a is b for a, b in zip(self._source, (elem_types, elem_offsets, elem_conn)))
+
+    @property
+    def nbytes(self):
+        """Bytes held by the groups, not counting views of the CSR arrays."""
+        arrays = [self.types, self.starts, self._conn_starts]
+        if self.order is not None:
+            arrays.append(self.order)
+        if self.conn.base is None:
+            arrays.append(self.conn)
+        return sum(a.nbytes for a in arrays)
+
+
+class Marker:
+    """
+    A boundary marker (MARKER_TAG) with its boundary elements in CSR form.
+
+    Parameters
+    ----------
+    tag : str
+        The marker name.
+    elem_types, elem_offsets, elem_conn : ndarray
+        CSR connectivity of the boundary elements.
+    send_to : int, optional
+        The SEND_TO value of legacy SEND_RECEIVE markers.
+    transform : ndarray, optional
+        Periodic transformation index of each SEND_RECEIVE vertex.
+    """
+
+    __slots__ = ("tag", "elem_types", "elem_offsets", "elem_conn", "send_to", "transform", "_nodes", "_groups")
+
+    def __init__(self, tag, elem_types, elem_offsets, elem_conn, send_to=None, transform=None):
+        self.tag = tag
+        self.elem_types = elem_types
+        self.elem_offsets = elem_offsets
+        self.elem_conn = elem_conn
+        self.send_to = send_to
+        self.transform = transform
+        self._nodes = None
+        self._groups = None
+
+    def __repr__(self):
+        return f"Marker({self.tag!r}, nelem={self.nelem})"
+
+    @property
+    def nelem(self):
+        return len(self.elem_types)
+
+    @property
+    def nodes(self):
+        """Sorted, unique indices of the points on this marker."""
+        if self._nodes is None:
+            self._nodes = np.unique(self.elem_conn)
+        return self._nodes
+
+    @property
+    def groups(self):
+        """The boundary elements grouped by type (:class:`ElementGroups`)."""
+        if self._groups is None or not self._groups.is_current(self.elem_types, self.elem_offsets, self.elem_conn):
+            self._groups = ElementGroups(self.elem_types, self.elem_offsets, self.elem_conn)
+        return self._groups
+
+
+class PeriodicTransform:
+    """
+    One PERIODIC_INDEX entry: rotation center, rotation angles and translation.
+    """
+
+    __slots__ = ("index", "center", "angles", "translation")
+
+    def __init__(self, index, center, angles, translation):
+        self.index = index
+        self.center = np.asarray(center, dtype=np.float64)
+        self.angles = np.asarray(angles, dtype=np.float64)
+        self.translation = np.asarray(translation, dtype=np.float64)
+
+    def __repr__(self):
+        angles, translation = self.angles.tolist(), self.translation.tolist()
+        return f"PeriodicTransform({self.index}, angles={angles}, translation={translation})"
+
+    @property
+    def is_identity(self):
+        return not (self.angles.any() or self.translation.any())
+
+    @property
+    def matrix(self):
+        """Rotation matrix, as built by SU2: rotation about z, then y, then x (``Rz Ry Rx``)."""
+        (ct, cp, cs), (st, sp, ss) = np.cos(self.angles), np.sin(self.angles)
+        return np.array(
+            [
+                [cp * cs, st * sp * cs - ct * ss, ct * sp * cs + st * ss],
+                [cp * ss, st * sp * ss + ct * cs, ct * sp * ss - st * cs],
+                [-sp, st * cp, ct * cp],
+            ]
+        )
+
+    def apply(self, coords, inverse=False):
+        """
+        Map (n, 2) or (n, 3) coordinates through the transform (or its inverse).
+
+        The points are rotated about ``center`` and then translated.
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        ndim = coords.shape[1]
+        rot = self.matrix[:ndim, :ndim]
+        center = self.center[:ndim]
+        if inverse:
+            return (coords - center - self.translation[:ndim]) @ rot + center
+        return (coords - center) @ rot.T + center + self.translation[:ndim]
+
+
+class FFDBox:
+    """
+    A free-form deformation box as stored after the FFD_NBOX keyword.
+
+    Attributes
+    ----------
+    tag : str
+        FFD_TAG of the box.
+    level : int
+        FFD_LEVEL of the box.
+    degree : tuple of int
+        Polynomial degree in each parametric direction (FFD_DEGREE_I/J/K).
+    parents, children : list of str
+        Tags of the parent and child boxes.
+    corners : ndarray
+        (ncorner, ndime) corner point coordinates.
+    control_indices : ndarray
+        (ncontrol, 3) integer (i, j, k) index of each control point.
+    control_points : ndarray
+        (ncontrol, 3) control point coordinates.
+    surface_markers : ndarray
+        Marker tag of each embedded surface point.
+    surface_points : ndarray
+        Point index of each embedded surface point.
+    surface_params : ndarray
+        (nsurface, 3) parametric coordinates of each embedded surface point.
+    """
+
+    __slots__ = (
+        "tag",
+        "level",
+        "degree",
+        "parents",
+        "children",
+        "corners",
+        "control_indices",
+        "control_points",
+        "surface_markers",
+        "surface_points",
+        "surface_params",
+    )
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.level = 0
+        self.degree = ()
+        self.parents = []
+        self.children = []
+        self.corners = np.zeros((0, 3))
+        self.control_indices = np.zeros((0, 3), dtype=np.int64)
+        self.control_points = np.zeros((0, 3))
+        self.surface_markers = np.zeros(0, dtype=object)
+        self.surface_points = np.zeros(0, dtype=np.int64)
+        self.surface_params = np.zeros((0, 3))
+
+    def __repr__(self):
+        return f"FFDBox({self.tag!r}, degree={self.degree}, ncontrol={len(self.control_points)})"
+
+
+class Zone:
+    """
+    A single mesh zone: volume elements, points, markers, periodic transforms and FFD boxes.
+    """
+
+    __slots__ = (
+        "izone",
+        "ndime",
+        "elem_types",
+        "elem_offsets",
+        "elem_conn",
+        "coords",
+        "npoin_domain",
+        "markers",
+        "periodic",
+        "ffd_boxes",
+        "_groups",
+    )
+
+    def __init__(self, izone=1, ndime=0):
+        self.izone = izone
+        self.ndime = ndime
+        self.elem_types = np.zeros(0, dtype=np.uint8)
+        self.elem_offsets = np.zeros(1, dtype=np.int64)
+        self.elem_conn = np.zeros(0, dtype=INDEX_DTYPE)
+        self.coords = np.zeros((0, ndime))
+        self.npoin_domain = 0
+        self.markers = []
+        self.periodic = []
+        self.ffd_boxes = []
+        self._groups = None
+
+    def __repr__(self):
+        return (
+            f"Zone({self.izone}, ndime={self.ndime}, nelem={self.nelem}, npoin={self.npoin}, "
+            f"markers={[m.tag for m in self.markers]})"
+        )
+
+    @property
+    def nelem(self):
+        return len(self.elem_types)
+
+    @property
+    def npoin(self):
+        return len(self.coords)
+
+    @property
+    def is_empty(self):
+        return self.nelem == 0 and self.npoin == 0 and not self.markers
+
+    @property
+    def groups(self):
+        """The volume elements grouped by type (:class:`ElementGroups`)."""
+        if self._groups is None or not self._groups.is_current(self.elem_types, self.elem_offsets, self.elem_conn):
+            self._groups = ElementGroups(self.elem_types, self.elem_offsets, self.elem_conn)
+        return self._groups
+
+    def element(self, i):
+        """Node indices of element ``i`` (a view into ``elem_conn``)."""
+        return self.elem_conn[self.elem_offsets[i] : self.elem_offsets[i + 1]]
+
+    def elem_counts(self):
+        """Number of volume elements of each VTK type, as a dict."""
+        types, counts = np.unique(self.elem_types, return_counts=True)
+        return {int(t): int(c) for t, c in zip(types, counts)}
+
+    def marker(self, tag):
+        """Return the first marker named ``tag``."""
+        for m in self.markers:
+            if m.tag == tag:
+                return m
+        raise KeyError(tag)
+
+    def marker_nodes(self):
+        """
+        Point indices of every marker, keyed by tag.
+
+        Markers that share a tag (e.g. the two SEND_RECEIVE blocks) are merged.
+        """
+        nodes = {}
+        for m in self.markers:
+            if m.tag in nodes:
+                nodes[m.tag] = np.union1d(nodes[m.tag], m.nodes)
+            else:
+                nodes[m.tag] = m.nodes
+        return nodes
+
+
+class Mesh:
+    """
+    A (possibly multi-zone) SU2 mesh.
+
+    For single-zone meshes, zone attributes such as ``coords`` or ``markers`` can be
+    accessed directly on the mesh.
+    """
+
+    __slots__ = ("zones", "path")
+
+    def __init__(self, zones, path=None):
+        self.zones = zones
+        self.path = path
+
+    def __repr__(self):
+        return f"Mesh({self.path!r}, nzone={self.nzone})"
+
+    def __len__(self):
+        return len(self.zones)
+
+    def __iter__(self):
+        return iter(self.zones)
+
+    def __getitem__(self, i):
+        return self.zones[i]
+
+    def __getattr__(self, name):
+        # Only reached for names not found on the Mesh itself, including unset slots (while
+        # copying or unpickling), which must not be looked up again
+        if name in Mesh.__slots__ or name.startswith("_"):
+            raise AttributeError(name)
+        if len(self.zones) == 1:
+            return getattr(self.zones[0], name)
+        raise AttributeError(name)
+
+    @property
+    def nzone(self):
+        return len(self.zones)
@@ -0,0 +1,481 @@
+"""
+Offline partitioning of SU2 meshes into per-rank .su2 files.
+
+The element dual graph of each zone is split with multilevel recursive bisection: the graph
+is coarsened by heavy-edge matching, the coarsest graph is bisected by greedy growing, and
+the bisection is projected back level by level with boundary refinement. Each rank then gets
+its own mesh file holding the elements it owns plus ``halo`` layers of neighboring elements:
+
+- points owned by the rank come first (``NPOIN= total domain``), ghost points follow;
+- halo exchanges are described by SEND_RECEIVE markers of VERTEX elements, as in the legacy
+  partitioned SU2 format: ``SEND_TO= q + 1`` lists the owned points to send to rank ``q``,
+  ``SEND_TO= -(q + 1)`` the ghost points received from it, both in global point order;
+- a ``.map`` bundle (see :mod:`su2tools.cache`) maps local points and elements back to the
+  global numbering and to their owner rank.
+
+FFD boxes refer to global point indices and are not copied to the partitions. Meshes that
+already have SEND_RECEIVE markers or ghost points (periodic meshes in the legacy format, or
+partitions) are refused, since their pairs would be lost; the partitions only keep the identity
+PERIODIC_INDEX used by their exchange markers.
+"""
+# Standard Python modules
+import argparse
+import collections
+import heapq
+import json
+import os
+
+# External modules
+import numpy as np
+
+# First party modules
+from .cache import save_bundle
+from .mesh import INDEX_DTYPE, VERTEX, Marker, Zone
+from .reader import read_mesh
+from .topology import dual_graph, take_elements
+from .writer import write_mesh
+
+# Allowed ratio between the heaviest part and the average part
+IMBALANCE = 1.03
+# Coarsening stops below this number of graph vertices
+COARSEST = 80
+# Number of seeds tried for the initial bisection
+INITIAL_TRIES = 4
+REFINE_PASSES = 8
+# Number of moves without improvement after which a refinement pass stops
+FM_LOOKAHEAD = 64
+
+
+class _Graph:
+    """Weighted graph in CSR form."""
+
+    def __init__(self, xadj, adjncy, adjwgt=None, vwgt=None):
+        self.xadj = xadj
+        self.adjncy = adjncy
+        self.adjwgt = np.ones(len(adjncy), dtype=np.int64) if adjwgt is None else adjwgt
+        self.vwgt = np.ones(len(xadj) - 1, dtype=np.int64) if vwgt is None else vwgt
+        self.src = np.repeat(np.arange(self.n), np.diff(xadj))
+
+    @property
+    def n(self):
+        return len(self.xadj) - 1
+
+
+def _match(g, rng, rounds=3):
+    """
+    Heavy-edge matching by handshakes: every free vertex points to its heaviest free
+    neighbor, and mutual choices are matched.
+
+    Returns
+    -------
+    cmap : ndarray
+        Coarse vertex of each vertex.
+    """
+    n = g.n
+    match = np.full(n, -1, dtype=np.int64)
+    # Random tie breaking between edges of equal weight
+    noise = rng.random(len(g.adjncy))
+    has_edges = np.flatnonzero(np.diff(g.xadj) > 0)
+    for _ in range(rounds):
+        free = match < 0
+        score = np.where(free[g.src] & free[g.adjncy], g.adjwgt + noise, -1.0)
+        # Rows stay in CSR order, so the best edge of vertex v ends up at xadj[v]
+        first = np.lexsort((-score, g.src))[g.xadj[has_edges]]
+        valid = score[first] >= 0
+        best = np.full(n, -1, dtype=np.int64)
+        best[has_edges[valid]] = g.adjncy[first[valid]]
+        cand = np.flatnonzero(best >= 0)
+        mutual = cand[best[best[cand]] == cand]
+        if len(mutual) == 0:
+            break
+        match[mutual] = best[mutual]
+    vertices = np.arange(n)
+    match = np.where(match < 0, vertices, match)
+    return np.unique(np.minimum(vertices, match), return_inverse=True)[1].ravel()
+
+
+def _contract(g, cmap):
+    """Collapse matched vertices, summing vertex weights and the weights of parallel edges."""
+    nc = int(cmap.max()) + 1
+    cu = cmap[g.src]
+    cv = cmap[g.adjncy]
+    keep = cu != cv
+    keys, inverse = np.unique(cu[keep] * nc + cv[keep], return_inverse=True)
+    adjwgt = np.bincount(inverse.ravel(), weights=g.adjwgt[keep]).astype(np.int64)
+    xadj = np.zeros(nc + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // nc, minlength=nc), out=xadj[1:])
+    vwgt = np.bincount(cmap, weights=g.vwgt, minlength=nc).astype(np.int64)
+    return _Graph(xadj, keys % nc, adjwgt, vwgt)
+
+
+def _subgraph(g, vertices):
+    """The graph induced by the sorted ``vertices``."""
+    new = np.full(g.n, -1, dtype=np.int64)
+    new[vertices] = np.arange(len(vertices))
+    keep = (new[g.src] >= 0) & (new[g.adjncy] >= 0)
+    xadj = np.zeros(len(vertices) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(new[g.src[keep]], minlength=len(vertices)), out=xadj[1:])
+    return _Graph(xadj, new[g.adjncy[keep]], g.adjwgt[keep], g.vwgt[vertices])
+
+
+def _cut(g, part):
+    return int(g.adjwgt[part[g.src] != part[g.adjncy]].sum()) // 2
+
+
+def _refine(g, part, targets, tolerance, passes=REFINE_PASSES):
+    """
+    Fiduccia-Mattheyses refinement of a bisection, in place.
+
+    Each pass moves boundary vertices one at a time by decreasing gain (cut weight removed by
+    the move), locking every moved vertex, and accepts moves that temporarily worsen the cut.
+    The pass is then rolled back to its best state: the least overweight one, and among those
+    the one with the lowest cut.
+    """
+    xadj, adjncy, adjwgt, vwgt = g.xadj, g.adjncy, g.adjwgt, g.vwgt
+    limit = targets * tolerance
+    weight = np.array([vwgt[part == 0].sum(), vwgt[part == 1].sum()], dtype=np.float64)
+    for _ in range(passes):
+        same = part[g.src] == part[adjncy]
+        external = np.bincount(g.src, weights=adjwgt * ~same, minlength=g.n)
+        internal = np.bincount(g.src, weights=adjwgt * same, minlength=g.n)
+        gain = external - internal
+        candidates = np.flatnonzero(external > 0)
+        if np.any(weight > limit):
+            # An overweight side may have to give up vertices that are not on the boundary
+            candidates = np.union1d(candidates, np.flatnonzero(weight[part] > limit[part]))
+        heap = list(zip((-gain[candidates]).tolist(), candidates.tolist()))
+        heapq.heapify(heap)
+        locked = np.zeros(g.n, dtype=bool)
+        cut = float(external.sum()) / 2
+        best = (float(np.maximum(weight - limit, 0).sum()), cut)
+        start = best
+        moves = []
+        best_moves = 0
+        while heap and len(moves) - best_moves < FM_LOOKAHEAD:
+            negative_gain, v = heapq.heappop(heap)
+            if locked[v] or -negative_gain != gain[v]:
+                continue  # stale heap entry
+            s = part[v]
+            t = 1 - s
+            if weight[t] + vwgt[v] > limit[t] and weight[s] <= limit[s]:
+                continue
+            part[v] = t
+            weight[s] -= vwgt[v]
+            weight[t] += vwgt[v]
+            cut -= gain[v]
+            gain[v] = -gain[v]
+            locked[v] = True
+            moves.append(v)
+            for u, w in zip(adjncy[xadj[v] : xadj[v + 1]].tolist(), adjwgt[xadj[v] : xadj[v + 1]].tolist()):
+                gain[u] += 2 * w if part[u] == s else -2 * w
+                if not locked[u]:
+                    heapq.heappush(heap, (-gain[u], u))
+            state = (float(np.maximum(weight - limit, 0).sum()), cut)
+            if state < best:
+                best = state
+                best_moves = len(moves)
+        for v in moves[best_moves:]:
+            t = 1 - part[v]
+            weight[part[v]] -= vwgt[v]
+            weight[t] += vwgt[v]
+            part[v] = t
+        if best >= start:
+            break
+    return part
+
+
+def _grow(g, seed, target):
+    """Breadth-first growth of side 0 from ``seed`` until it reaches ``target`` weight."""
+    part = np.ones(g.n, dtype=np.int8)
+    weight = 0
+    queue = collections.deque([seed])
+    visited = np.zeros(g.n, dtype=bool)
+    visited[seed] = True
+    unvisited = iter(range(g.n))
+    while weight < target:
+        if not queue:
+            # Disconnected graph: continue from any vertex not reached yet
+            v = next((u for u in unvisited if not visited[u]), None)
+            if v is None:
+                break
+            visited[v] = True
+            queue.append(v)
+        v = queue.popleft()
+        part[v] = 0
+        weight += g.vwgt[v]
+        for u in g.adjncy[g.xadj[v] : g.xadj[v + 1]].tolist():
+            if not visited[u]:
+                visited[u] = True
+                queue.append(u)
+    return part
+
+
+def _initial_bisection(g, targets, tolerance, rng):
+    best = None
+    seeds = rng.choice(g.n, size=min(INITIAL_TRIES, g.n), replace=False)
+    for seed in seeds.tolist():
+        part = _refine(g, _grow(g, seed, targets[0]), targets, tolerance)
+        weight = np.array([g.vwgt[part == 0].sum(), g.vwgt[part == 1].sum()])
+        key = (bool(np.any(weight > targets * tolerance)), _cut(g, part))
+        if best is None or key < best[0]:
+            best = (key, part)
+    return best[1]
+
+
+def _bisect(g, fraction, tolerance, rng):
+    """
+    Multilevel bisection of ``g`` with ``fraction`` of the vertex weight on side 0.
+
+    Returns
+    -------
+    part : ndarray
+        0 or 1 for every vertex.
+    """
+    total = g.vwgt.sum()
+    targets = np.array([fraction * total, (1 - fraction) * total])
+    graphs = [g]
+    cmaps = []
+    while graphs[-1].n > COARSEST:
+        cmap = _match(graphs[-1], rng)
+        if cmap.max() + 1 > 0.95 * graphs[-1].n:
+            # Matching no longer shrinks the graph (e.g. few edges left)
+            break
+        cmaps.append(cmap)
+        graphs.append(_contract(graphs[-1], cmap))
+    part = _initial_bisection(graphs[-1], targets, tolerance, rng)
+    for cmap, fine in zip(reversed(cmaps), reversed(graphs[:-1])):
+        part = _refine(fine, part[cmap], targets, tolerance)
+    return part
+
+
+def partition_graph(xadj, adjncy, nparts, vwgt=None, seed=0):
+    """
+    Split a graph into ``nparts`` parts by recursive multilevel bisection.
+
+    Parameters
+    ----------
+    xadj, adjncy : ndarray
+        CSR adjacency of the graph.
+    nparts : int
+        Number of parts.
+    vwgt : ndarray, optional
+        Vertex weights (default: 1).
+    seed : int
+        Seed of the random tie breaking, for reproducible partitions.
+
+    Returns
+    -------
+    parts : ndarray
+        Part of each vertex, between 0 and ``nparts - 1``.
+    """
+    rng = np.random.default_rng(seed)
+    g = _Graph(np.asarray(xadj, dtype=np.int64), np.asarray(adjncy, dtype=np.int64), vwgt=vwgt)
+    parts = np.zeros(g.n, dtype=np.int32)
+    # Imbalance compounds over the levels of recursion
+    tolerance = IMBALANCE ** (1 / max(1, int(np.ceil(np.log2(nparts)))))
+    stack = [(g, np.arange(g.n), nparts, 0)]
+    while stack:
+        sub, vertices, k, first = stack.pop()
+        if k == 1 or sub.n == 0:
+            parts[vertices] = first
+            continue
+        k0 = k // 2
+        side = _bisect(sub, k0 / k, tolerance, rng)
+        for s, ks, offset in ((0, k0, first), (1, k - k0, first + k0)):
+            sel = np.flatnonzero(side == s)
+            stack.append((_subgraph(sub, sel), vertices[sel], ks, offset))
+    return parts
+
+
+def edge_cut(xadj, adjncy, parts):
+    """Number of graph edges between different parts."""
+    src = np.repeat(np.arange(len(xadj) - 1), np.diff(xadj))
+    return int(np.count_nonzero(parts[src] != parts[adjncy])) // 2
+
+
+def imbalance(parts, nparts, vwgt=None):
+    """Weight of the heaviest part divided by the average part weight."""
+    weight = np.bincount(parts, weights=vwgt, minlength=nparts)
+    return float(weight.max() / weight.mean()) if weight.sum() else 1.0
+
+
+def _elements_touching(zone, points):
+    """Boolean mask of the elements with at least one node in the boolean point mask."""
+    hits = points[zone.elem_conn].astype(np.int64)
+    return np.add.reduceat(hits, zone.elem_offsets[:-1]) > 0 if zone.nelem else np.zeros(0, dtype=bool)
+
+
+def _extract_elements(types, offsets, conn, elems, new_index):
+    types, offsets, conn = take_elements(types, offsets, conn, elems)
+    return types, offsets, new_index[conn].astype(INDEX_DTYPE)
+
+
+def split_zone(zone, parts, nparts, halo=1):
+    """
+    Build the local zone of every rank.
+
+    Parameters
+    ----------
+    zone : Zone
+        The global zone.
+    parts : ndarray
+        Rank of every element.
+    nparts : int
+        Number of ranks.
+    halo : int
+        Number of element layers around the owned points.
+
+    Returns
+    -------
+    pieces : list of (Zone, dict)
+        The local zone of each rank and its ``global_points``, ``point_owner``,
+        ``global_elems`` and ``elem_owner`` arrays.
+    """
+    if any(m.send_to is not None for m in zone.markers) or 0 < zone.npoin_domain < zone.npoin:
+        raise ValueError(
+            f"zone {zone.izone} has SEND_RECEIVE markers or ghost points, which cannot be partitioned; "
+            "use a mesh without them (periodic boundaries as MARKER_PERIODIC in the configuration)"
+        )
+    elem_of = np.repeat(np.arange(zone.nelem), np.diff(zone.elem_offsets))
+    owner = np.full(zone.npoin, nparts, dtype=np.int32)
+    np.minimum.at(owner, zone.elem_conn, parts[elem_of])
+    owner[owner == nparts] = 0  # points outside every element
+
+    local = []
+    for r in range(nparts):
+        elems = parts == r
+        points = np.zeros(zone.npoin, dtype=bool)
+        points[zone.elem_conn[elems[elem_of]]] = True
+        for _ in range(halo):
+            elems |= _elements_touching(zone, points)
+            points[zone.elem_conn[elems[elem_of]]] = True
+        points |= owner == r
+        owned = np.flatnonzero(owner == r)
+        ghosts = np.flatnonzero(points & (owner != r))
+        ghosts = ghosts[np.lexsort((ghosts, owner[ghosts]))]
+        local.append((np.flatnonzero(elems), owned, ghosts))
+
+    pieces = []
+    for r, (elems, owned, ghosts) in enumerate(local):
+        # Owned elements first, then the halo
+        elems = np.concatenate([elems[parts[elems] == r], elems[parts[elems] != r]])
+        global_points = np.concatenate([owned, ghosts])
+        new_index = np.full(zone.npoin, -1, dtype=np.int64)
+        new_index[global_points] = np.arange(len(global_points))
+
+        piece = Zone(zone.izone, zone.ndime)
+        piece.elem_types, piece.elem_offsets, piece.elem_conn = _extract_elements(
+            zone.elem_types, zone.elem_offsets, zone.elem_conn, elems, new_index
+        )
+        piece.coords = zone.coords[global_points]
+        piece.npoin_domain = len(owned)
+        # The exchange markers only use the identity transform
+        piece.periodic = [p for p in zone.periodic if p.is_identity]
+        for m in zone.markers:
+            # Keep the boundary elements whose nodes are all local
+            outside = (new_index[m.elem_conn] < 0).astype(np.int64)
+            sel = np.flatnonzero(np.add.reduceat(outside, m.elem_offsets[:-1]) == 0) if m.nelem else []
+            types, offsets, conn = _extract_elements(m.elem_types, m.elem_offsets, m.elem_conn, sel, new_index)
+            piece.markers.append(Marker(m.tag, types, offsets, conn))
+        for q, (_, _, q_ghosts) in enumerate(local):
+            if q == r:
+                continue
+            send = np.sort(q_ghosts[owner[q_ghosts] == r])
+            recv = np.sort(ghosts[owner[ghosts] == q])
+            for send_to, pts in ((q + 1, send), (-(q + 1), recv)):
+                if len(pts) == 0:
+                    continue
+                n = len(pts)
+                piece.markers.append(
+                    Marker(
+                        "SEND_RECEIVE",
+                        np.full(n, VERTEX, dtype=np.uint8),
+                        np.arange(n + 1, dtype=np.int64),
+                        new_index[pts].astype(INDEX_DTYPE),
+                        send_to=send_to,
+                        transform=np.zeros(n, dtype=np.int64),
+                    )
+                )
+        maps = {
+            "global_points": global_points,
+            "point_owner": owner[global_points],
+            "global_elems": elems,
+            "elem_owner": parts[elems].astype(np.int32),
+        }
+        pieces.append((piece, maps))
+    return pieces
+
+
+def partition_mesh(mesh, nparts, out_dir, halo=1, seed=0):
+    """
+    Partition every zone of ``mesh`` and write one .su2 file and one .map bundle per rank.
+
+    Returns
+    -------
+    report : dict
+        Edge cut, imbalance and per-rank sizes for every zone; also written to
+        ``<stem>_partition.json`` in ``out_dir``.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(mesh.path or "mesh"))[0]
+    rank_zones = [[] for _ in range(nparts)]
+    rank_maps = [{} for _ in range(nparts)]
+    report = {"mesh": mesh.path, "nparts": nparts, "halo": halo, "zones": []}
+    for iz, zone in enumerate(mesh):
+        xadj, adjncy = dual_graph(zone)
+        parts = partition_graph(xadj, adjncy, nparts, seed=seed)
+        ranks = []
+        for r, (piece, maps) in enumerate(split_zone(zone, parts, nparts, halo)):
+            rank_zones[r].append(piece)
+            rank_maps[r].update({f"z{iz}/{k}": v for k, v in maps.items()})
+            exchange = [m for m in piece.markers if m.send_to is not None]
+            ranks.append(
+                {
+                    "rank": r,
+                    "nelem": int(np.count_nonzero(maps["elem_owner"] == r)),
+                    "nelem_halo": int(np.count_nonzero(maps["elem_owner"] != r)),
+                    "npoin_domain": piece.npoin_domain,
+                    "nghost": piece.npoin - piece.npoin_domain,
+                    "neighbors": sorted({abs(m.send_to) - 1 for m in exchange}),
+                    "send": int(sum(m.nelem for m in exchange if m.send_to > 0)),
+                }
+            )
+        report["zones"].append(
+            {
+                "izone": zone.izone,
+                "nelem": zone.nelem,
+                "edge_cut": edge_cut(xadj, adjncy, parts),
+                "imbalance": imbalance(parts, nparts),
+                "ranks": ranks,
+            }
+        )
+    for r in range(nparts):
+        base = os.path.join(out_dir, f"{stem}_{r}")
+        write_mesh(rank_zones[r], base + ".su2")
+        save_bundle(base + ".map", rank_maps[r], {"kind": "partition", "rank": r, "nparts": nparts, "halo": halo})
+    with open(os.path.join(out_dir, f"{stem}_partition.json"), "w") as f:
+        json.dump(report, f, indent=1)
+        f.write("\n")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools partition", description="Write per-rank partitions of SU2 meshes.")
+    parser.add_argument("mesh", help=".su2 file")
+    parser.add_argument("nparts", type=int, help="number of ranks")
+    parser.add_argument("--out", help="output directory (default: <mesh>_<nparts>parts next to the mesh)")
+    parser.add_argument("--halo", type=int, default=1, help="element layers around owned points (default: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    out = args.out or f"{os.path.splitext(args.mesh)[0]}_{args.nparts}parts"
+    try:
+        report = partition_mesh(read_mesh(args.mesh), args.nparts, out, args.halo, args.seed)
+    except ValueError as e:
+        parser.error(f"{args.mesh}: {e}")
+    for z in report["zones"]:
+        ghosts = sum(r["nghost"] for r in z["ranks"])
+        print(
+            f"zone {z['izone']}: {z['nelem']} elements, edge cut {z['edge_cut']}, "
+            f"imbalance {z['imbalance']:.3f}, {ghosts} ghost points"
+        )
+    print(f"written to {out}")
@@ -0,0 +1,256 @@
+"""
+Matching of the nodes of periodic marker pairs.
+
+For a pair of markers related by one of the PERIODIC_INDEX transforms, every point of the
+donor marker is mapped through the transform and matched to the closest point of the receiver
+marker with a k-d tree, in O(N log N) instead of comparing all pairs of points. When the
+marker pairs are not given, every ordered pair of markers with the same number of points is
+tried with every non-identity transform, and the pairs that match within the tolerance are
+kept.
+
+The map is cached next to the mesh (``mesh.su2`` -> ``mesh.su2.periodic``) and reused as long
+as the size and modification time of the mesh are unchanged.
+"""
+# Standard Python modules
+import argparse
+
+# External modules
+import numpy as np
+
+# First party modules
+from .cache import file_stamp, load_bundle, read_sidecar_meta, save_bundle, save_quietly
+from .kdtree import KDTree
+from .reader import read_mesh
+
+MAP_SUFFIX = ".periodic"
+MAP_VERSION = 1
+
+# Largest accepted mismatch, relative to the bounding box diagonal of the zone
+TOLERANCE = 1e-6
+
+
+class PeriodicPair:
+    """
+    Matched nodes of a donor and a receiver marker.
+
+    Attributes
+    ----------
+    izone : int
+        Zone of the markers.
+    donor, receiver : str
+        Marker tags.
+    index : int
+        PERIODIC_INDEX of the transform that maps donor points onto receiver points.
+    donor_points, receiver_points : ndarray
+        Matched point indices: ``receiver_points[i]`` is the image of ``donor_points[i]``.
+    mismatch : ndarray
+        Distance between each transformed donor point and its receiver point.
+    """
+
+    def __init__(self, izone, donor, receiver, index, donor_points, receiver_points, mismatch):
+        self.izone = izone
+        self.donor = donor
+        self.receiver = receiver
+        self.index = index
+        self.donor_points = donor_points
+        self.receiver_points = receiver_points
+        self.mismatch = mismatch
+
+    def __repr__(self):
+        return (
+            f"PeriodicPair(zone {self.izone}, {self.donor!r} -> {self.receiver!r}, index={self.index}, "
+            f"npoint={len(self.donor_points)}, max_mismatch={self.max_mismatch:.3e})"
+        )
+
+    @property
+    def max_mismatch(self):
+        return float(self.mismatch.max()) if len(self.mismatch) else 0.0
+
+    @property
+    def is_one_to_one(self):
+        """True if no receiver point is matched twice."""
+        return len(np.unique(self.receiver_points)) == len(self.receiver_points)
+
+
+def match_nodes(donor_coords, receiver_coords, transform, tree=None):
+    """
+    Match transformed donor points to receiver points.
+
+    Parameters
+    ----------
+    donor_coords, receiver_coords : ndarray
+        Point coordinates.
+    transform : PeriodicTransform
+        Transform applied to the donor points.
+    tree : KDTree, optional
+        Tree over ``receiver_coords``, when it is already built.
+
+    Returns
+    -------
+    match : ndarray
+        Index into ``receiver_coords`` of the closest point to each transformed donor point.
+    mismatch : ndarray
+        Distance to that point.
+    """
+    tree = tree or KDTree(receiver_coords)
+    mismatch, match = tree.query(transform.apply(donor_coords))
+    return match, mismatch
+
+
+def match_pair(zone, donor, receiver, index):
+    """Match the nodes of the markers ``donor`` and ``receiver`` of ``zone`` through transform ``index``."""
+    transforms = {p.index: p for p in zone.periodic}
+    if index not in transforms:
+        raise ValueError(f"zone {zone.izone} has no PERIODIC_INDEX {index}")
+    nodes = zone.marker_nodes()
+    for tag in (donor, receiver):
+        if tag not in nodes:
+            raise ValueError(f"zone {zone.izone} has no marker {tag!r}")
+    transform = transforms[index]
+    match, mismatch = match_nodes(zone.coords[nodes[donor]], zone.coords[nodes[receiver]], transform)
+    return PeriodicPair(zone.izone, donor, receiver, index, nodes[donor], nodes[receiver][match], mismatch)
+
+
+def find_pairs(zone, tolerance=TOLERANCE):
+    """
+    Find the periodic marker pairs of a zone.
+
+    For every non-identity transform, the ordered marker pair with the smallest largest
+    mismatch is kept if that mismatch is within ``tolerance`` times the zone size.
+
+    Returns
+    -------
+    pairs : list of PeriodicPair
+    """
+    nodes = {tag: n for tag, n in zone.marker_nodes().items() if tag != "SEND_RECEIVE"}
+    if not len(zone.coords):
+        return []
+    size = np.linalg.norm(zone.coords.max(axis=0) - zone.coords.min(axis=0))
+    trees = {}
+    pairs = []
+    for transform in zone.periodic:
+        if transform.is_identity:
+            continue
+        best = None
+        for donor, donor_nodes in nodes.items():
+            for receiver, receiver_nodes in nodes.items():
+                if donor == receiver or len(donor_nodes) != len(receiver_nodes):
+                    continue
+                if receiver not in trees:
+                    trees[receiver] = KDTree(zone.coords[receiver_nodes])
+                match, mismatch = match_nodes(zone.coords[donor_nodes], None, transform, trees[receiver])
+                if best is None or mismatch.max() < best.max_mismatch:
+                    best = PeriodicPair(
+                        zone.izone, donor, receiver, transform.index, donor_nodes, receiver_nodes[match], mismatch
+                    )
+        if best is not None and best.max_mismatch <= tolerance * size:
+            pairs.append(best)
+    return pairs
+
+
+def map_path(path):
+    return path + MAP_SUFFIX
+
+
+def save_map(path, pairs, tolerance, request=None, filename=None):
+    """Write the matched pairs of the mesh ``path`` to its map file."""
+    arrays = {}
+    for i, p in enumerate(pairs):
+        arrays[f"p{i}/donor_points"] = p.donor_points
+        arrays[f"p{i}/receiver_points"] = p.receiver_points
+        arrays[f"p{i}/mismatch"] = p.mismatch
+    meta = {
+        "kind": "periodic",
+        "version": MAP_VERSION,
+        **file_stamp(path),
+        "tolerance": tolerance,
+        "request": request,
+        "pairs": [[p.izone, p.donor, p.receiver, p.index] for p in pairs],
+    }
+    save_bundle(filename or map_path(path), arrays, meta)
+
+
+def read_map(path, tolerance=TOLERANCE, request=None, filename=None):
+    """Read the cached pairs of ``path``, or return None if the map is missing or stale."""
+    filename = filename or map_path(path)
+    meta = read_sidecar_meta(filename, "periodic", MAP_VERSION, path)
+    if meta is None or meta["tolerance"] != tolerance or meta["request"] != request:
+        return None
+    arrays, meta = load_bundle(filename)
+    result = []
+    for i, (izone, donor, receiver, index) in enumerate(meta["pairs"]):
+        donor_points, receiver_points, mismatch = (
+            arrays[f"p{i}/{name}"] for name in ("donor_points", "receiver_points", "mismatch")
+        )
+        result.append(PeriodicPair(izone, donor, receiver, index, donor_points, receiver_points, mismatch))
+    return result
+
+
+def match_mesh(mesh, pairs=None, tolerance=TOLERANCE):
+    """Match the given marker pairs of ``mesh``, or all the pairs found by :func:`find_pairs`."""
+    if pairs:
+        zones = {z.izone: z for z in mesh}
+        return [match_pair(zones[izone], donor, receiver, index) for izone, donor, receiver, index in pairs]
+    return [p for zone in mesh for p in find_pairs(zone, tolerance)]
+
+
+def periodic_map(path, pairs=None, tolerance=TOLERANCE, write=True):
+    """
+    Periodic node map of a mesh file, from its cache when it is up to date.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .su2 file.
+    pairs : list of (izone, donor, receiver, index), optional
+        Marker pairs to match; found automatically with :func:`find_pairs` when not given.
+    tolerance : float
+        Relative tolerance of the automatic pair search.
+    write : bool
+        Write the map file when it had to be rebuilt. Errors while writing are ignored.
+
+    Returns
+    -------
+    pairs : list of PeriodicPair
+    cached : bool
+        True if the map was read from the cache.
+    """
+    request = [list(p) for p in pairs] if pairs else None
+    result = read_map(path, tolerance, request)
+    if result is not None:
+        return result, True
+    result = match_mesh(read_mesh(path), pairs, tolerance)
+    if write:
+        save_quietly(save_map, path, result, tolerance, request)
+    return result, False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools periodic", description="Match the nodes of periodic markers.")
+    parser.add_argument("paths", nargs="+", help=".su2 files")
+    parser.add_argument(
+        "--pair",
+        nargs=3,
+        action="append",
+        metavar=("DONOR", "RECEIVER", "INDEX"),
+        help="match these markers through PERIODIC_INDEX INDEX (repeatable; default: find the pairs)",
+    )
+    parser.add_argument("--zone", type=int, default=1, help="zone of the --pair markers (default: 1)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="relative tolerance of the pair search")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the map file")
+    args = parser.parse_args(argv)
+    pairs = [(args.zone, donor, receiver, int(index)) for donor, receiver, index in args.pair or []]
+    for path in args.paths:
+        if args.no_cache:
+            result, cached = match_mesh(read_mesh(path), pairs, args.tolerance), False
+        else:
+            result, cached = periodic_map(path, pairs, args.tolerance)
+        source = " (cached)" if cached else ""
+        if not result:
+            print(f"{path}: no periodic marker pairs{source}")
+        for p in result:
+            note = "" if p.is_one_to_one else ", NOT one-to-one"
+            print(
+                f"{path} zone {p.izone}: {p.donor} -> {p.receiver} (index {p.index}), "
+                f"{len(p.donor_points)} points, max mismatch {p.max_mismatch:.3e}{note}{source}"
+            )
@@ -0,0 +1,265 @@
+"""
+Element quality metrics for whole meshes, computed with array operations per element type.
+
+For every volume element:
+
+- ``volume``: signed area (2D) or volume (3D), from the divergence theorem over the element
+  faces;
+- ``inverted``: whether the node order of the element is inverted, see :func:`inverted`;
+- ``aspect_ratio``: longest edge over shortest edge;
+- ``skewness``: equiangle skewness, the worst relative deviation of the corner angles of the
+  element (2D) or of its faces (3D) from 60 degrees (triangles) or 90 degrees (quadrilaterals),
+  between 0 (ideal) and 1 (degenerate);
+- ``orthogonality``: the smallest cosine, over the element faces, between the face normal and
+  the vector from the element centroid to the neighbor centroid (or to the face center on
+  boundaries), between 0 (worst) and 1 (ideal);
+- ``growth_ratio``: the largest volume ratio between the element and a face neighbor.
+"""
+# Standard Python modules
+import argparse
+import concurrent.futures
+import json
+
+# External modules
+import numpy as np
+
+# First party modules
+from .mesh import HEXAHEDRON, PRISM, PYRAMID, QUADRILATERAL, TETRAHEDRON, TRIANGLE
+from .reader import read_mesh
+from .store import find_files
+from .topology import ELEM_EDGES, connected_components, element_faces, match_faces
+
+METRICS = ("aspect_ratio", "skewness", "orthogonality", "growth_ratio")
+
+# Histogram bin edges of each metric; the last bin includes its upper edge
+BINS = {
+    "aspect_ratio": np.array([1, 2, 5, 10, 20, 50, 100, 1000, 1e4, np.inf]),
+    "skewness": np.linspace(0, 1, 11),
+    "orthogonality": np.linspace(0, 1, 11),
+    "growth_ratio": np.array([1, 1.1, 1.2, 1.5, 2, 3, 5, 10, 100, np.inf]),
+}
+
+# Polygons whose corner angles define the skewness: the element itself in 2D, its faces in 3D
+_POLYGON_ELEMS = (TRIANGLE, QUADRILATERAL)
+_POLYHEDRA = (TETRAHEDRON, HEXAHEDRON, PRISM, PYRAMID)
+
+
+def _centroids(zone):
+    nnode = np.diff(zone.elem_offsets)
+    return np.add.reduceat(zone.coords[zone.elem_conn], zone.elem_offsets[:-1], axis=0) / nnode[:, None]
+
+
+def _face_geometry(coords, faces, ndime):
+    """Center and area vector (outward for positively oriented elements) of each face."""
+    if ndime == 2:
+        a = coords[faces[:, 0]]
+        b = coords[faces[:, 1]]
+        d = b - a
+        return (a + b) / 2, np.column_stack([d[:, 1], -d[:, 0]])
+    tri = faces[:, 3] < 0
+    corners = coords[np.where(faces < 0, faces[:, :1], faces)]
+    center = np.where(tri[:, None], corners[:, :3].mean(axis=1), corners.mean(axis=1))
+    normal_tri = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]) / 2
+    normal_quad = np.cross(corners[:, 2] - corners[:, 0], corners[:, 3] - corners[:, 1]) / 2
+    return center, np.where(tri[:, None], normal_tri, normal_quad)
+
+
+def _edge_ratio(zone):
+    ratio = np.ones(zone.nelem)
+    for etype, templates in ELEM_EDGES.items():
+        elems = np.flatnonzero(zone.elem_types == etype)
+        if len(elems) == 0:
+            continue
+        nodes = zone.elem_conn[zone.elem_offsets[elems][:, None, None] + np.asarray(templates)]
+        length = np.linalg.norm(zone.coords[nodes[..., 1]] - zone.coords[nodes[..., 0]], axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio[elems] = length.max(axis=1) / length.min(axis=1)
+    return ratio
+
+
+def _polygon_skewness(points):
+    """Equiangle skewness of polygons given as (n, k, dim) corner coordinates, k = 3 or 4."""
+    k = points.shape[1]
+    prev = np.roll(points, 1, axis=1) - points
+    nxt = np.roll(points, -1, axis=1) - points
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos = np.einsum("nkd,nkd->nk", prev, nxt) / (np.linalg.norm(prev, axis=-1) * np.linalg.norm(nxt, axis=-1))
+    angle = np.degrees(np.arccos(np.clip(cos, -1, 1)))
+    ideal = 60.0 if k == 3 else 90.0
+    skew = np.maximum((angle.max(axis=1) - ideal) / (180 - ideal), (ideal - angle.min(axis=1)) / ideal)
+    return np.nan_to_num(skew, nan=1.0)
+
+
+def element_quality(zone):
+    """
+    Quality metrics of every volume element of a zone.
+
+    Returns
+    -------
+    quality : dict of ndarray
+        ``volume``, ``inverted``, ``aspect_ratio``, ``skewness``, ``orthogonality`` and ``growth_ratio``, one
+        value per element (NaN for element types the metric does not apply to).
+    """
+    ndime = zone.ndime
+    centroid = _centroids(zone)
+    faces, face_elem = element_faces(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+    faces = faces[:, : 2 if ndime == 2 else 4]
+    center, normal = _face_geometry(zone.coords, faces, ndime)
+
+    # Divergence theorem, relative to the centroid for accuracy far from the origin
+    flux = np.einsum("fd,fd->f", center - centroid[face_elem], normal)
+    volume = np.bincount(face_elem, weights=flux, minlength=zone.nelem) / ndime
+
+    skewness = np.full(zone.nelem, np.nan)
+    if ndime == 2:
+        for etype in _POLYGON_ELEMS:
+            elems = np.flatnonzero(zone.elem_types == etype)
+            k = 3 if etype == TRIANGLE else 4
+            nodes = zone.elem_conn[zone.elem_offsets[elems][:, None] + np.arange(k)]
+            skewness[elems] = _polygon_skewness(zone.coords[nodes])
+    else:
+        skewness[np.isin(zone.elem_types, _POLYHEDRA)] = 0.0
+        for k in (3, 4):
+            sel = (faces[:, 3] < 0) if k == 3 else (faces[:, 3] >= 0)
+            np.fmax.at(skewness, face_elem[sel], _polygon_skewness(zone.coords[faces[sel, :k]]))
+
+    # Orthogonality and growth across interior faces, orthogonality alone on boundary faces
+    pairs, single = match_faces(faces)
+    e0 = face_elem[pairs[:, 0]]
+    e1 = face_elem[pairs[:, 1]]
+    area = np.linalg.norm(normal, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = centroid[e1] - centroid[e0]
+        n = normal[pairs[:, 0]]
+        cos_interior = np.abs(np.einsum("fd,fd->f", n, d)) / (area[pairs[:, 0]] * np.linalg.norm(d, axis=1))
+        d = center[single] - centroid[face_elem[single]]
+        cos_boundary = np.abs(np.einsum("fd,fd->f", normal[single], d)) / (area[single] * np.linalg.norm(d, axis=1))
+        v0 = np.abs(volume[e0])
+        v1 = np.abs(volume[e1])
+        growth = np.maximum(v0, v1) / np.minimum(v0, v1)
+    orthogonality = np.ones(zone.nelem)
+    cos_interior = np.nan_to_num(cos_interior, nan=0.0)
+    np.minimum.at(orthogonality, e0, cos_interior)
+    np.minimum.at(orthogonality, e1, cos_interior)
+    np.minimum.at(orthogonality, face_elem[single], np.nan_to_num(cos_boundary, nan=0.0))
+    growth_ratio = np.ones(zone.nelem)
+    growth = np.nan_to_num(growth, nan=np.inf, posinf=np.inf)
+    np.maximum.at(growth_ratio, e0, growth)
+    np.maximum.at(growth_ratio, e1, growth)
+
+    return {
+        "volume": volume,
+        "inverted": inverted(zone, volume, np.column_stack([e0, e1])),
+        "aspect_ratio": _edge_ratio(zone),
+        "skewness": skewness,
+        "orthogonality": orthogonality,
+        "growth_ratio": growth_ratio,
+    }
+
+
+def inverted(zone, volume, neighbors=None):
+    """
+    Elements of a zone with inverted node order, from their signed ``volume``.
+
+    In 3D valid elements have a positive volume. In 2D both orientations are valid (many meshes
+    are ordered clockwise, and hybrid meshes often have their triangles and quadrilaterals
+    ordered differently), so the elements are split into regions of face neighbors of the same
+    type, and the inverted elements are those whose area does not have the sign of most
+    elements of their region. Elements of zero volume count as inverted.
+
+    Parameters
+    ----------
+    zone : Zone
+    volume : ndarray
+        Signed volume of every element, see :func:`element_quality`.
+    neighbors : ndarray, optional
+        (npair, 2) elements that share a face, found from the faces when not given.
+    """
+    if zone.ndime == 3:
+        return volume <= 0
+    if neighbors is None:
+        faces, face_elem = element_faces(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+        neighbors = face_elem[match_faces(faces)[0]]
+    same = zone.elem_types[neighbors[:, 0]] == zone.elem_types[neighbors[:, 1]]
+    region = connected_components(zone.nelem, neighbors[same, 0], neighbors[same, 1])
+    balance = np.bincount(region, weights=np.sign(volume), minlength=zone.nelem)
+    dominant = np.where(balance[region] >= 0, 1.0, -1.0)
+    return volume * dominant <= 0
+
+
+def histogram(values, metric):
+    """Counts of ``values`` in the bins of ``metric``."""
+    edges = BINS[metric]
+    values = values[~np.isnan(values)]
+    index = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+    return np.bincount(index, minlength=len(edges) - 1)
+
+
+def summarize(path):
+    """
+    Quality summary of one mesh, over all its zones.
+
+    Returns
+    -------
+    summary : dict
+        Element count, number of inverted elements (see :func:`inverted`), extreme values of
+        each metric and histogram counts (see :data:`BINS`).
+    """
+    mesh = read_mesh(path)
+    quality = [element_quality(zone) for zone in mesh]
+    merged = {k: np.concatenate([q[k] for q in quality]) for k in quality[0]} if quality else {}
+    summary = {"path": path, "nelem": sum(z.nelem for z in mesh)}
+    if not summary["nelem"]:
+        return summary
+    summary["inverted"] = int(np.count_nonzero(merged["inverted"]))
+    summary["max_aspect_ratio"] = float(np.nanmax(merged["aspect_ratio"]))
+    summary["max_skewness"] = float(np.nanmax(merged["skewness"]))
+    summary["mean_skewness"] = float(np.nanmean(merged["skewness"]))
+    summary["min_orthogonality"] = float(np.nanmin(merged["orthogonality"]))
+    summary["max_growth_ratio"] = float(np.nanmax(merged["growth_ratio"]))
+    summary["histograms"] = {m: histogram(merged[m], m).tolist() for m in METRICS}
+    return summary
+
+
+def _format_table(summaries):
+    header = f"{'mesh':<64s} {'nelem':>8s} {'inv':>6s} {'AR max':>9s} {'skew max':>8s} {'orth min':>8s} {'growth':>8s}"
+    lines = [header]
+    for s in summaries:
+        if not s["nelem"]:
+            continue
+        lines.append(
+            f"{s['path']:<64s} {s['nelem']:>8d} {s['inverted']:>6d} {s['max_aspect_ratio']:>9.1f} "
+            f"{s['max_skewness']:>8.3f} {s['min_orthogonality']:>8.3f} {s['max_growth_ratio']:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _format_histograms(summaries):
+    lines = []
+    for metric in METRICS:
+        total = np.sum([s["histograms"][metric] for s in summaries if s["nelem"]], axis=0)
+        edges = BINS[metric]
+        lines.append(f"{metric} (all meshes, {int(total.sum())} elements)")
+        width = max(1, int(total.max()))
+        for i, count in enumerate(total):
+            label = f">= {edges[i]:g}" if np.isinf(edges[i + 1]) else f"[{edges[i]:g}, {edges[i + 1]:g})"
+            lines.append(f"  {label:>16s} {int(count):>9d} {'#' * int(50 * count / width)}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools quality", description="Element quality of SU2 meshes.")
+    parser.add_argument("paths", nargs="*", help=".su2 files (default: every .su2 file under the current directory)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--json", help="also write the summaries to this JSON file")
+    args = parser.parse_args(argv)
+    paths = args.paths or find_files(".", ("*.su2",))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        summaries = list(pool.map(summarize, paths))
+    print(_format_table(summaries))
+    print()
+    print(_format_histograms(summaries))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=1)
+            f.write("\n")
@@ -0,0 +1,374 @@
+"""
+Streaming reader for SU2 native (.su2) meshes.
+
+The file is memory-mapped and walked once. Keyword lines (NDIME, NELEM, NPOIN, NMARK, ...)
+are handled one at a time, while the numeric blocks that follow them are cut into chunks of
+complete lines and parsed by NumPy directly into preallocated arrays. Peak memory is therefore
+the final arrays plus one chunk of text.
+"""
+# Standard Python modules
+import argparse
+import mmap
+import os
+
+# External modules
+import numpy as np
+
+# First party modules
+from .mesh import (
+    INDEX_DTYPE,
+    NODES_PER_ELEM,
+    FFDBox,
+    Marker,
+    Mesh,
+    PeriodicTransform,
+    Zone,
+)
+
+# Number of lines parsed per NumPy call inside a numeric block
+CHUNK_LINES = 1 << 16
+
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[[ord(" "), ord("\t"), ord("\r"), ord("\n"), ord("\v"), ord("\f")]] = True
+
+
+class _Cursor:
+    """
+    Sequential line cursor over the bytes ``start:end`` of a bytes-like buffer.
+    """
+
+    def __init__(self, buf, start=0, end=None, lineno=0):
+        self.buf = buf
+        self.size = len(buf) if end is None else end
+        self.pos = start
+        self.lineno = lineno
+        self._line_length = 64
+
+    def readline(self):
+        """Return the next line without its terminator, or None at end of file."""
+        if self.pos >= self.size:
+            return None
+        end = self.buf.find(b"\n", self.pos, self.size)
+        if end < 0:
+            end = self.size
+        line = self.buf[self.pos : end]
+        self.pos = end + 1
+        self.lineno += 1
+        return line.rstrip(b"\r")
+
+    def peekline(self):
+        pos, lineno = self.pos, self.lineno
+        line = self.readline()
+        self.pos, self.lineno = pos, lineno
+        return line
+
+    def seek(self, pos, lineno=0):
+        self.pos = pos
+        self.lineno = lineno
+
+    def chunks(self, nlines, chunk_lines=CHUNK_LINES):
+        """
+        Yield ``(text, n)`` pairs covering the next ``nlines`` lines, ``n`` complete lines at a time.
+        """
+        remaining = nlines
+        while remaining > 0:
+            want = min(remaining, chunk_lines)
+            window = max(want * self._line_length * 2, 4096)
+            while True:
+                text = self.buf[self.pos : min(self.pos + window, self.size)]
+                newlines = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == 10)
+                if len(newlines) >= want:
+                    end = int(newlines[want - 1]) + 1
+                    break
+                if self.pos + window >= self.size:
+                    # The last line of the file may lack a terminator
+                    unterminated = len(text) > 0 and not text.endswith(b"\n")
+                    if len(newlines) + unterminated < want:
+                        raise ValueError(f"unexpected end of file, expected {nlines} lines")
+                    end = len(text)
+                    break
+                window *= 2
+            chunk = text[:end]
+            self._line_length = max(1, end // want)
+            self.pos += end
+            self.lineno += want
+            remaining -= want
+            yield chunk, want
+
+    def skip(self, nlines):
+        """Move past the next ``nlines`` lines without parsing them."""
+        for _ in self.chunks(nlines):
+            pass
+
+
+def _tokenize(text, nlines, dtype):
+    """
+    Parse a block of ``nlines`` whitespace-separated numeric lines.
+
+    Returns
+    -------
+    values : ndarray
+        All tokens, flattened.
+    starts : ndarray
+        Index of the first token of each line in ``values``.
+    counts : ndarray
+        Number of tokens on each line.
+    """
+    raw = np.frombuffer(text, dtype=np.uint8)
+    space = _WHITESPACE[raw]
+    token_start = ~space
+    token_start[1:] &= space[:-1]
+    token_pos = np.flatnonzero(token_start)
+    line_of_token = np.searchsorted(np.flatnonzero(raw == 10), token_pos)
+    counts = np.bincount(line_of_token, minlength=nlines)[:nlines]
+    values = np.fromstring(text, dtype=dtype, sep=" ")
+    if len(values) != len(token_pos):
+        raise ValueError("non-numeric data found inside a numeric block")
+    starts = np.cumsum(counts) - counts
+    return values, starts, counts
+
+
+def _gather(values, starts, counts, width):
+    """Take the first ``width`` tokens of every line, as an (nlines, width) array."""
+    if len(counts) and np.all(counts == counts[0]):
+        # Uniform lines: a strided view is enough
+        return values.reshape(-1, counts[0])[:, :width]
+    return values[starts[:, None] + np.arange(width)]
+
+
+def _parse_elements(text, nlines):
+    """
+    Parse element lines ``type n0 n1 ... [extra]`` into CSR pieces.
+
+    Returns
+    -------
+    types, nnode, conn, extra : ndarray
+        Element types, nodes per element, flattened connectivity and the first trailing
+        token of each line (-1 if absent).
+    """
+    values, starts, counts = _tokenize(text, nlines, np.int64)
+    if np.any(counts == 0):
+        raise ValueError("empty line inside an element block")
+    types = values[starts]
+    if np.any((types < 0) | (types >= len(NODES_PER_ELEM))) or not np.all(NODES_PER_ELEM[types]):
+        bad = types[(types < 0) | (types >= len(NODES_PER_ELEM))]
+        bad = bad if len(bad) else types[NODES_PER_ELEM[types] == 0]
+        raise ValueError(f"unsupported VTK element type {int(bad[0])}")
+    nnode = NODES_PER_ELEM[types]
+    if np.any(counts < nnode + 1):
+        raise ValueError("element line with too few nodes")
+    offsets = np.cumsum(nnode) - nnode
+    conn = values[np.arange(int(nnode.sum())) + np.repeat(starts + 1 - offsets, nnode)]
+    extra = np.where(counts > nnode + 1, values[np.minimum(starts + nnode + 1, len(values) - 1)], -1)
+    return types, nnode, conn, extra
+
+
+def _read_elements(cursor, nelem, chunk_lines):
+    """
+    Read ``nelem`` element lines into CSR arrays plus the trailing token of each line.
+    """
+    types = np.empty(nelem, dtype=np.uint8)
+    offsets = np.empty(nelem + 1, dtype=np.int64)
+    extra = np.empty(nelem, dtype=np.int64)
+    conn = np.empty(0, dtype=INDEX_DTYPE)
+    offsets[0] = 0
+    i = 0
+    for text, n in cursor.chunks(nelem, chunk_lines):
+        t, nnode, c, x = _parse_elements(text, n)
+        types[i : i + n] = t
+        extra[i : i + n] = x
+        offsets[i + 1 : i + n + 1] = offsets[i] + np.cumsum(nnode)
+        end = offsets[i + n]
+        if end > len(conn):
+            # Grow in place, sized from the average element so far
+            capacity = max(int(end), int(end * nelem / (i + n)))
+            conn.resize(capacity, refcheck=False)
+        conn[offsets[i] : end] = c
+        i += n
+    conn.resize(int(offsets[-1]), refcheck=False)
+    return types, offsets, conn, extra
+
+
+def _read_points(cursor, npoin, ndime, chunk_lines):
+    coords = np.empty((npoin, ndime), dtype=np.float64)
+    i = 0
+    for text, n in cursor.chunks(npoin, chunk_lines):
+        values, starts, counts = _tokenize(text, n, np.float64)
+        if np.any(counts < ndime):
+            raise ValueError(f"point line with fewer than {ndime} coordinates")
+        coords[i : i + n] = _gather(values, starts, counts, ndime)
+        i += n
+    return coords
+
+
+def _read_floats(cursor, nlines, width):
+    values, starts, counts = _tokenize(b"".join(t for t, _ in cursor.chunks(nlines)), nlines, np.float64)
+    if np.any(counts < width):
+        raise ValueError(f"expected at least {width} values per line")
+    return _gather(values, starts, counts, width)
+
+
+def _keyword(line):
+    """Split ``KEY= value`` into an upper-case key and a stripped value, or return None."""
+    line = line.strip()
+    if not line or line.startswith(b"%"):
+        return None
+    key, sep, value = line.partition(b"=")
+    if not sep:
+        return None
+    return key.strip().upper().decode(), value.strip().decode()
+
+
+def parse(buf, path=None, chunk_lines=CHUNK_LINES, start=0, end=None, lineno=0, ndime=0):
+    """
+    Parse an SU2 mesh held in a bytes-like buffer.
+
+    Parameters
+    ----------
+    buf : bytes, mmap.mmap
+        The mesh file contents.
+    path : str, optional
+        The file name, used in error messages and stored on the mesh.
+    chunk_lines : int
+        Number of lines parsed per NumPy call inside numeric blocks.
+    start, end : int, optional
+        Byte range to parse, for reading a single section (see :mod:`su2tools.sections`).
+    lineno : int
+        Number of lines before ``start``, for error messages.
+    ndime : int
+        NDIME in effect at ``start``.
+
+    Returns
+    -------
+    mesh : Mesh
+        The parsed mesh.
+    """
+    cursor = _Cursor(buf, start, end, lineno)
+    zones = [Zone(ndime=ndime)]
+    zone = zones[0]
+    box = None
+    tag = None
+    try:
+        while True:
+            line = cursor.readline()
+            if line is None:
+                break
+            kv = _keyword(line)
+            if kv is None:
+                continue
+            key, value = kv
+
+            if key == "NDIME":
+                ndime = int(value)
+                zone.ndime = ndime
+            elif key == "NZONE":
+                pass
+            elif key == "IZONE":
+                if not zone.is_empty:
+                    zone = Zone(ndime=ndime)
+                    zones.append(zone)
+                zone.izone = int(value)
+            elif key == "NELEM":
+                types, offsets, conn, _ = _read_elements(cursor, int(value), chunk_lines)
+                zone.elem_types, zone.elem_offsets, zone.elem_conn = types, offsets, conn
+            elif key == "NPOIN":
+                counts = [int(v) for v in value.split()]
+                zone.coords = _read_points(cursor, counts[0], zone.ndime, chunk_lines)
+                zone.npoin_domain = counts[1] if len(counts) > 1 else counts[0]
+            elif key == "NMARK":
+                pass
+            elif key == "MARKER_TAG":
+                tag = value
+            elif key == "MARKER_ELEMS":
+                nelem = int(value)
+                send_to = None
+                nxt = cursor.peekline()
+                if nxt is not None and nxt.strip().upper().startswith(b"SEND_TO"):
+                    cursor.readline()
+                    send_to = int(nxt.partition(b"=")[2])
+                types, offsets, conn, extra = _read_elements(cursor, nelem, chunk_lines)
+                transform = extra if send_to is not None else None
+                zone.markers.append(Marker(tag, types, offsets, conn, send_to, transform))
+            elif key == "NPERIODIC":
+                pass
+            elif key == "PERIODIC_INDEX":
+                rows = _read_floats(cursor, 3, 3)
+                zone.periodic.append(PeriodicTransform(int(value), rows[0], rows[1], rows[2]))
+            elif key in ("FFD_NBOX", "FFD_NLEVEL"):
+                pass
+            elif key == "FFD_TAG":
+                box = FFDBox(value)
+                zone.ffd_boxes.append(box)
+            elif key == "FFD_LEVEL":
+                box.level = int(value)
+            elif key.startswith("FFD_DEGREE_"):
+                box.degree += (int(value),)
+            elif key in ("FFD_PARENTS", "FFD_CHILDREN"):
+                tags = [cursor.readline().strip().decode() for _ in range(int(value))]
+                if key == "FFD_PARENTS":
+                    box.parents = tags
+                else:
+                    box.children = tags
+            elif key == "FFD_CORNER_POINTS":
+                box.corners = _read_floats(cursor, int(value), zone.ndime).copy()
+            elif key == "FFD_CONTROL_POINTS":
+                rows = _read_floats(cursor, int(value), 6)
+                box.control_indices = rows[:, :3].astype(np.int64)
+                box.control_points = rows[:, 3:6].copy()
+            elif key == "FFD_SURFACE_POINTS":
+                n = int(value)
+                words = [cursor.readline().split() for _ in range(n)]
+                box.surface_markers = np.array([w[0].decode() for w in words], dtype=object)
+                box.surface_points = np.array([int(w[1]) for w in words], dtype=np.int64)
+                box.surface_params = np.array([[float(x) for x in w[2:5]] for w in words]).reshape(n, 3)
+            # Any other keyword is ignored, as SU2 itself does
+    except (ValueError, IndexError, AttributeError) as e:
+        raise ValueError(f"{path or '<buffer>'}:{cursor.lineno}: {e}") from e
+    return Mesh(zones, path=path)
+
+
+def read_mesh(path, chunk_lines=CHUNK_LINES):
+    """
+    Read an SU2 native mesh file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .su2 file.
+    chunk_lines : int
+        Number of lines parsed per NumPy call inside numeric blocks.
+
+    Returns
+    -------
+    mesh : Mesh
+        The parsed mesh.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return parse(b"", path, chunk_lines)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return parse(buf, path, chunk_lines)
+
+
+def describe(mesh):
+    """Return a short multi-line text summary of a mesh."""
+    lines = [f"{mesh.path}: {mesh.nzone} zone(s)"]
+    for zone in mesh:
+        lines.append(f"  zone {zone.izone}: NDIME={zone.ndime} NELEM={zone.nelem} NPOIN={zone.npoin}")
+        counts = ", ".join(f"{t}:{n}" for t, n in zone.elem_counts().items())
+        lines.append(f"    elements by VTK type: {counts}")
+        for m in zone.markers:
+            lines.append(f"    marker {m.tag}: {m.nelem} elements, {len(m.nodes)} points")
+        if zone.periodic:
+            lines.append(f"    NPERIODIC={len(zone.periodic)}")
+        for box in zone.ffd_boxes:
+            lines.append(f"    {box}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools info", description="Print a summary of SU2 meshes.")
+    parser.add_argument("meshes", nargs="+", help=".su2 files to read")
+    args = parser.parse_args(argv)
+    for path in args.meshes:
+        print(describe(read_mesh(path)))
@@ -0,0 +1,256 @@
+"""
+Point renumbering for better memory locality.
+
+Three orderings are available:
+
+- ``rcm``: reverse Cuthill-McKee on the point graph, which minimizes the bandwidth of the
+  point-to-point matrix (breadth-first levels from a pseudo-peripheral point);
+- ``hilbert`` and ``morton``: sort points along a space-filling curve through the bounding
+  box, which keeps points that are close in space close in memory.
+
+Points, element and marker connectivity and FFD surface points are renumbered together, and
+elements are sorted by their lowest new point index. Ghost points (``NPOIN= total domain``)
+stay after the domain points.
+"""
+# Standard Python modules
+import argparse
+
+# External modules
+import numpy as np
+
+# First party modules
+from .mesh import INDEX_DTYPE
+from .reader import read_mesh
+from .topology import element_edges, point_graph, take_elements
+from .writer import write_mesh
+
+METHODS = ("rcm", "hilbert", "morton")
+
+
+def _neighbors(xadj, adjncy, vertices):
+    """Neighbors of ``vertices`` and the position in ``vertices`` of the vertex they come from."""
+    counts = xadj[vertices + 1] - xadj[vertices]
+    source = np.repeat(np.arange(len(vertices)), counts)
+    index = np.repeat(xadj[vertices] - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    return adjncy[index], source
+
+
+def _levels(xadj, adjncy, start):
+    """Breadth-first level of every vertex reachable from ``start`` (-1 elsewhere)."""
+    level = np.full(len(xadj) - 1, -1, dtype=np.int64)
+    level[start] = 0
+    frontier = np.array([start])
+    depth = 0
+    while len(frontier):
+        nbrs, _ = _neighbors(xadj, adjncy, frontier)
+        frontier = np.unique(nbrs[level[nbrs] < 0])
+        depth += 1
+        level[frontier] = depth
+    return level
+
+
+def _peripheral(xadj, adjncy, degree, start):
+    """Pseudo-peripheral vertex of the component of ``start`` (George and Liu)."""
+    level = _levels(xadj, adjncy, start)
+    for _ in range(16):
+        last = np.flatnonzero(level == level.max())
+        candidate = last[np.argmin(degree[last])]
+        new_level = _levels(xadj, adjncy, candidate)
+        if new_level.max() <= level.max():
+            break
+        start, level = candidate, new_level
+    return start
+
+
+def rcm_order(xadj, adjncy):
+    """
+    Reverse Cuthill-McKee ordering of a graph.
+
+    Each breadth-first level is built at once: the new vertices are ordered by the position
+    of their first neighbor in the previous level, then by increasing degree.
+
+    Returns
+    -------
+    perm : ndarray
+        Old index of each vertex in the new order.
+    """
+    n = len(xadj) - 1
+    degree = np.diff(xadj)
+    visited = np.zeros(n, dtype=bool)
+    order = []
+    # Isolated vertices are placed last
+    isolated = np.flatnonzero(degree == 0)
+    visited[isolated] = True
+    while not visited.all():
+        remaining = np.flatnonzero(~visited)
+        start = _peripheral(xadj, adjncy, degree, remaining[np.argmin(degree[remaining])])
+        visited[start] = True
+        frontier = np.array([start])
+        component = [frontier]
+        while len(frontier):
+            nbrs, source = _neighbors(xadj, adjncy, frontier)
+            new = ~visited[nbrs]
+            nbrs, source = nbrs[new], source[new]
+            nbrs = nbrs[np.lexsort((nbrs, degree[nbrs], source))]
+            _, first = np.unique(nbrs, return_index=True)
+            frontier = nbrs[np.sort(first)]
+            visited[frontier] = True
+            component.append(frontier)
+        order.append(np.concatenate(component)[::-1])
+    order.append(isolated)
+    return np.concatenate(order)
+
+
+def _quantize(coords, bits):
+    lo = coords.min(axis=0)
+    span = np.maximum(coords.max(axis=0) - lo, np.finfo(np.float64).tiny)
+    return ((coords - lo) / span * ((1 << bits) - 1)).astype(np.uint64)
+
+
+def morton_keys(coords, bits=None):
+    """Z-order (Morton) key of each point: the bits of the quantized coordinates interleaved."""
+    ndim = coords.shape[1]
+    bits = bits or 63 // ndim
+    q = _quantize(coords, bits)
+    key = np.zeros(len(coords), dtype=np.uint64)
+    for b in range(bits):
+        for d in range(ndim):
+            key |= ((q[:, d] >> np.uint64(b)) & np.uint64(1)) << np.uint64(ndim * b + ndim - 1 - d)
+    return key
+
+
+def hilbert_keys(coords, bits=None):
+    """
+    Hilbert curve index of each point, in 2D or 3D.
+
+    Uses Skilling's transpose algorithm ("Programming the Hilbert curve", 2004) on all points
+    at once; the index is then the Morton interleave of the transposed coordinates.
+    """
+    ndim = coords.shape[1]
+    bits = bits or 63 // ndim
+    x = _quantize(coords, bits).T.copy()
+    one = np.uint64(1)
+    q = one << np.uint64(bits - 1)
+    # Inverse undo
+    while q > one:
+        p = q - one
+        for i in range(ndim):
+            flip = (x[i] & q) != 0
+            x[0] = np.where(flip, x[0] ^ p, x[0])
+            t = np.where(flip, np.uint64(0), (x[0] ^ x[i]) & p)
+            x[0] ^= t
+            x[i] ^= t
+        q >>= one
+    # Gray encode
+    for i in range(1, ndim):
+        x[i] ^= x[i - 1]
+    t = np.zeros(x.shape[1], dtype=np.uint64)
+    q = one << np.uint64(bits - 1)
+    while q > one:
+        t = np.where((x[ndim - 1] & q) != 0, t ^ (q - one), t)
+        q >>= one
+    x ^= t
+    key = np.zeros(x.shape[1], dtype=np.uint64)
+    for b in range(bits):
+        for d in range(ndim):
+            key |= ((x[d] >> np.uint64(b)) & one) << np.uint64(ndim * b + ndim - 1 - d)
+    return key
+
+
+def point_order(zone, method="rcm"):
+    """
+    New point order of a zone.
+
+    Returns
+    -------
+    perm : ndarray
+        Old index of each point in the new order, domain points first.
+    """
+    if method == "rcm":
+        perm = rcm_order(*point_graph(zone))
+    elif method == "hilbert":
+        perm = np.argsort(hilbert_keys(zone.coords), kind="stable")
+    elif method == "morton":
+        perm = np.argsort(morton_keys(zone.coords), kind="stable")
+    else:
+        raise ValueError(f"unknown ordering {method!r}, expected one of {METHODS}")
+    if zone.npoin_domain and zone.npoin_domain < zone.npoin:
+        perm = np.concatenate([perm[perm < zone.npoin_domain], perm[perm >= zone.npoin_domain]])
+    return perm
+
+
+def bandwidth_profile(zone):
+    """
+    Bandwidth and profile of the point graph of a zone.
+
+    Returns
+    -------
+    bandwidth : int
+        Largest index difference across an edge.
+    profile : int
+        Envelope size: sum over points of the distance to their lowest-numbered neighbor.
+    """
+    edges = element_edges(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+    if len(edges) == 0:
+        return 0, 0
+    first = np.arange(zone.npoin)
+    np.minimum.at(first, edges[:, 1], edges[:, 0])
+    return int((edges[:, 1] - edges[:, 0]).max()), int((np.arange(zone.npoin) - first).sum())
+
+
+def apply_order(zone, perm, sort_elements=True):
+    """
+    Renumber the points of ``zone`` in place so that new point ``i`` is old point ``perm[i]``.
+    """
+    new_index = np.empty(zone.npoin, dtype=np.int64)
+    new_index[perm] = np.arange(zone.npoin)
+    zone.coords = zone.coords[perm]
+    zone.elem_conn = new_index[zone.elem_conn].astype(INDEX_DTYPE)
+    if sort_elements and zone.nelem:
+        lowest = np.minimum.reduceat(zone.elem_conn, zone.elem_offsets[:-1])
+        order = np.argsort(lowest, kind="stable")
+        zone.elem_types, zone.elem_offsets, zone.elem_conn = take_elements(
+            zone.elem_types, zone.elem_offsets, zone.elem_conn, order
+        )
+    for m in zone.markers:
+        m.elem_conn = new_index[m.elem_conn].astype(INDEX_DTYPE)
+        m._nodes = None
+    for box in zone.ffd_boxes:
+        box.surface_points = new_index[box.surface_points]
+    return zone
+
+
+def renumber(mesh, method="rcm", sort_elements=True):
+    """
+    Renumber every zone of ``mesh`` in place.
+
+    Returns
+    -------
+    stats : list of dict
+        Bandwidth and profile of each zone before and after.
+    """
+    stats = []
+    for zone in mesh:
+        before = bandwidth_profile(zone)
+        apply_order(zone, point_order(zone, method), sort_elements)
+        after = bandwidth_profile(zone)
+        stats.append({"izone": zone.izone, "bandwidth": (before[0], after[0]), "profile": (before[1], after[1])})
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools renumber", description="Renumber mesh points for locality.")
+    parser.add_argument("mesh", help=".su2 file")
+    parser.add_argument("-o", "--output", help="renumbered .su2 file to write (default: only report)")
+    parser.add_argument("--method", choices=METHODS + ("all",), default="rcm")
+    parser.add_argument("--keep-elements", action="store_true", help="do not reorder the elements")
+    args = parser.parse_args(argv)
+    if args.output and args.method == "all":
+        parser.error("--method all only compares the orderings; choose one to write a mesh")
+    for method in METHODS if args.method == "all" else (args.method,):
+        mesh = read_mesh(args.mesh)
+        for s in renumber(mesh, method, not args.keep_elements):
+            (b0, b1), (p0, p1) = s["bandwidth"], s["profile"]
+            print(f"zone {s['izone']} {method:>7s}: bandwidth {b0} -> {b1}, profile {p0} -> {p1}")
+        if args.output:
+            write_mesh(mesh, args.output)
@@ -0,0 +1,358 @@
+"""
+Byte-offset index of the sections of an SU2 mesh, for loading one zone or marker at a time.
+
+Building the index only counts newlines inside the numeric blocks, which is several times
+faster than parsing them. The index records, for every zone, the byte range of its element
+block, point block, markers, periodic transforms and FFD boxes. :func:`load_zone` and
+:func:`load_marker` then parse only that byte range of the memory-mapped file.
+
+The index is kept in a small JSON sidecar (``mesh.su2.idx``) that is reused while the size
+and modification time of the mesh are unchanged.
+"""
+# Standard Python modules
+import argparse
+import json
+import mmap
+import os
+
+# First party modules
+from .cache import save_quietly
+from .reader import CHUNK_LINES, _Cursor, _keyword, parse
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# Keywords followed by one line per count that belong to an FFD definition
+_FFD_BLOCKS = ("FFD_PARENTS", "FFD_CHILDREN", "FFD_CORNER_POINTS", "FFD_CONTROL_POINTS", "FFD_SURFACE_POINTS")
+
+
+class Section:
+    """
+    One keyword block of a mesh file.
+
+    Attributes
+    ----------
+    kind : str
+        "elements", "points", "marker", "periodic" or "ffd".
+    name : str
+        Marker tag, PERIODIC_INDEX value or "" for the other kinds.
+    offset, end : int
+        Byte range, from the first keyword line of the section to the end of its data.
+    lineno : int
+        Number of lines before ``offset``.
+    count : int
+        Number of data lines (elements, points, ...).
+    """
+
+    def __init__(self, kind, name, offset, end, lineno, count):
+        self.kind = kind
+        self.name = name
+        self.offset = offset
+        self.end = end
+        self.lineno = lineno
+        self.count = count
+
+    def __repr__(self):
+        return f"Section({self.kind!r}, {self.name!r}, bytes {self.offset}:{self.end}, count={self.count})"
+
+    def to_list(self):
+        return [self.kind, self.name, self.offset, self.end, self.lineno, self.count]
+
+
+class ZoneIndex:
+    """
+    Byte range and sections of one zone.
+    """
+
+    def __init__(self, izone, ndime, offset, lineno, end=None, npoin_domain=0, sections=None):
+        self.izone = izone
+        self.ndime = ndime
+        self.offset = offset
+        self.lineno = lineno
+        self.end = end
+        self.npoin_domain = npoin_domain
+        self.sections = sections if sections is not None else []
+
+    def __repr__(self):
+        return f"ZoneIndex({self.izone}, bytes {self.offset}:{self.end}, nsection={len(self.sections)})"
+
+    def find(self, kind, name=None):
+        """Sections of a given kind, and name if given, in file order."""
+        return [s for s in self.sections if s.kind == kind and (name is None or s.name == name)]
+
+    @property
+    def markers(self):
+        return [s.name for s in self.find("marker")]
+
+    def to_dict(self):
+        return {
+            "izone": self.izone,
+            "ndime": self.ndime,
+            "offset": self.offset,
+            "lineno": self.lineno,
+            "end": self.end,
+            "npoin_domain": self.npoin_domain,
+            "sections": [s.to_list() for s in self.sections],
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        sections = [Section(*s) for s in d.pop("sections")]
+        return cls(sections=sections, **d)
+
+
+class MeshIndex:
+    """
+    Section index of a whole mesh file.
+    """
+
+    def __init__(self, path, size, mtime_ns, zones):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.zones = zones
+
+    def __repr__(self):
+        return f"MeshIndex({self.path!r}, nzone={len(self.zones)})"
+
+    def zone(self, izone):
+        """The index of the zone numbered ``izone`` (the IZONE value, starting at 1)."""
+        for z in self.zones:
+            if z.izone == izone:
+                return z
+        raise KeyError(f"{self.path} has no zone {izone}")
+
+    def marker(self, tag, izone=None):
+        """The zone and section of the first marker called ``tag``."""
+        for z in self.zones:
+            if izone is not None and z.izone != izone:
+                continue
+            found = z.find("marker", tag)
+            if found:
+                return z, found[0]
+        raise KeyError(f"{self.path} has no marker {tag}")
+
+    def is_current(self, path=None):
+        """Whether the mesh file still has the size and modification time that were indexed."""
+        st = os.stat(path or self.path)
+        return (st.st_size, st.st_mtime_ns) == (self.size, self.mtime_ns)
+
+    def to_dict(self):
+        return {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "zones": [z.to_dict() for z in self.zones],
+        }
+
+
+def scan(buf, path=None):
+    """
+    Build the section index of an SU2 mesh held in a bytes-like buffer.
+
+    Returns
+    -------
+    zones : list of ZoneIndex
+        One entry per zone, in file order.
+    """
+    cursor = _Cursor(buf)
+    zone = ZoneIndex(1, 0, 0, 0)
+    zones = [zone]
+    tag = None
+    ffd = None
+    try:
+        while True:
+            offset, lineno = cursor.pos, cursor.lineno
+            line = cursor.readline()
+            if line is None:
+                break
+            kv = _keyword(line)
+            if kv is None:
+                continue
+            key, value = kv
+
+            if key == "NDIME":
+                zone.ndime = int(value)
+            elif key == "IZONE":
+                if zone.sections:
+                    zone.end = offset
+                    zone = ZoneIndex(int(value), zone.ndime, offset, lineno)
+                    zones.append(zone)
+                else:
+                    zone.izone, zone.offset, zone.lineno = int(value), offset, lineno
+            elif key == "NELEM":
+                cursor.skip(int(value))
+                zone.sections.append(Section("elements", "", offset, cursor.pos, lineno, int(value)))
+            elif key == "NPOIN":
+                counts = [int(v) for v in value.split()]
+                zone.npoin_domain = counts[1] if len(counts) > 1 else counts[0]
+                cursor.skip(counts[0])
+                zone.sections.append(Section("points", "", offset, cursor.pos, lineno, counts[0]))
+            elif key == "MARKER_TAG":
+                tag = (value, offset, lineno)
+            elif key == "MARKER_ELEMS":
+                nxt = cursor.peekline()
+                if nxt is not None and nxt.strip().upper().startswith(b"SEND_TO"):
+                    cursor.readline()
+                cursor.skip(int(value))
+                zone.sections.append(Section("marker", tag[0], tag[1], cursor.pos, tag[2], int(value)))
+            elif key == "PERIODIC_INDEX":
+                cursor.skip(3)
+                zone.sections.append(Section("periodic", value, offset, cursor.pos, lineno, 3))
+            elif key.startswith("FFD_"):
+                # All FFD keywords up to the last box form one section
+                if key == "FFD_NBOX":
+                    ffd = Section("ffd", "", offset, offset, lineno, int(value))
+                    zone.sections.append(ffd)
+                elif key in _FFD_BLOCKS:
+                    cursor.skip(int(value))
+                if ffd is not None:
+                    ffd.end = cursor.pos
+    except (ValueError, IndexError, TypeError) as e:
+        raise ValueError(f"{path or '<buffer>'}:{cursor.lineno}: {e}") from e
+    zone.end = cursor.size
+    return zones
+
+
+def index_path(path):
+    return path + INDEX_SUFFIX
+
+
+def build_index(path):
+    """Scan ``path`` and return its :class:`MeshIndex`."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            zones = scan(b"", path)
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                zones = scan(buf, path)
+    return MeshIndex(path, st.st_size, st.st_mtime_ns, zones)
+
+
+def save_index(index, filename=None):
+    """Write ``index`` as JSON, by default next to the mesh."""
+    filename = filename or index_path(index.path)
+    tmp = filename + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index.to_dict(), f, separators=(",", ":"))
+    os.replace(tmp, filename)
+
+
+def read_index(path, filename=None):
+    """Read the index sidecar of ``path``, or return None if it is missing, stale or unreadable."""
+    filename = filename or index_path(path)
+    try:
+        with open(filename) as f:
+            d = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if d.get("version") != INDEX_VERSION:
+        return None
+    index = MeshIndex(path, d["size"], d["mtime_ns"], [ZoneIndex.from_dict(z) for z in d["zones"]])
+    return index if index.is_current() else None
+
+
+def get_index(path, write=True):
+    """
+    Return the section index of ``path``, from its sidecar when it is up to date.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .su2 file.
+    write : bool
+        Write a new sidecar when the index had to be rebuilt. Errors while writing (e.g. a
+        read-only tree) are ignored.
+    """
+    index = read_index(path)
+    if index is None:
+        index = build_index(path)
+        if write:
+            save_quietly(save_index, index)
+    return index
+
+
+def _parse_range(path, offset, end, lineno, ndime, chunk_lines):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return parse(buf, path, chunk_lines, start=offset, end=end, lineno=lineno, ndime=ndime).zones[0]
+
+
+def load_zone(path, izone, index=None, chunk_lines=CHUNK_LINES):
+    """
+    Read a single zone of a multi-zone mesh.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .su2 file.
+    izone : int
+        IZONE value of the zone.
+    index : MeshIndex, optional
+        Section index of the file (default: :func:`get_index`).
+
+    Returns
+    -------
+    zone : Zone
+        The zone, as :func:`su2tools.read_mesh` would return it.
+    """
+    index = index or get_index(path)
+    z = index.zone(izone)
+    zone = _parse_range(path, z.offset, z.end, z.lineno, z.ndime, chunk_lines)
+    zone.izone = z.izone
+    return zone
+
+
+def load_marker(path, tag, izone=None, index=None, chunk_lines=CHUNK_LINES):
+    """
+    Read the first marker called ``tag`` without reading the volume mesh.
+
+    Returns
+    -------
+    marker : Marker
+        The marker; its ``elem_conn`` holds point indices of the whole zone.
+    """
+    index = index or get_index(path)
+    z, s = index.marker(tag, izone)
+    return _parse_range(path, s.offset, s.end, s.lineno, z.ndime, chunk_lines).markers[0]
+
+
+def load_points(path, izone=1, index=None, chunk_lines=CHUNK_LINES):
+    """Read the point coordinates of one zone only."""
+    index = index or get_index(path)
+    z = index.zone(izone)
+    s = z.find("points")[0]
+    return _parse_range(path, s.offset, s.end, s.lineno, z.ndime, chunk_lines).coords
+
+
+def describe(index):
+    """Return the section table of ``index`` as text."""
+    lines = [f"{index.path}: {len(index.zones)} zone(s), {index.size} bytes"]
+    for z in index.zones:
+        lines.append(f"  zone {z.izone}: NDIME={z.ndime} bytes {z.offset}-{z.end} from line {z.lineno + 1}")
+        for s in z.sections:
+            label = f"{s.kind} {s.name}".strip()
+            span = f"bytes {s.offset:>10d}-{s.end:<10d}"
+            lines.append(f"    {label:<24s} line {s.lineno + 1:>8d}  {span} count {s.count}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="su2tools sections", description="Index the sections of SU2 meshes and read single zones or markers."
+    )
+    parser.add_argument("meshes", nargs="+", help=".su2 files")
+    parser.add_argument("--zone", type=int, help="read and summarize only this zone")
+    parser.add_argument("--marker", help="read and summarize only this marker")
+    parser.add_argument("--no-write", action="store_true", help="do not write .idx sidecars")
+    args = parser.parse_args(argv)
+    for path in args.meshes:
+        index = get_index(path, write=not args.no_write)
+        if args.zone is None and args.marker is None:
+            print(describe(index))
+            continue
+        if args.zone is not None:
+            print(f"{path}: {load_zone(path, args.zone, index)}")
+        if args.marker is not None:
+            marker = load_marker(path, args.marker, args.zone, index)
+            print(f"{path}: {marker}, {len(marker.nodes)} points")
@@ -0,0 +1,85 @@
+"""
+Reader and writer for SU2 ASCII solution and restart files (``solution_flow.dat`` and the like).
+
+The files hold a header of quoted, tab-separated column names ("PointID", the coordinates,
+then "Conservative_1", ... and derived fields) and one tab-separated row per point. Lines that
+follow the point rows (e.g. ``EXT_ITER=`` metadata written by some SU2 versions) are kept as
+they are.
+"""
+# External modules
+import numpy as np
+
+COORD_NAMES = ("x", "y", "z")
+
+
+class Solution:
+    """
+    Point values of a solution file.
+
+    Attributes
+    ----------
+    names : list of str
+        Column names, without the PointID column.
+    values : ndarray
+        (npoint, ncolumn) values, rows ordered by PointID.
+    footer : list of str
+        Lines that follow the point rows.
+    """
+
+    def __init__(self, names, values, footer=None):
+        self.names = list(names)
+        self.values = values
+        self.footer = footer or []
+
+    def __repr__(self):
+        return f"Solution(npoint={self.npoint}, names={self.names})"
+
+    @property
+    def npoint(self):
+        return len(self.values)
+
+    @property
+    def ndime(self):
+        return sum(1 for name in self.names if name in COORD_NAMES)
+
+    @property
+    def coords(self):
+        """(npoint, ndime) coordinate columns."""
+        return self.values[:, : self.ndime]
+
+    @property
+    def field_names(self):
+        """Names of the columns that are not coordinates."""
+        return self.names[self.ndime :]
+
+    @property
+    def fields(self):
+        return self.values[:, self.ndime :]
+
+    def column(self, name):
+        return self.values[:, self.names.index(name)]
+
+
+def read_solution(path):
+    """Read an SU2 ASCII solution file into a :class:`Solution`."""
+    with open(path) as f:
+        header = f.readline()
+        lines = f.read().splitlines()
+    names = [name.strip().strip('"') for name in header.rstrip("\n").split("\t") if name.strip()]
+    nrow = 0
+    while nrow < len(lines) and lines[nrow][:1].isdigit():
+        nrow += 1
+    values = np.array(" ".join(lines[:nrow]).split(), dtype=np.float64).reshape(nrow, len(names))
+    point_id = values[:, 0].astype(np.int64)
+    values = values[np.argsort(point_id, kind="stable"), 1:]
+    return Solution(names[1:], values, lines[nrow:])
+
+
+def write_solution(path, solution):
+    """Write a :class:`Solution` in the layout of the SU2 ASCII solution files."""
+    fmt = "%d\t" + "\t".join(["%.15e"] * len(solution.names)) + "\t\n"
+    with open(path, "w") as f:
+        f.write("\t".join(f'"{name}"' for name in ["PointID"] + solution.names) + "\n")
+        f.write("".join(fmt % (i, *row) for i, row in enumerate(solution.values.tolist())))
+        f.write("".join(line + "\n" for line in solution.footer))
+
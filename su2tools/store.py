@@ -0,0 +1,272 @@
+"""
+Content-addressed storage for the mesh corpus.
+
+Many test cases ship byte-identical meshes (e.g. ``mesh_NACA0012_inv.su2`` is stored in half a
+dozen folders). A store keeps one blob per distinct file, named by its SHA-256 digest, next to a
+manifest that maps every case path to its blob. Cases are materialized from the store with
+reflinks or hardlinks, so duplicated meshes cost their size only once on disk.
+
+Store layout::
+
+    <store>/manifest.json
+    <store>/objects/<digest[:2]>/<digest>
+"""
+# Standard Python modules
+import argparse
+import fnmatch
+import json
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+# First party modules
+from .cache import file_digest
+
+MANIFEST = "manifest.json"
+DEFAULT_PATTERNS = ("*.su2", "*.cgns")
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Linux ioctl to share the extents of one file with another (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+
+
+def find_files(root, patterns=DEFAULT_PATTERNS, exclude=()):
+    """
+    Walk ``root`` and return the relative, '/'-separated paths of files matching ``patterns``.
+
+    Hidden directories (``.git``, ...) and the directories in ``exclude`` are skipped.
+    """
+    root = os.path.abspath(root)
+    exclude = {os.path.abspath(e) for e in exclude}
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames if not d.startswith(".") and os.path.join(dirpath, d) not in exclude
+        )
+        for name in sorted(filenames):
+            if any(fnmatch.fnmatch(name, p) for p in patterns):
+                found.append(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/"))
+    return found
+
+
+def scan(root, patterns=DEFAULT_PATTERNS, exclude=()):
+    """
+    Hash every matching file under ``root``.
+
+    Returns
+    -------
+    files : dict
+        Relative path -> {"digest": str, "size": int}.
+    """
+    files = {}
+    for rel in find_files(root, patterns, exclude):
+        path = os.path.join(root, rel)
+        files[rel] = {"digest": file_digest(path), "size": os.path.getsize(path)}
+    return files
+
+
+def duplicates(files):
+    """Group paths by digest, keeping only digests shared by more than one path."""
+    groups = {}
+    for rel, info in files.items():
+        groups.setdefault(info["digest"], []).append(rel)
+    return {d: paths for d, paths in groups.items() if len(paths) > 1}
+
+
+def blob_path(store, digest):
+    return os.path.join(store, "objects", digest[:2], digest)
+
+
+def read_manifest(store):
+    with open(os.path.join(store, MANIFEST)) as f:
+        return json.load(f)
+
+
+def write_manifest(store, files):
+    tmp = os.path.join(store, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": 1, "algorithm": "sha256", "files": files}, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, os.path.join(store, MANIFEST))
+
+
+def ingest(root, store, patterns=DEFAULT_PATTERNS):
+    """
+    Copy every matching file under ``root`` into the store and record it in the manifest.
+
+    Blobs that already exist are not copied again and are made read-only, since materialized
+    hardlinks share them. Entries already in the manifest for other paths are kept.
+
+    Returns
+    -------
+    files : dict
+        The manifest entries for the files found under ``root``.
+    """
+    os.makedirs(store, exist_ok=True)
+    files = scan(root, patterns, exclude=[store])
+    for rel, info in files.items():
+        blob = blob_path(store, info["digest"])
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp = blob + ".tmp"
+            shutil.copyfile(os.path.join(root, rel), tmp)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, blob)
+    manifest = {}
+    if os.path.exists(os.path.join(store, MANIFEST)):
+        manifest = read_manifest(store)["files"]
+    manifest.update(files)
+    write_manifest(store, manifest)
+    return files
+
+
+def resolve(store, rel, manifest=None):
+    """Return the blob that backs the case path ``rel``."""
+    manifest = manifest or read_manifest(store)
+    return blob_path(store, manifest["files"][rel.replace(os.sep, "/")]["digest"])
+
+
+def _reflink(src, dst):
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+
+
+def link_file(src, dst, mode="auto"):
+    """
+    Create ``dst`` from ``src`` without duplicating data where the filesystem allows it.
+
+    Parameters
+    ----------
+    src, dst : str
+        Source and destination file names. An existing ``dst`` is replaced.
+    mode : str
+        One of "reflink", "hardlink", "copy" or "auto" (try each in that order).
+
+    Returns
+    -------
+    used : str
+        The method that succeeded.
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"unknown link mode {mode!r}, expected one of {LINK_MODES}")
+    tmp = dst + ".tmp-link"
+    methods = ("reflink", "hardlink", "copy") if mode == "auto" else (mode,)
+    for method in methods:
+        try:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            if method == "reflink":
+                _reflink(src, tmp)
+            elif method == "hardlink":
+                os.link(src, tmp)
+            else:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+            return method
+        except OSError:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            if method == methods[-1]:
+                raise
+
+
+def materialize(store, dest, mode="auto", paths=None):
+    """
+    Recreate case files under ``dest`` from the store.
+
+    Parameters
+    ----------
+    store : str
+        The store directory.
+    dest : str
+        Destination root; case paths from the manifest are created below it.
+    mode : str
+        See :func:`link_file`.
+    paths : list of str, optional
+        Only materialize these case paths (default: all).
+
+    Returns
+    -------
+    counts : dict
+        Number of files created with each method.
+    """
+    files = read_manifest(store)["files"]
+    counts = {}
+    for rel in paths or sorted(files):
+        target = os.path.join(dest, rel)
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        used = link_file(blob_path(store, files[rel]["digest"]), target, mode)
+        counts[used] = counts.get(used, 0) + 1
+    return counts
+
+
+def link_duplicates(root, patterns=DEFAULT_PATTERNS, mode="hardlink"):
+    """
+    Replace duplicated files in a working tree by links to their first occurrence.
+
+    Returns
+    -------
+    saved : int
+        Number of bytes no longer stored twice.
+    """
+    files = scan(root, patterns)
+    saved = 0
+    for paths in duplicates(files).values():
+        first = os.path.join(root, paths[0])
+        for rel in paths[1:]:
+            target = os.path.join(root, rel)
+            if os.path.samefile(first, target):
+                continue
+            link_file(first, target, mode)
+            saved += files[rel]["size"]
+    return saved
+
+
+def report(files):
+    """Return a text summary of the duplicates in ``files``."""
+    total = sum(info["size"] for info in files.values())
+    unique = sum({info["digest"]: info["size"] for info in files.values()}.values())
+    lines = []
+    for digest, paths in sorted(duplicates(files).items(), key=lambda kv: -files[kv[1][0]]["size"] * len(kv[1])):
+        lines.append(f"{digest[:12]}  {files[paths[0]]['size']:>10d} B x {len(paths)}")
+        lines.extend(f"    {p}" for p in paths)
+    lines.append(f"{len(files)} files, {total / 1e6:.1f} MB; {unique / 1e6:.1f} MB after deduplication")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools dedup", description="Content-addressed mesh storage.")
+    parser.add_argument("--pattern", action="append", help="file patterns (default: *.su2, *.cgns)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("report", help="list duplicated files")
+    p.add_argument("root", nargs="?", default=".")
+    p = sub.add_parser("ingest", help="add files to a store and update its manifest")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--store", required=True)
+    p = sub.add_parser("materialize", help="recreate case files from a store")
+    p.add_argument("--store", required=True)
+    p.add_argument("--dest", required=True)
+    p.add_argument("--mode", choices=LINK_MODES, default="auto")
+    p = sub.add_parser("link", help="replace duplicates in a tree by links")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--mode", choices=LINK_MODES, default="hardlink")
+    args = parser.parse_args(argv)
+    patterns = tuple(args.pattern) if args.pattern else DEFAULT_PATTERNS
+
+    if args.command == "report":
+        print(report(scan(args.root, patterns)))
+    elif args.command == "ingest":
+        files = ingest(args.root, args.store, patterns)
+        print(f"{len(files)} files, {len(set(i['digest'] for i in files.values()))} blobs in {args.store}")
+    elif args.command == "materialize":
+        counts = materialize(args.store, args.dest, args.mode)
+        print(", ".join(f"{n} by {method}" for method, n in counts.items()))
+    elif args.command == "link":
+        saved = link_duplicates(args.root, patterns, args.mode)
+        print(f"{saved / 1e6:.1f} MB of duplicates linked")
@@ -0,0 +1,331 @@
+"""
+Reader for Tecplot ASCII data files (``.plt``, and ``.dat`` files with a Tecplot header), such
+as the gradient files of SU2 (``of_grad_cd.plt``) and experimental data
+(``RAE2822_case9_experimental.plt``).
+
+The file is read as bytes and split once into header lines (TITLE, VARIABLES, ZONE and the
+other records that start with a letter) and numeric blocks. The header records are tokenized
+into keyword/value pairs, and every zone's numeric block is parsed with a single NumPy call,
+commas included, then shaped from the zone header:
+
+- ordered zones (``I``, ``J``, ``K``) and finite-element zones (``N``, ``E``, ``ZONETYPE``
+  or ``ET``) in POINT or BLOCK data packing;
+- the element connectivity of finite-element zones, made 0-based;
+- without a ZONE record (or without point counts), every value up to the next record.
+
+Only node-located variables are supported. The zones are returned as a dict of
+(npoint, nvariable) arrays keyed by the zone title.
+
+The arrays can be cached next to the file (``file.plt`` -> ``file.plt.tecplot``) and are
+reused as long as the size and modification time of the file are unchanged.
+"""
+# Standard Python modules
+import argparse
+import re
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .cache import file_stamp, load_bundle, read_sidecar_meta, save_bundle, save_quietly
+from .reader import _WHITESPACE
+from .store import find_files
+
+TECPLOT_SUFFIX = ".tecplot"
+TECPLOT_VERSION = 1
+
+# Nodes per element of the finite-element zone types
+ZONE_TYPES = {
+    "FELINESEG": 2,
+    "FETRIANGLE": 3,
+    "FEQUADRILATERAL": 4,
+    "FETETRAHEDRON": 4,
+    "FEBRICK": 8,
+}
+_ELEMENT_TYPES = {"LINESEG": "FELINESEG", "TRIANGLE": "FETRIANGLE", "QUADRILATERAL": "FEQUADRILATERAL"}
+_ELEMENT_TYPES.update({"TETRAHEDRON": "FETETRAHEDRON", "BRICK": "FEBRICK"})
+
+# Lines that start with a letter, '#' or a quote are records (or comments), the others are data
+_RECORD_LINE = re.compile(rb'^[ \t]*[A-Za-z#"].*$', re.M)
+_RECORD = re.compile(r"^\s*(TITLE|VARIABLES|ZONE|TEXT|GEOMETRY|AUXDATA|DATASETAUXDATA|VARAUXDATA)\b", re.I)
+_COMMENT_LINE = re.compile(rb"^[ \t]*#.*$", re.M)
+_PAIR = re.compile(r'(\w+)\s*=\s*("[^"]*"|\([^)]*\)|[^,\s]+)')
+_COMMA = bytes.maketrans(b",", b" ")
+
+
+class TecplotData:
+    """
+    Contents of a Tecplot ASCII file.
+
+    Attributes
+    ----------
+    title : str
+    variables : list of str
+    zones : dict
+        (npoint, nvariable) array of every zone, keyed by the zone title ("zone 1", ...
+        for zones without one).
+    shapes : dict
+        (I, J, K) of ordered zones.
+    elements : dict
+        (nelem, nnode) 0-based connectivity of finite-element zones.
+    """
+
+    def __init__(self, title, variables, zones, shapes=None, elements=None):
+        self.title = title
+        self.variables = list(variables)
+        self.zones = zones
+        self.shapes = shapes or {}
+        self.elements = elements or {}
+
+    def __repr__(self):
+        zones = ", ".join(f"{t!r}: {len(v)}" for t, v in self.zones.items())
+        return f"TecplotData(variables={self.variables}, zones={{{zones}}})"
+
+    @property
+    def values(self):
+        """Values of all zones, stacked."""
+        if not self.zones:
+            return np.zeros((0, len(self.variables)))
+        return np.concatenate(list(self.zones.values()))
+
+    def column(self, name, zone=None):
+        """Values of a variable, in one zone or stacked over all zones."""
+        i = self.variables.index(name)
+        return (self.zones[zone] if zone is not None else self.values)[:, i]
+
+
+def _pairs(text):
+    """Upper-case keyword/value pairs of a record, with quotes removed."""
+    return {key.upper(): value.strip('"') for key, value in _PAIR.findall(text)}
+
+
+def _variable_names(text):
+    """Names of a VARIABLES record (the text after ``VARIABLES``)."""
+    text = text.split("=", 1)[1] if "=" in text else text
+    names = re.findall(r'"([^"]*)"', text)
+    return names if names else [name for name in re.split(r"[,\s]+", text) if name]
+
+
+def _records(buf):
+    """
+    Split a file into records and numeric blocks.
+
+    Returns
+    -------
+    records : list of (str, str)
+        Record keyword and text (continuation lines included), in file order.
+    blocks : list of (int, int)
+        Byte range of the numeric data that follows each record.
+    """
+    records = []
+    bounds = []
+    for match in _RECORD_LINE.finditer(buf):
+        line = match.group().decode(errors="replace")
+        if line.lstrip().startswith("#"):
+            continue
+        record = _RECORD.match(line)
+        if record:
+            records.append([record.group(1).upper(), line])
+            bounds.append([match.start(), match.end() + 1])
+        elif records:
+            # Continuation of a record spread over several lines (VARIABLES, ZONE)
+            records[-1][1] += "\n" + line
+            bounds[-1][1] = match.end() + 1
+    blocks = [(end, bounds[i + 1][0] if i + 1 < len(bounds) else len(buf)) for i, (_, end) in enumerate(bounds)]
+    return [tuple(r) for r in records], blocks
+
+
+def _parse_numbers(text, path):
+    """All the numbers of a block, separated by whitespace or commas."""
+    text = text.translate(_COMMA)
+    space = _WHITESPACE[np.frombuffer(text, dtype=np.uint8)]
+    ntoken = int(np.count_nonzero(~space[1:] & space[:-1])) + int(len(space) > 0 and not space[0])
+    try:
+        values = np.fromstring(text, dtype=np.float64, sep=" ")
+    except ValueError:
+        values = None
+    if values is None or len(values) != ntoken:
+        raise ValueError(f"{path}: non-numeric data found inside a numeric block")
+    return values
+
+
+def _zone_arrays(header, values, nvar, path):
+    """Point values, shape and connectivity of one zone from its header pairs and its numbers."""
+    zonetype = header.get("ZONETYPE", "").upper()
+    packing = header.get("DATAPACKING", header.get("F", "POINT")).upper()
+    if "ET" in header:
+        zonetype = _ELEMENT_TYPES.get(header["ET"].upper(), header["ET"].upper())
+    if "VARLOCATION" in header and "CELLCENTERED" in header["VARLOCATION"].upper():
+        raise ValueError(f"{path}: cell-centered variables are not supported")
+    shape = None
+    elements = None
+    if zonetype in ZONE_TYPES:
+        npoint = int(header.get("N", header.get("NODES", 0)))
+        nelem = int(header.get("E", header.get("ELEMENTS", 0)))
+        nnode = ZONE_TYPES[zonetype]
+        if len(values) != npoint * nvar + nelem * nnode:
+            raise ValueError(f"{path}: expected {npoint} points and {nelem} elements, found {len(values)} values")
+        elements = values[npoint * nvar :].astype(np.int64).reshape(nelem, nnode) - 1
+        values = values[: npoint * nvar]
+    elif zonetype not in ("", "ORDERED"):
+        raise ValueError(f"{path}: unsupported zone type {zonetype}")
+    elif "I" in header:
+        shape = tuple(int(header.get(k, 1)) for k in ("I", "J", "K"))
+        npoint = int(np.prod(shape))
+        if len(values) != npoint * nvar:
+            raise ValueError(f"{path}: expected {npoint} points of {nvar} variables, found {len(values)} values")
+    else:
+        if len(values) % max(nvar, 1):
+            raise ValueError(f"{path}: {len(values)} values is not a multiple of {nvar} variables")
+        npoint = len(values) // max(nvar, 1)
+    if packing.endswith("BLOCK"):
+        points = values.reshape(nvar, npoint).T.copy()
+    else:
+        points = values.reshape(npoint, nvar)
+    return points, shape, elements
+
+
+def parse_tecplot(buf, path=None):
+    """Parse the bytes of a Tecplot ASCII file into a :class:`TecplotData`."""
+    if buf[:5] == b"#!TDV":
+        raise ValueError(f"{path}: binary Tecplot files are not supported")
+    title = ""
+    variables = []
+    zones = {}
+    shapes = {}
+    elements = {}
+    header = None
+    records, blocks = _records(buf)
+    for (keyword, text), (start, end) in zip(records, blocks):
+        if keyword == "TITLE":
+            title = _pairs(text).get("TITLE", "")
+        elif keyword == "VARIABLES":
+            variables = _variable_names(text)
+        elif keyword == "ZONE":
+            header = _pairs(text)
+        block = buf[start:end]
+        if b"#" in block:
+            block = _COMMENT_LINE.sub(b"", block)
+        # The data that follows TEXT and GEOMETRY records belongs to them
+        if keyword in ("TEXT", "GEOMETRY") or not block.strip():
+            continue
+        values = _parse_numbers(block, path)
+        points, shape, conn = _zone_arrays(header or {}, values, len(variables), path)
+        name = (header or {}).get("T") or f"zone {len(zones) + 1}"
+        while name in zones:
+            name += "'"
+        zones[name] = points
+        if shape is not None:
+            shapes[name] = shape
+        if conn is not None:
+            elements[name] = conn
+        header = None
+    return TecplotData(title, variables, zones, shapes, elements)
+
+
+def read_tecplot(path):
+    """Read a Tecplot ASCII file into a :class:`TecplotData`."""
+    with open(path, "rb") as f:
+        return parse_tecplot(f.read(), path)
+
+
+def read_table(path):
+    """
+    Read a single-table Tecplot file, e.g. a gradient file of SU2.
+
+    Returns
+    -------
+    names : list of str
+        Variable names, including the first (index) column, e.g. "VARIABLE".
+    values : ndarray
+        (nrow, nvariable) values of all zones, stacked.
+    """
+    data = read_tecplot(path)
+    if not data.variables:
+        raise ValueError(f"{path} has no VARIABLES header")
+    return data.variables, data.values
+
+
+def tecplot_path(path):
+    return path + TECPLOT_SUFFIX
+
+
+def save_tecplot(path, data, filename=None):
+    """Write the arrays of a Tecplot file to its sidecar cache."""
+    arrays = {}
+    zones = []
+    for i, (name, values) in enumerate(data.zones.items()):
+        arrays[f"z{i}/values"] = values
+        if name in data.elements:
+            arrays[f"z{i}/elements"] = data.elements[name]
+        zones.append({"title": name, "shape": data.shapes.get(name), "elements": name in data.elements})
+    meta = {
+        "kind": "tecplot",
+        "version": TECPLOT_VERSION,
+        **file_stamp(path),
+        "title": data.title,
+        "variables": data.variables,
+        "zones": zones,
+    }
+    save_bundle(filename or tecplot_path(path), arrays, meta)
+
+
+def read_cached_tecplot(path, filename=None):
+    """Read the sidecar cache of a Tecplot file, or return None if it is missing or stale."""
+    filename = filename or tecplot_path(path)
+    if read_sidecar_meta(filename, "tecplot", TECPLOT_VERSION, path) is None:
+        return None
+    arrays, meta = load_bundle(filename)
+    zones = {z["title"]: arrays[f"z{i}/values"] for i, z in enumerate(meta["zones"])}
+    shapes = {z["title"]: tuple(z["shape"]) for z in meta["zones"] if z["shape"]}
+    elements = {z["title"]: arrays[f"z{i}/elements"] for i, z in enumerate(meta["zones"]) if z["elements"]}
+    return TecplotData(meta["title"], meta["variables"], zones, shapes, elements)
+
+
+def load_tecplot(path, write=True):
+    """
+    Read a Tecplot file, from its sidecar cache when it is up to date.
+
+    Parameters
+    ----------
+    path : str
+    write : bool
+        Write the cache when the file had to be parsed. Errors while writing are ignored.
+
+    Returns
+    -------
+    data : TecplotData
+    cached : bool
+        True if the arrays were read from the cache.
+    """
+    data = read_cached_tecplot(path)
+    if data is not None:
+        return data, True
+    data = read_tecplot(path)
+    if write:
+        save_quietly(save_tecplot, path, data)
+    return data, False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools tecplot", description="Read Tecplot ASCII files.")
+    parser.add_argument("paths", nargs="*", help=".plt files (default: every .plt file under the current directory)")
+    parser.add_argument("--cache", action="store_true", help="read and write the binary sidecar caches")
+    args = parser.parse_args(argv)
+    paths = args.paths or find_files(".", ("*.plt",))
+    total = 0.0
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            data, cached = load_tecplot(path) if args.cache else (read_tecplot(path), False)
+        except ValueError as e:
+            print(f"{path}: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        zones = ", ".join(f"{name} {len(values)}" for name, values in data.zones.items())
+        source = "cache" if cached else "text"
+        print(f"{path}: {len(data.variables)} variables, zones {zones} ({source}, {elapsed * 1e3:.2f} ms)")
+    print(f"{len(paths)} files in {total * 1e3:.1f} ms")
+    return 0
@@ -0,0 +1,218 @@
+"""
+Connectivity derived from the element CSR arrays: element faces and edges, the element dual
+graph, the point graph and connected components.
+
+Everything is computed with whole-array operations over all elements of a type at once.
+Faces are stored as rows of four node indices, padded with -1 for triangles (3D) and lines
+(2D), so that faces of every element type can be sorted and matched together.
+"""
+# External modules
+import numpy as np
+
+# First party modules
+from .mesh import HEXAHEDRON, LINE, PRISM, PYRAMID, QUADRILATERAL, TETRAHEDRON, TRIANGLE
+
+# Local node indices of the faces of each element type, ordered so that the normal given by
+# the right-hand rule points out of a positively oriented element
+ELEM_FACES = {
+    LINE: [(0,), (1,)],
+    TRIANGLE: [(0, 1), (1, 2), (2, 0)],
+    QUADRILATERAL: [(0, 1), (1, 2), (2, 3), (3, 0)],
+    TETRAHEDRON: [(0, 2, 1), (0, 1, 3), (1, 2, 3), (0, 3, 2)],
+    HEXAHEDRON: [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)],
+    PRISM: [(0, 1, 2), (3, 5, 4), (0, 3, 4, 1), (1, 4, 5, 2), (2, 5, 3, 0)],
+    PYRAMID: [(0, 3, 2, 1), (0, 1, 4), (1, 2, 4), (2, 3, 4), (3, 0, 4)],
+}
+
+FACE_WIDTH = 4
+
+# Local node indices of the edges of each element type
+ELEM_EDGES = {
+    LINE: [(0, 1)],
+    TRIANGLE: [(0, 1), (1, 2), (2, 0)],
+    QUADRILATERAL: [(0, 1), (1, 2), (2, 3), (3, 0)],
+    TETRAHEDRON: [(0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3)],
+    HEXAHEDRON: [(0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7)],
+    PRISM: [(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (0, 3), (1, 4), (2, 5)],
+    PYRAMID: [(0, 1), (1, 2), (2, 3), (3, 0), (0, 4), (1, 4), (2, 4), (3, 4)],
+}
+
+
+def element_faces(elem_types, elem_offsets, elem_conn):
+    """
+    List the faces of every element.
+
+    Returns
+    -------
+    faces : ndarray
+        (nface, 4) node indices of each face, padded with -1.
+    face_elem : ndarray
+        Element of each face.
+    """
+    faces = []
+    owners = []
+    for etype, templates in ELEM_FACES.items():
+        elems = np.flatnonzero(elem_types == etype)
+        if len(elems) == 0:
+            continue
+        start = elem_offsets[elems]
+        for local in templates:
+            f = np.full((len(elems), FACE_WIDTH), -1, dtype=np.int64)
+            f[:, : len(local)] = elem_conn[start[:, None] + np.asarray(local)]
+            faces.append(f)
+            owners.append(elems)
+    if not faces:
+        return np.zeros((0, FACE_WIDTH), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(faces), np.concatenate(owners)
+
+
+def match_faces(faces):
+    """
+    Find faces that share the same set of nodes.
+
+    Returns
+    -------
+    pairs : ndarray
+        (npair, 2) indices into ``faces`` of each matched pair (interior faces).
+    single : ndarray
+        Indices of the faces that appear only once (boundary faces).
+    """
+    key = np.sort(faces, axis=1)
+    order = np.lexsort(key.T[::-1])
+    key = key[order]
+    same = np.all(key[1:] == key[:-1], axis=1)
+    first = np.flatnonzero(same)
+    pairs = np.column_stack([order[first], order[first + 1]])
+    paired = np.zeros(len(faces), dtype=bool)
+    paired[first] = paired[first + 1] = True
+    return pairs, order[~paired]
+
+
+def csr_from_pairs(n, a, b, weights=None):
+    """
+    Symmetric CSR adjacency of ``n`` vertices from the undirected edges ``(a[i], b[i])``.
+
+    Returns
+    -------
+    xadj, adjncy, adjwgt : ndarray
+        Row offsets, neighbors and edge weights (1 where ``weights`` is not given).
+    """
+    weights = np.ones(len(a), dtype=np.int64) if weights is None else weights
+    src = np.concatenate([a, b])
+    dst = np.concatenate([b, a])
+    w = np.concatenate([weights, weights])
+    order = np.lexsort((dst, src))
+    xadj = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=xadj[1:])
+    return xadj, dst[order].astype(np.int64), w[order]
+
+
+def connected_components(n, a, b):
+    """
+    Connected components of ``n`` vertices joined by the undirected edges ``(a[i], b[i])``.
+
+    Returns
+    -------
+    labels : ndarray
+        Smallest vertex index of the component of each vertex.
+    """
+    labels = np.arange(n)
+    while True:
+        # Hook the root of every edge end onto the smaller root, then compress the trees
+        la = labels[a]
+        lb = labels[b]
+        differ = la != lb
+        if not differ.any():
+            return labels
+        low = np.minimum(la[differ], lb[differ])
+        np.minimum.at(labels, la[differ], low)
+        np.minimum.at(labels, lb[differ], low)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def dual_graph(zone):
+    """
+    Element dual graph of a zone: two elements are neighbors if they share a face.
+
+    Returns
+    -------
+    xadj, adjncy : ndarray
+        CSR adjacency of the elements.
+    """
+    faces, face_elem = element_faces(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+    pairs, _ = match_faces(faces)
+    xadj, adjncy, _ = csr_from_pairs(zone.nelem, face_elem[pairs[:, 0]], face_elem[pairs[:, 1]])
+    return xadj, adjncy
+
+
+def element_edges(elem_types, elem_offsets, elem_conn):
+    """
+    Unique edges of a set of elements.
+
+    Returns
+    -------
+    edges : ndarray
+        (nedge, 2) point indices of each edge, smaller index first, sorted.
+    """
+    edges = []
+    for etype, templates in ELEM_EDGES.items():
+        elems = np.flatnonzero(elem_types == etype)
+        if len(elems):
+            local = np.asarray(templates)
+            edges.append(elem_conn[elem_offsets[elems][:, None, None] + local].reshape(-1, 2))
+    if not edges:
+        return np.zeros((0, 2), dtype=np.int64)
+    edges = np.sort(np.concatenate(edges).astype(np.int64), axis=1)
+    n = int(edges.max()) + 1
+    key = np.unique(edges[:, 0] * n + edges[:, 1])
+    return np.column_stack([key // n, key % n])
+
+
+def point_graph(zone):
+    """
+    Point adjacency of a zone along element edges.
+
+    Returns
+    -------
+    xadj, adjncy : ndarray
+        CSR adjacency of the points.
+    """
+    edges = element_edges(zone.elem_types, zone.elem_offsets, zone.elem_conn)
+    xadj, adjncy, _ = csr_from_pairs(zone.npoin, edges[:, 0], edges[:, 1])
+    return xadj, adjncy
+
+
+def take_elements(elem_types, elem_offsets, elem_conn, elems):
+    """
+    Select (and reorder) elements of a CSR element set.
+
+    Returns
+    -------
+    types, offsets, conn : ndarray
+        CSR arrays of the elements ``elems``, in that order.
+    """
+    nnode = np.diff(elem_offsets)[elems]
+    offsets = np.zeros(len(elems) + 1, dtype=np.int64)
+    np.cumsum(nnode, out=offsets[1:])
+    take = np.repeat(elem_offsets[elems] - offsets[:-1], nnode) + np.arange(offsets[-1])
+    return elem_types[elems], offsets, elem_conn[take]
+
+
+def node_elements(zone):
+    """
+    Elements around each point, in CSR form.
+
+    Returns
+    -------
+    offsets, elems : ndarray
+        ``elems[offsets[p]:offsets[p + 1]]`` are the elements that contain point ``p``.
+    """
+    owner = np.repeat(np.arange(zone.nelem), np.diff(zone.elem_offsets))
+    order = np.argsort(zone.elem_conn, kind="stable")
+    offsets = np.zeros(zone.npoin + 1, dtype=np.int64)
+    np.cumsum(np.bincount(zone.elem_conn, minlength=zone.npoin), out=offsets[1:])
+    return offsets, owner[order]
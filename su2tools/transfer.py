@@ -0,0 +1,276 @@
+"""
+Transfer of point solutions between meshes of the same geometry.
+
+The source elements are split into triangles (2D) or tetrahedra (3D). Every target point is
+located in a source simplex in two vectorized passes: the simplices around the closest source
+point (from a k-d tree) are tried first, and points that are not inside any of them walk from
+the best candidate towards the face with the most negative barycentric coordinate. Inside a
+simplex the solution is interpolated with barycentric weights, which reproduces linear fields
+exactly; target points outside the source domain (e.g. on a finer discretization of a curved
+wall) take the value of the closest source point.
+"""
+# Standard Python modules
+import argparse
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .kdtree import KDTree
+from .mesh import (
+    ELEM_DIMS,
+    HEXAHEDRON,
+    PRISM,
+    PYRAMID,
+    QUADRILATERAL,
+    TETRAHEDRON,
+    TRIANGLE,
+)
+from .reader import read_mesh
+from .solution import COORD_NAMES, Solution, read_solution, write_solution
+from .topology import match_faces
+
+# Local node indices of the simplices each element type is split into
+SIMPLICES = {
+    TRIANGLE: [(0, 1, 2)],
+    QUADRILATERAL: [(0, 1, 2), (0, 2, 3)],
+    TETRAHEDRON: [(0, 1, 2, 3)],
+    HEXAHEDRON: [(0, 1, 2, 6), (0, 2, 3, 6), (0, 3, 7, 6), (0, 7, 4, 6), (0, 4, 5, 6), (0, 5, 1, 6)],
+    PRISM: [(0, 1, 2, 5), (0, 1, 5, 4), (0, 4, 5, 3)],
+    PYRAMID: [(0, 1, 2, 4), (0, 2, 3, 4)],
+}
+
+# Smallest barycentric coordinate still counted as inside a simplex
+INSIDE_TOLERANCE = 1e-10
+WALK_STEPS = 256
+
+# Closest source points tried as new starting points when a walk gets stuck
+RESTART_POINTS = 16
+
+
+def split_simplices(zone):
+    """
+    Split the volume elements of a zone into simplices.
+
+    Returns
+    -------
+    simplices : ndarray
+        (nsimplex, ndime + 1) point indices of each simplex.
+    simplex_elem : ndarray
+        Element each simplex comes from.
+    """
+    simplices = [np.zeros((0, zone.ndime + 1), dtype=np.int64)]
+    owners = [np.zeros(0, dtype=np.int64)]
+    for etype, templates in SIMPLICES.items():
+        if ELEM_DIMS[etype] != zone.ndime:
+            continue
+        elems = np.flatnonzero(zone.elem_types == etype)
+        if len(elems) == 0:
+            continue
+        nodes = zone.elem_conn[zone.elem_offsets[elems][:, None, None] + np.asarray(templates)]
+        simplices.append(nodes.reshape(-1, zone.ndime + 1).astype(np.int64))
+        owners.append(np.repeat(elems, len(templates)))
+    return np.concatenate(simplices), np.concatenate(owners)
+
+
+class PointLocator:
+    """
+    Point-location index over the simplices of a source zone.
+
+    Attributes
+    ----------
+    simplices : ndarray
+        (nsimplex, ndime + 1) point indices of each simplex.
+    neighbors : ndarray
+        (nsimplex, ndime + 1) simplex across the face opposite each vertex (-1 on the boundary
+        and across faces that are split differently on both sides).
+    tree : KDTree
+        Tree over the source points.
+    """
+
+    def __init__(self, zone):
+        self.zone = zone
+        self.simplices, self.simplex_elem = split_simplices(zone)
+        nsimplex, nvertex = self.simplices.shape
+        coords = zone.coords
+
+        # (x - v0) @ inverse gives the barycentric coordinates of vertices 1..ndime
+        edges = coords[self.simplices[:, 1:]] - coords[self.simplices[:, :1]]
+        det = np.linalg.det(edges) if nsimplex else np.zeros(0)
+        scale = np.abs(edges).max(axis=(1, 2)) if nsimplex else np.zeros(0)
+        self._degenerate = np.abs(det) <= 1e-14 * scale**zone.ndime
+        edges[self._degenerate] = np.eye(zone.ndime)
+        self._inverse = np.linalg.inv(edges)
+
+        faces = np.full((nsimplex * nvertex, 4), -1, dtype=np.int64)
+        for i in range(nvertex):
+            faces[i::nvertex, : nvertex - 1] = np.delete(self.simplices, i, axis=1)
+        pairs, _ = match_faces(faces)
+        self.neighbors = np.full(nsimplex * nvertex, -1, dtype=np.int64)
+        self.neighbors[pairs[:, 0]] = pairs[:, 1] // nvertex
+        self.neighbors[pairs[:, 1]] = pairs[:, 0] // nvertex
+        self.neighbors = self.neighbors.reshape(nsimplex, nvertex)
+
+        owner = np.repeat(np.arange(nsimplex), nvertex)
+        order = np.argsort(self.simplices.ravel(), kind="stable")
+        self._node_offsets = np.zeros(zone.npoin + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.simplices.ravel(), minlength=zone.npoin), out=self._node_offsets[1:])
+        self._node_simplices = owner[order]
+        self.tree = KDTree(coords)
+
+    def barycentric(self, simplices, x):
+        """Barycentric coordinates of the points ``x`` in ``simplices`` (NaN for degenerate ones)."""
+        lam = np.einsum("nd,nde->ne", x - self.zone.coords[self.simplices[simplices, 0]], self._inverse[simplices])
+        lam = np.column_stack([1 - lam.sum(axis=1), lam])
+        lam[self._degenerate[simplices]] = np.nan
+        return lam
+
+    def _start(self, x, queries, points, simplex, weights, score):
+        """Move each query to the best simplex around ``points`` if it beats its current one."""
+        counts = self._node_offsets[points + 1] - self._node_offsets[points]
+        query = np.repeat(queries, counts)
+        first = np.cumsum(counts) - counts
+        take = np.repeat(self._node_offsets[points] - first, counts) + np.arange(counts.sum())
+        candidate = self._node_simplices[take]
+        lam = self.barycentric(candidate, x[query])
+        candidate_score = np.nan_to_num(lam.min(axis=1), nan=-np.inf)
+        order = np.lexsort((-candidate_score, query))
+        best = order[np.searchsorted(query[order], np.unique(query))]
+        best = best[candidate_score[best] > score[query[best]]]
+        simplex[query[best]] = candidate[best]
+        weights[query[best]] = lam[best]
+        score[query[best]] = candidate_score[best]
+
+    def _walk(self, x, simplex, weights, score):
+        """
+        Walk the points that are not inside their simplex across the interior face with the most
+        negative barycentric coordinate, until they are inside or no such face is left.
+        """
+        active = np.flatnonzero((score < -INSIDE_TOLERANCE) & (simplex >= 0))
+        for _ in range(WALK_STEPS):
+            if not len(active):
+                break
+            across = self.neighbors[simplex[active]]
+            lam = np.where(across >= 0, np.nan_to_num(weights[active], nan=np.inf), np.inf)
+            worst = np.argmin(lam, axis=1)
+            step = across[np.arange(len(active)), worst]
+            moving = lam[np.arange(len(active)), worst] < -INSIDE_TOLERANCE
+            active, step = active[moving], step[moving]
+            lam = self.barycentric(step, x[active])
+            simplex[active] = step
+            weights[active] = lam
+            score[active] = np.nan_to_num(lam.min(axis=1), nan=-np.inf)
+            active = active[score[active] < -INSIDE_TOLERANCE]
+
+    def locate(self, x):
+        """
+        Locate points in the source simplices.
+
+        Returns
+        -------
+        simplex : ndarray
+            Containing simplex of each point (-1 where none was found).
+        weights : ndarray
+            (npoint, ndime + 1) barycentric coordinates in that simplex.
+        nearest : ndarray
+            Closest source point of each point.
+        distance : ndarray
+            Distance to that point.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        m, nvertex = len(x), self.simplices.shape[1]
+        distance, nearest = self.tree.query(x)
+        simplex = np.full(m, -1, dtype=np.int64)
+        weights = np.full((m, nvertex), np.nan)
+        score = np.full(m, -np.inf)
+        self._start(x, np.arange(m), nearest, simplex, weights, score)
+        self._walk(x, simplex, weights, score)
+
+        # Walks that ended on a wall (the point lies behind it, seen from its closest point)
+        # start again from the best simplex around the next closest points
+        lo, hi = self.zone.coords.min(axis=0), self.zone.coords.max(axis=0)
+        stuck = np.flatnonzero((score < -INSIDE_TOLERANCE) & np.all((x >= lo) & (x <= hi), axis=1))
+        if len(stuck):
+            _, near = self.tree.query(x[stuck], RESTART_POINTS)
+            queries = np.repeat(stuck, RESTART_POINTS)
+            near = near.ravel()
+            valid = near < self.zone.npoin
+            self._start(x, queries[valid], near[valid], simplex, weights, score)
+            self._walk(x, simplex, weights, score)
+
+        outside = score < -INSIDE_TOLERANCE
+        simplex[outside] = -1
+        return simplex, weights, nearest, distance
+
+    def interpolation(self, x):
+        """
+        Interpolation stencil of the points ``x``.
+
+        Returns
+        -------
+        index : ndarray
+            (npoint, ndime + 1) source points of each target point.
+        weights : ndarray
+            (npoint, ndime + 1) weights: barycentric inside the source mesh, a single weight of
+            1 on the closest source point outside.
+        inside : ndarray
+            Whether each point was found inside a source simplex.
+        """
+        simplex, weights, nearest, _ = self.locate(x)
+        inside = simplex >= 0
+        index = np.repeat(nearest[:, None], self.simplices.shape[1], axis=1)
+        index[inside] = self.simplices[simplex[inside]]
+        weights = np.where(inside[:, None], weights, 0.0)
+        weights[~inside, 0] = 1.0
+        return index, weights, inside
+
+
+def transfer(source_zone, solution, target_zone, locator=None):
+    """
+    Interpolate a solution of ``source_zone`` onto the points of ``target_zone``.
+
+    Returns
+    -------
+    solution : Solution
+        Target solution, with the target coordinates and every field column interpolated.
+    stats : dict
+        Number of target points found inside the source mesh and interpolated from the closest
+        source point, and the largest distance to that point.
+    """
+    if solution.npoint != source_zone.npoin:
+        raise ValueError(f"the solution has {solution.npoint} points, the source mesh {source_zone.npoin}")
+    locator = locator or PointLocator(source_zone)
+    index, weights, inside = locator.interpolation(target_zone.coords)
+    fields = np.einsum("nk,nkf->nf", weights, solution.fields[index])
+    values = np.column_stack([target_zone.coords, fields])
+    names = list(COORD_NAMES[: target_zone.ndime]) + solution.field_names
+    distance = locator.tree.query(target_zone.coords[~inside])[0]
+    stats = {
+        "inside": int(inside.sum()),
+        "nearest": int((~inside).sum()),
+        "max_nearest_distance": float(distance.max(initial=0.0)),
+    }
+    return Solution(names, values, solution.footer), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools transfer", description="Interpolate a solution onto another mesh.")
+    parser.add_argument("source_mesh", help="mesh the solution was computed on")
+    parser.add_argument("solution", help="SU2 ASCII solution or restart file")
+    parser.add_argument("target_mesh", help="mesh to interpolate onto")
+    parser.add_argument("-o", "--output", required=True, help="solution file to write")
+    parser.add_argument("--zone", type=int, default=1, help="zone of both meshes (default: 1)")
+    args = parser.parse_args(argv)
+    source = {z.izone: z for z in read_mesh(args.source_mesh)}[args.zone]
+    target = {z.izone: z for z in read_mesh(args.target_mesh)}[args.zone]
+    start = time.perf_counter()
+    locator = PointLocator(source)
+    setup = time.perf_counter() - start
+    result, stats = transfer(source, read_solution(args.solution), target, locator)
+    elapsed = time.perf_counter() - start - setup
+    write_solution(args.output, result)
+    print(
+        f"{target.npoin} points: {stats['inside']} interpolated, {stats['nearest']} from the closest source point "
+        f"(up to {stats['max_nearest_distance']:.3e} away); index {setup:.2f} s, transfer {elapsed:.2f} s"
+    )
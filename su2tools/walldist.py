@@ -0,0 +1,381 @@
+"""
+Exact wall distance of every point of a mesh, for turbulence models.
+
+The faces of the wall markers (segments in 2D, triangles in 3D with quadrilaterals split in
+two) are put in a bounding volume hierarchy: the k-d tree of :mod:`su2tools.kdtree` built on
+the face centroids, with the node boxes enlarged to hold whole faces. The points are then
+processed in chunks, all points of a chunk at once and one tree level at a time, as in
+:meth:`su2tools.kdtree.KDTree.query`: the distance to the face with the closest centroid is
+an upper bound on the wall distance of each point, then every (point, node) pair whose box is
+closer than that bound is expanded down to the leaves, where the exact point-to-face
+distances are computed. Chunks are spread over worker processes.
+
+Which markers are walls is not stored in the mesh. Unless they are given, every marker whose
+tag does not look like a far-field, inlet, outlet, symmetry, axis or periodic boundary is taken as
+a wall.
+
+The distances are cached next to the mesh (``mesh.su2`` -> ``mesh.su2.walldist``) and reused
+as long as the size and modification time of the mesh and the wall markers are unchanged.
+"""
+# Standard Python modules
+import argparse
+import concurrent.futures
+import time
+
+# External modules
+import numpy as np
+
+# First party modules
+from .cache import file_stamp, load_bundle, read_sidecar_meta, save_bundle, save_quietly
+from .kdtree import KDTree, _box_distance
+from .mesh import LINE, QUADRILATERAL, TRIANGLE
+from .reader import read_mesh
+
+DISTANCE_SUFFIX = ".walldist"
+DISTANCE_VERSION = 1
+
+# Parts of marker tags (lower case) that are not walls
+NON_WALL_TAGS = (
+    "far",
+    "inlet",
+    "inflow",
+    "outlet",
+    "outflow",
+    "exit",
+    "sym",
+    "axis",
+    "periodic",
+    "riemann",
+    "send_receive",
+)
+
+# Points per chunk: bounds the memory of the (point, leaf) pairs
+CHUNK_POINTS = 8192
+LEAF_SIZE = 8
+
+# Local node indices of the simplices of each wall face type
+_WALL_SIMPLICES = {
+    LINE: [(0, 1)],
+    TRIANGLE: [(0, 1, 2)],
+    QUADRILATERAL: [(0, 1, 2), (0, 2, 3)],
+}
+
+
+def wall_markers(zone):
+    """Tags of the markers of ``zone`` that look like walls (see :data:`NON_WALL_TAGS`)."""
+    tags = []
+    for m in zone.markers:
+        if m.send_to is None and m.tag not in tags and not any(s in m.tag.lower() for s in NON_WALL_TAGS):
+            tags.append(m.tag)
+    return tags
+
+
+def wall_faces(zone, walls):
+    """
+    Simplices of the wall markers of a zone.
+
+    Returns
+    -------
+    vertices : ndarray
+        (nface, ndime, ndime) coordinates of the vertices of each segment (2D) or triangle (3D).
+    """
+    faces = [np.zeros((0, zone.ndime), dtype=np.int64)]
+    missing = set(walls) - {m.tag for m in zone.markers}
+    if missing:
+        raise ValueError(f"zone {zone.izone} has no marker {', '.join(sorted(missing))}")
+    for m in zone.markers:
+        if m.tag not in walls:
+            continue
+        for etype, templates in _WALL_SIMPLICES.items():
+            elems = np.flatnonzero(m.elem_types == etype)
+            if len(elems) and len(templates[0]) == zone.ndime:
+                nodes = m.elem_conn[m.elem_offsets[elems][:, None, None] + np.asarray(templates)]
+                faces.append(nodes.reshape(-1, zone.ndime))
+    return zone.coords[np.concatenate(faces)]
+
+
+def _segment_distance(p, a, b):
+    """Squared distance from points ``p`` to the segments ``[a, b]`` (row by row)."""
+    ab = b - a
+    length = np.einsum("nd,nd->n", ab, ab)
+    t = np.einsum("nd,nd->n", p - a, ab) / np.where(length > 0, length, 1.0)
+    d = p - a - np.clip(t, 0.0, 1.0)[:, None] * ab
+    return np.einsum("nd,nd->n", d, d)
+
+
+def _triangle_distance(p, a, b, c):
+    """
+    Squared distance from points ``p`` to the triangles ``abc``: to the plane when the projection
+    of the point falls inside the triangle, else to the closest edge.
+    """
+    v0, v1, v2 = b - a, c - a, p - a
+    d00 = np.einsum("nd,nd->n", v0, v0)
+    d01 = np.einsum("nd,nd->n", v0, v1)
+    d11 = np.einsum("nd,nd->n", v1, v1)
+    d20 = np.einsum("nd,nd->n", v2, v0)
+    d21 = np.einsum("nd,nd->n", v2, v1)
+    denom = d00 * d11 - d01 * d01
+    flat = denom <= 1e-14 * d00 * d11
+    denom = np.where(flat, 1.0, denom)
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    inside = ~flat & (v >= 0) & (w >= 0) & (v + w <= 1)
+    normal = np.cross(v0, v1)
+    plane = np.einsum("nd,nd->n", v2, normal) ** 2 / np.where(flat, 1.0, np.einsum("nd,nd->n", normal, normal))
+    edges = np.minimum(np.minimum(_segment_distance(p, a, b), _segment_distance(p, b, c)), _segment_distance(p, c, a))
+    return np.where(inside, plane, edges)
+
+
+def face_distance(p, vertices):
+    """Squared distance from points ``p`` to the faces ``vertices`` (row by row)."""
+    if vertices.shape[1] == 2:
+        return _segment_distance(p, vertices[:, 0], vertices[:, 1])
+    return _triangle_distance(p, vertices[:, 0], vertices[:, 1], vertices[:, 2])
+
+
+class FaceTree:
+    """
+    Bounding volume hierarchy over wall faces.
+
+    Parameters
+    ----------
+    vertices : ndarray
+        (nface, nvertex, dim) vertex coordinates of each face.
+    leaf_size : int
+        Largest number of faces in a leaf.
+    """
+
+    def __init__(self, vertices, leaf_size=LEAF_SIZE):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+        self.tree = KDTree(self.vertices.mean(axis=1), leaf_size)
+        if not len(self.vertices):
+            return
+        # Same nodes as the k-d tree, with boxes that hold the whole faces
+        starts = self.tree.leaf_bounds[:-1]
+        self._lo = [np.minimum.reduceat(self.vertices.min(axis=1)[self.tree.perm], starts)]
+        self._hi = [np.maximum.reduceat(self.vertices.max(axis=1)[self.tree.perm], starts)]
+        for _ in range(self.tree.depth):
+            self._lo.insert(0, np.minimum(self._lo[0][0::2], self._lo[0][1::2]))
+            self._hi.insert(0, np.maximum(self._hi[0][0::2], self._hi[0][1::2]))
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def _leaf_distance(self, queries, leaves, x):
+        """Smallest squared distance and closest face of ``x[queries]`` among the faces of ``leaves``."""
+        if not len(queries):
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        start = self.tree.leaf_bounds[leaves]
+        size = self.tree.leaf_bounds[leaves + 1] - start
+        slot = np.arange(int(size.max()))
+        valid = slot < size[:, None]
+        face = self.tree.perm[np.where(valid, start[:, None] + slot, start[:, None])]
+        dist = face_distance(np.repeat(x[queries], len(slot), axis=0), self.vertices[face.ravel()])
+        dist = np.where(valid, dist.reshape(face.shape), np.inf)
+        best = np.argmin(dist, axis=1)
+        rows = np.arange(len(queries))
+        return dist[rows, best], face[rows, best]
+
+    def query(self, x):
+        """
+        Distance from every point of ``x`` to the closest face.
+
+        Returns
+        -------
+        dist : ndarray
+            Distances (inf if there are no faces).
+        face : ndarray
+            Index of the closest face (``len(self)`` if there are no faces).
+        """
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        m = len(x)
+        dist = np.full(m, np.inf)
+        face = np.full(m, len(self), dtype=np.int64)
+        if not m or not len(self):
+            return dist, face
+        queries = np.arange(m)
+        # The face with the closest centroid gives an upper bound
+        _, face = self.tree.query(x)
+        dist = face_distance(x, self.vertices[face])
+
+        # Expand every (point, node) pair whose box may hold a closer face
+        node = np.zeros(m, dtype=np.int64)
+        for level in range(1, self.tree.depth + 1):
+            queries = np.repeat(queries, 2)
+            node = np.stack([2 * node, 2 * node + 1], axis=1).ravel()
+            keep = _box_distance(x[queries], self._lo[level][node], self._hi[level][node]) < dist[queries]
+            queries, node = queries[keep], node[keep]
+        d, f = self._leaf_distance(queries, node, x)
+        order = np.lexsort((d, queries))
+        first = order[np.unique(queries[order], return_index=True)[1]]
+        closer = d[first] < dist[queries[first]]
+        dist[queries[first[closer]]] = d[first[closer]]
+        face[queries[first[closer]]] = f[first[closer]]
+        return np.sqrt(dist), face
+
+
+# Tree of the worker processes, set once per process by _init_worker
+_worker_tree = None
+
+
+def _init_worker(vertices):
+    global _worker_tree
+    _worker_tree = FaceTree(vertices)
+
+
+def _query_chunk(x):
+    return _worker_tree.query(x)
+
+
+def wall_distance(zone, walls=None, workers=1, chunk_points=CHUNK_POINTS):
+    """
+    Distance from every point of a zone to its walls.
+
+    Parameters
+    ----------
+    zone : Zone
+    walls : list of str, optional
+        Wall marker tags (default: :func:`wall_markers`).
+    workers : int, optional
+        Worker processes for the chunks of points (None: one per CPU; 1: in this process).
+    chunk_points : int
+        Points per chunk.
+
+    Returns
+    -------
+    distance : ndarray
+        Wall distance of every point (inf if the zone has no wall).
+    face : ndarray
+        Index of the closest wall face, in the order of :func:`wall_faces`.
+    """
+    walls = wall_markers(zone) if walls is None else walls
+    vertices = wall_faces(zone, walls)
+    chunks = [zone.coords[i : i + chunk_points] for i in range(0, zone.npoin, chunk_points)]
+    if workers == 1 or len(chunks) <= 1:
+        tree = FaceTree(vertices)
+        results = [tree.query(x) for x in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(vertices,)) as pool:
+            results = list(pool.map(_query_chunk, chunks))
+    if not results:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def _zone_walls(mesh, walls):
+    """The tags of ``walls`` that are markers of each zone."""
+    return [[t for t in walls if t in {m.tag for m in zone.markers}] for zone in mesh]
+
+
+def mesh_distances(mesh, walls=None, workers=1):
+    """
+    Wall distances of every zone of a mesh.
+
+    ``walls`` is either None (guess the walls of each zone) or a list of wall tags per zone.
+
+    Returns
+    -------
+    walls : list of list of str
+    distances : list of (distance, face)
+    """
+    walls = walls or [wall_markers(zone) for zone in mesh]
+    return walls, [wall_distance(zone, w, workers) for zone, w in zip(mesh, walls)]
+
+
+def distance_path(path):
+    return path + DISTANCE_SUFFIX
+
+
+def save_distances(path, walls, distances, filename=None):
+    """Write the wall distances of the zones of ``path`` to its distance file."""
+    arrays = {}
+    for i, (distance, face) in enumerate(distances):
+        arrays[f"z{i}/distance"] = distance
+        arrays[f"z{i}/face"] = face
+    meta = {"kind": "walldist", "version": DISTANCE_VERSION, **file_stamp(path), "walls": walls}
+    save_bundle(filename or distance_path(path), arrays, meta)
+
+
+def read_distances(path, walls=None, filename=None):
+    """
+    Read the cached wall distances of ``path``, or return None if they are missing, stale or
+    for other wall markers (``walls`` None accepts any).
+
+    Returns
+    -------
+    walls : list of list of str
+        Wall markers of each zone.
+    distances : list of (distance, face)
+    """
+    filename = filename or distance_path(path)
+    meta = read_sidecar_meta(filename, "walldist", DISTANCE_VERSION, path)
+    if meta is None or walls is not None and meta["walls"] != walls:
+        return None
+    arrays, meta = load_bundle(filename)
+    return meta["walls"], [(arrays[f"z{i}/distance"], arrays[f"z{i}/face"]) for i in range(len(meta["walls"]))]
+
+
+def mesh_wall_distance(path, walls=None, workers=1, write=True):
+    """
+    Wall distances of every zone of a mesh file, from its cache when it is up to date.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .su2 file.
+    walls : list of str, optional
+        Wall marker tags, used in every zone that has them (default: :func:`wall_markers`).
+    workers : int, optional
+        Worker processes (see :func:`wall_distance`).
+    write : bool
+        Write the distance file when it had to be computed. Errors while writing are ignored.
+
+    Returns
+    -------
+    walls : list of list of str
+        Wall markers of each zone.
+    distances : list of (distance, face)
+        See :func:`wall_distance`, one pair per zone.
+    cached : bool
+        True if the distances were read from the cache.
+    """
+    mesh = None
+    if walls is not None:
+        # The cache key is the wall list of each zone, which needs the marker tags
+        mesh = read_mesh(path)
+        walls = _zone_walls(mesh, walls)
+    cached = read_distances(path, walls)
+    if cached is not None:
+        return cached + (True,)
+    walls, distances = mesh_distances(mesh or read_mesh(path), walls, workers)
+    if write:
+        save_quietly(save_distances, path, walls, distances)
+    return walls, distances, False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="su2tools walldist", description="Wall distance of SU2 meshes.")
+    parser.add_argument("paths", nargs="+", help=".su2 files")
+    parser.add_argument("--wall", action="append", help="wall marker tag (repeatable; default: guessed from tags)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1, 0 for one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the distance file")
+    args = parser.parse_args(argv)
+    workers = args.workers or None
+    for path in args.paths:
+        start = time.perf_counter()
+        if args.no_cache:
+            mesh = read_mesh(path)
+            walls, distances = mesh_distances(mesh, _zone_walls(mesh, args.wall) if args.wall else None, workers)
+            cached = False
+        else:
+            walls, distances, cached = mesh_wall_distance(path, args.wall, workers)
+        elapsed = time.perf_counter() - start
+        for izone, (w, (distance, _)) in enumerate(zip(walls, distances), 1):
+            # Points on the wall, up to round-off in the projection on the faces
+            off_wall = distance[distance > 1e-12 * distance.max(initial=0.0)]
+            print(
+                f"{path} zone {izone}: walls {', '.join(w) or '(none)'}; {len(distance)} points, "
+                f"max {distance.max(initial=0.0):.4e}, closest off-wall point {off_wall.min(initial=np.inf):.4e}"
+                f"{' (cached)' if cached else ''}"
+            )
+        print(f"  {elapsed:.2f} s")
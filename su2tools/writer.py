@@ -0,0 +1,272 @@
+"""
+Writer for SU2 native (.su2) meshes.
+
+The output follows the layout of the meshes in this repository: tab-separated values and the
+element or point index at the end of each line. Coordinates are written with ``%.16e``, one
+digit more than the corpus files, so that every double is read back exactly.
+
+Element, point and marker blocks are formatted with whole-array operations, ``CHUNK_ROWS``
+lines at a time: every line is laid out in a row of a byte matrix with one fixed-width slot
+per value, the digits of all values are written column by column, and the unused bytes of
+each slot are dropped in one pass. Decimal digits of doubles are computed exactly in
+double-double arithmetic, so the text is the same as Python's ``"%.16e" % x``.
+"""
+# Standard Python modules
+import os
+from fractions import Fraction
+
+# External modules
+import numpy as np
+
+# First party modules
+from .mesh import NODES_PER_ELEM
+
+CHUNK_ROWS = 1 << 16
+
+# Bytes of the slots that hold no character, removed from the text
+_FILL = 0
+_TAB, _NEWLINE = ord("\t"), ord("\n")
+_ZERO, _MINUS, _PLUS, _POINT, _E = (ord(c) for c in "0-+.e")
+
+# Width of a %.16e value: sign, 17 digits, point, "e", exponent sign and 3 digits
+FLOAT_WIDTH = 24
+
+# Powers of ten as double-double (hi + lo), for the values formatted with array operations
+_POW_RANGE = 300
+_POW_HI = np.array([float(Fraction(10) ** k) for k in range(-_POW_RANGE, _POW_RANGE + 1)])
+_POW_LO = np.array(
+    [float(Fraction(10) ** k - Fraction(h)) for k, h in zip(range(-_POW_RANGE, _POW_RANGE + 1), _POW_HI)]
+)
+# Magnitudes outside this range (and inf or nan) are formatted one by one by Python
+_FAST_RANGE = (1e-250, 1e250)
+_SPLIT = 134217729.0
+
+
+def _two_product(a, b):
+    """Product of ``a`` and ``b`` and its rounding error (Dekker)."""
+    p = a * b
+    t = a * _SPLIT
+    ah = t - (t - a)
+    al = a - ah
+    t = b * _SPLIT
+    bh = t - (t - b)
+    bl = b - bh
+    return p, ((ah * bh - p) + ah * bl + al * bh) + al * bl
+
+
+def _scaled(x, k):
+    """``x * 10**k`` as a double-double ``(hi, lo)``."""
+    p, err = _two_product(x, _POW_HI[k + _POW_RANGE])
+    err = err + x * _POW_LO[k + _POW_RANGE]
+    hi = p + err
+    return hi, err - (hi - p)
+
+
+def _significand(a):
+    """
+    The 17 significant digits and the decimal exponent of the positive doubles ``a``, so that
+    ``a`` is ``digits * 10**(exponent - 16)`` correctly rounded.
+    """
+    exponent = np.floor(np.log10(a)).astype(np.int64)
+    hi, lo = _scaled(a, 16 - exponent)
+    # log10 may be off by one next to powers of ten
+    up = (hi > 1e17) | ((hi == 1e17) & (lo >= 0))
+    down = (hi < 1e16) | ((hi == 1e16) & (lo < 0))
+    fix = np.flatnonzero(up | down)
+    if len(fix):
+        exponent[fix] += up[fix].astype(np.int64) - down[fix]
+        hi[fix], lo[fix] = _scaled(a[fix], 16 - exponent[fix])
+    # hi is a whole number, the fraction is in lo
+    digits = hi.astype(np.int64) + np.rint(lo).astype(np.int64)
+    carry = digits >= 10**17
+    digits[carry] //= 10
+    exponent[carry] += 1
+    return digits, exponent
+
+
+def _put_digits(chars, values, width):
+    """Write the non-negative ``values`` right-aligned in the last ``width`` columns of ``chars``."""
+    values = values.copy()
+    for k in range(width):
+        quotient = values // 10
+        chars[..., -1 - k] = np.where((values > 0) | (k == 0), _ZERO + (values - 10 * quotient), _FILL)
+        values = quotient
+
+
+def _int_slots(values):
+    """Slots of ``%d`` for integer array ``values``: shape ``values.shape + (width,)``."""
+    values = np.asarray(values, dtype=np.int64)
+    negative = values < 0
+    magnitude = np.abs(values)
+    width = len(str(int(magnitude.max()))) if magnitude.size else 1
+    chars = np.empty(values.shape + (width + int(negative.any()),), dtype=np.uint8)
+    _put_digits(chars, magnitude, width)
+    if negative.any():
+        chars[..., 0] = _FILL
+        # The sign goes just before the first digit
+        ndigit = 1 + sum(magnitude >= 10**k for k in range(1, width))
+        where = np.nonzero(negative)
+        chars[where + (chars.shape[-1] - 1 - ndigit[where],)] = _MINUS
+    return chars
+
+
+def _float_slots(values):
+    """Slots of ``%.16e`` for float array ``values``: shape ``values.shape + (FLOAT_WIDTH,)``."""
+    values = np.asarray(values, dtype=np.float64)
+    chars = np.empty(values.shape + (FLOAT_WIDTH,), dtype=np.uint8)
+    magnitude = np.abs(values)
+    fast = (magnitude >= _FAST_RANGE[0]) & (magnitude < _FAST_RANGE[1])
+    digits, exponent = (a.reshape(values.shape) for a in _significand(np.where(fast, magnitude, 1.0).ravel()))
+    digits[magnitude == 0] = 0
+    exponent[magnitude == 0] = 0
+    chars[..., 0] = np.where(np.signbit(values), _MINUS, _FILL)
+    _put_digits(chars[..., 1:2], digits // 10**16, 1)
+    chars[..., 2] = _POINT
+    high, low = np.divmod(digits % 10**16, 10**8)
+    _put_digits(chars[..., 3:11], high, 8)
+    _put_digits(chars[..., 11:19], low, 8)
+    chars[..., 3:19][chars[..., 3:19] == _FILL] = _ZERO
+    chars[..., 19] = _E
+    chars[..., 20] = np.where(exponent < 0, _MINUS, _PLUS)
+    _put_digits(chars[..., 21:], np.abs(exponent), 3)
+    chars[..., 22:][chars[..., 22:] == _FILL] = _ZERO
+    slow = ~fast & (magnitude != 0)
+    for index in zip(*np.nonzero(slow)):
+        text = ("%.16e" % values[index]).encode()
+        chars[index] = _FILL
+        chars[index][FLOAT_WIDTH - len(text) :] = np.frombuffer(text, dtype=np.uint8)
+    return chars
+
+
+def _join(slots):
+    """
+    Lines of tab-separated slots.
+
+    Parameters
+    ----------
+    slots : list of ndarray
+        (n, width) slots of one value per line, or (n, m, width) slots of ``m`` values per
+        line; slots filled with ``_FILL`` only are left out with their tab.
+
+    Returns
+    -------
+    text : bytes
+    """
+    n = len(slots[0])
+    slots = [s.reshape(n, -1, s.shape[-1]) for s in slots]
+    # Every value is preceded by a tab, dropped again for the first one
+    width = sum(s.shape[1] * (s.shape[2] + 1) for s in slots) + 1
+    chars = np.empty((n, width), dtype=np.uint8)
+    col = 0
+    for s in slots:
+        block = chars[:, col : col + s.shape[1] * (s.shape[2] + 1)].reshape(n, s.shape[1], s.shape[2] + 1)
+        block[:, :, 0] = np.where(s[:, :, -1] == _FILL, _FILL, _TAB)
+        block[:, :, 1:] = s
+        col += block.shape[1] * block.shape[2]
+    chars[:, 0] = _FILL
+    chars[:, -1] = _NEWLINE
+    return chars[chars != _FILL].tobytes()
+
+
+def _format_elements(types, offsets, conn, extra=None):
+    """Lines ``type n0 n1 ... [extra]`` for every element."""
+    out = []
+    for start in range(0, len(types), CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, len(types))
+        nnode = np.diff(offsets[start : stop + 1])
+        slot = np.arange(nnode.max())
+        valid = slot < nnode[:, None]
+        nodes = _int_slots(conn[np.where(valid, offsets[start:stop, None] + slot, 0)])
+        nodes[~valid] = _FILL
+        columns = [_int_slots(types[start:stop]), nodes]
+        if extra is not None:
+            columns.append(_int_slots(extra[start:stop]))
+        out.append(_join(columns))
+    return b"".join(out)
+
+
+def _format_floats(rows, index=False):
+    """Lines of the values of ``rows`` in ``%.16e``, and the row index if ``index``."""
+    out = []
+    for start in range(0, len(rows), CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, len(rows))
+        columns = [_float_slots(rows[start:stop])]
+        if index:
+            columns.append(_int_slots(np.arange(start, stop)))
+        out.append(_join(columns))
+    return b"".join(out)
+
+
+def _format_ffd(boxes, ndime):
+    out = [f"FFD_NBOX= {len(boxes)}\n", f"FFD_NLEVEL= {max(b.level for b in boxes) + 1}\n"]
+    for box in boxes:
+        out.append(f"FFD_TAG= {box.tag}\n")
+        out.append(f"FFD_LEVEL= {box.level}\n")
+        for name, degree in zip("IJK", box.degree):
+            out.append(f"FFD_DEGREE_{name}= {degree}\n")
+        out.append(f"FFD_PARENTS= {len(box.parents)}\n")
+        out.extend(f"{tag}\n" for tag in box.parents)
+        out.append(f"FFD_CHILDREN= {len(box.children)}\n")
+        out.extend(f"{tag}\n" for tag in box.children)
+        out.append(f"FFD_CORNER_POINTS= {len(box.corners)}\n")
+        out.extend("\t".join(repr(float(x)) for x in row) + "\n" for row in box.corners[:, :ndime])
+        out.append(f"FFD_CONTROL_POINTS= {len(box.control_points)}\n")
+        for ijk, xyz in zip(box.control_indices.tolist(), box.control_points.tolist()):
+            out.append("\t".join([str(i) for i in ijk] + [repr(x) for x in xyz]) + "\n")
+        out.append(f"FFD_SURFACE_POINTS= {len(box.surface_points)}\n")
+        for tag, point, uvw in zip(box.surface_markers, box.surface_points.tolist(), box.surface_params.tolist()):
+            out.append(f"{tag}\t{point}\t" + "\t".join(f"{x:.16e}" for x in uvw) + "\n")
+    return "".join(out)
+
+
+def _zone_chunks(zone):
+    """Text of one zone, from NDIME to the FFD boxes, as a list of bytes."""
+    out = [f"NDIME= {zone.ndime}\nNELEM= {zone.nelem}\n".encode()]
+    out.append(_format_elements(zone.elem_types, zone.elem_offsets, zone.elem_conn, np.arange(zone.nelem)))
+    if zone.npoin_domain and zone.npoin_domain != zone.npoin:
+        out.append(f"NPOIN= {zone.npoin}\t{zone.npoin_domain}\n".encode())
+    else:
+        out.append(f"NPOIN= {zone.npoin}\n".encode())
+    out.append(_format_floats(zone.coords, index=True))
+    out.append(f"NMARK= {len(zone.markers)}\n".encode())
+    for m in zone.markers:
+        header = f"MARKER_TAG= {m.tag}\nMARKER_ELEMS= {m.nelem}\n"
+        if m.send_to is not None:
+            header += f"SEND_TO= {m.send_to}\n"
+        out.append(header.encode())
+        out.append(_format_elements(m.elem_types, m.elem_offsets, m.elem_conn, m.transform))
+    if zone.periodic:
+        out.append(f"NPERIODIC= {len(zone.periodic)}\n".encode())
+        for p in zone.periodic:
+            out.append(f"PERIODIC_INDEX= {p.index}\n".encode())
+            out.append(_format_floats(np.array([p.center, p.angles, p.translation])))
+    if zone.ffd_boxes:
+        out.append(_format_ffd(zone.ffd_boxes, zone.ndime).encode())
+    return out
+
+
+def format_zone(zone):
+    """Return the text of one zone, from NDIME to the FFD boxes."""
+    return b"".join(_zone_chunks(zone)).decode()
+
+
+def write_mesh(mesh, path):
+    """
+    Write a :class:`~su2tools.mesh.Mesh` (or a list of zones) to an .su2 file.
+
+    Multi-zone meshes are written with NZONE and one IZONE header per zone. The file is
+    written to a temporary name first and moved into place.
+    """
+    zones = list(mesh)
+    for zone in zones:
+        if not np.array_equal(np.diff(zone.elem_offsets), NODES_PER_ELEM[zone.elem_types]):
+            raise ValueError(f"zone {zone.izone}: element offsets do not match the element types")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        if len(zones) > 1:
+            f.write(f"NZONE= {len(zones)}\n".encode())
+        for zone in zones:
+            if len(zones) > 1:
+                f.write(f"IZONE= {zone.izone}\n".encode())
+            f.writelines(_zone_chunks(zone))
+    os.replace(tmp, path)
@@ -0,0 +1,154 @@
+"""
+Small synthetic .su2 meshes for the tests.
+"""
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+
+# First party modules
+from su2tools.mesh import HEXAHEDRON, LINE, PRISM, QUADRILATERAL, TETRAHEDRON, TRIANGLE
+from su2tools.reader import parse
+
+# Root of the repository, for the tests that read its meshes
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tetrahedra of a hexahedron (nodes 0-3 bottom, 4-7 top), sharing the 0-6 diagonal
+_HEX_TETS = [(0, 1, 2, 6), (0, 2, 3, 6), (0, 3, 7, 6), (0, 7, 4, 6), (0, 4, 5, 6), (0, 5, 1, 6)]
+
+
+def _lines(rows):
+    return ["\t".join(str(v) for v in row) for row in rows]
+
+
+def _format(ndime, elements, coords, markers):
+    lines = [f"NDIME= {ndime}", f"NELEM= {len(elements)}"]
+    lines += _lines([(etype, *nodes, i) for i, (etype, nodes) in enumerate(elements)])
+    lines.append(f"NPOIN= {len(coords)}")
+    lines += ["\t".join(repr(float(x)) for x in row) + f"\t{i}" for i, row in enumerate(coords)]
+    lines.append(f"NMARK= {len(markers)}")
+    for tag, faces in markers.items():
+        lines += [f"MARKER_TAG= {tag}", f"MARKER_ELEMS= {len(faces)}"]
+        lines += _lines([(etype, *nodes) for etype, nodes in faces])
+    return "\n".join(lines) + "\n"
+
+
+def grid_2d(nx=8, ny=6, triangles=False, clockwise=False, jitter=0.0, seed=0):
+    """
+    A structured mesh of the unit square with markers lower, right, upper and left, as text.
+
+    ``clockwise`` orders the nodes of every element clockwise; ``jitter`` moves the interior
+    points randomly by up to that fraction of the spacing.
+    """
+    x, y = np.meshgrid(np.linspace(0, 1, nx + 1), np.linspace(0, 1, ny + 1), indexing="ij")
+    coords = np.column_stack([x.ravel(), y.ravel()])
+    if jitter:
+        interior = (coords > 0).all(axis=1) & (coords < 1).all(axis=1)
+        step = np.array([1 / nx, 1 / ny])
+        coords[interior] += jitter * step * np.random.default_rng(seed).uniform(-1, 1, (interior.sum(), 2))
+    index = np.arange(len(coords)).reshape(nx + 1, ny + 1)
+    elements = []
+    for i in range(nx):
+        for j in range(ny):
+            quad = [index[i, j], index[i + 1, j], index[i + 1, j + 1], index[i, j + 1]]
+            if triangles:
+                cells = [(TRIANGLE, quad[:3]), (TRIANGLE, [quad[0], quad[2], quad[3]])]
+            else:
+                cells = [(QUADRILATERAL, quad)]
+            elements += [(etype, nodes[::-1] if clockwise else nodes) for etype, nodes in cells]
+    markers = {
+        "lower": [(LINE, (index[i, 0], index[i + 1, 0])) for i in range(nx)],
+        "right": [(LINE, (index[nx, j], index[nx, j + 1])) for j in range(ny)],
+        "upper": [(LINE, (index[i + 1, ny], index[i, ny])) for i in range(nx)],
+        "left": [(LINE, (index[0, j + 1], index[0, j])) for j in range(ny)],
+    }
+    return _format(2, elements, coords, markers)
+
+
+def grid_3d(n=4, etype=HEXAHEDRON):
+    """A structured mesh of the unit cube in hexahedra, prisms or tetrahedra, as text."""
+    axis = np.linspace(0, 1, n + 1)
+    x, y, z = np.meshgrid(axis, axis, axis, indexing="ij")
+    coords = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+    index = np.arange(len(coords)).reshape(n + 1, n + 1, n + 1)
+    elements = []
+    for i in range(n):
+        for j in range(n):
+            for k in range(n):
+                hexa = [
+                    index[i, j, k],
+                    index[i + 1, j, k],
+                    index[i + 1, j + 1, k],
+                    index[i, j + 1, k],
+                    index[i, j, k + 1],
+                    index[i + 1, j, k + 1],
+                    index[i + 1, j + 1, k + 1],
+                    index[i, j + 1, k + 1],
+                ]
+                if etype == HEXAHEDRON:
+                    elements.append((HEXAHEDRON, hexa))
+                elif etype == PRISM:
+                    # The normal of the first triangle points away from the second one
+                    elements.append((PRISM, [hexa[0], hexa[2], hexa[1], hexa[4], hexa[6], hexa[5]]))
+                    elements.append((PRISM, [hexa[0], hexa[3], hexa[2], hexa[4], hexa[7], hexa[6]]))
+                else:
+                    elements += [(TETRAHEDRON, [hexa[a] for a in tet]) for tet in _HEX_TETS]
+
+    def faces(quads, split):
+        if not split:
+            return [(QUADRILATERAL, quad) for quad in quads]
+        return [f for q in quads for f in ((TRIANGLE, (q[0], q[1], q[2])), (TRIANGLE, (q[0], q[2], q[3])))]
+
+    r = range(n)
+    bottom = [(index[i, j, 0], index[i, j + 1, 0], index[i + 1, j + 1, 0], index[i + 1, j, 0]) for i in r for j in r]
+    top = [(index[i, j, n], index[i + 1, j, n], index[i + 1, j + 1, n], index[i, j + 1, n]) for i in r for j in r]
+    sides = [(index[0, j, k], index[0, j, k + 1], index[0, j + 1, k + 1], index[0, j + 1, k]) for j in r for k in r]
+    sides += [(index[n, j, k], index[n, j + 1, k], index[n, j + 1, k + 1], index[n, j, k + 1]) for j in r for k in r]
+    sides += [(index[i, 0, k], index[i + 1, 0, k], index[i + 1, 0, k + 1], index[i, 0, k + 1]) for i in r for k in r]
+    sides += [(index[i, n, k], index[i, n, k + 1], index[i + 1, n, k + 1], index[i + 1, n, k]) for i in r for k in r]
+    # Prisms have triangles on the bottom and top only
+    split = etype != HEXAHEDRON
+    markers = {"bottom": faces(bottom, split), "top": faces(top, split), "sides": faces(sides, etype == TETRAHEDRON)}
+    return _format(3, elements, coords, markers)
+
+
+def load(text):
+    """Parse the text of a mesh."""
+    return parse(text.encode())
+
+
+def write(tmp_path, text, name="mesh.su2"):
+    """Write the text of a mesh to a file in ``tmp_path``; return its path."""
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def assert_same_mesh(a, b):
+    """Assert that two meshes hold the same zones, markers, periodic transforms and FFD boxes."""
+    assert len(a.zones) == len(b.zones)
+    for za, zb in zip(a, b):
+        assert (za.izone, za.ndime, za.npoin_domain) == (zb.izone, zb.ndime, zb.npoin_domain)
+        for name in ("elem_types", "elem_offsets", "elem_conn", "coords"):
+            assert np.array_equal(getattr(za, name), getattr(zb, name)), name
+        assert [m.tag for m in za.markers] == [m.tag for m in zb.markers]
+        for ma, mb in zip(za.markers, zb.markers):
+            assert ma.send_to == mb.send_to
+            for name in ("elem_types", "elem_offsets", "elem_conn"):
+                assert np.array_equal(getattr(ma, name), getattr(mb, name)), f"{ma.tag} {name}"
+            assert (ma.transform is None) == (mb.transform is None)
+            if ma.transform is not None:
+                assert np.array_equal(ma.transform, mb.transform)
+        assert len(za.periodic) == len(zb.periodic)
+        for pa, pb in zip(za.periodic, zb.periodic):
+            assert pa.index == pb.index
+            for name in ("center", "angles", "translation"):
+                assert np.array_equal(getattr(pa, name), getattr(pb, name)), name
+        assert [box.tag for box in za.ffd_boxes] == [box.tag for box in zb.ffd_boxes]
+        for ba, bb in zip(za.ffd_boxes, zb.ffd_boxes):
+            assert (ba.level, tuple(ba.degree)) == (bb.level, tuple(bb.degree))
+            assert (ba.parents, ba.children) == (bb.parents, bb.children)
+            assert list(ba.surface_markers) == list(bb.surface_markers)
+            for name in ("corners", "control_indices", "control_points", "surface_points", "surface_params"):
+                assert np.array_equal(getattr(ba, name), getattr(bb, name)), f"{ba.tag} {name}"
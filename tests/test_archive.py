@@ -0,0 +1,101 @@
+# Standard Python modules
+import os
+import tarfile
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.archive import Archive, main, pack, pack_tar, read_archive
+from su2tools.mesh import Mesh
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, assert_same_mesh
+
+MULTIZONE = os.path.join(ROOT, "fea_fsi", "WallChannel_2d", "meshFSI_2D.su2")
+
+
+@pytest.fixture(scope="module")
+def archive_path(tmp_path_factory):
+    return pack(MULTIZONE, str(tmp_path_factory.mktemp("archive") / "meshFSI_2D.su2z"), block_size=4096)
+
+
+def test_mesh_equals_full_parse(archive_path):
+    assert_same_mesh(read_archive(archive_path), read_mesh(MULTIZONE))
+    assert_same_mesh(read_archive(archive_path, workers=1), read_mesh(MULTIZONE))
+
+
+def test_zones_and_markers(archive_path):
+    mesh = read_mesh(MULTIZONE)
+    with Archive(archive_path) as archive:
+        assert len(archive.blocks) > 10
+        for zone in mesh:
+            assert_same_mesh(Mesh([archive.load_zone(zone.izone)]), Mesh([zone]))
+            assert np.array_equal(archive.load_points(zone.izone), zone.coords)
+        archive.blocks_read = 0
+        marker = archive.load_marker("clamped")
+        # Only the blocks of the marker are decompressed
+        assert 0 < archive.blocks_read < len(archive.blocks) // 4
+    expected = mesh.zones[1].marker("clamped")
+    assert np.array_equal(marker.elem_conn, expected.elem_conn)
+    assert np.array_equal(marker.elem_types, expected.elem_types)
+
+
+def test_read_ranges(archive_path):
+    with open(MULTIZONE, "rb") as f:
+        data = f.read()
+    with Archive(archive_path) as archive:
+        assert archive.read() == data
+        for start, end in [(0, 1), (4095, 4097), (10000, 30000), (len(data) - 5, len(data)), (7, 7)]:
+            assert archive.read(start, end, workers=2) == data[start:end]
+
+
+def test_unpack(archive_path, tmp_path):
+    path = str(tmp_path / "unpacked.su2")
+    with Archive(archive_path) as archive:
+        archive.unpack(path)
+        archive.sha256 = "0" * 64
+        with pytest.raises(ValueError, match="checksum"):
+            archive.unpack(path)
+    with open(path, "rb") as a, open(MULTIZONE, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_not_an_archive():
+    with pytest.raises(ValueError, match="not a version 1"):
+        Archive(MULTIZONE)
+
+
+@pytest.mark.parametrize(
+    "argv, message",
+    [
+        (["read", "{archive}", "--marker", "nosuch"], "has no marker nosuch"),
+        (["read", "{archive}", "--zone", "9"], "has no zone 9"),
+        (["info", MULTIZONE], "not a version 1"),
+    ],
+)
+def test_main_errors(archive_path, capsys, argv, message):
+    with pytest.raises(SystemExit):
+        main([arg.format(archive=archive_path) for arg in argv])
+    assert message in capsys.readouterr().err
+
+
+def test_zstd(tmp_path):
+    pytest.importorskip("zstandard")
+    path = pack(MULTIZONE, str(tmp_path / "mesh.su2z"), codec="zstd")
+    assert_same_mesh(read_archive(path), read_mesh(MULTIZONE))
+
+
+def test_unknown_codec(tmp_path):
+    with pytest.raises(ValueError, match="unknown codec"):
+        pack(MULTIZONE, str(tmp_path / "mesh.su2z"), codec="lzma")
+
+
+def test_pack_tar(tmp_path):
+    source = str(tmp_path / "meshes.tar.gz")
+    with tarfile.open(source, "w:gz") as tar:
+        tar.add(MULTIZONE, arcname="fsi/meshFSI_2D.su2")
+    (path,) = pack_tar(source)
+    assert path == str(tmp_path / "meshFSI_2D.su2z")
+    assert_same_mesh(read_archive(path), read_mesh(MULTIZONE))
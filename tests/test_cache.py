@@ -0,0 +1,91 @@
+# Standard Python modules
+import os
+import shutil
+
+# External modules
+import numpy as np
+
+# First party modules
+from su2tools.cache import (
+    CACHE_SUFFIX,
+    cache_path,
+    file_digest,
+    file_stamp,
+    load_bundle,
+    load_mesh,
+    read_bundle_meta,
+    read_sidecar_meta,
+    save_bundle,
+    save_quietly,
+)
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, assert_same_mesh, grid_2d, write
+
+
+def test_bundle(tmp_path):
+    arrays = {"a": np.arange(10, dtype=np.int32), "b": np.ones((3, 2)), "empty": np.zeros((0, 3))}
+    path = str(tmp_path / "bundle")
+    save_bundle(path, arrays, {"kind": "test", "n": 3})
+    loaded, meta = load_bundle(path)
+    assert meta == {"kind": "test", "n": 3}
+    assert read_bundle_meta(path) == meta
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype and np.array_equal(loaded[name], array)
+    # Copy-on-write: changing the arrays leaves the file alone
+    loaded["a"][0] = 99
+    assert load_bundle(path)[0]["a"][0] == 0
+    assert os.listdir(tmp_path) == ["bundle"]
+
+
+def test_not_a_bundle(tmp_path):
+    path = write(tmp_path, grid_2d(2, 2))
+    assert read_bundle_meta(path) is None
+    assert read_bundle_meta(str(tmp_path / "missing")) is None
+
+
+def test_mesh_cache(tmp_path):
+    path = str(tmp_path / "mesh.su2")
+    shutil.copy(os.path.join(ROOT, "cont_adj_euler", "wedge", "mesh_wedge_inv_FFD.su2"), path)
+    mesh = load_mesh(path)
+    assert os.path.exists(path + CACHE_SUFFIX)
+    cached = load_mesh(path)
+    assert_same_mesh(cached, read_mesh(path))
+    assert cached.zones[0].ffd_boxes
+    # The cached arrays are views of the file
+    assert cached.zones[0].coords.base is not None
+    assert_same_mesh(cached, mesh)
+
+
+def test_stale_cache(tmp_path):
+    path = write(tmp_path, grid_2d(3, 3))
+    load_mesh(path)
+    write(tmp_path, grid_2d(4, 3))
+    mesh = load_mesh(path)
+    assert mesh.npoin == 20
+    assert read_bundle_meta(path + CACHE_SUFFIX)["source_digest"] == file_digest(path)
+
+
+def test_cache_dir(tmp_path):
+    path = write(tmp_path, grid_2d(2, 2))
+    copy = write(tmp_path, grid_2d(2, 2), "copy.su2")
+    cache_dir = str(tmp_path / "cache")
+    load_mesh(path, cache_dir=cache_dir)
+    assert cache_path(copy, cache_dir=cache_dir) == cache_path(path, cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == [file_digest(path) + CACHE_SUFFIX]
+    assert not os.path.exists(path + CACHE_SUFFIX)
+    assert_same_mesh(load_mesh(copy, cache_dir=cache_dir), read_mesh(copy))
+
+
+def test_sidecar_meta(tmp_path):
+    path = write(tmp_path, grid_2d(2, 2))
+    sidecar = str(tmp_path / "mesh.su2.side")
+    assert read_sidecar_meta(sidecar, "side", 1, path) is None
+    assert save_quietly(save_bundle, sidecar, {}, {"kind": "side", "version": 1, **file_stamp(path)})
+    assert read_sidecar_meta(sidecar, "side", 1, path)["size"] == os.path.getsize(path)
+    assert read_sidecar_meta(sidecar, "side", 2, path) is None
+    assert read_sidecar_meta(sidecar, "other", 1, path) is None
+    # A changed source makes the sidecar stale
+    write(tmp_path, grid_2d(3, 2))
+    assert read_sidecar_meta(sidecar, "side", 1, path) is None
+    assert not save_quietly(save_bundle, str(tmp_path / "missing" / "side"), {}, {})
@@ -0,0 +1,55 @@
+# Standard Python modules
+import os
+
+# First party modules
+from su2tools.catalog import build_catalog, query, summarize_file
+from su2tools.mesh import HEXAHEDRON, QUADRILATERAL, TETRAHEDRON
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, grid_2d, grid_3d
+
+
+def _tree(root):
+    (root / "euler" / "square").mkdir(parents=True)
+    (root / "rans" / "cube").mkdir(parents=True)
+    (root / "euler" / "square" / "mesh.su2").write_text(grid_2d(8, 6))
+    (root / "rans" / "cube" / "hexa.su2").write_text(grid_3d(3))
+    (root / "rans" / "cube" / "tetra.su2").write_text(grid_3d(2, TETRAHEDRON))
+    (root / "rans" / "broken.su2").write_text("NDIME= 2\nNELEM= 5\n5 0 1 2 0\n")
+
+
+def test_build_and_query(tmp_path):
+    root, db = tmp_path / "root", str(tmp_path / "catalog.sqlite")
+    _tree(root)
+    assert build_catalog(str(root), db, workers=1) == (4, 0, 0)
+    assert [row[0] for row in query(db)] == ["euler/square/mesh.su2", "rans/cube/hexa.su2", "rans/cube/tetra.su2"]
+    assert query(db, ndime=2) == [("euler/square/mesh.su2", 2, 63, 48, 1)]
+    assert [row[0] for row in query(db, category="rans", min_points=30)] == ["rans/cube/hexa.su2"]
+    assert [row[0] for row in query(db, elem_type=TETRAHEDRON)] == ["rans/cube/tetra.su2"]
+    assert [row[0] for row in query(db, marker="upp%")] == ["euler/square/mesh.su2"]
+    assert query(db, ffd=True) == []
+
+    # Only changed files are read again
+    assert build_catalog(str(root), db, workers=1) == (0, 4, 0)
+    (root / "rans" / "cube" / "tetra.su2").write_text(grid_3d(3, TETRAHEDRON))
+    os.remove(root / "rans" / "broken.su2")
+    assert build_catalog(str(root), db, workers=1) == (1, 2, 1)
+    assert query(db, elem_type=TETRAHEDRON) == [("rans/cube/tetra.su2", 3, 64, 162, 1)]
+
+
+def test_cgns_summary_matches_su2():
+    summary = summarize_file(os.path.join(ROOT, "euler", "wedge", "mesh_wedge_inv.cgns"))
+    zone = read_mesh(os.path.join(ROOT, "euler", "wedge", "mesh_wedge_inv.su2")).zones[0]
+    assert summary["format"] == "cgns"
+    assert summary["zones"][0]["npoin"] == zone.npoin
+    assert summary["zones"][0]["elem_counts"] == zone.elem_counts() == {QUADRILATERAL: zone.nelem}
+    assert [m[:2] for m in summary["zones"][0]["markers"]] == [(m.tag, m.nelem) for m in zone.markers]
+
+
+def test_summarize_su2(tmp_path):
+    path = tmp_path / "mesh.su2"
+    path.write_text(grid_3d(2))
+    summary = summarize_file(str(path))
+    assert (summary["format"], summary["ndime"], summary["nzone"]) == ("su2", 3, 1)
+    assert summary["zones"][0]["elem_counts"] == {HEXAHEDRON: 8}
+    assert summary["zones"][0]["markers"][0] == ("bottom", 4, 9)
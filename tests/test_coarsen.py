@@ -0,0 +1,85 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.coarsen import coarsen_mesh, coarsen_zone
+from su2tools.mesh import HEXAHEDRON, PRISM, TETRAHEDRON
+from su2tools.quality import element_quality
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, grid_2d, grid_3d, load
+
+# Smallest accepted element measure on a coarse level, relative to the median of the level
+EPS = 1e-3
+
+
+def check_level(zone, dominant):
+    """Assert that a coarse zone is valid: no flat or inverted elements and consistent markers."""
+    volume = element_quality(zone)["volume"]
+    assert np.all(volume * dominant > 0), "orientation flip"
+    assert np.abs(volume).min() >= EPS * np.median(np.abs(volume)), "flat element"
+    used = np.zeros(zone.npoin, dtype=bool)
+    used[zone.elem_conn] = True
+    assert used.all()
+    for nodes in zone.marker_nodes().values():
+        assert used[nodes].all()
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        grid_2d(24, 20, jitter=0.3),
+        grid_2d(24, 20, triangles=True, jitter=0.3),
+        grid_2d(24, 20, triangles=True, clockwise=True, jitter=0.3),
+    ],
+    ids=["quadrilaterals", "triangles", "clockwise"],
+)
+def test_levels_2d(text):
+    mesh = load(text)
+    dominant = np.sign(element_quality(mesh.zones[0])["volume"].sum())
+    corners = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    npoin = mesh.npoin
+    for (zone,) in coarsen_mesh(mesh, levels=2):
+        assert zone.npoin < npoin
+        npoin = zone.npoin
+        check_level(zone, dominant)
+        assert np.isclose(np.abs(element_quality(zone)["volume"]).sum(), 1.0)
+        # Points on two markers never move
+        for corner in corners:
+            assert np.isclose(np.linalg.norm(zone.coords - corner, axis=1).min(), 0.0)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [("moving_wall", "cavity", "mesh_cavity_stretch.su2"), ("cont_adj_euler", "wedge", "mesh_wedge_inv_FFD.su2")],
+)
+def test_levels_corpus(path):
+    mesh = read_mesh(os.path.join(ROOT, *path))
+    dominant = np.sign(element_quality(mesh.zones[0])["volume"].sum())
+    tags = [m.tag for m in mesh.zones[0].markers]
+    for (zone,) in coarsen_mesh(mesh, levels=2):
+        check_level(zone, dominant)
+        assert [m.tag for m in zone.markers] == tags
+
+
+def test_tetrahedra():
+    zone = load(grid_3d(6, TETRAHEDRON)).zones[0]
+    npoin = zone.npoin
+    coarsen_zone(zone)
+    assert zone.npoin < npoin
+    check_level(zone, 1.0)
+    assert np.isclose(element_quality(zone)["volume"].sum(), 1.0)
+
+
+@pytest.mark.parametrize("etype", [HEXAHEDRON, PRISM])
+def test_other_3d_elements_unchanged(etype):
+    text = grid_3d(3, etype)
+    zone = load(text).zones[0]
+    coarsen_zone(zone)
+    fine = load(text).zones[0]
+    for name in ("elem_types", "elem_offsets", "elem_conn", "coords"):
+        assert np.array_equal(getattr(zone, name), getattr(fine, name)), name
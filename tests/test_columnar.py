@@ -0,0 +1,82 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.columnar import (
+    ColumnFile,
+    columns_path,
+    load_solution,
+    pack,
+    save_columns,
+    unpack,
+)
+from su2tools.solution import Solution, read_solution
+
+from .meshes import ROOT
+
+FLOW = os.path.join(ROOT, "cont_adj_euler", "wedge", "solution_flow.dat")
+
+
+@pytest.fixture(scope="module")
+def flow():
+    return read_solution(FLOW)
+
+
+@pytest.mark.parametrize("codec", ["raw", "zlib"])
+def test_columns_equal_text(tmp_path, flow, codec):
+    path = pack(FLOW, str(tmp_path / "flow.su2col"), codec=codec)
+    columns = ColumnFile(path)
+    assert columns.names == flow.names and columns.npoint == flow.npoint
+    mach = columns.column("Mach")
+    assert np.array_equal(mach, flow.column("Mach"))
+    assert columns.bytes_read == columns.stored_size("Mach")
+    if codec == "raw":
+        assert not mach.flags.writeable
+        assert columns.stored_size("Mach") == 8 * flow.npoint
+    else:
+        assert columns.stored_size("Mach") < 8 * flow.npoint
+    assert np.array_equal(columns.solution().values, flow.values)
+
+
+@pytest.mark.parametrize("codec", ["raw", "zlib"])
+def test_unpack_identical(tmp_path, codec):
+    path = pack(FLOW, str(tmp_path / "flow.su2col"), codec=codec)
+    output = str(tmp_path / "flow.dat")
+    assert unpack(path, output) is True
+    with open(output, "rb") as a, open(FLOW, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_unrecorded_source(tmp_path):
+    values = np.array([[0.0, 1.0, -0.0], [np.pi, np.inf, 1e-310]])
+    path = str(tmp_path / "small.su2col")
+    save_columns(path, Solution(["x", "y", "Density"], values, ["EXT_ITER= 3"]), codec="zlib")
+    assert unpack(path, str(tmp_path / "small.dat")) is None
+    again = read_solution(str(tmp_path / "small.dat"))
+    assert again.footer == ["EXT_ITER= 3"]
+    assert np.array_equal(again.values.view(np.uint64), values.view(np.uint64))
+
+
+def test_load_solution_subset(tmp_path, flow):
+    path = pack(FLOW, str(tmp_path / "flow.su2col"))
+    assert path == columns_path(str(tmp_path / "flow.dat"))
+    for source in (FLOW, path):
+        subset = load_solution(source, ["Mach", "x"])
+        # Columns come in file order
+        assert subset.names == ["x", "Mach"]
+        assert np.array_equal(subset.values, flow.values[:, [0, flow.names.index("Mach")]])
+    with pytest.raises(KeyError, match="Entropy"):
+        load_solution(path, ["Entropy"])
+    with pytest.raises(KeyError, match="Entropy"):
+        ColumnFile(path).column("Entropy")
+
+
+def test_errors(tmp_path, flow):
+    with pytest.raises(ValueError, match="not a version 1 columnar"):
+        ColumnFile(FLOW)
+    with pytest.raises(ValueError, match="unknown codec"):
+        save_columns(str(tmp_path / "flow.su2col"), flow, codec="lzma")
@@ -0,0 +1,118 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.columnar import pack
+from su2tools.compare import (
+    compare,
+    compare_values,
+    format_comparison,
+    parse_tolerances,
+    ulp_distance,
+)
+from su2tools.solution import Solution, write_solution
+
+from .meshes import ROOT
+
+GRADIENT = os.path.join(ROOT, "cont_adj_euler", "naca0012", "of_grad_cd.dat.ref")
+
+
+def test_ulp_distance():
+    tiny = 5e-324
+    a = np.array([1.0, 0.0, -0.0, -tiny, 0.0, np.finfo(float).max, -1.0, 2.0, 1.0])
+    b = np.array([np.nextafter(1.0, 2.0), -0.0, 0.0, tiny, tiny, np.inf, np.nextafter(-1.0, -2.0), 2.0, 1.0 + 4e-16])
+    assert ulp_distance(a, b).tolist() == [1, 0, 0, 2, 1, 1, 1, 0, 2]
+    assert ulp_distance(b, a).tolist() == ulp_distance(a, b).tolist()
+    # Across zero, the distance is the sum of the distances to zero
+    assert ulp_distance(-1.0, 1.0) == 2 * ulp_distance(0.0, 1.0)
+
+
+def test_compare_values():
+    ref = np.array([[1.0, 1.0, 1e-20, 1.0, np.nan, np.nan, 0.0]])
+    new = np.array([[1.0 + 1e-7, 1.0 + 1e-5, 2e-20, np.nextafter(1.0, 2.0), np.nan, 1.0, -0.0]])
+    atol = np.array([0.0, 0.0, 1e-19, 0.0, 0.0, 0.0, 0.0])
+    rtol = np.array([1e-6, 1e-6, 0.0, 0.0, 0.0, 0.0, 0.0])
+    ulps = np.array([0, 0, 0, 1, 0, 0, 0], dtype=np.uint64)
+    ok, diff, rel, ulp, excess = compare_values(ref, new, atol, rtol, ulps)
+    assert ok.tolist() == [[True, False, True, True, True, False, True]]
+    eps = np.finfo(float).eps
+    assert np.allclose(diff[0, [0, 1, 2, 3, 6]], [1e-7, 1e-5, 1e-20, eps, 0.0], rtol=1e-8, atol=0.0)
+    assert np.allclose(rel[0, [0, 1, 2, 3]], [1e-7, 1e-5, 1.0, eps], rtol=1e-8, atol=0.0)
+    # NaN values and a zero reference have no relative difference
+    assert np.isnan(diff[0, [4, 5]]).all() and np.isnan(rel[0, [4, 5, 6]]).all()
+    assert np.isclose(excess[0, 1], 10.0)
+    assert excess[0, 5] == np.inf and excess[0, 0] == 0.0
+    assert ulp[0, 3] == 1 and ulp[0, 6] == 0
+
+
+def test_parse_tolerances():
+    tolerances = parse_tolerances(["Mach:rtol=0,ulps=4", "a:b:atol=1e-3", "Mach:atol=1"], atol=0.0)
+    assert tolerances[None] == {"atol": 0.0, "rtol": 1e-6, "ulps": 0}
+    assert tolerances["Mach"] == {"atol": 1.0, "rtol": 0.0, "ulps": 4}
+    assert tolerances["a:b"]["atol"] == 1e-3
+    with pytest.raises(ValueError, match="no column"):
+        parse_tolerances(["rtol=1"])
+    with pytest.raises(ValueError, match="unknown tolerance 'tol'"):
+        parse_tolerances(["Mach:tol=1"])
+
+
+def write(tmp_path, name, values, names=("x", "y", "Density", "Mach")):
+    path = str(tmp_path / name)
+    write_solution(path, Solution(list(names), values))
+    return path
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    return rng.uniform(1.0, 2.0, size=(1000, 4))
+
+
+def test_compare_files(tmp_path, values):
+    ref = write(tmp_path, "ref.dat", values)
+    new = values.copy()
+    new[10, 2] *= 1 + 1e-3
+    new[500, 3] *= 1 + 1e-8
+    comparison = compare(ref, write(tmp_path, "new.dat", new))
+    assert comparison.rows == 1000 and not comparison.passed
+    assert comparison.failed.tolist() == [0, 0, 1, 0]
+    ((excess, index, column, _, _),) = comparison.worst
+    assert (index, column) == (10, "Density") and np.isclose(excess, 1e3, rtol=1e-3)
+    assert np.allclose(comparison.max_abs, [0.0, 0.0, values[10, 2] * 1e-3, values[500, 3] * 1e-8], atol=0.0)
+    assert np.allclose(comparison.max_rel, [0.0, 0.0, 1e-3, 1e-8], atol=0.0)
+    assert "FAILED" in format_comparison(comparison)
+    loose = parse_tolerances(["Density:rtol=1e-2"])
+    assert compare(ref, write(tmp_path, "new.dat", new), loose).passed
+    # Columnar files compare like the text files
+    assert compare(pack(ref), ref).passed
+
+
+def test_stream_stops_early(tmp_path, values):
+    ref = write(tmp_path, "ref.dat", values)
+    new = values.copy()
+    new[150, 0] += 1.0
+    new[900, 0] += 1.0
+    comparison = compare(ref, write(tmp_path, "new.dat", new), stream=True, chunk_rows=100)
+    assert comparison.stopped and comparison.rows == 200 and comparison.failed.sum() == 1
+    assert compare(ref, ref, stream=True, chunk_rows=100).rows == 1000
+
+
+def test_columns_and_rows(tmp_path, values):
+    ref = write(tmp_path, "ref.dat", values)
+    comparison = compare(ref, write(tmp_path, "new.dat", values[:, :3], names=("x", "y", "Pressure")))
+    assert comparison.missing == ["Density", "Mach"] and comparison.extra == ["Pressure"]
+    assert not comparison.passed
+    comparison = compare(ref, write(tmp_path, "new.dat", values[:900]), stream=True, chunk_rows=100)
+    assert comparison.row_mismatch == f"{tmp_path / 'new.dat'} has fewer rows"
+    comparison = compare(ref, write(tmp_path, "new.dat", values[:-1]))
+    assert comparison.row_mismatch == f"{ref} has 1000 rows, {tmp_path / 'new.dat'} 999"
+
+
+def test_table_reference():
+    comparison = compare(GRADIENT, GRADIENT)
+    assert comparison.passed and comparison.rows > 0
+    assert comparison.index_name == "VARIABLE"
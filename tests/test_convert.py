@@ -0,0 +1,65 @@
+# Standard Python modules
+import os
+
+# External modules
+import pytest
+
+# First party modules
+from su2tools.cgns import read_cgns, summarize
+from su2tools.convert import compare, convert, not_converted, round_trip
+from su2tools.mesh import HEXAHEDRON, PRISM, TETRAHEDRON
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, grid_2d, grid_3d, write
+
+WEDGE = os.path.join(ROOT, "euler", "wedge", "mesh_wedge_inv")
+
+
+def test_adf_equals_su2():
+    mesh = read_cgns(WEDGE + ".cgns")
+    assert compare(mesh, read_mesh(WEDGE + ".su2")) == []
+    summary = summarize(WEDGE + ".cgns")
+    (zone,) = summary["zones"]
+    assert (zone["npoin"], zone["nelem"]) == (mesh.npoin, mesh.nelem)
+    assert zone["markers"] == [(m.tag, m.nelem) for m in mesh.markers]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [grid_2d(5, 4), grid_2d(5, 4, triangles=True), grid_3d(3), grid_3d(3, PRISM), grid_3d(2, TETRAHEDRON)],
+    ids=["quadrilaterals", "triangles", "hexahedra", "prisms", "tetrahedra"],
+)
+def test_round_trip(tmp_path, text):
+    pytest.importorskip("h5py")
+    path = write(tmp_path, text)
+    convert(path, str(tmp_path / "mesh.cgns"))
+    convert(str(tmp_path / "mesh.cgns"), str(tmp_path / "back.su2"))
+    assert compare(read_mesh(path), read_mesh(str(tmp_path / "back.su2"))) == []
+    result = round_trip(path, str(tmp_path))
+    assert result["differences"] == [] and result["not_converted"] == []
+
+
+def test_not_converted():
+    pytest.importorskip("h5py")
+    mesh = read_mesh(os.path.join(ROOT, "cont_adj_euler", "wedge", "mesh_wedge_inv_FFD.su2"))
+    assert not_converted(mesh) == ["zone 1: 1 FFD boxes"]
+
+
+def test_compare_reports_differences():
+    a = read_mesh(WEDGE + ".su2")
+    b = read_mesh(WEDGE + ".su2")
+    b.zones[0].coords[0, 0] += 1e-9
+    b.zones[0].markers[0].elem_conn[0] += 1
+    assert compare(a, b) == ["zone 1: coordinates", "zone 1: marker inlet"]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="unknown mesh format"):
+        convert(WEDGE + ".su2", str(tmp_path / "mesh.msh"))
+
+
+def test_hexahedra_element_type(tmp_path):
+    pytest.importorskip("h5py")
+    path = str(tmp_path / "cube.cgns")
+    convert(write(tmp_path, grid_3d(2)), path)
+    assert summarize(path)["zones"][0]["elem_counts"] == {HEXAHEDRON: 8}
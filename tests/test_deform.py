@@ -0,0 +1,88 @@
+# Standard Python modules
+import copy
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.deform import Deformation, pitch_plunge, rigid_modes, wendland
+from su2tools.quality import element_quality
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, grid_2d, load
+
+
+@pytest.fixture(scope="module")
+def airfoil():
+    return read_mesh(os.path.join(ROOT, "cont_adj_euler", "naca0012", "mesh_NACA0012_inv.su2")).zones[0]
+
+
+def test_wendland():
+    r = np.linspace(0, 1.5, 16)
+    w = wendland(r)
+    assert w[0] == 1.0 and (w[r >= 1] == 0.0).all()
+    assert (np.diff(w[r <= 1]) < 0).all()
+    assert np.isclose(wendland(np.array([0.5]))[0], 0.5**4 * 3)
+
+
+def test_rigid_modes():
+    coords = np.random.default_rng(0).uniform(size=(20, 3))
+    modes = rigid_modes(coords)
+    assert modes.shape == (6, 20, 3)
+    assert np.allclose(modes[:3], np.eye(3)[:, None, :])
+    r = coords - coords.mean(axis=0)
+    for mode in modes[3:]:
+        assert np.isclose(np.linalg.norm(mode, axis=1).max(), 1.0)
+        assert np.allclose(np.einsum("nd,nd->n", mode, r), 0.0)
+    assert rigid_modes(coords[:, :2]).shape == (3, 20, 2)
+
+
+def test_pitch_plunge():
+    coords = np.array([[1.0, 0.0], [0.25, 0.0], [0.25, 1.0]])
+    disp = pitch_plunge(coords, 90.0, 0.5, [0.25, 0.0])
+    # Nose up: the trailing edge goes down
+    assert np.allclose(disp, [[-0.75, -0.25], [0.0, 0.5], [1.0, -0.5]])
+
+
+@pytest.mark.parametrize("method", ["rbf", "idw"])
+def test_rigid_motion(airfoil, method):
+    deformation = Deformation(airfoil, method=method)
+    assert deformation.error < 1e-3 and len(deformation.selected) <= len(deformation.surface)
+    x = airfoil.coords[deformation.surface]
+    disp = deformation.displacements(np.broadcast_to([0.01, -0.02], x.shape))
+    assert np.allclose(disp[deformation.surface], [0.01, -0.02])
+    # Points out of reach of the airfoil and the farfield do not move
+    farfield = airfoil.marker("farfield").nodes
+    assert not disp[farfield].any()
+    # The volume points follow the translation, blended out with the distance from the airfoil
+    assert np.allclose(disp[:, 0] * -0.02 - disp[:, 1] * 0.01, 0.0)
+    assert np.linalg.norm(disp, axis=1).max() <= np.hypot(0.01, 0.02) * (1 + 1e-3)
+    near = np.linalg.norm(airfoil.coords - [0.5, 0.0], axis=1) < 0.6
+    assert np.allclose(disp[near], [0.01, -0.02], atol=0.03 * 0.02)
+
+
+@pytest.mark.parametrize("method", ["rbf", "idw"])
+def test_pitch_keeps_elements_valid(airfoil, method):
+    deformation = Deformation(airfoil, method=method)
+    x = airfoil.coords[deformation.surface]
+    steps = np.array([pitch_plunge(x, angle, 0.1 * angle / 5, [0.25, 0.0]) for angle in (-5.0, 2.0, 5.0)])
+    coords = deformation.deform(steps)
+    assert coords.shape == (3, airfoil.npoin, 2)
+    assert np.allclose(coords[2], deformation.deform(steps[2]))
+    before = element_quality(airfoil)["volume"]
+    moved = copy.deepcopy(airfoil)
+    for c in coords:
+        moved.coords = c
+        assert (element_quality(moved)["volume"] / before).min() > 0.5
+
+
+def test_errors():
+    zone = load(grid_2d(3, 3)).zones[0]
+    with pytest.raises(ValueError, match="unknown deformation method"):
+        Deformation(zone, method="spring")
+    with pytest.raises(ValueError, match="no marker wall"):
+        Deformation(zone, markers=["wall"])
+    with pytest.raises(ValueError, match="no moving marker"):
+        Deformation(zone, markers=[])
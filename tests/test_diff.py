@@ -0,0 +1,75 @@
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.diff import apply_delta, delta_path, format_diff, save_delta, zone_diff
+from su2tools.reader import read_mesh
+
+from .meshes import grid_2d, load, write
+
+
+def test_identical():
+    zone = load(grid_2d(5, 4)).zones[0]
+    diff = zone_diff(zone, load(grid_2d(5, 4)).zones[0])
+    assert diff["by_index"] and not diff["displacement"].any()
+    assert diff["markers"]["lower"] == {"points": 6, "displacement": [0.0, 0.0], "deviation": [0.0, 0.0]}
+    assert diff["volume"]["ratio"] == [1.0, 1.0] and diff["volume"]["inverted"] == 0
+    assert all(q["worse"] == 0 for q in diff["quality"].values())
+    assert "0 of 30 points moved" in format_diff(diff)
+
+
+def test_interior_motion():
+    base = load(grid_2d(6, 6)).zones[0]
+    zone = load(grid_2d(6, 6, jitter=0.3)).zones[0]
+    diff = zone_diff(base, zone)
+    interior = np.all((base.coords > 0) & (base.coords < 1), axis=1)
+    assert np.array_equal(np.any(diff["displacement"] != 0, axis=1), interior)
+    assert all(m["displacement"] == [0.0, 0.0] for m in diff["markers"].values())
+    assert np.allclose(diff["volume"]["total"], 1.0)
+
+
+def test_marker_motion():
+    base = load(grid_2d(4, 4)).zones[0]
+    zone = load(grid_2d(4, 4)).zones[0]
+    # Push the inner points of the lower wall down by 0.01, and one point along the wall
+    lower = zone.marker("lower").nodes[1:-1]
+    zone.coords[lower, 1] -= 0.01
+    zone.coords[lower[0], 0] += 0.1
+    diff = zone_diff(base, zone)
+    assert np.allclose(diff["markers"]["lower"]["deviation"][0], 0.01)
+    assert np.isclose(diff["markers"]["lower"]["displacement"][0], np.hypot(0.1, 0.01))
+    assert diff["markers"]["upper"]["displacement"] == [0.0, 0.0]
+
+
+def test_inverted():
+    base = load(grid_2d(3, 3)).zones[0]
+    zone = load(grid_2d(3, 3)).zones[0]
+    center = np.flatnonzero(np.all(np.isclose(zone.coords, 1 / 3), axis=1))
+    zone.coords[center] = [0.9, 0.9]
+    assert zone_diff(base, zone)["volume"]["inverted"] > 0
+
+
+def test_other_topology():
+    base = load(grid_2d(4, 3)).zones[0]
+    zone = load(grid_2d(4, 3, triangles=True)).zones[0]
+    diff = zone_diff(base, zone)
+    assert not diff["by_index"] and "ratio" not in diff["volume"]
+    assert np.array_equal(diff["index"], np.arange(zone.npoin)) and not diff["displacement"].any()
+    assert "worse" not in diff["quality"]["skewness"]
+
+
+def test_delta(tmp_path):
+    base_path = write(tmp_path, grid_2d(6, 5), "base.su2")
+    new_path = write(tmp_path, grid_2d(6, 5, jitter=0.3), "new.su2")
+    filename = delta_path(new_path)
+    assert filename.endswith("new.su2delta")
+    moved = save_delta(filename, base_path, read_mesh(base_path), read_mesh(new_path))
+    assert moved == [20]
+    mesh = apply_delta(base_path, filename)
+    assert np.array_equal(mesh.coords, read_mesh(new_path).coords)
+    # The delta only applies to its own baseline
+    with pytest.raises(ValueError, match="is not the baseline"):
+        apply_delta(new_path, filename)
+    with pytest.raises(ValueError, match="same elements"):
+        save_delta(filename, base_path, read_mesh(base_path), load(grid_2d(6, 5, triangles=True)))
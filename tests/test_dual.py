@@ -0,0 +1,85 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.dual import closure, dual_path, dual_zone, green_gauss, mesh_dual
+from su2tools.mesh import PRISM, TETRAHEDRON
+from su2tools.quality import element_quality
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, grid_2d, grid_3d, load, write
+
+MESHES = {
+    "quadrilaterals": grid_2d(6, 5, jitter=0.3),
+    "triangles": grid_2d(6, 5, triangles=True, jitter=0.3),
+    "clockwise": grid_2d(6, 5, triangles=True, clockwise=True, jitter=0.3),
+    "hexahedra": grid_3d(3),
+    "prisms": grid_3d(3, PRISM),
+    "tetrahedra": grid_3d(3, TETRAHEDRON),
+}
+
+
+@pytest.mark.parametrize("name", MESHES)
+def test_volumes_and_closure(name):
+    zone = load(MESHES[name]).zones[0]
+    dual = dual_zone(zone)
+    assert (dual.volumes > 0).all()
+    assert np.isclose(dual.volumes.sum(), np.abs(element_quality(zone)["volume"]).sum())
+    assert np.abs(closure(dual)).max() < 1e-14
+    assert len(np.unique(dual.edges, axis=0)) == dual.nedge and (dual.edges[:, 0] < dual.edges[:, 1]).all()
+    assert sorted(dual.vertices) == sorted(m.tag for m in zone.markers)
+
+
+def test_regular_grid():
+    zone = load(grid_2d(4, 4)).zones[0]
+    dual = dual_zone(zone)
+    h = 0.25
+    interior = np.all((zone.coords > 0) & (zone.coords < 1), axis=1)
+    corner = np.all((zone.coords == 0) | (zone.coords == 1), axis=1)
+    assert np.allclose(dual.volumes[interior], h * h)
+    assert np.allclose(dual.volumes[corner], h * h / 4)
+    # The dual face of an edge has the length of the grid spacing and points along the edge
+    direction = zone.coords[dual.edges[:, 1]] - zone.coords[dual.edges[:, 0]]
+    length = np.linalg.norm(dual.normals, axis=1)
+    assert np.allclose(np.einsum("nd,nd->n", dual.normals, direction), length * h)
+    assert np.allclose(dual.vertex_normals["lower"].sum(axis=0), [0.0, -1.0])
+
+
+@pytest.mark.parametrize(
+    "text",
+    [grid_2d(6, 5), MESHES["triangles"], MESHES["clockwise"], grid_3d(3), grid_3d(3, PRISM), MESHES["tetrahedra"]],
+    ids=["quadrilaterals", "triangles", "clockwise", "hexahedra", "prisms", "tetrahedra"],
+)
+def test_green_gauss_linear(text):
+    # Arithmetic means on the dual faces are exact for simplices and parallelograms
+    zone = load(text).zones[0]
+    dual = dual_zone(zone)
+    slope = np.array([1.0, -2.0, 3.0])[: zone.ndime]
+    gradient = green_gauss(dual, 4.0 + zone.coords @ slope)
+    boundary = np.zeros(zone.npoin, dtype=bool)
+    boundary[np.concatenate(list(dual.vertices.values()))] = True
+    # Exact at interior points, where no marker face term enters
+    assert np.allclose(gradient[~boundary], slope)
+    assert green_gauss(dual, np.ones((zone.npoin, 2))).shape == (zone.npoin, 2, zone.ndime)
+
+
+def test_hybrid_mesh():
+    zone = read_mesh(os.path.join(ROOT, "aeroelastic", "mesh_NACA64A010_hybrid_inv.su2")).zones[0]
+    dual = dual_zone(zone)
+    assert np.isclose(dual.volumes.sum(), np.abs(element_quality(zone)["volume"]).sum())
+    assert np.abs(closure(dual)).max() < 1e-10 * np.abs(dual.normals).max()
+
+
+def test_cache(tmp_path):
+    path = write(tmp_path, grid_2d(4, 3, triangles=True))
+    duals, cached = mesh_dual(path)
+    assert not cached and os.path.exists(dual_path(path))
+    again, cached = mesh_dual(path)
+    assert cached
+    for name in ("edges", "normals", "volumes"):
+        assert np.array_equal(getattr(again[0], name), getattr(duals[0], name))
+    assert np.array_equal(again[0].vertex_normals["left"], duals[0].vertex_normals["left"])
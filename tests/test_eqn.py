@@ -0,0 +1,124 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.columnar import ColumnFile, save_columns
+from su2tools.eqn import Program, compile_macro, read_macro
+from su2tools.solution import Solution
+
+from .meshes import ROOT
+
+MACRO = os.path.join(ROOT, "turbomachinery", "centrifugal_blade", "rotating_equation_tecplot.eqn")
+
+
+def value(equation):
+    (result,) = Program([equation]).evaluate(np.zeros((1, 1))).values()
+    return result[0]
+
+
+@pytest.mark.parametrize(
+    "equation, expected",
+    [
+        ("{a} = 1 + 2*3 - 4/8", 6.5),
+        ("{a} = (1 + 2)*3", 9.0),
+        ("{a} = -2**2", -4.0),
+        ("{a} = 2**3**2", 512.0),
+        ("{a} = 2**-1", 0.5),
+        ("{a} = 8/4/2", 1.0),
+        ("{a} = 1.5d2 + .5E1 + 2.", 157.0),
+        ("{a} = MAX(1, 2) + min(-1, 3) + ABS(-3)", 4.0),
+        ("{a} = atan2(1, 1)*4 - PI", 0.0),
+        ("{a} = sign(-3) + round(2.6) + trunc(-1.5)", 1.0),
+        ("V2 = alog10(1000) + sqrt(16)", 7.0),
+    ],
+)
+def test_constants(equation, expected):
+    program = Program([equation])
+    assert program.operations == 0 and program.inputs == []
+    assert np.isclose(value(equation), expected)
+
+
+def test_columns():
+    data = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    program = Program(["{s} = V1 + {b}*V3", "{t} = {s} - V1", "{b} = -{s}"])
+    assert program.inputs == [1, "b", 3]
+    results = program.evaluate(data, names=["a", "b", "c"])
+    assert list(results) == ["s", "t", "b"]
+    assert np.array_equal(results["s"], [7.0, 34.0])
+    assert np.array_equal(results["t"], [6.0, 30.0])
+    assert np.array_equal(results["b"], [-7.0, -34.0])
+    # Assigned variables are replaced in place, new ones appended
+    solution = program.apply(data, names=["a", "b", "c"])
+    assert solution.names == ["a", "b", "c", "s", "t"]
+    assert np.array_equal(solution.values[:, 1], [-7.0, -34.0])
+    assert np.array_equal(solution.values[:, 4], [6.0, 30.0])
+
+
+def test_sharing():
+    program = Program(["{a} = V1*V2 + V2*V1", "{b} = sqrt(V2*V1) + 2*3"])
+    # V1*V2 is computed once, 2*3 folded
+    assert program.expression_size == 3 + 3
+    assert program.operations == 4
+    assert program.describe().count("*") == 1
+    results = program.evaluate(np.array([[2.0, 8.0]]))
+    assert results["a"][0] == 32.0 and results["b"][0] == 10.0
+
+
+def test_macro(tmp_path):
+    program = compile_macro(MACRO)
+    assert len(program.equations) == 8
+    assert list(program.outputs) == ["Vx", "Vy", "V", "c", "Wx", "Wy", "W", "Mr"]
+    assert sorted(program.inputs) == [3, 4, 5, 9, 10, 14]
+    assert program.operations < program.expression_size
+
+    rng = np.random.default_rng(0)
+    data = rng.uniform(1.0, 2.0, size=(1000, 14))
+    rho, mx, my, gx, gy, sound = data[:, 2], data[:, 3], data[:, 4], data[:, 8], data[:, 9], data[:, 13]
+    vx, vy = mx / rho, my / rho
+    w = np.hypot(vx - gx, vy - gy)
+    mach = w / (np.hypot(vx, vy) / sound)
+    results = program.evaluate(data)
+    assert np.allclose(results["W"], w) and np.allclose(results["Mr"], mach)
+    chunked = program.evaluate(data, chunk_size=7)
+    assert all(np.array_equal(chunked[key], results[key]) for key in results)
+
+    # Columnar files are read column by column
+    names = [f"c{j}" for j in range(14)]
+    path = str(tmp_path / "flow.su2col")
+    save_columns(path, Solution(names, data))
+    columns = ColumnFile(path)
+    assert np.array_equal(program.evaluate(columns, chunk_size=100)["Mr"], results["Mr"])
+    assert columns.bytes_read == 6 * 8 * len(data)
+
+
+@pytest.mark.parametrize(
+    "equation, message",
+    [
+        ("{a} = 1 +", "unexpected end"),
+        ("{a} = (1 + 2", "expected '\\)'"),
+        ("{a} = sqrt(1, 2)", "sqrt takes 1 arguments, got 2"),
+        ("{a} = 1 2", "unexpected '2'"),
+        ("3 = V1", "expected a variable to assign"),
+        ("{a} = V1 $ 2", "unexpected '\\$ 2'"),
+        ("{a} = V0", "unexpected 'V0'"),
+    ],
+)
+def test_errors(equation, message):
+    with pytest.raises(ValueError, match=message):
+        Program([equation])
+
+
+def test_missing_column(tmp_path):
+    program = Program(["{a} = {Mach} + V3"])
+    with pytest.raises(KeyError, match="no column V3"):
+        program.evaluate(np.zeros((2, 2)), names=["Mach", "x"])
+    with pytest.raises(KeyError, match="no column 'Mach'"):
+        program.evaluate(np.zeros((2, 3)))
+    path = tmp_path / "empty.eqn"
+    path.write_text("#!MC 1200\n$!REDRAW\n")
+    with pytest.raises(ValueError, match="no \\$!ALTERDATA equation"):
+        read_macro(str(path))
@@ -0,0 +1,84 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.ffd import (
+    FFDEngine,
+    basis_matrix,
+    bernstein,
+    bernstein_derivative,
+    parametric_coordinates,
+    random_designs,
+)
+from su2tools.reader import read_mesh
+
+from .meshes import ROOT, grid_2d, load
+
+
+@pytest.fixture(scope="module")
+def wedge():
+    return read_mesh(os.path.join(ROOT, "cont_adj_euler", "wedge", "mesh_wedge_inv_FFD.su2")).zones[0]
+
+
+@pytest.mark.parametrize("degree", [0, 1, 4, 10])
+def test_bernstein(degree):
+    t = np.linspace(0, 1, 11)
+    b = bernstein(degree, t)
+    assert np.allclose(b.sum(axis=1), 1.0)
+    # The control points i / degree reproduce the identity (linear precision)
+    if degree:
+        assert np.allclose(b @ (np.arange(degree + 1) / degree), t)
+    h = 1e-6
+    fd = (bernstein(degree, t + h) - bernstein(degree, t - h)) / (2 * h)
+    assert np.allclose(bernstein_derivative(degree, t), fd, atol=1e-6)
+
+
+def test_surface_points(wedge):
+    engine = FFDEngine(wedge)
+    assert engine.surface_error() < 1e-12
+    emb = engine.embedded["MAIN_BOX"]
+    assert emb.is_surface.sum() == len(np.unique(wedge.ffd_boxes[0].surface_points))
+    assert (~emb.is_surface).sum() > 0
+
+
+def test_parametric_coordinates(wedge):
+    box = wedge.ffd_boxes[0]
+    params = np.random.default_rng(0).uniform(size=(100, 3))
+    coords = basis_matrix(box, params) @ box.control_points
+    found, converged = parametric_coordinates(box, coords)
+    assert converged.all()
+    assert np.allclose(found, params, atol=1e-9)
+
+
+def test_rigid_translation(wedge):
+    engine = FFDEngine(wedge)
+    box = wedge.ffd_boxes[0]
+    delta = np.zeros((2, len(box.control_points), 3))
+    delta[1, :, :2] = [0.01, -0.02]
+    coords = engine.deform({box.tag: delta})
+    assert np.array_equal(coords[0], wedge.coords)
+    moved = np.zeros(wedge.npoin, dtype=bool)
+    moved[engine.embedded[box.tag].points] = True
+    assert np.allclose(coords[1, moved] - wedge.coords[moved], [0.01, -0.02])
+    assert np.array_equal(coords[1, ~moved], wedge.coords[~moved])
+
+
+def test_batch_equals_single_designs(wedge):
+    engine = FFDEngine(wedge)
+    designs = random_designs(wedge, 4, 0.05)
+    batch = engine.displacements(designs)
+    for i in range(4):
+        single = engine.displacements({tag: delta[i : i + 1] for tag, delta in designs.items()})
+        assert np.allclose(batch[i], single[0])
+    # Displacements are linear in the control point displacements
+    doubled = engine.displacements({tag: 2 * delta for tag, delta in designs.items()})
+    assert np.allclose(doubled, 2 * batch)
+
+
+def test_no_boxes():
+    with pytest.raises(ValueError, match="no FFD boxes"):
+        FFDEngine(load(grid_2d(2, 2)).zones[0])
@@ -0,0 +1,97 @@
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.gradcheck import (
+    check_all,
+    check_case,
+    discover,
+    format_report,
+    relative_error,
+    sign_agreement,
+)
+
+
+def write_table(path, columns, rows):
+    lines = ["VARIABLES=" + " , ".join(f'"{name}"' for name in columns)]
+    lines += [" , ".join(repr(v) for v in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def case_root(tmp_path):
+    """A case with drag and lift adjoints and finite differences with two steps."""
+    case = tmp_path / "euler" / "airfoil"
+    case.mkdir(parents=True)
+    write_table(case / "of_grad_cd.plt", ["VARIABLE", "GRADIENT"], [[0, 0.1], [1, -0.2], [2, 0.0005], [3, 0.3]])
+    write_table(case / "of_grad_cl.plt", ["VARIABLE", "GRADIENT"], [[0, 1.0], [1, 2.0], [2, 3.0], [3, 4.0]])
+    write_table(
+        case / "of_grad_findiff_1E-3.plt",
+        ["VARIABLE", "LIFT", "DRAG", "FINDIFF_STEP"],
+        [[0, 1.0, 0.11, 1e-3], [1, 2.0, -0.2, 1e-3], [2, 3.0, -0.0004, 1e-3], [3, 4.0, 0.3, 1e-3]],
+    )
+    # The smaller step lacks variable 3 and the lift
+    write_table(
+        case / "of_grad_findiff_1E-4.plt",
+        ["VARIABLE", "DRAG", "FINDIFF_STEP"],
+        [[0, 0.101, 1e-4], [1, -0.2, 1e-4], [2, 0.0, 1e-4]],
+    )
+    # Adjoint files only, or of an unknown objective: not a case
+    (tmp_path / "other").mkdir()
+    write_table(tmp_path / "other" / "of_grad_cd.plt", ["VARIABLE", "GRADIENT"], [[0, 1.0]])
+    write_table(case / "of_grad_xyz.plt", ["VARIABLE", "GRADIENT"], [[0, 1.0]])
+    return str(tmp_path)
+
+
+def test_relative_error():
+    adjoint = np.array([0.1, -0.2, 0.0005, 0.3, 0.0])
+    findiff = np.array([0.11, -0.2, -0.0004, 0.3, 0.0])
+    # Denominators are kept above 1e-3 times the largest finite difference, 3e-4
+    assert np.allclose(relative_error(adjoint, findiff), [0.01 / 0.11, 0.0, 0.0009 / 0.0004, 0.0, 0.0])
+    assert sign_agreement(adjoint, findiff).tolist() == [True, True, False, True, True]
+    assert sign_agreement(np.array([1.0, 1e-4]), np.array([1.0, -1e-4])).tolist() == [True, True]
+
+
+def test_discover(case_root):
+    (case,) = discover(case_root)
+    assert case["case"] == "euler/airfoil"
+    assert sorted(case["adjoint"]) == ["cd", "cl"]
+    assert sorted(case["findiff"]) == ["1E-3", "1E-4"]
+
+
+def test_check_case(case_root):
+    result = check_case(discover(case_root)[0])
+    pairs = {(p["objective"], p["step"]): p for p in result["pairs"]}
+    assert sorted(pairs) == [("cd", 1e-4), ("cd", 1e-3), ("cl", 1e-3)]
+
+    coarse = pairs["cd", 1e-3]
+    assert coarse["column"] == "DRAG" and coarse["variables"] == [0, 1, 2, 3] and coarse["unmatched"] == 0
+    assert np.allclose(coarse["rel_error"], [0.01 / 0.11, 0.0, 0.0009 / 0.0004, 0.0])
+    assert coarse["sign_agrees"] == [True, True, False, True] and coarse["sign_agreement"] == 0.75
+    fine = pairs["cd", 1e-4]
+    assert fine["variables"] == [0, 1, 2] and fine["unmatched"] == 1
+    assert np.allclose(fine["rel_error"], [0.001 / 0.101, 0.0, 0.0005 / 0.0002])
+    assert pairs["cl", 1e-3]["max_rel_error"] == 0.0
+
+    (steps,) = result["steps"]
+    assert steps["objective"] == "cd" and steps["best_step"] == 1e-4
+    (change,) = steps["changes"]
+    assert change["steps"] == [1e-3, 1e-4]
+    assert np.allclose(change["rel_change"], [0.009 / 0.101, 0.0, 0.0004 / 0.0002])
+    assert len(result["skipped"]) == 1 and "no LIFT column for cl" in result["skipped"][0]
+
+
+def test_missing_gradient_column(case_root, tmp_path):
+    case = discover(case_root)[0]
+    write_table(tmp_path / "euler" / "airfoil" / "of_grad_cl.plt", ["VARIABLE", "SENSITIVITY"], [[0, 1.0]])
+    result = check_case(case)
+    assert all(p["objective"] == "cd" for p in result["pairs"])
+    assert any("no GRADIENT column" in reason for reason in result["skipped"])
+
+
+def test_report(case_root):
+    results = check_all(discover(case_root), workers=1)
+    report = format_report(results, variables=True)
+    assert "cd/DRAG" in report and "sign differs" in report
+    assert "adjoint closest to step 0.0001" in report
@@ -0,0 +1,103 @@
+# Standard Python modules
+import copy
+import pickle
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.mesh import LINE, QUADRILATERAL, TRIANGLE, ElementGroups, Mesh
+
+from .meshes import assert_same_mesh, grid_2d, load
+
+MIXED = """NDIME= 2
+NELEM= 4
+5\t0\t1\t4\t0
+9\t1\t2\t5\t4\t1
+5\t0\t4\t3\t2
+9\t4\t5\t8\t7\t3
+NPOIN= 9
+0.0\t0.0\t0
+0.5\t0.0\t1
+1.0\t0.0\t2
+0.0\t0.5\t3
+0.5\t0.5\t4
+1.0\t0.5\t5
+0.0\t1.0\t6
+0.5\t1.0\t7
+1.0\t1.0\t8
+NMARK= 0
+"""
+
+
+def test_groups_contiguous():
+    zone = load(grid_2d(3, 2)).zones[0]
+    groups = zone.groups
+    assert groups.order is None and list(groups.types) == [QUADRILATERAL]
+    assert np.shares_memory(groups[QUADRILATERAL], zone.elem_conn)
+    assert np.array_equal(groups[QUADRILATERAL], zone.elem_conn.reshape(-1, 4))
+    assert zone.groups is groups
+    etype, elements, nodes = next(iter(zone.marker("lower").groups))
+    assert etype == LINE and np.array_equal(elements, np.arange(3)) and nodes.shape == (3, 2)
+
+
+def test_groups_mixed():
+    zone = load(MIXED).zones[0]
+    groups = zone.groups
+    assert groups.order is not None and len(groups) == 2
+    assert np.array_equal(groups.elements(TRIANGLE), [0, 2])
+    assert np.array_equal(groups[TRIANGLE], [[0, 1, 4], [0, 4, 3]])
+    assert np.array_equal(groups[QUADRILATERAL], [[1, 2, 5, 4], [4, 5, 8, 7]])
+    assert QUADRILATERAL in groups and LINE not in groups
+    with pytest.raises(KeyError):
+        groups[LINE]
+    # Replacing the element arrays rebuilds the groups
+    zone.elem_types = np.array([5, 5, 5, 9], dtype=zone.elem_types.dtype)
+    zone.elem_offsets = np.array([0, 3, 6, 9, 13])
+    zone.elem_conn = np.array([0, 1, 4, 1, 2, 5, 0, 4, 3, 4, 5, 8, 7], dtype=zone.elem_conn.dtype)
+    assert zone.groups is not groups and zone.groups.order is None
+    assert zone.groups[TRIANGLE].shape == (3, 3)
+
+
+def test_empty_groups():
+    groups = ElementGroups(np.zeros(0, dtype=np.int8), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32))
+    assert len(groups) == 0 and list(groups) == []
+
+
+def test_slots():
+    mesh = load(grid_2d(2, 2))
+    zone = mesh.zones[0]
+    for obj in (mesh, zone, zone.markers[0], zone.groups):
+        assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        mesh.comment = "no"
+    with pytest.raises(AttributeError):
+        zone.comment = "no"
+
+
+def test_attribute_delegation():
+    mesh = load(grid_2d(2, 2))
+    assert mesh.npoin == 9 and mesh.coords is mesh.zones[0].coords
+    with pytest.raises(AttributeError):
+        mesh.not_an_attribute
+    with pytest.raises(AttributeError):
+        mesh._private
+    two = Mesh([mesh.zones[0], mesh.zones[0]])
+    with pytest.raises(AttributeError):
+        two.coords
+    assert two.nzone == 2
+
+
+def test_copy_and_pickle():
+    mesh = load(grid_2d(3, 2))
+    mesh.path = "mesh.su2"
+    for other in (copy.deepcopy(mesh), pickle.loads(pickle.dumps(mesh)), copy.copy(mesh)):
+        assert other.path == "mesh.su2"
+        assert_same_mesh(other, mesh)
+    deep = copy.deepcopy(mesh)
+    deep.coords[0, 0] = 5.0
+    assert mesh.coords[0, 0] == 0.0
+    # An unset slot raises AttributeError instead of recursing
+    with pytest.raises(AttributeError):
+        Mesh.__new__(Mesh).coords
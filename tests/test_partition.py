@@ -0,0 +1,116 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.cache import load_bundle
+from su2tools.mesh import TETRAHEDRON
+from su2tools.partition import (
+    IMBALANCE,
+    edge_cut,
+    imbalance,
+    partition_graph,
+    partition_mesh,
+    split_zone,
+)
+from su2tools.reader import read_mesh
+from su2tools.topology import dual_graph
+
+from .meshes import ROOT, grid_2d, grid_3d, load
+
+
+@pytest.mark.parametrize("nparts", [2, 3, 4, 7])
+def test_partition_graph(nparts):
+    zone = load(grid_2d(24, 20, triangles=True)).zones[0]
+    xadj, adjncy = dual_graph(zone)
+    parts = partition_graph(xadj, adjncy, nparts)
+    assert set(parts.tolist()) == set(range(nparts))
+    assert imbalance(parts, nparts) <= IMBALANCE + 1e-9
+    # Much better than a random assignment of the same sizes
+    shuffled = np.random.default_rng(0).permutation(parts)
+    assert edge_cut(xadj, adjncy, parts) < edge_cut(xadj, adjncy, shuffled) / 4
+    assert np.array_equal(parts, partition_graph(xadj, adjncy, nparts))
+
+
+@pytest.mark.parametrize("halo", [1, 2])
+def test_split_zone(halo):
+    zone = load(grid_3d(5, TETRAHEDRON)).zones[0]
+    nparts = 3
+    parts = partition_graph(*dual_graph(zone), nparts)
+    pieces = split_zone(zone, parts, nparts, halo)
+    owners = np.concatenate([maps["global_points"][: piece.npoin_domain] for piece, maps in pieces])
+    assert np.array_equal(np.sort(owners), np.arange(zone.npoin))
+    owned = np.concatenate([maps["global_elems"][maps["elem_owner"] == r] for r, (_, maps) in enumerate(pieces)])
+    assert np.array_equal(np.sort(owned), np.arange(zone.nelem))
+
+    for r, (piece, maps) in enumerate(pieces):
+        g = maps["global_points"]
+        assert np.array_equal(piece.coords, zone.coords[g])
+        assert (maps["point_owner"][: piece.npoin_domain] == r).all()
+        assert (maps["point_owner"][piece.npoin_domain :] != r).all()
+        # Local elements are the global ones, renumbered
+        for local, elem in enumerate(maps["global_elems"][:10]):
+            assert np.array_equal(g[piece.element(local)], zone.element(elem))
+        # What r receives from q is what q sends to r, in the same global order
+        for m in piece.markers:
+            if m.send_to is None or m.send_to > 0:
+                continue
+            q = -m.send_to - 1
+            other, other_maps = pieces[q]
+            sent = [s for s in other.markers if s.send_to == r + 1]
+            assert len(sent) == 1
+            assert np.array_equal(g[m.elem_conn], other_maps["global_points"][sent[0].elem_conn])
+            assert (maps["point_owner"][m.elem_conn] == q).all()
+
+
+def test_partition_mesh(tmp_path):
+    path = os.path.join(ROOT, "euler", "wedge", "mesh_wedge_inv.su2")
+    mesh = read_mesh(path)
+    report = partition_mesh(mesh, 4, str(tmp_path))
+    assert report["zones"][0]["imbalance"] <= IMBALANCE + 1e-9
+    for r in range(4):
+        piece = read_mesh(str(tmp_path / f"mesh_wedge_inv_{r}.su2")).zones[0]
+        maps, meta = load_bundle(str(tmp_path / f"mesh_wedge_inv_{r}.map"))
+        assert meta["rank"] == r
+        assert piece.npoin_domain == report["zones"][0]["ranks"][r]["npoin_domain"]
+        assert np.array_equal(piece.coords, mesh.coords[maps["z0/global_points"]])
+        # Boundary elements are kept where all their points are local
+        lower = piece.marker("lower")
+        assert np.isin(maps["z0/global_points"][lower.elem_conn], mesh.marker("lower").nodes).all()
+
+
+def test_rank_files_count_markers(tmp_path):
+    mesh = read_mesh(os.path.join(ROOT, "rans", "naca0012", "n0012_113-33.su2"))
+    partition_mesh(mesh, 4, str(tmp_path))
+    for r in range(4):
+        with open(tmp_path / f"n0012_113-33_{r}.su2") as f:
+            lines = f.read().splitlines()
+        (nmark,) = [int(line.split("=")[1]) for line in lines if line.startswith("NMARK=")]
+        tags = [line.split("=")[1].strip() for line in lines if line.startswith("MARKER_TAG=")]
+        # SU2 reads NMARK marker blocks: one per SEND_RECEIVE neighbour, under the same tag
+        assert nmark == len(tags)
+        assert tags.count("SEND_RECEIVE") == sum(line.startswith("SEND_TO=") for line in lines) > 0
+
+
+def test_refuses_send_receive(tmp_path):
+    mesh = read_mesh(os.path.join(ROOT, "turbomachinery", "centrifugal_blade", "su2mesh_periodic.su2"))
+    zone = mesh.zones[0]
+    assert not all(p.is_identity for p in zone.periodic)
+    parts = np.zeros(zone.nelem, dtype=np.int32)
+    with pytest.raises(ValueError, match="SEND_RECEIVE"):
+        split_zone(zone, parts, 2)
+    with pytest.raises(ValueError, match="SEND_RECEIVE"):
+        partition_mesh(mesh, 2, str(tmp_path))
+
+
+def test_periodic_transforms():
+    mesh = read_mesh(os.path.join(ROOT, "turbomachinery", "centrifugal_blade", "su2mesh_periodic.su2"))
+    zone = mesh.zones[0]
+    zone.markers = [m for m in zone.markers if m.send_to is None]
+    zone.npoin_domain = zone.npoin
+    parts = partition_graph(*dual_graph(zone), 2)
+    for piece, _ in split_zone(zone, parts, 2):
+        assert piece.periodic and all(p.is_identity for p in piece.periodic)
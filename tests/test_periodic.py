@@ -0,0 +1,98 @@
+# Standard Python modules
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.kdtree import KDTree
+from su2tools.mesh import PeriodicTransform
+from su2tools.periodic import find_pairs, map_path, match_pair, periodic_map
+
+from .meshes import grid_2d, load, write
+
+PERIODIC = """NPERIODIC= 2
+PERIODIC_INDEX= 0
+0.0 0.0 0.0
+0.0 0.0 0.0
+0.0 0.0 0.0
+PERIODIC_INDEX= 1
+0.0 0.0 0.0
+0.0 0.0 0.0
+1.0 0.0 0.0
+"""
+
+
+def brute_force(points, x, k):
+    dist = np.linalg.norm(x[:, None, :] - points[None, :, :], axis=2)
+    return np.sort(dist, axis=1)[:, :k]
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+@pytest.mark.parametrize("k", [1, 5])
+@pytest.mark.parametrize("n", [1, 7, 500])
+def test_kdtree_brute_force(n, k, dim):
+    rng = np.random.default_rng(n)
+    points = rng.uniform(size=(n, dim))
+    x = rng.uniform(-0.2, 1.2, size=(200, dim))
+    dist, index = KDTree(points, leaf_size=4).query(x, k)
+    expected = brute_force(points, x, k)
+    if k == 1:
+        dist, index, expected = dist[:, None], index[:, None], expected[:, :1]
+    found = index < n
+    assert np.allclose(dist[:, :n], expected)
+    assert np.isinf(dist[:, n:]).all() and not found[:, n:].any()
+    neighbors = points[index[found]] - np.repeat(x, k, axis=0)[found.ravel()]
+    assert np.allclose(np.linalg.norm(neighbors, axis=1), dist[found])
+
+
+def test_kdtree_duplicates():
+    points = np.repeat(np.random.default_rng(0).uniform(size=(50, 3)), 3, axis=0)
+    dist, index = KDTree(points).query(points, 3)
+    assert np.allclose(dist, 0.0)
+    assert (np.sort(index, axis=1) // 3 == np.arange(150)[:, None] // 3).all()
+
+
+def test_kdtree_empty():
+    dist, index = KDTree(np.zeros((0, 2))).query(np.ones((3, 2)))
+    assert np.isinf(dist).all() and (index == 0).all()
+
+
+def test_match_translation():
+    zone = load(grid_2d(6, 4, jitter=0.3) + PERIODIC).zones[0]
+    pair = match_pair(zone, "left", "right", 1)
+    assert pair.is_one_to_one and pair.max_mismatch < 1e-12
+    assert np.allclose(zone.coords[pair.receiver_points], zone.coords[pair.donor_points] + [1.0, 0.0])
+    with pytest.raises(ValueError, match="PERIODIC_INDEX 2"):
+        match_pair(zone, "left", "right", 2)
+
+
+def test_find_pairs_rotation():
+    zone = load(grid_2d(5, 5)).zones[0]
+    zone.periodic = [PeriodicTransform(1, [0.5, 0.5, 0.0], [0.0, 0.0, np.pi / 2], [0.0, 0.0, 0.0])]
+    (pair,) = find_pairs(zone)
+    assert pair.is_one_to_one and pair.max_mismatch < 1e-12
+    rotated = zone.periodic[0].apply(zone.coords[pair.donor_points])
+    assert np.allclose(zone.coords[pair.receiver_points], rotated)
+
+
+def test_find_pairs_rejects_mismatch():
+    zone = load(grid_2d(6, 4) + PERIODIC).zones[0]
+    zone.periodic[1].translation[:] = [0.9, 0.0, 0.0]
+    assert find_pairs(zone) == []
+
+
+def test_map_cache(tmp_path):
+    path = write(tmp_path, grid_2d(6, 4) + PERIODIC)
+    pairs, cached = periodic_map(path)
+    assert not cached and [(p.donor, p.receiver, p.index) for p in pairs] == [("left", "right", 1)]
+    again, cached = periodic_map(path)
+    assert cached
+    assert np.array_equal(again[0].receiver_points, pairs[0].receiver_points)
+    # A request for other pairs, or a modified mesh, rebuilds the map
+    assert not periodic_map(path, [(1, "right", "left", 1)])[1]
+    with open(path, "a") as f:
+        f.write("\n")
+    assert not periodic_map(path)[1]
+    assert os.path.exists(map_path(path))
@@ -0,0 +1,96 @@
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.mesh import HEXAHEDRON, PRISM, QUADRILATERAL, TETRAHEDRON, TRIANGLE
+from su2tools.quality import (
+    BINS,
+    METRICS,
+    element_quality,
+    histogram,
+    inverted,
+    summarize,
+)
+from su2tools.writer import write_mesh
+
+from .meshes import grid_2d, grid_3d, load, write
+
+
+@pytest.mark.parametrize("clockwise", [False, True])
+def test_orientation_2d(tmp_path, clockwise):
+    text = grid_2d(6, 4, triangles=True, clockwise=clockwise)
+    zone = load(text).zones[0]
+    volume = element_quality(zone)["volume"]
+    assert np.isclose(np.abs(volume).sum(), 1.0)
+    assert ((volume < 0) == clockwise).all()
+    assert not inverted(zone, volume).any()
+    assert summarize(write(tmp_path, text))["inverted"] == 0
+
+    # One element in the other orientation
+    zone.elem_conn[:3] = zone.elem_conn[:3][::-1].copy()
+    flipped = inverted(zone, element_quality(zone)["volume"])
+    assert np.flatnonzero(flipped).tolist() == [0]
+
+
+def test_orientation_hybrid(tmp_path):
+    mesh = load(grid_2d(6, 4))
+    zone = mesh.zones[0]
+    quads = zone.elem_conn.reshape(-1, 4)
+    # Clockwise triangles on the left half, counter-clockwise quadrilaterals on the right half
+    left, right = quads[:12], quads[12:]
+    triangles = np.concatenate([left[:, [2, 1, 0]], left[:, [3, 2, 0]]])
+    zone.elem_types = np.array([TRIANGLE] * 24 + [QUADRILATERAL] * 12, dtype=zone.elem_types.dtype)
+    zone.elem_offsets = np.concatenate([np.arange(0, 72, 3), np.arange(72, 121, 4)])
+    zone.elem_conn = np.concatenate([triangles.ravel(), right.ravel()]).astype(zone.elem_conn.dtype)
+    quality = element_quality(zone)
+    assert ((quality["volume"] < 0) == (zone.elem_types == TRIANGLE)).all()
+    assert np.isclose(np.abs(quality["volume"]).sum(), 1.0)
+    assert not quality["inverted"].any() and not inverted(zone, quality["volume"]).any()
+    path = str(tmp_path / "hybrid.su2")
+    write_mesh(mesh, path)
+    assert summarize(path)["inverted"] == 0
+
+    # A reversed element of either type is found among the elements of its type
+    for elem in (0, 30):
+        start, stop = zone.elem_offsets[elem], zone.elem_offsets[elem + 1]
+        zone.elem_conn[start:stop] = zone.elem_conn[start:stop][::-1].copy()
+    assert np.flatnonzero(element_quality(zone)["inverted"]).tolist() == [0, 30]
+
+
+@pytest.mark.parametrize("etype", [HEXAHEDRON, PRISM, TETRAHEDRON])
+def test_volume_3d(etype):
+    zone = load(grid_3d(3, etype)).zones[0]
+    volume = element_quality(zone)["volume"]
+    assert (volume > 0).all()
+    assert np.isclose(volume.sum(), 1.0)
+    assert not inverted(zone, volume).any()
+    # A mirrored element has a negative volume
+    zone.coords[:, 2] *= -1
+    assert inverted(zone, element_quality(zone)["volume"]).all()
+
+
+def test_metrics_regular_grid():
+    quality = element_quality(load(grid_2d(4, 4)).zones[0])
+    assert np.allclose(quality["aspect_ratio"], 1.0)
+    assert np.allclose(quality["skewness"], 0.0)
+    assert np.allclose(quality["orthogonality"], 1.0)
+    assert np.allclose(quality["growth_ratio"], 1.0)
+    # Right isosceles triangles: angles of 90 and 45 degrees
+    quality = element_quality(load(grid_2d(4, 4, triangles=True)).zones[0])
+    assert np.allclose(quality["skewness"], 0.25)
+    assert np.allclose(quality["aspect_ratio"], np.sqrt(2))
+
+
+def test_stretched_grid():
+    quality = element_quality(load(grid_2d(2, 8)).zones[0])
+    assert np.allclose(quality["aspect_ratio"], 4.0)
+    quality = element_quality(load(grid_2d(4, 4, jitter=0.3)).zones[0])
+    assert (quality["skewness"] > 0).any() and (quality["orthogonality"] < 1).any()
+
+
+def test_histogram():
+    for metric in METRICS:
+        values = np.array([BINS[metric][0], np.nan, BINS[metric][-2]])
+        counts = histogram(values, metric)
+        assert counts.sum() == 2 and counts[0] == 1 and counts[-1] == 1
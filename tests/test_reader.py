@@ -0,0 +1,79 @@
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.mesh import LINE, QUADRILATERAL, TRIANGLE
+from su2tools.reader import parse, read_mesh
+
+from .meshes import grid_2d, load, write
+
+MULTIZONE = b"""NZONE= 2
+IZONE= 1
+NDIME= 2
+NELEM= 1
+5 0 1 2 0
+NPOIN= 3
+0.0 0.0 0
+1.0 0.0 1
+0.0 1.0 2
+NMARK= 1
+MARKER_TAG= wall
+MARKER_ELEMS= 1
+3 0 1
+IZONE= 2
+NDIME= 2
+NELEM= 1
+9 0 1 2 3 0
+NPOIN= 4 3
+0.0 0.0 0
+1.0 0.0 1
+1.0 1.0 2
+0.0 1.0 3
+NMARK= 0
+"""
+
+
+def test_grid():
+    mesh = load(grid_2d(4, 3))
+    zone = mesh.zones[0]
+    assert (zone.ndime, zone.nelem, zone.npoin) == (2, 12, 20)
+    assert (zone.elem_types == QUADRILATERAL).all()
+    assert np.array_equal(zone.elem_offsets, np.arange(13) * 4)
+    assert np.array_equal(zone.element(0), [0, 4, 5, 1])
+    assert np.allclose(zone.coords[19], [1.0, 1.0])
+    assert [m.tag for m in zone.markers] == ["lower", "right", "upper", "left"]
+    assert (zone.marker("lower").elem_types == LINE).all()
+    assert np.array_equal(zone.marker("left").nodes, [0, 1, 2, 3])
+
+
+def test_chunks():
+    text = grid_2d(7, 5, triangles=True)
+    full = load(text).zones[0]
+    chunked = parse(text.encode(), chunk_lines=3).zones[0]
+    assert (chunked.elem_types == TRIANGLE).all()
+    for name in ("elem_types", "elem_offsets", "elem_conn", "coords"):
+        assert np.array_equal(getattr(full, name), getattr(chunked, name))
+
+
+def test_multizone():
+    mesh = parse(MULTIZONE)
+    assert mesh.nzone == 2
+    assert [z.izone for z in mesh] == [1, 2]
+    assert mesh[1].npoin == 4 and mesh[1].npoin_domain == 3
+    assert mesh[0].marker("wall").nelem == 1
+    with pytest.raises(AttributeError):
+        mesh.coords
+
+
+def test_single_zone_attributes(tmp_path):
+    mesh = read_mesh(write(tmp_path, grid_2d(2, 2)))
+    assert mesh.path.endswith("mesh.su2")
+    assert mesh.npoin == 9
+    assert mesh.coords is mesh.zones[0].coords
+
+
+def test_truncated():
+    text = grid_2d(2, 2)
+    with pytest.raises(ValueError, match="<buffer>"):
+        parse(text[: text.index("NPOIN") + 20].encode())
@@ -0,0 +1,81 @@
+# Standard Python modules
+import copy
+import os
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.reader import read_mesh
+from su2tools.renumber import (
+    METHODS,
+    apply_order,
+    bandwidth_profile,
+    hilbert_keys,
+    morton_keys,
+    point_order,
+    renumber,
+)
+
+from .meshes import ROOT, grid_2d, load
+
+
+def _element_coords(zone):
+    """Sorted rows of (type, coordinates of the nodes) of all elements."""
+    rows = [(int(t), *zone.coords[zone.element(i)].ravel().tolist()) for i, t in enumerate(zone.elem_types)]
+    return sorted(rows)
+
+
+def _marker_coords(zone):
+    coords = {}
+    for m in zone.markers:
+        bounds = zip(m.elem_offsets[:-1], m.elem_offsets[1:])
+        coords[m.tag] = sorted(tuple(zone.coords[m.elem_conn[a:b]].ravel().tolist()) for a, b in bounds)
+    return coords
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_renumber_keeps_mesh(method):
+    mesh = read_mesh(os.path.join(ROOT, "cont_adj_euler", "wedge", "mesh_wedge_inv_FFD.su2"))
+    before = copy.deepcopy(mesh.zones[0])
+    renumber(mesh, method)
+    zone = mesh.zones[0]
+    assert _element_coords(zone) == _element_coords(before)
+    assert _marker_coords(zone) == _marker_coords(before)
+    for box, old in zip(zone.ffd_boxes, before.ffd_boxes):
+        assert np.array_equal(zone.coords[box.surface_points], before.coords[old.surface_points])
+    # Elements are sorted by their lowest point
+    lowest = np.minimum.reduceat(zone.elem_conn, zone.elem_offsets[:-1])
+    assert (np.diff(lowest) >= 0).all()
+
+
+def test_rcm_bandwidth():
+    zone = load(grid_2d(30, 10, triangles=True)).zones[0]
+    apply_order(zone, np.random.default_rng(0).permutation(zone.npoin))
+    shuffled = bandwidth_profile(zone)
+    apply_order(zone, point_order(zone, "rcm"))
+    bandwidth, profile = bandwidth_profile(zone)
+    # Level sets of a 31 x 11 grid hold at most about 12 points
+    assert bandwidth <= 24 < shuffled[0]
+    assert profile < shuffled[1] / 10
+
+
+def test_ghost_points_stay_last():
+    zone = load(grid_2d(6, 6)).zones[0]
+    zone.npoin_domain = 40
+    perm = point_order(zone, "hilbert")
+    assert (perm[:40] < 40).all() and (perm[40:] >= 40).all()
+
+
+def test_space_filling_curves():
+    i, j = np.meshgrid(np.arange(16), np.arange(16), indexing="ij")
+    coords = np.column_stack([i.ravel(), j.ravel()]).astype(float)
+    # Successive cells of the Hilbert curve are neighbors
+    path = coords[np.argsort(hilbert_keys(coords, bits=4))]
+    assert (np.abs(np.diff(path, axis=0)).sum(axis=1) == 1).all()
+    assert len(np.unique(hilbert_keys(coords, bits=4))) == 256
+    # Morton keys interleave the bits, x first
+    assert morton_keys(np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]), bits=1).tolist() == [0, 2, 1, 3]
+    with pytest.raises(ValueError):
+        point_order(load(grid_2d(2, 2)).zones[0], "random")
@@ -0,0 +1,67 @@
+# Standard Python modules
+import os
+import shutil
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.mesh import Mesh
+from su2tools.reader import read_mesh
+from su2tools.sections import (
+    get_index,
+    index_path,
+    load_marker,
+    load_points,
+    load_zone,
+    read_index,
+)
+
+from .meshes import ROOT, assert_same_mesh, grid_2d, write
+
+
+@pytest.fixture
+def multizone(tmp_path):
+    path = str(tmp_path / "meshFSI_2D.su2")
+    shutil.copy(os.path.join(ROOT, "fea_fsi", "WallChannel_2d", "meshFSI_2D.su2"), path)
+    return path
+
+
+def test_zones_equal_full_parse(multizone):
+    mesh = read_mesh(multizone)
+    index = get_index(multizone)
+    assert [z.izone for z in index.zones] == [z.izone for z in mesh]
+    for zone in mesh:
+        loaded = load_zone(multizone, zone.izone, index)
+        assert_same_mesh(Mesh([loaded]), Mesh([zone]))
+        assert np.array_equal(load_points(multizone, zone.izone, index), zone.coords)
+        for marker in zone.markers:
+            m = load_marker(multizone, marker.tag, zone.izone, index)
+            assert np.array_equal(m.elem_conn, marker.elem_conn)
+            assert np.array_equal(m.elem_types, marker.elem_types)
+
+
+def test_periodic_markers(tmp_path):
+    path = str(tmp_path / "mesh.su2")
+    shutil.copy(os.path.join(ROOT, "turbomachinery", "centrifugal_blade", "su2mesh_periodic.su2"), path)
+    mesh = read_mesh(path)
+    zone = mesh.zones[0]
+    assert_same_mesh(Mesh([load_zone(path, zone.izone)]), mesh)
+    send_receive = [m for m in zone.markers if m.send_to is not None][0]
+    marker = load_marker(path, send_receive.tag)
+    assert marker.send_to == send_receive.send_to
+    assert np.array_equal(marker.transform, send_receive.transform)
+
+
+def test_sidecar(tmp_path):
+    path = write(tmp_path, grid_2d(3, 3))
+    index = get_index(path)
+    assert os.path.exists(index_path(path))
+    assert read_index(path).to_dict() == index.to_dict()
+    # A changed mesh makes the sidecar stale
+    write(tmp_path, grid_2d(5, 3))
+    assert read_index(path) is None
+    assert load_points(path).shape == (24, 2)
+    with pytest.raises(KeyError):
+        load_marker(path, "missing")
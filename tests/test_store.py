@@ -0,0 +1,61 @@
+# Standard Python modules
+import os
+
+# First party modules
+from su2tools.store import (
+    duplicates,
+    find_files,
+    ingest,
+    link_duplicates,
+    materialize,
+    read_manifest,
+    resolve,
+    scan,
+)
+
+from .meshes import grid_2d
+
+
+def _tree(root):
+    (root / "a").mkdir(parents=True)
+    (root / "b" / "c").mkdir(parents=True)
+    (root / ".hidden").mkdir()
+    (root / "a" / "mesh.su2").write_text(grid_2d(3, 3))
+    (root / "b" / "c" / "mesh.su2").write_text(grid_2d(3, 3))
+    (root / "b" / "other.su2").write_text(grid_2d(4, 3))
+    (root / "b" / "notes.txt").write_text("not a mesh")
+    (root / ".hidden" / "mesh.su2").write_text(grid_2d(3, 3))
+
+
+def test_scan(tmp_path):
+    _tree(tmp_path)
+    assert find_files(tmp_path) == ["a/mesh.su2", "b/other.su2", "b/c/mesh.su2"]
+    files = scan(tmp_path)
+    assert list(duplicates(files).values()) == [["a/mesh.su2", "b/c/mesh.su2"]]
+
+
+def test_ingest_materialize(tmp_path):
+    root, store, dest = tmp_path / "root", str(tmp_path / "store"), tmp_path / "dest"
+    _tree(root)
+    files = ingest(str(root), store)
+    assert len(files) == 3
+    blobs = [os.path.join(d, f) for d, _, names in os.walk(os.path.join(store, "objects")) for f in names]
+    assert len(blobs) == 2
+    assert resolve(store, "a/mesh.su2") == resolve(store, "b/c/mesh.su2")
+
+    counts = materialize(store, str(dest), mode="hardlink")
+    assert counts == {"hardlink": 3}
+    for rel in read_manifest(store)["files"]:
+        assert (dest / rel).read_bytes() == (root / rel).read_bytes()
+    assert os.path.samefile(dest / "a" / "mesh.su2", dest / "b" / "c" / "mesh.su2")
+
+    counts = materialize(store, str(dest), mode="copy", paths=["b/other.su2"])
+    assert counts == {"copy": 1}
+
+
+def test_link_duplicates(tmp_path):
+    _tree(tmp_path)
+    size = (tmp_path / "a" / "mesh.su2").stat().st_size
+    assert link_duplicates(str(tmp_path)) == size
+    assert os.path.samefile(tmp_path / "a" / "mesh.su2", tmp_path / "b" / "c" / "mesh.su2")
+    assert link_duplicates(str(tmp_path)) == 0
@@ -0,0 +1,124 @@
+# Standard Python modules
+import os
+import shutil
+
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.tecplot import (
+    load_tecplot,
+    parse_tecplot,
+    read_table,
+    read_tecplot,
+    tecplot_path,
+)
+
+from .meshes import ROOT
+
+EXPERIMENT = os.path.join(ROOT, "rans", "rae2822", "RAE2822_case9_experimental.plt")
+GRADIENT = os.path.join(ROOT, "cont_adj_euler", "naca0012", "of_grad_cd.plt")
+
+ZONES = b"""TITLE = "zones"
+# A comment before the variables
+VARIABLES = "x", "y"
+"p"
+ZONE T="ordered", I=3, J=2, F=POINT
+0 0 1
+1 0 2
+2 0 3
+# A comment inside the data
+0 1 4, 1 1 5, 2 1 6
+ZONE T="ordered" I=2 DATAPACKING=BLOCK
+0 1
+5 6
+7 8
+ZONE T="triangles", N=4, E=2, ZONETYPE=FETRIANGLE
+0 0 1
+1 0 2
+1 1 3
+0 1 4
+1 2 3
+1 3 4
+"""
+
+
+def test_experiment():
+    data = read_tecplot(EXPERIMENT)
+    assert data.title == "Experimental data RAE2822 case9"
+    assert data.variables == ["x", "Pressure Coefficient"]
+    assert list(data.zones) == ["zone 1"] and not data.shapes
+    assert np.array_equal(data.values, np.loadtxt(EXPERIMENT, delimiter=",", skiprows=2))
+
+
+def test_read_table():
+    names, values = read_table(GRADIENT)
+    assert names == ["VARIABLE", "GRADIENT", "FINDIFF_STEP"]
+    assert np.array_equal(values[:, 0], np.arange(len(values)))
+    assert np.array_equal(values, np.loadtxt(GRADIENT, delimiter=",", skiprows=1))
+
+
+def test_zones():
+    data = parse_tecplot(ZONES)
+    assert data.variables == ["x", "y", "p"]
+    assert list(data.zones) == ["ordered", "ordered'", "triangles"]
+    ordered = data.zones["ordered"]
+    assert data.shapes["ordered"] == (3, 2, 1)
+    assert np.array_equal(ordered[:, 2], np.arange(1, 7)) and np.array_equal(ordered[3], [0, 1, 4])
+    # Block packing: one variable after the other
+    assert np.array_equal(data.zones["ordered'"], [[0, 5, 7], [1, 6, 8]])
+    assert np.array_equal(data.elements["triangles"], [[0, 1, 2], [0, 2, 3]])
+    assert np.array_equal(data.column("p"), [1, 2, 3, 4, 5, 6, 7, 8, 1, 2, 3, 4])
+    assert np.array_equal(data.column("p", zone="triangles"), [1, 2, 3, 4])
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        (b"#!TDV112", "binary Tecplot"),
+        (b'VARIABLES="x" "y"\n1 2 3\n', "not a multiple of 2"),
+        (b'VARIABLES="x" "y"\nZONE I=2\n1 2 3\n', "expected 2 points"),
+        (b'VARIABLES="x" "y"\n1 2\n3 4z\n', "non-numeric"),
+        (b'VARIABLES="x"\nZONE I=1, VARLOCATION=([1]=CELLCENTERED)\n1\n', "cell-centered"),
+        (b'VARIABLES="x"\nZONE N=1, E=1, ZONETYPE=FEPOLYGON\n1\n', "unsupported zone type FEPOLYGON"),
+    ],
+)
+def test_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_tecplot(text)
+
+
+def test_no_variables(tmp_path):
+    path = tmp_path / "data.plt"
+    path.write_bytes(b"1 2\n3 4\n")
+    with pytest.raises(ValueError, match="no VARIABLES"):
+        read_table(str(path))
+
+
+def test_cache(tmp_path):
+    path = str(tmp_path / "zones.plt")
+    with open(path, "wb") as f:
+        f.write(ZONES)
+    data, cached = load_tecplot(path)
+    assert not cached and os.path.exists(tecplot_path(path))
+    again, cached = load_tecplot(path)
+    assert cached and again.title == data.title and again.variables == data.variables
+    assert again.shapes == data.shapes
+    for name, values in data.zones.items():
+        assert np.array_equal(again.zones[name], values)
+    assert np.array_equal(again.elements["triangles"], data.elements["triangles"])
+    # A changed file is parsed again
+    with open(path, "ab") as f:
+        f.write(b"ZONE T=\"more\"\n9 9 9\n")
+    data, cached = load_tecplot(path, write=False)
+    assert not cached and np.array_equal(data.zones["more"], [[9, 9, 9]])
+    assert not load_tecplot(path)[1] and load_tecplot(path)[1]
+
+
+def test_corpus_cache(tmp_path):
+    path = str(tmp_path / "experiment.plt")
+    shutil.copy(EXPERIMENT, path)
+    load_tecplot(path)
+    data, cached = load_tecplot(path)
+    assert cached and np.array_equal(data.values, read_tecplot(EXPERIMENT).values)
@@ -0,0 +1,67 @@
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.mesh import HEXAHEDRON, PRISM, TETRAHEDRON
+from su2tools.solution import Solution, read_solution, write_solution
+from su2tools.transfer import PointLocator, transfer
+
+from .meshes import grid_2d, grid_3d, load
+
+
+def linear_solution(zone, gradient):
+    """A solution holding one linear field and one constant field."""
+    names = ["x", "y", "z"][: zone.ndime] + ["Linear", "Constant"]
+    linear = 0.5 + zone.coords @ np.asarray(gradient)[: zone.ndime]
+    return Solution(names, np.column_stack([zone.coords, linear, np.full(zone.npoin, 2.0)]))
+
+
+@pytest.mark.parametrize("triangles", [False, True])
+def test_linear_field_2d(triangles):
+    source = load(grid_2d(7, 5, triangles=triangles, jitter=0.3)).zones[0]
+    target = load(grid_2d(13, 11, triangles=not triangles, jitter=0.3, seed=1)).zones[0]
+    result, stats = transfer(source, linear_solution(source, [2.0, -3.0]), target)
+    assert stats["inside"] == target.npoin and stats["nearest"] == 0
+    assert np.allclose(result.coords, target.coords)
+    assert np.allclose(result.column("Linear"), linear_solution(target, [2.0, -3.0]).column("Linear"))
+    assert np.allclose(result.column("Constant"), 2.0)
+
+
+@pytest.mark.parametrize("etype", [HEXAHEDRON, PRISM, TETRAHEDRON])
+def test_linear_field_3d(etype):
+    source = load(grid_3d(3, etype)).zones[0]
+    target = load(grid_3d(5, TETRAHEDRON)).zones[0]
+    target.coords = np.random.default_rng(0).uniform(size=(300, 3))
+    result, stats = transfer(source, linear_solution(source, [1.0, -2.0, 4.0]), target)
+    assert stats["inside"] == 300
+    assert np.allclose(result.column("Linear"), 0.5 + target.coords @ [1.0, -2.0, 4.0])
+
+
+def test_outside_points_take_nearest_value():
+    source = load(grid_2d(4, 4)).zones[0]
+    locator = PointLocator(source)
+    x = np.array([[0.5, 0.5], [1.3, 0.5], [-0.2, -0.1]])
+    index, weights, inside = locator.interpolation(x)
+    assert inside.tolist() == [True, False, False]
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert np.allclose(source.coords[index[1:, 0]], [[1.0, 0.5], [0.0, 0.0]])
+    assert (weights[1:, 0] == 1.0).all()
+
+
+def test_solution_mismatch():
+    source = load(grid_2d(4, 4)).zones[0]
+    target = load(grid_2d(2, 2)).zones[0]
+    with pytest.raises(ValueError, match="9 points"):
+        transfer(source, linear_solution(target, [1.0, 1.0]), target)
+
+
+def test_solution_round_trip(tmp_path):
+    zone = load(grid_2d(3, 2)).zones[0]
+    solution = linear_solution(zone, [0.1, 0.2])
+    solution.footer = ["EXT_ITER= 10"]
+    path = str(tmp_path / "solution_flow.dat")
+    write_solution(path, solution)
+    again = read_solution(path)
+    assert again.names == solution.names and again.footer == solution.footer
+    assert np.allclose(again.values, solution.values)
@@ -0,0 +1,83 @@
+# External modules
+import numpy as np
+import pytest
+
+# First party modules
+from su2tools.mesh import HEXAHEDRON, TETRAHEDRON
+from su2tools.walldist import (
+    FaceTree,
+    face_distance,
+    mesh_wall_distance,
+    wall_distance,
+    wall_faces,
+    wall_markers,
+)
+
+from .meshes import grid_2d, grid_3d, load, write
+
+
+def brute_force(x, vertices):
+    d = face_distance(np.repeat(x, len(vertices), axis=0), np.tile(vertices, (len(x), 1, 1)))
+    return np.sqrt(d.reshape(len(x), len(vertices)).min(axis=1))
+
+
+def test_face_distance():
+    triangle = np.array([[[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]] * 4)
+    p = np.array([[0.2, 0.2, 0.5], [2.0, 0.0, 0.0], [1.0, 1.0, 0.0], [-1.0, -1.0, 1.0]])
+    assert np.allclose(face_distance(p, triangle), [0.25, 1.0, 0.5, 3.0])
+    segment = np.array([[[0.0, 0.0], [2.0, 0.0]]] * 3)
+    assert np.allclose(face_distance(np.array([[1.0, 3.0], [-3.0, 4.0], [2.0, 0.0]]), segment), [9.0, 25.0, 0.0])
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+def test_face_tree_brute_force(dim):
+    rng = np.random.default_rng(dim)
+    centers = rng.uniform(size=(300, 1, dim))
+    vertices = centers + 0.05 * rng.standard_normal((300, dim, dim))
+    x = rng.uniform(-0.5, 1.5, size=(500, dim))
+    dist, face = FaceTree(vertices).query(x)
+    assert np.allclose(dist, brute_force(x, vertices))
+    assert np.allclose(np.sqrt(face_distance(x, vertices[face])), dist)
+
+
+def test_wall_markers():
+    zone = load(grid_2d(2, 2).replace("MARKER_TAG= left", "MARKER_TAG= farfield")).zones[0]
+    assert wall_markers(zone) == ["lower", "right", "upper"]
+
+
+@pytest.mark.parametrize("etype", [HEXAHEDRON, TETRAHEDRON])
+def test_unit_cube(etype):
+    zone = load(grid_3d(4, etype)).zones[0]
+    distance, _ = wall_distance(zone, ["bottom"])
+    assert np.allclose(distance, zone.coords[:, 2])
+    distance, _ = wall_distance(zone)
+    assert np.allclose(distance, np.minimum(zone.coords, 1 - zone.coords).min(axis=1))
+
+
+def test_chunks():
+    zone = load(grid_2d(9, 7, triangles=True, jitter=0.3)).zones[0]
+    distance, face = wall_distance(zone, ["lower", "left"])
+    chunked, _ = wall_distance(zone, ["lower", "left"], chunk_points=7)
+    assert np.array_equal(distance, chunked)
+    x, y = zone.coords.T
+    assert np.allclose(distance, np.minimum(x, y))
+    # The closest face is one of the 9 segments of lower, then of the 7 of left
+    vertices = wall_faces(zone, ["lower", "left"])
+    assert len(vertices) == 16
+    assert np.allclose(np.sqrt(face_distance(zone.coords, vertices[face])), distance)
+    clear = np.abs(x - y) > 1e-9
+    assert np.array_equal(face[clear] < 9, (y < x)[clear])
+    with pytest.raises(ValueError, match="no marker wall"):
+        wall_distance(zone, ["wall"])
+
+
+def test_cache(tmp_path):
+    path = write(tmp_path, grid_2d(4, 3))
+    walls, distances, cached = mesh_wall_distance(path)
+    assert not cached and walls == [["lower", "right", "upper", "left"]]
+    again, cached_distances, cached = mesh_wall_distance(path)
+    assert cached and again == walls
+    assert np.array_equal(cached_distances[0][0], distances[0][0])
+    # Other wall markers are computed again
+    walls, distances, cached = mesh_wall_distance(path, ["lower"])
+    assert not cached and walls == [["lower"]]